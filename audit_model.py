@@ -0,0 +1,302 @@
+"""
+Audit data shared by the SiteRoast app and its report workers: console/PDF-safe text helpers,
+the finding vocabulary and Finding record, and the stored audit format (pack_audit/unpack_audit).
+Importing this module has no side effects, so worker processes can load it without the app.
+"""
+import hashlib
+import json
+import sys
+import zlib
+
+def clean_text(text):
+    """
+    Brutal ASCII Text Sanitizer: Removes ALL Unicode/emojis for FPDF.
+    Forces conversion to ASCII to eliminate any possibility of font rendering issues.
+    This prevents Unicode errors that cause blank PDFs on Streamlit Cloud.
+    """
+    if text is None:
+        return ""
+    
+    # Force string, replace common smart quotes, then strip non-ASCII
+    text = str(text).replace("'", "'").replace('"', '"').replace('"', '"')
+    return text.encode('ascii', 'ignore').decode('ascii')
+
+def clean_text_for_pdf(text):
+    """
+    Alias for clean_text - kept for backward compatibility.
+    All new code should use clean_text() directly.
+    """
+    return clean_text(text)
+
+def safe_error_message(error, max_length=200):
+    """
+    Safely convert an error to a string that can be displayed without Unicode encoding issues.
+    This function ensures error messages don't contain emojis or Unicode that Windows can't handle.
+    """
+    try:
+        error_str = str(error)
+        # Clean the error message to remove Unicode characters
+        error_str = clean_text_for_pdf(error_str)
+        # Truncate if too long
+        if len(error_str) > max_length:
+            error_str = error_str[:max_length] + "..."
+        return error_str
+    except Exception:
+        # If even cleaning fails, return a safe fallback
+        return "An error occurred during processing. Please try again."
+
+def safe_print(*args, **kwargs):
+    """
+    Safe print function that handles Unicode characters on Windows.
+    Replaces emojis with ASCII equivalents before printing.
+    """
+    try:
+        # Convert all arguments to strings and clean them
+        cleaned_args = []
+        for arg in args:
+            if isinstance(arg, (str, bytes)):
+                cleaned = safe_error_message(str(arg), max_length=10000)
+                cleaned_args.append(cleaned)
+            else:
+                cleaned_args.append(str(arg))
+        
+        # Use the cleaned arguments for printing
+        print(*cleaned_args, **kwargs)
+    except Exception:
+        # If printing fails, try to print a safe fallback
+        try:
+            print("[Print error: Unable to display message]", **kwargs)
+        except:
+            pass  # If even that fails, silently continue
+
+def content_hash(value):
+    """Short stable hash of text or a JSON-serializable value."""
+    if not isinstance(value, str):
+        value = json.dumps(value, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+# Stored audit format: canonical JSON (each finding once, derived views dropped) compressed with zlib.
+# Bump the schema version when the canonical layout changes; unpack_audit also reads plain JSON rows.
+AUDIT_STORAGE_SCHEMA_VERSION = 1
+
+def _radar_scores_view(radar_metrics):
+    return {name: radar_metrics.get(name.lower(), 50) for name in ("UX", "Conversion", "Copy", "Visuals", "Trust", "Speed")}
+
+def _summary_bullets_view(audit_items):
+    return ([f"✅ {item.get('element')}" for item in audit_items if item.get("status") in ("Excellent", "Good")][:10] +
+            [f"❌ {item.get('element')}" for item in audit_items if item.get("status") in ("Needs Improvement", "Failed")][:10])
+
+def _derived_audit_fields(data):
+    """Top-level fields that duplicate or are computed from other fields of a (legacy-view) audit."""
+    overview = data.get("overview") or {}
+    overall_score = overview.get("overallScore")
+    return {
+        "overall_score": overall_score,
+        "roastSummary": overview.get("executiveSummary"),
+        "headline_roast": f"Site Score: {overall_score}/100",
+        "radar_scores": _radar_scores_view(data.get("radarMetrics") or {}),
+        "quick_wins": data.get("quickWins"),
+        "summary_bullets": _summary_bullets_view(data.get("audit_items") or [])
+    }
+
+def pack_audit(roast_data):
+    """
+    Encode a compile_roast result for storage. Every finding is stored once in a "findings" table;
+    detailedAudit, auditSnapshot worker items, audit_items and quickWins become indexes into it
+    (entries that aren't a view of a stored finding stay inline), and top-level fields that
+    duplicate other fields are dropped when they match. unpack_audit restores the exact original.
+    """
+    data = json.loads(json.dumps(roast_data, default=str))
+    derived = _derived_audit_fields(data)
+    findings, finding_index = [], {}
+    
+    def ref(item):
+        key = json.dumps(item, sort_keys=True)
+        if key not in finding_index:
+            finding_index[key] = len(findings)
+            findings.append(item)
+        return finding_index[key]
+    
+    snapshot = data.get("auditSnapshot") or {}
+    if snapshot.get("workerItems"):
+        snapshot["workerItems"] = {worker: [ref(item) for item in items] for worker, items in snapshot["workerItems"].items()}
+    if data.get("detailedAudit"):
+        data["detailedAudit"] = {category: [ref(item) for item in items] for category, items in data["detailedAudit"].items()}
+    
+    views = {"audit_items": {}, "quickWins": {}}
+    for index, item in enumerate(findings):
+        finding = Finding.from_item(item)
+        views["audit_items"].setdefault(json.dumps(finding.audit_item(), sort_keys=True), index)
+        views["quickWins"].setdefault(json.dumps(finding.quick_win(), sort_keys=True), index)
+    for field, view_index in views.items():
+        if isinstance(data.get(field), list):
+            data[field] = [view_index.get(json.dumps(entry, sort_keys=True), entry) for entry in data[field]]
+    
+    dropped = [field for field, value in derived.items() if field in data and data[field] == value]
+    for field in dropped:
+        del data[field]
+    
+    data["schema"] = AUDIT_STORAGE_SCHEMA_VERSION
+    data["derived"] = dropped
+    data["findings"] = findings
+    return zlib.compress(json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8"), 6)
+
+# Rationale of the stand-in finding compile_roast adds when the visuals worker returned nothing
+VISUALS_PLACEHOLDER_RATIONALE = "Visual analysis data was not available. This may indicate the visuals worker did not return structured findings."
+
+def _flag_visuals_placeholder(data):
+    """Audits stored before findings carried a "placeholder" flag: mark the empty-visuals stand-in by its rationale."""
+    for item in (data.get("detailedAudit") or {}).get("visuals") or []:
+        if item.get("rationale") == VISUALS_PLACEHOLDER_RATIONALE:
+            item["placeholder"] = True
+    return data
+
+def unpack_audit(stored):
+    """Decode pack_audit output (bytes) back to the full audit dict; plain JSON text (pre-schema rows) is parsed as-is."""
+    if isinstance(stored, str):
+        return _flag_visuals_placeholder(json.loads(stored))
+    data = json.loads(zlib.decompress(stored).decode("utf-8"))
+    schema = data.pop("schema", None)
+    if schema != AUDIT_STORAGE_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported stored audit schema {schema}")
+    findings = data.pop("findings")
+    dropped = data.pop("derived")
+    
+    def expand(refs, view=None):
+        return [
+            (getattr(Finding.from_item(findings[entry]), view)() if view else json.loads(json.dumps(findings[entry])))
+            if isinstance(entry, int) else entry
+            for entry in refs
+        ]
+    
+    if data.get("detailedAudit"):
+        data["detailedAudit"] = {category: expand(refs) for category, refs in data["detailedAudit"].items()}
+        _flag_visuals_placeholder(data)
+    snapshot = data.get("auditSnapshot") or {}
+    if snapshot.get("workerItems"):
+        snapshot["workerItems"] = {worker: expand(refs) for worker, refs in snapshot["workerItems"].items()}
+    if isinstance(data.get("audit_items"), list):
+        data["audit_items"] = expand(data["audit_items"], "audit_item")
+    if isinstance(data.get("quickWins"), list):
+        data["quickWins"] = expand(data["quickWins"], "quick_win")
+    derived = _derived_audit_fields(data)
+    for field in dropped:
+        data[field] = derived[field]
+    return data
+
+RADAR_CATEGORIES = ["ux", "conversion", "copy", "visuals", "trust", "speed"]
+
+# Finding vocabularies. Values are interned so every Finding shares the same string objects.
+STATUS_SCALE = tuple(sys.intern(status) for status in ("Excellent", "Good", "Satisfactory", "Needs Improvement", "Failed"))
+IMPACT_LEVELS = tuple(sys.intern(impact) for impact in ("HI", "MI", "LI"))
+IMPACT_LABELS = {"HI": "High Impact", "MI": "Medium Impact", "LI": "Low Impact"}
+_FINDING_VOCABULARY = {value: value for value in STATUS_SCALE + IMPACT_LEVELS + tuple(sys.intern(c) for c in RADAR_CATEGORIES)}
+
+class Finding:
+    """
+    One audit finding in normalized form, read from either the unified worker schema
+    (elementName/workingWell/fix{...}) or a legacy audit_items entry (element/working/fix string).
+    status, impact and category are interned vocabulary strings; unknown schema keys (source,
+    metrics, provenance, ...) are kept in extra. The JSON views - to_item() for detailedAudit,
+    audit_item() and quick_win() - are only built when a result is serialized.
+    """
+    __slots__ = ("element_name", "status", "impact", "category", "rationale", "working_well", "not_working",
+                 "conversion_impact", "quick_fix", "fix_example", "expected_impact", "change", "extra")
+    
+    ITEM_KEYS = frozenset(("elementName", "element", "status", "impact", "radarCategory", "rationale", "workingWell", "working",
+                           "notWorking", "not_working", "conversionImpact", "expected_impact", "fix", "change"))
+    
+    def __init__(self, element_name, status="Satisfactory", impact="MI", category="", rationale="", working_well=None,
+                 not_working=None, conversion_impact="", quick_fix="", fix_example="", expected_impact="", change=None, extra=None):
+        self.element_name = element_name
+        self.status = _FINDING_VOCABULARY.get(status, status)
+        self.impact = _FINDING_VOCABULARY.get(impact, impact)
+        self.category = _FINDING_VOCABULARY.get(category, category)
+        self.rationale = rationale
+        self.working_well = working_well or []
+        self.not_working = not_working or []
+        self.conversion_impact = conversion_impact
+        self.quick_fix = quick_fix
+        self.fix_example = fix_example
+        self.expected_impact = expected_impact
+        self.change = change
+        self.extra = extra
+    
+    @classmethod
+    def from_item(cls, item):
+        fix = item.get("fix")
+        if isinstance(fix, dict):
+            quick_fix, fix_example, expected_impact = fix.get("quickFix", ""), fix.get("example", ""), fix.get("expectedImpact", "")
+        else:
+            quick_fix, fix_example, expected_impact = str(fix) if fix else "", "", ""
+        return cls(
+            item.get("elementName", item.get("element", "")),
+            item.get("status", "Satisfactory"),
+            item.get("impact", "MI"),
+            (item.get("radarCategory") or "").lower(),
+            item.get("rationale", ""),
+            item.get("workingWell", item.get("working")),
+            item.get("notWorking", item.get("not_working")),
+            item.get("conversionImpact", item.get("expected_impact", "")),
+            quick_fix,
+            fix_example,
+            expected_impact,
+            item.get("change"),
+            {key: value for key, value in item.items() if key not in cls.ITEM_KEYS} or None
+        )
+    
+    @property
+    def impact_label(self):
+        return IMPACT_LABELS.get(self.impact, "Medium Impact")
+    
+    @property
+    def is_failing(self):
+        return self.status in ("Needs Improvement", "Failed")
+    
+    @property
+    def is_passing(self):
+        return self.status in ("Excellent", "Good")
+    
+    def to_item(self):
+        """Unified-schema dict (the detailedAudit / worker item format)."""
+        item = {
+            "elementName": self.element_name,
+            "status": self.status,
+            "impact": self.impact,
+            "radarCategory": self.category,
+            "rationale": self.rationale,
+            "workingWell": self.working_well,
+            "notWorking": self.not_working,
+            "conversionImpact": self.conversion_impact,
+            "fix": {"quickFix": self.quick_fix, "example": self.fix_example, "expectedImpact": self.expected_impact}
+        }
+        if self.change is not None:
+            item["change"] = self.change
+        if self.extra:
+            item.update(self.extra)
+        return item
+    
+    def audit_item(self):
+        """Legacy audit_items entry."""
+        return {
+            "element": self.element_name,
+            "status": self.status,
+            "rationale": self.rationale,
+            "working": self.working_well,
+            "not_working": self.not_working,
+            "fix": self.quick_fix,
+            "expected_impact": self.conversion_impact,
+            "change": self.change
+        }
+    
+    def quick_win(self):
+        """Quick-win card."""
+        return {
+            "title": self.element_name or "Fix Required",
+            "elementName": self.element_name or "Fix Required",
+            "problem": "; ".join(self.not_working[:2]) if self.not_working else "Review and improve",
+            "fix": self.quick_fix or "Review and improve",
+            "example": self.fix_example,
+            "effort": "15min",
+            "lift": self.expected_impact or "Expected conversion improvement"
+        }
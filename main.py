@@ -1,6 +1,6 @@
 import streamlit as st
 import google.generativeai as genai
-from PIL import Image, ImageDraw, ImageFilter
+from PIL import Image, ImageFilter
 import os
 import json
 import re
@@ -9,7 +9,7 @@ import random
 from dotenv import load_dotenv
 import pandas as pd
 import plotly.express as px
-from fpdf import FPDF
+from bs4 import BeautifulSoup
 import io
 import asyncio
 from playwright.async_api import async_playwright
@@ -19,7 +19,27 @@ import numpy as np
 import sys
 import pathlib
 import subprocess
+import argparse
 import base64
+import concurrent.futures
+import functools
+import hashlib
+import heapq
+import queue
+import sqlite3
+import threading
+import zlib
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from audit_model import (
+    RADAR_CATEGORIES, STATUS_SCALE, VISUALS_PLACEHOLDER_RATIONALE, Finding, content_hash, pack_audit,
+    safe_error_message, safe_print, unpack_audit
+)
+from reports import (
+    RADAR_AXIS_LABELS, format_bytes, render_radar_png, render_report_task, report_render_dir, stage_report_audit,
+    stage_report_data
+)
 
 # Optional Firebase integration - gracefully handle if module doesn't exist
 try:
@@ -700,120 +720,612 @@ css = """
 """
 st.markdown(css, unsafe_allow_html=True)
 
-def repair_json(text, error_pos=None):
+class TolerantJSONParser:
     """
-    Repair common JSON syntax errors.
-    Tries multiple strategies to fix malformed JSON, especially missing commas.
+    Single-pass, string-aware JSON parser for LLM worker output.
+    Tolerates markdown fences, leading/trailing prose, missing commas, trailing commas,
+    unescaped quotes/newlines inside strings, bare words and truncated output.
+    Containers cut off by truncation keep every complete child parsed before the cut.
     """
-    if error_pos is not None and error_pos < len(text):
-        # Get context around the error position
-        start_ctx = max(0, error_pos - 100)
-        end_ctx = min(len(text), error_pos + 100)
-        context = text[start_ctx:end_ctx]
-        safe_print(f"[DEBUG] Error context (pos {error_pos}): {safe_error_message(context)}")
-    
-    fixed = text
-    
-    # Strategy 1: Remove trailing commas before } or ]
-    fixed = re.sub(r',(\s*[}\]])', r'\1', fixed)
-    
-    # Strategy 2: Fix missing comma after closing bracket before quote (CRITICAL - most common issue)
-    # Pattern: ] "key": -> ], "key":  OR  ]\n    "key": -> ],\n    "key":
-    fixed = re.sub(r'\]\s+"(\w+)":', r'], "\1":', fixed)
-    fixed = re.sub(r'\]\s*\n\s*"(\w+)":', r'],\n    "\1":', fixed)
-    
-    # Strategy 3: Fix missing comma after closing quote before quote (array/object property)
-    # Pattern: "value" "key": -> "value", "key":
-    fixed = re.sub(r'"\s+"(\w+)":', r'", "\1":', fixed)
-    
-    # Strategy 4: Fix missing comma after closing brace/bracket before quote
-    # Pattern: } "key": -> }, "key":  OR  ] "key": -> ], "key":
-    fixed = re.sub(r'([}\]])"(\w+)":', r'\1, "\2":', fixed)
-    
-    # Strategy 5: Fix missing comma after string values with newlines
-    # Pattern: "string"\n    "key": -> "string",\n    "key":
-    fixed = re.sub(r'"\s*\n\s*"(\w+)":', r'",\n    "\1":', fixed)
-    
-    # Strategy 6: Fix missing comma after closing bracket before opening brace
-    # Pattern: ] { -> ], {
-    fixed = re.sub(r'\]\s*{', r'], {', fixed)
-    
-    # Strategy 7: Fix missing comma between array elements (after closing bracket)
-    # Pattern: ]"key": -> ], "key":  (array ending before property)
-    fixed = re.sub(r'\]"(\w+)":', r'], "\1":', fixed)
-    
-    # Strategy 8: Fix missing comma after number/boolean before quote
-    # Pattern: 123 "key": -> 123, "key":  OR  true "key": -> true, "key":
-    fixed = re.sub(r'(\d+|true|false|null)\s+"(\w+)":', r'\1, "\2":', fixed)
-    
-    # Strategy 9: Fix missing comma after closing quote before opening brace (nested objects)
-    # Pattern: "value" { -> "value", {
-    fixed = re.sub(r'"\s*{', r'", {', fixed)
-    
-    # Strategy 10: Fix missing comma after closing quote before opening bracket (nested arrays)
-    # Pattern: "value" [ -> "value", [
-    fixed = re.sub(r'"\s*\[', r'", [', fixed)
+    _NUMBER_RE = re.compile(r'-?\d+(?:\.\d+)?(?:[eE][+-]?\d+)?')
+    _WORD_RE = re.compile(r'[^\s,:{}\[\]"]+')
+    _KEY_AHEAD_RE = re.compile(r'"[^"\\\n]*"\s*:')
+    # A bare key or literal after `"...",` means the quote before the comma closed the string
+    _AFTER_COMMA_RE = re.compile(r'(?:true|false|null|True|False|None)\b|[A-Za-z_][\w-]*\s*:')
+    _LITERALS = {
+        "true": True, "false": False, "null": None,
+        "True": True, "False": False, "None": None
+    }
     
-    # Strategy 11: Fix missing comma after closing quote in arrays (common pattern)
-    # Pattern: "item"\n      "key": -> "item",\n      "key":
-    fixed = re.sub(r'"\s*\n\s+"(\w+)":', r'",\n    "\1":', fixed)
+    def __init__(self, text):
+        self.text = text
+        self.pos = 0
+        self.length = len(text)
     
-    # Strategy 12: More aggressive - fix any quote-space-quote that looks like property boundary
-    # But only if it's followed by a word and colon (property name pattern)
-    fixed = re.sub(r'(")\s+(")(\w+)":', r'\1, \2\3":', fixed)
+    def _skip_ws(self):
+        text, pos, length = self.text, self.pos, self.length
+        while pos < length and text[pos] in ' \t\r\n':
+            pos += 1
+        self.pos = pos
     
-    return fixed
+    def parse(self):
+        """
+        Parse from the first '{' or '['.
+        Returns (value, complete) - complete is False when the input was truncated.
+        """
+        starts = [i for i in (self.text.find('{'), self.text.find('[')) if i != -1]
+        if not starts:
+            return None, False
+        self.pos = min(starts)
+        return self._parse_value()
+    
+    def _parse_value(self):
+        self._skip_ws()
+        if self.pos >= self.length:
+            return None, False
+        ch = self.text[self.pos]
+        if ch == '{':
+            return self._parse_object()
+        if ch == '[':
+            return self._parse_array()
+        if ch == '"':
+            return self._parse_string()
+        match = self._NUMBER_RE.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            # A number running into EOF may have been cut off mid-digit
+            if self.pos >= self.length:
+                return None, False
+            number = match.group()
+            return (float(number) if any(c in number for c in '.eE') else int(number)), True
+        match = self._WORD_RE.match(self.text, self.pos)
+        if match:
+            self.pos = match.end()
+            word = match.group()
+            return self._LITERALS.get(word, word), self.pos < self.length
+        # Stray delimiter in value position - consume it so we always make progress
+        self.pos += 1
+        return None, True
+    
+    def _parse_object(self):
+        self.pos += 1  # Skip '{'
+        result = {}
+        while True:
+            self._skip_ws()
+            if self.pos >= self.length:
+                return result, False
+            ch = self.text[self.pos]
+            if ch == '}':
+                self.pos += 1
+                return result, True
+            if ch == ']':
+                # Mismatched closer: end the object, let the parent array consume it
+                return result, True
+            if ch in ',:':
+                # Trailing, doubled or stray separators
+                self.pos += 1
+                continue
+            
+            # Key: quoted string or bare identifier
+            if ch == '"':
+                key, complete = self._parse_string()
+            else:
+                match = self._WORD_RE.match(self.text, self.pos)
+                if not match:
+                    self.pos += 1
+                    continue
+                self.pos = match.end()
+                key, complete = match.group(), self.pos < self.length
+            if not complete:
+                return result, False
+            
+            self._skip_ws()
+            if self.pos < self.length and self.text[self.pos] == ':':
+                self.pos += 1
+            
+            value, complete = self._parse_value()
+            if complete:
+                result[key] = value
+            else:
+                # Keep truncated containers (their complete children survive), drop truncated scalars
+                if isinstance(value, (dict, list)):
+                    result[key] = value
+                return result, False
+    
+    def _parse_array(self):
+        self.pos += 1  # Skip '['
+        result = []
+        while True:
+            self._skip_ws()
+            if self.pos >= self.length:
+                return result, False
+            ch = self.text[self.pos]
+            if ch == ']':
+                self.pos += 1
+                return result, True
+            if ch == '}':
+                # Mismatched closer: end the array, let the parent object consume it
+                return result, True
+            if ch in ',:':
+                self.pos += 1
+                continue
+            
+            value, complete = self._parse_value()
+            if not complete:
+                # Drop the element that was cut off, keep everything before it
+                return result, False
+            result.append(value)
+    
+    def _closes_before_comma(self, comma):
+        """Whether the text after a comma starts another value or key (rather than more prose)."""
+        text, length = self.text, self.length
+        look = comma + 1
+        while look < length and text[look] in ' \t\r\n':
+            if text[look] == '\n':
+                return True
+            look += 1
+        return (look >= length or text[look] in '"{[]}-0123456789'
+                or self._AFTER_COMMA_RE.match(text, look) is not None)
+    
+    def _parse_string(self):
+        text, length = self.text, self.length
+        pos = self.pos + 1  # Skip opening quote
+        chunks = []
+        chunk_start = pos
+        while pos < length:
+            ch = text[pos]
+            if ch == '\\':
+                chunks.append(text[chunk_start:pos])
+                if pos + 1 >= length:
+                    self.pos = length
+                    return ''.join(chunks), False
+                esc = text[pos + 1]
+                if esc == 'u':
+                    hex_digits = text[pos + 2:pos + 6]
+                    if len(hex_digits) < 4:
+                        self.pos = length
+                        return ''.join(chunks), False
+                    try:
+                        chunks.append(chr(int(hex_digits, 16)))
+                        pos += 6
+                    except ValueError:
+                        chunks.append(esc)
+                        pos += 2
+                else:
+                    chunks.append({'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f'}.get(esc, esc))
+                    pos += 2
+                chunk_start = pos
+                continue
+            if ch == '"':
+                # Only treat the quote as closing if it is followed by a structural character,
+                # EOF, a line break or the next "key": (missing comma). A comma only counts
+                # when something that can follow a value comes after it, so the quote in
+                # "she said "x", then" stays part of the string. Otherwise it is an unescaped
+                # quote inside the string value.
+                look = pos + 1
+                saw_newline = False
+                while look < length and text[look] in ' \t\r\n':
+                    if text[look] == '\n':
+                        saw_newline = True
+                    look += 1
+                if (look >= length or text[look] in ':}]' or saw_newline
+                        or (text[look] == ',' and self._closes_before_comma(look))
+                        or self._KEY_AHEAD_RE.match(text, look)):
+                    chunks.append(text[chunk_start:pos])
+                    self.pos = pos + 1
+                    return ''.join(chunks), True
+            pos += 1
+        chunks.append(text[chunk_start:pos])
+        self.pos = length
+        return ''.join(chunks), False
 
-def clean_json_text(text):
+def strip_json_fences(text):
     """
-    The 'Janitor' cleaner: strip Markdown formatting and extract clean JSON.
-    Removes markdown code blocks and extracts the JSON object using balanced braces.
-    Handles truncated JSON by finding the deepest complete JSON object.
+    Strip Markdown code fences and surrounding whitespace from an LLM response.
     """
-    # Remove markdown code blocks
-    text = text.replace("```json", "").replace("```", "")
-    text = text.strip()
-    
-    # Find the first open bracket
-    start = text.find("{")
-    if start == -1:
-        return text
-    
-    # Find the last close bracket that balances with the first {
-    # This handles truncated JSON better than just finding last }
-    brace_count = 0
-    last_balanced_brace = -1
-    
-    for i in range(start, len(text)):
-        if text[i] == '{':
-            brace_count += 1
-        elif text[i] == '}':
-            brace_count -= 1
-            if brace_count == 0:
-                last_balanced_brace = i
-                break  # Found the matching closing brace
+    return text.replace("```json", "").replace("```", "").strip()
+
+def parse_llm_json(text):
+    """
+    Parse JSON returned by a Gemini worker.
+    Valid JSON goes through the C json decoder; anything else falls back to the tolerant
+    single-pass parser. Returns (value, complete) where complete is False when the
+    response was truncated and only the valid prefix could be recovered.
+    """
+    text = strip_json_fences(text or "")
+    try:
+        return json.loads(text), True
+    except (json.JSONDecodeError, ValueError):
+        pass
+    return TolerantJSONParser(text).parse()
+
+def parse_worker_items(text):
+    """
+    Parse a worker response into ({"items": [...]}, complete).
+    Always returns a dict with an items list, keeping every complete item object even when
+    the response is malformed or truncated. Non-dict entries are discarded.
+    """
+    value, complete = parse_llm_json(text)
+    if isinstance(value, list):
+        value = {"items": value}
+    if not isinstance(value, dict):
+        value = {}
+    items = value.get("items")
+    if not isinstance(items, list):
+        items = []
+    value["items"] = [item for item in items if isinstance(item, dict)]
+    if not complete:
+        safe_print(f"[WARN] Worker JSON was malformed or truncated - recovered {len(value['items'])} complete items")
+    return value, complete
+
+# Element names each worker is asked to return (used to detect what a truncated response is missing)
+VISUALS_ELEMENTS = [
+    "Visual Hierarchy & Layout", "Navigation Clarity", "Readability", "Scroll Experience",
+    "Aesthetics & Image Quality", "CTA Visibility", "Trust Signals", "Mobile Layout"
+]
+COPY_ELEMENTS = [
+    "Headline Impact", "Value Proposition", "Persuasion & Tone", "Objection Handling",
+    "Lead Capture", "One Page One Goal"
+]
+TECH_ELEMENTS = [
+    "Page Speed Indicators", "SEO Tags", "Legal Compliance", "Mobile Form Usability"
+]
+
+def response_hit_token_limit(response):
+    """
+    Check whether a Gemini response stopped because it reached max_output_tokens.
+    """
+    try:
+        finish_reason = response.candidates[0].finish_reason
+    except Exception:
+        return False
+    return getattr(finish_reason, 'name', str(finish_reason)) == 'MAX_TOKENS' or finish_reason == 2
+
+def run_worker(model, prompt, expected_elements, worker_name, attachments=None):
+    """
+    Run a worker prompt and parse its items, salvaging truncated output.
+    When the response is cut off at max_output_tokens, every complete item before the cut is
+    kept and a single continuation request asks only for the elements that are still missing.
+    The result carries a "salvage" record describing what was recovered and re-requested.
+    """
+    generation_config = {
+        "temperature": 0.7,
+        "top_p": 0.95,
+        "top_k": 40,
+        "max_output_tokens": 8192,
+        "response_mime_type": "application/json"
+    }
+    attachments = attachments or []
     
-    # If we found a balanced JSON object, return it
-    if last_balanced_brace != -1:
-        return text[start:last_balanced_brace + 1]
+    response = model.generate_content([prompt] + attachments if attachments else prompt, generation_config=generation_config)
+    result, complete = parse_worker_items(response.text)
+    if complete and not response_hit_token_limit(response):
+        return result
     
-    # Fallback: if no balanced brace found, try to find last } (might be truncated)
-    end = text.rfind("}")
-    if end != -1 and end > start:
-        return text[start:end + 1]
+    received = [item.get("elementName", "") for item in result["items"]]
+    missing = [name for name in expected_elements if name not in received]
+    salvage = {
+        "truncated": True,
+        "salvagedElements": list(received),
+        "continuedElements": [],
+        "missingElements": missing
+    }
+    safe_print(f"[WARN] {worker_name} output truncated - salvaged {len(received)} items, re-requesting {len(missing)}")
+    
+    if missing:
+        continuation_prompt = (
+            f"{prompt}\n\nCONTINUATION: Your previous answer was cut off. You already returned these elements: "
+            f"{', '.join(received) if received else 'none'}.\n"
+            f"Return ONLY the items for these remaining elements, in the same JSON format: {', '.join(missing)}.\n"
+            f"Keep every field concise."
+        )
+        try:
+            continuation = model.generate_content(
+                [continuation_prompt] + attachments if attachments else continuation_prompt,
+                generation_config=generation_config
+            )
+            continuation_result, _ = parse_worker_items(continuation.text)
+            for item in continuation_result["items"]:
+                name = item.get("elementName", "")
+                if name in missing and name not in received:
+                    result["items"].append(item)
+                    received.append(name)
+                    salvage["continuedElements"].append(name)
+            salvage["missingElements"] = [name for name in missing if name not in received]
+        except Exception as e:
+            safe_print(f"[WARN] {worker_name} continuation request failed: {safe_error_message(e)}")
     
-    # Last resort: return from first { to end (truncated JSON - will be completed later)
-    return text[start:]
+    result["salvage"] = salvage
+    return result
+
+def estimate_tokens(text):
+    """
+    Rough token estimate for Gemini prompts (~4 characters per token for English text/markup).
+    """
+    return (len(text) + 3) // 4 if text else 0
+
+def pack_sections(sections, token_budget):
+    """
+    Pack (label, lines) sections into a prompt block without exceeding token_budget.
+    Sections are in priority order; lines are added until the budget runs out.
+    Returns (packed_text, estimated_tokens).
+    """
+    output = []
+    used = 0
+    for label, lines in sections:
+        lines = [line for line in lines if line]
+        if not lines:
+            continue
+        header = f"## {label}"
+        header_cost = estimate_tokens(header) + 1
+        if used + header_cost >= token_budget:
+            break
+        output.append(header)
+        used += header_cost
+        for line in lines:
+            cost = estimate_tokens(line) + 1
+            if used + cost > token_budget:
+                # Keep a clipped prefix of an oversized line rather than dropping it entirely
+                remaining = token_budget - used - 1
+                if remaining >= 8:
+                    output.append(line[:remaining * 4])
+                    used = token_budget
+                break
+            output.append(line)
+            used += cost
+    return "\n".join(output), used
+
+def _element_text(el, max_chars=200):
+    """Collapse whitespace in an element's visible text and cap its length."""
+    text = " ".join(el.get_text(" ", strip=True).split())
+    return text[:max_chars]
+
+def build_tech_context(html_source, token_budget=1500):
+    """
+    Extract the high-signal parts of the HTML for the tech worker within a token budget:
+    meta tags, headings, forms and input types, legal page links and resource hints.
+    Returns (context_text, estimated_tokens).
+    """
+    soup = BeautifulSoup(html_source or "", "html.parser")
+    
+    head_lines = []
+    if soup.title and soup.title.string:
+        head_lines.append(f"<title>{soup.title.string.strip()[:150]}</title>")
+    html_tag = soup.find("html")
+    if html_tag and html_tag.get("lang"):
+        head_lines.append(f'<html lang="{html_tag.get("lang")}">')
+    for meta in soup.find_all("meta"):
+        key = meta.get("name") or meta.get("property") or meta.get("http-equiv") or ("charset" if meta.get("charset") else None)
+        if not key:
+            continue
+        value = meta.get("content") or meta.get("charset") or ""
+        head_lines.append(f'<meta {key}="{str(value)[:160]}">')
+    
+    heading_lines = [f"<{h.name}>{_element_text(h, 120)}</{h.name}>" for h in soup.find_all(["h1", "h2", "h3"])]
+    
+    form_lines = []
+    for form in soup.find_all("form"):
+        form_lines.append(f'<form action="{form.get("action", "")}" method="{form.get("method", "get")}">')
+        for field in form.find_all(["input", "select", "textarea"]):
+            if field.name == "input" and field.get("type", "text") == "hidden":
+                continue
+            attrs = " ".join(
+                f'{attr}="{field.get(attr)}"'
+                for attr in ("type", "name", "autocomplete", "inputmode", "placeholder", "required")
+                if field.get(attr) is not None
+            )
+            form_lines.append(f"  <{field.name} {attrs}>")
+    
+    legal_keywords = ("privacy", "terms", "cookie", "disclaimer", "imprint", "legal", "gdpr", "refund")
+    legal_lines = []
+    for link in soup.find_all("a", href=True):
+        label = _element_text(link, 60)
+        haystack = f"{link['href']} {label}".lower()
+        if any(keyword in haystack for keyword in legal_keywords):
+            legal_lines.append(f'<a href="{link["href"][:120]}">{label}</a>')
+    
+    hint_lines = []
+    for link in soup.find_all("link", rel=True):
+        rel = " ".join(link.get("rel", []))
+        if any(hint in rel for hint in ("preload", "preconnect", "dns-prefetch", "prefetch", "canonical", "stylesheet", "manifest", "icon")):
+            hint_lines.append(f'<link rel="{rel}" href="{str(link.get("href", ""))[:120]}">')
+    scripts = soup.find_all("script")
+    external_scripts = [script for script in scripts if script.get("src")]
+    hint_lines.append(f"scripts: {len(scripts)} total, {len(external_scripts)} external, "
+                      f"{sum(1 for s in external_scripts if s.has_attr('async') or s.has_attr('defer'))} async/defer")
+    for script in external_scripts[:15]:
+        hint_lines.append(f'<script src="{script["src"][:120]}">')
+    images = soup.find_all("img")
+    hint_lines.append(f"images: {len(images)} total, {sum(1 for img in images if not img.get('alt'))} missing alt, "
+                      f"{sum(1 for img in images if img.get('loading') == 'lazy')} lazy-loaded")
+    
+    return pack_sections([
+        ("Head & meta tags", head_lines),
+        ("Headings", heading_lines),
+        ("Forms", form_lines),
+        ("Legal links", legal_lines),
+        ("Resource hints & scripts", hint_lines)
+    ], token_budget)
+
+def build_copy_context(page_text, html_source="", token_budget=1500):
+    """
+    Extract the high-signal copy for the copy worker within a token budget:
+    hero, headings, CTAs and testimonials first, then the remaining page text.
+    Falls back to the plain page text when no HTML is available.
+    Returns (context_text, estimated_tokens).
+    """
+    sections = []
+    if html_source:
+        soup = BeautifulSoup(html_source, "html.parser")
+        for tag in soup(["script", "style", "noscript", "svg"]):
+            tag.decompose()
+        
+        hero_lines = []
+        first_h1 = soup.find("h1")
+        if first_h1:
+            hero_lines.append(_element_text(first_h1))
+            for sibling in first_h1.find_all_next(["p", "h2"], limit=3):
+                hero_lines.append(_element_text(sibling, 300))
+        
+        heading_lines = [_element_text(h, 150) for h in soup.find_all(["h2", "h3"])]
+        
+        cta_lines = []
+        seen = set()
+        for el in soup.find_all(["button", "a", "input"]):
+            if el.name == "input":
+                if el.get("type") not in ("submit", "button"):
+                    continue
+                label = (el.get("value") or "").strip()
+            elif el.name == "a":
+                classes = " ".join(el.get("class", [])).lower()
+                if not any(hint in classes for hint in ("btn", "button", "cta")):
+                    continue
+                label = _element_text(el, 80)
+            else:
+                label = _element_text(el, 80)
+            if label and label.lower() not in seen:
+                seen.add(label.lower())
+                cta_lines.append(f"[CTA] {label}")
+        
+        testimonial_lines = []
+        for el in soup.find_all(["blockquote", "figure", "div", "section", "li"]):
+            marker = " ".join(el.get("class", []) + [el.get("id") or ""]).lower()
+            if el.name == "blockquote" or any(hint in marker for hint in ("testimonial", "review", "quote")):
+                text = _element_text(el, 300)
+                if text and text not in testimonial_lines:
+                    testimonial_lines.append(text)
+        
+        sections.extend([
+            ("Hero", hero_lines),
+            ("Headings", heading_lines),
+            ("CTAs", cta_lines),
+            ("Testimonials", testimonial_lines[:8])
+        ])
+    
+    body_lines = [" ".join(line.split()) for line in (page_text or "").splitlines()]
+    sections.append(("Page text", [line for line in body_lines if len(line) > 2]))
+    return pack_sections(sections, token_budget)
+
+def estimate_image_tokens(img):
+    """Rough Gemini image-token cost: ~258 tokens per 768x768 tile after the worker's 1024px downscale."""
+    width, height = img.size
+    if width > 1024:
+        height = int(height * 1024 / width)
+        width = 1024
+    return 258 * max(1, -(-width // 768)) * max(1, -(-height // 768))
+
+def crop_uniform_bands(img, min_band=None, keep=24):
+    """
+    Collapse tall horizontal bands of (near) uniform colour - empty hero padding, blank lazy-load
+    areas - down to `keep` rows. Returns (image, rows_removed); a fully uniform frame returns (None, height).
+    """
+    gray = np.asarray(img.convert('L').resize((128, img.height)), dtype=np.int16)
+    uniform = (gray.max(axis=1) - gray.min(axis=1)) <= 6
+    if uniform.all():
+        return None, img.height
+    min_band = min_band or max(60, img.height // 12)
+    keep_rows = np.ones(img.height, dtype=bool)
+    # Runs of uniform rows: starts/ends from the padded difference
+    edges = np.diff(np.concatenate(([0], uniform.astype(np.int8), [0])))
+    for start, end in zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)):
+        if end - start >= min_band:
+            keep_rows[start + keep // 2:end - keep // 2] = False
+    removed = int((~keep_rows).sum())
+    if not removed:
+        return img, 0
+    cropped = Image.fromarray(np.asarray(img)[keep_rows])
+    cropped.info.update(img.info)
+    return cropped, removed
+
+def frame_hash(img):
+    """64-bit difference hash (dHash) of a frame."""
+    small = np.asarray(img.convert('L').resize((9, 8), Image.Resampling.BILINEAR), dtype=np.int16)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+def frame_ssim(img_a, img_b, size=(128, 128)):
+    """Mean SSIM over 8x8 blocks of two frames scaled to the same small grayscale size."""
+    a = np.asarray(img_a.convert('L').resize(size), dtype=np.float64).reshape(size[1] // 8, 8, size[0] // 8, 8)
+    b = np.asarray(img_b.convert('L').resize(size), dtype=np.float64).reshape(size[1] // 8, 8, size[0] // 8, 8)
+    mu_a, mu_b = a.mean(axis=(1, 3)), b.mean(axis=(1, 3))
+    var_a, var_b = a.var(axis=(1, 3)), b.var(axis=(1, 3))
+    cov = ((a - mu_a[:, None, :, None]) * (b - mu_b[:, None, :, None])).mean(axis=(1, 3))
+    c1, c2 = (0.01 * 255) ** 2, (0.03 * 255) ** 2
+    ssim = ((2 * mu_a * mu_b + c1) * (2 * cov + c2)) / ((mu_a ** 2 + mu_b ** 2 + c1) * (var_a + var_b + c2))
+    return float(ssim.mean())
+
+def prepare_visual_frames(frames, hash_distance=6, ssim_threshold=0.92):
+    """
+    Dedup stage between capture and analyze_visuals: crop large uniform bands, drop blank frames,
+    and drop frames that are perceptually near-identical (dHash distance and SSIM) to one already
+    kept - the kept frame inherits the dropped frame's section label. Always keeps at least one frame.
+    The input frames are not modified: a kept frame whose label changes is returned as a copy.
+    Returns (frames, stats).
+    """
+    stats = {"inputFrames": len(frames), "keptFrames": 0, "rowsCropped": 0, "duplicatesDropped": 0,
+             "blankDropped": 0, "imageTokensBefore": sum(estimate_image_tokens(f) for f in frames)}
+    kept = []  # (frame, hash, section labels)
+    for frame in frames:
+        cropped, removed = crop_uniform_bands(frame)
+        stats["rowsCropped"] += removed
+        if cropped is None:
+            stats["blankDropped"] += 1
+            continue
+        digest = frame_hash(cropped)
+        duplicate = None
+        for other, other_digest, other_labels in kept:
+            similar_shape = 0.8 <= cropped.height / other.height <= 1.25
+            if similar_shape and bin(digest ^ other_digest).count("1") <= hash_distance and frame_ssim(cropped, other) >= ssim_threshold:
+                duplicate = other_labels
+                break
+        if duplicate is not None:
+            stats["duplicatesDropped"] += 1
+            label = cropped.info.get("section")
+            if label and label not in duplicate:
+                duplicate.append(label)
+            continue
+        kept.append((cropped, digest, [cropped.info["section"]] if cropped.info.get("section") else []))
+    if not kept and frames:
+        kept.append((frames[0], 0, []))
+    result = []
+    for frame, _, labels in kept:
+        label = "/".join(labels)
+        if label and label != frame.info.get("section"):
+            # Label a copy, not the caller's image (crop_uniform_bands returns it unchanged when nothing was cropped)
+            frame = frame.copy()
+            frame.info["section"] = label
+        result.append(frame)
+    stats["keptFrames"] = len(result)
+    stats["imageTokensAfter"] = sum(estimate_image_tokens(f) for f in result)
+    return result, stats
 
-def analyze_visuals(images, model):
+def analyze_visuals(images, model, device_images=None):
     """
     Worker 1: Analyze visual design elements from screenshots.
     Returns unified JSON schema with items array containing: Visual Hierarchy, Aesthetics, CTA Visibility, Trust Signals, Mobile Layout.
+    device_images ({"mobile": [...], "tablet": [...]}) adds frames from other device captures after the desktop ones.
+    Frames are deduplicated per device first (prepare_visual_frames); the totals are returned under "frames".
     """
     try:
+        # Desktop frames first, then other devices in order; remember which frames belong to which device
+        frame_groups = []
+        all_images = []
+        frame_stats = {}
+        for device, frames in [("desktop", images)] + list((device_images or {}).items()):
+            if not frames:
+                continue
+            frames, stats = prepare_visual_frames(frames)
+            for key, value in stats.items():
+                frame_stats[key] = frame_stats.get(key, 0) + value
+            frame_groups.append((device, len(frames)))
+            all_images.extend(frames)
+        safe_print(f"[DEBUG] Visual frames: {frame_stats.get('inputFrames', 0)} -> {frame_stats.get('keptFrames', 0)} "
+                   f"({frame_stats.get('duplicatesDropped', 0)} duplicates, {frame_stats.get('rowsCropped', 0)} uniform rows cropped), "
+                   f"~{frame_stats.get('imageTokensBefore', 0)} -> ~{frame_stats.get('imageTokensAfter', 0)} image tokens")
+        
         # Optimize images before sending to Gemini
         optimized_images = []
-        for img in images:
+        for img in all_images:
             if img.mode != 'RGB':
                 img = img.convert('RGB')
             if img.width > 1024:
@@ -962,45 +1474,38 @@ CRITICAL RULES:
 - Be specific: include exact measurements, colors (hex codes), sizes, positions
 - Use professional UX terminology
 - MANDATORY CHECKS: Navigation clarity (Is the menu intuitive?), Readability (Font sizes, line height, and contrast check), Scroll experience (Guided flow vs chaotic), Logo visibility & stock image authenticity check"""
+        sections = [img.info.get("section") for img in all_images]
+        if len(frame_groups) > 1 or any(sections):
+            order, start = [], 0
+            for device, count in frame_groups:
+                width = CAPTURE_DEVICE_PROFILES[device]["viewport"]["width"]
+                frames = ", ".join(
+                    f"{start + i + 1}" + (f" {sections[start + i]}" if sections[start + i] else "") for i in range(count)
+                )
+                order.append(f"{device} ({width}px viewport): {frames}")
+                start += count
+            prompt += f"\n- SCREENSHOT ORDER (page sections): {'; '.join(order)}"
+            if len(frame_groups) > 1:
+                prompt += ". Judge \"Mobile Layout\" from the mobile/tablet screenshots, and note where the desktop and mobile experience differ"
         
-        response = model.generate_content(
-            [prompt] + optimized_images,
-            generation_config={
-                "temperature": 0.7,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 8192,
-                "response_mime_type": "application/json"
-            }
-        )
-        
-        text = response.text.strip()
-        text = clean_json_text(text)
-        
-        # Parse JSON
-        try:
-            result = json.loads(text)
-        except json.JSONDecodeError as e:
-            fixed_text = repair_json(text, getattr(e, 'pos', None))
-            result = json.loads(fixed_text)
-        
-        # Ensure items array exists
-        if "items" not in result:
-            result["items"] = []
+        # Parse JSON (tolerates malformed output, salvages truncated output)
+        result = run_worker(model, prompt, VISUALS_ELEMENTS, "Visuals", attachments=optimized_images)
+        result["frames"] = frame_stats
         
         return result
     except Exception as e:
         safe_print(f"[ERROR] analyze_visuals failed: {safe_error_message(e)}")
-        return {"items": []}
+        return {"items": [], "error": safe_error_message(e)}
 
-def analyze_copy(text_content, model):
+def analyze_copy(text_content, model, html_source="", token_budget=1500):
     """
     Worker 2: Analyze copywriting and messaging from text content.
     Returns unified JSON schema with items array containing: Headline Impact, Value Proposition, Persuasion/Tone, One Page One Goal.
     """
     try:
-        # Clean and truncate text content if too long
-        clean_text = text_content[:5000] if len(text_content) > 5000 else text_content
+        # Budget the input: hero, headings, CTAs and testimonials first, then remaining page text
+        clean_text, input_tokens = build_copy_context(text_content, html_source, token_budget)
+        safe_print(f"[DEBUG] Copy worker input: ~{input_tokens} tokens (budget {token_budget})")
         
         prompt = f"""Act as a Lead Copywriter. Analyze this landing page text content:
 
@@ -1111,58 +1616,17 @@ CRITICAL RULES:
 - Use professional copywriting terminology
 - MANDATORY CHECKS: Lead Capture (Clarity of what happens after submit), Value Prop (Differentiation vs generic claims), Objection Handling (Price, Risk, Effort, and Time addresses), Persuasive Techniques (Authority and Specificity)"""
         
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 8192,
-                "response_mime_type": "application/json"
-            }
-        )
-        
-        text = response.text.strip()
-        text = clean_json_text(text)
-        
-        # Parse JSON
-        try:
-            result = json.loads(text)
-        except json.JSONDecodeError as e:
-            fixed_text = repair_json(text, getattr(e, 'pos', None))
-            result = json.loads(fixed_text)
-        
-        # Ensure items array exists
-        if "items" not in result:
-            result["items"] = []
+        # Parse JSON (tolerates malformed output, salvages truncated output)
+        result = run_worker(model, prompt, COPY_ELEMENTS, "Copy")
         
         return result
     except Exception as e:
         safe_print(f"[ERROR] analyze_copy failed: {safe_error_message(e)}")
-        return {"items": []}
-
-def analyze_tech(html_source, model):
-    """
-    Worker 3: Analyze technical SEO and compliance from HTML source.
-    Returns unified JSON schema with items array containing: Page Speed Indicators, SEO Tags, Legal Compliance.
-    """
-    try:
-        # Clean HTML - remove scripts to reduce token usage
-        import re as regex_module
-        clean_html = regex_module.sub(r'<script[^>]*>.*?</script>', '', html_source, flags=regex_module.DOTALL | regex_module.IGNORECASE)
-        clean_html = regex_module.sub(r'<style[^>]*>.*?</style>', '', clean_html, flags=regex_module.DOTALL | regex_module.IGNORECASE)
-        
-        # Truncate if too long
-        clean_html = clean_html[:3000] if len(clean_html) > 3000 else clean_html
-        
-        prompt = f"""Act as a Technical SEO Expert. Analyze this HTML source code:
+        return {"items": [], "error": safe_error_message(e)}
 
-{clean_html}
-
-Return ONLY valid JSON in this exact format (NO other keys, NO commentary):
-{{
-  "items": [
-    {{
+# Item templates for the tech worker, keyed by elementName (only the ones not scored locally are sent)
+TECH_ITEM_TEMPLATES = {
+    "Page Speed Indicators": """    {
       "elementName": "Page Speed Indicators",
       "status": "Excellent" | "Good" | "Satisfactory" | "Needs Improvement" | "Failed",
       "impact": "HI" | "MI" | "LI",
@@ -1171,13 +1635,13 @@ Return ONLY valid JSON in this exact format (NO other keys, NO commentary):
       "workingWell": ["Specific thing that works", "Another positive"],
       "notWorking": ["Specific problem with exact technical details", "Caching or CDN issues if detectable"],
       "conversionImpact": "How this affects conversions (1 sentence)",
-      "fix": {{
+      "fix": {
         "quickFix": "Actionable fix with technical specifics including caching and CDN recommendations",
         "example": "Code snippet or configuration example",
         "expectedImpact": "Expected conversion impact"
-      }}
-    }},
-    {{
+      }
+    }""",
+    "SEO Tags": """    {
       "elementName": "SEO Tags",
       "status": "Excellent" | "Good" | "Satisfactory" | "Needs Improvement" | "Failed",
       "impact": "HI" | "MI" | "LI",
@@ -1186,13 +1650,13 @@ Return ONLY valid JSON in this exact format (NO other keys, NO commentary):
       "workingWell": ["Specific thing that works"],
       "notWorking": ["Specific problem with tag names and attributes"],
       "conversionImpact": "How this affects conversions",
-      "fix": {{
+      "fix": {
         "quickFix": "Actionable fix",
         "example": "Example HTML tags",
         "expectedImpact": "Impact"
-      }}
-    }},
-    {{
+      }
+    }""",
+    "Legal Compliance": """    {
       "elementName": "Legal Compliance",
       "status": "Excellent" | "Good" | "Satisfactory" | "Needs Improvement" | "Failed",
       "impact": "HI" | "MI" | "LI",
@@ -1201,13 +1665,13 @@ Return ONLY valid JSON in this exact format (NO other keys, NO commentary):
       "workingWell": ["Specific thing that works"],
       "notWorking": ["Specific problem with Privacy Policy, Terms & Conditions, Cookie Policy, or Disclaimers"],
       "conversionImpact": "How this affects conversions",
-      "fix": {{
+      "fix": {
         "quickFix": "Actionable fix ensuring Privacy Policy, Terms & Conditions, Cookie Policy, and Disclaimers are present",
         "example": "Example link structure for all legal pages",
         "expectedImpact": "Impact"
-      }}
-    }},
-    {{
+      }
+    }""",
+    "Mobile Form Usability": """    {
       "elementName": "Mobile Form Usability",
       "status": "Excellent" | "Good" | "Satisfactory" | "Needs Improvement" | "Failed",
       "impact": "HI" | "MI" | "LI",
@@ -1216,305 +1680,1199 @@ Return ONLY valid JSON in this exact format (NO other keys, NO commentary):
       "workingWell": ["Specific thing that works"],
       "notWorking": ["Specific problem with keyboard types for email/number inputs or mobile form usability"],
       "conversionImpact": "How this affects conversions",
-      "fix": {{
+      "fix": {
         "quickFix": "Actionable fix with proper input types (email, tel, number) and mobile form optimization",
         "example": "Example HTML form with correct input types",
         "expectedImpact": "Impact"
-      }}
-    }}
+      }
+    }"""
+}
+
+TECH_MANDATORY_CHECKS = {
+    "Page Speed Indicators": "Speed (Caching & CDN usage if detectable)",
+    "Legal Compliance": "Legal (Privacy Policy, Terms & Conditions, Cookie Policy, AND Disclaimers)",
+    "Mobile Form Usability": "Mobile (Form usability - keyboard types for email/number)"
+}
+
+def analyze_tech(html_source, model, token_budget=1500, page_features=None):
+    """
+    Worker 3: Analyze technical SEO and compliance from HTML source.
+    Returns unified JSON schema with items array containing: Page Speed Indicators, SEO Tags, Legal Compliance.
+    When page_features (from the in-browser extraction pass) are available, deterministic checks are
+    scored locally and only the remaining elements are sent to the LLM.
+    """
+    try:
+        local_items = score_page_features(page_features) if page_features else []
+        local_names = {item["elementName"] for item in local_items}
+        llm_elements = [name for name in TECH_ELEMENTS if name not in local_names]
+        if not llm_elements:
+            return {"items": local_items}
+        
+        # Budget the input: meta tags, headings, forms, legal links and resource hints extracted from the whole page
+        if page_features:
+            # Measured facts cover most of what the HTML would say - spend less on raw markup
+            clean_html, input_tokens = build_tech_context(html_source, token_budget // 2)
+            features_json = json.dumps(page_features, separators=(',', ':'))
+            clean_html = f"## Measured page facts\n{features_json}\n{clean_html}"
+            input_tokens += estimate_tokens(features_json)
+        else:
+            clean_html, input_tokens = build_tech_context(html_source, token_budget)
+        safe_print(f"[DEBUG] Tech worker input: ~{input_tokens} tokens (budget {token_budget}), "
+                   f"{len(local_items)} elements scored locally")
+        
+        items_block = ",\n".join(TECH_ITEM_TEMPLATES[name] for name in llm_elements)
+        mandatory_checks = ", ".join(TECH_MANDATORY_CHECKS[name] for name in llm_elements if name in TECH_MANDATORY_CHECKS)
+        
+        prompt = f"""Act as a Technical SEO Expert. Analyze these signals extracted from the page HTML:
+
+{clean_html}
+
+Return ONLY valid JSON in this exact format (NO other keys, NO commentary):
+{{
+  "items": [
+{items_block}
   ]
 }}
 
 CRITICAL RULES:
-- Use AT MOST 3 items per element analyzed (aim for 4 items total as shown above)
+- Use AT MOST 3 items per element analyzed (aim for {len(llm_elements)} items total as shown above)
 - radarCategory MUST be exactly: "ux", "conversion", "copy", "visuals", "trust", "speed" (lowercase)
 - status MUST be exactly: "Excellent", "Good", "Satisfactory", "Needs Improvement", or "Failed"
 - impact MUST be exactly: "HI", "MI", or "LI"
 - Be specific: include tag names, attribute values, link URLs
-- Use professional SEO terminology
-- MANDATORY CHECKS: Speed (Caching & CDN usage if detectable), Legal (Privacy Policy, Terms & Conditions, Cookie Policy, AND Disclaimers), Mobile (Form usability - keyboard types for email/number)"""
-        
-        response = model.generate_content(
-            prompt,
-            generation_config={
-                "temperature": 0.7,
-                "top_p": 0.95,
-                "top_k": 40,
-                "max_output_tokens": 8192,
-                "response_mime_type": "application/json"
-            }
-        )
-        
-        text = response.text.strip()
-        text = clean_json_text(text)
-        
-        # Parse JSON
-        try:
-            result = json.loads(text)
-        except json.JSONDecodeError as e:
-            fixed_text = repair_json(text, getattr(e, 'pos', None))
-            result = json.loads(fixed_text)
+- Use professional SEO terminology"""
+        if mandatory_checks:
+            prompt += f"\n- MANDATORY CHECKS: {mandatory_checks}"
         
-        # Ensure items array exists
-        if "items" not in result:
-            result["items"] = []
+        # Parse JSON (tolerates malformed output, salvages truncated output)
+        result = run_worker(model, prompt, llm_elements, "Tech")
+        result["items"] = local_items + result.get("items", [])
         
         return result
     except Exception as e:
         safe_print(f"[ERROR] analyze_tech failed: {safe_error_message(e)}")
-        return {"items": []}
+        return {"items": [], "error": safe_error_message(e)}
+
+def normalize_audit_url(url):
+    """Canonical form of an audited URL (scheme + lowercase host without www + path without trailing slash)."""
+    url = (url or "").strip()
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parsed.path.rstrip("/")
+    return f"{host}{path}" + (f"?{parsed.query}" if parsed.query else "")
 
-def compile_roast(images, text_content, html_source, progress_manager=None):
+
+def build_audit_fingerprint(images, text_content, html_source, page_features=None, device_captures=None):
     """
-    Manager function: Orchestrates the 3 workers and merges their unified JSON outputs
-    into the final God Mode JSON schema with scoring, roast summary, and aggregation.
+    Fingerprint what each worker sees, so a later audit of the same page can tell what changed:
+    DOM text, section hashes, per-device screenshot hashes and the copy/tech worker inputs.
     """
-    api_key = get_api_key()
-    if not api_key:
-        raise ValueError("GOOGLE_GENAI_API_KEY not found. For Streamlit Cloud, add it to Secrets. For local, add it to .env.local file.")
-    
-    try:
-        genai.configure(api_key=api_key)
-        model = genai.GenerativeModel('gemini-2.0-flash-001')
-    except Exception as e:
-        raise ValueError(f"Failed to configure Gemini API: {str(e)}")
-    
-    # Worker 1: Analyze Visuals (Progress step 13)
-    if progress_manager:
-        progress_manager.update(13)
-    try:
-        visuals_data = analyze_visuals(images, model)
-        visuals_items = visuals_data.get("items", [])
-    except Exception as e:
-        safe_print(f"[ERROR] Visuals worker failed: {safe_error_message(e)}")
-        visuals_items = []
-    
-    # Worker 2: Analyze Copy (Progress step 15)
-    if progress_manager:
-        progress_manager.update(15)
-    try:
-        copy_data = analyze_copy(text_content, model)
-        copy_items = copy_data.get("items", [])
-    except Exception as e:
-        safe_print(f"[ERROR] Copy worker failed: {safe_error_message(e)}")
-        copy_items = []
-    
-    # Worker 3: Analyze Tech (Progress step 17)
-    if progress_manager:
-        progress_manager.update(17)
-    try:
-        tech_data = analyze_tech(html_source, model)
-        tech_items = tech_data.get("items", [])
-    except Exception as e:
-        safe_print(f"[ERROR] Tech worker failed: {safe_error_message(e)}")
-        tech_items = []
-    
-    # Merge all items
-    all_items = visuals_items + copy_items + tech_items
-    
-    # Scoring logic: Status points and impact multipliers
-    status_points = {
-        "Excellent": 95,
-        "Good": 80,
-        "Satisfactory": 60,
-        "Needs Improvement": 35,
-        "Failed": 5
-    }
-    impact_multipliers = {
-        "HI": 1.5,
-        "MI": 1.0,
-        "LI": 0.5
+    features = page_features or {}
+    frames = {"desktop": [format(frame_hash(img), "016x") for img in images]}
+    for device, capture in (device_captures or {}).items():
+        if device != "desktop":
+            frames[device] = [format(frame_hash(img), "016x") for img in capture.get("screenshots", [])]
+    copy_context, _ = build_copy_context(text_content, html_source)
+    tech_context, _ = build_tech_context(html_source)
+    # Speed, blocking counters and section geometry vary run to run without the page changing
+    stable_features = {k: v for k, v in features.items() if k not in ("speed", "blocking", "sections")}
+    return {
+        "text": content_hash(" ".join((text_content or "").split())),
+        "sections": [
+            {"label": s.get("label"), "hash": content_hash([s.get("label"), s.get("heading")])}
+            for s in features.get("sections", [])
+        ],
+        "frames": frames,
+        "workers": {
+            "copy": content_hash(copy_context),
+            "tech": content_hash([tech_context, stable_features])
+        }
     }
-    
-    # Group items by radarCategory and calculate scores
-    radar_categories = ["ux", "conversion", "copy", "visuals", "trust", "speed"]
-    radar_metrics = {}
-    
-    for category in radar_categories:
-        category_items = [item for item in all_items if item.get("radarCategory", "").lower() == category.lower()]
-        if category_items:
-            weighted_sum = 0
-            weight_sum = 0
-            for item in category_items:
-                status = item.get("status", "Satisfactory")
-                impact = item.get("impact", "MI")
-                points = status_points.get(status, 60)
-                multiplier = impact_multipliers.get(impact, 1.0)
-                weighted_sum += points * multiplier
-                weight_sum += 95 * multiplier
-            radar_metrics[category] = round((weighted_sum / weight_sum) * 100) if weight_sum > 0 else 50
-        else:
-            radar_metrics[category] = 50
-    
-    # Calculate overall score (average of radar scores)
-    overall_score = round(sum(radar_metrics.values()) / len(radar_metrics))
-    
-    # Generate roast summary using AI (Progress step 18)
-    if progress_manager:
-        progress_manager.update(18)
-    
-    roast_summary_json = {
-        "executiveSummary": "Overall analysis complete. Review detailed findings below.",
-        "roastAnalysis": "Comprehensive audit completed across all key areas."
+
+def frames_unchanged(previous_frames, current_frames, max_distance=4):
+    """True when every device has the same number of frames and each is within max_distance dHash bits."""
+    if set(previous_frames) != set(current_frames):
+        return False
+    for device, hashes in current_frames.items():
+        old = previous_frames[device]
+        if len(old) != len(hashes):
+            return False
+        if any(bin(int(a, 16) ^ int(b, 16)).count("1") > max_distance for a, b in zip(old, hashes)):
+            return False
+    return True
+
+def plan_incremental_audit(previous_audit, fingerprint):
+    """
+    Decide which workers need to re-run against a previous audit snapshot. Only results of a
+    worker that succeeded last time (snapshot "workerOk") and returned items can be reused.
+    Returns {"rerun": [...], "reuse": [...], "changedSections": [...]}.
+    """
+    previous = (previous_audit or {}).get("fingerprint") or {}
+    reuse = []
+    if previous.get("frames") and frames_unchanged(previous["frames"], fingerprint["frames"]):
+        reuse.append("visuals")
+    for worker in ("copy", "tech"):
+        if previous.get("workers", {}).get(worker) == fingerprint["workers"][worker]:
+            reuse.append(worker)
+    worker_items = (previous_audit or {}).get("workerItems", {})
+    worker_ok = (previous_audit or {}).get("workerOk", {})
+    reuse = [w for w in reuse if worker_items.get(w) and worker_ok.get(w)]
+    old_sections = {(s["label"], s["hash"]) for s in previous.get("sections", [])}
+    changed_sections = [s["label"] for s in fingerprint["sections"] if (s["label"], s["hash"]) not in old_sections]
+    return {
+        "rerun": [w for w in ("visuals", "copy", "tech") if w not in reuse],
+        "reuse": reuse,
+        "changedSections": changed_sections,
+        "textChanged": previous.get("text") != fingerprint["text"]
     }
-    
-    # Always generate roast summary - explicitly call API if missing or empty
-    if all_items:
-        try:
-            # Build audit_dump with failed/needs improvement items
-            failed_items = [
-                item for item in all_items 
-                if item.get("status") in ["Failed", "Needs Improvement"]
-            ]
-            
-            audit_dump = []
-            for item in failed_items[:15]:  # Limit to 15 items for token efficiency
-                element_name = item.get("elementName", "Unknown Element")
-                status = item.get("status", "Unknown")
-                audit_dump.append(f"- {element_name}: {status}")
-            
-            audit_dump_str = "\n".join(audit_dump) if audit_dump else "No critical issues found."
-            
-            roast_prompt = f"""You are a brutally honest, no-nonsense CRO Consultant who uses humor to soften the blow.
 
-Input: The list of failed audit items:
-{audit_dump_str}
+def carry_forward_items(items, previous_audit, worker):
+    """Copy a previous audit's items for a worker, tagging their provenance."""
+    carried = []
+    for item in items:
+        item = json.loads(json.dumps(item))
+        item.pop("change", None)
+        provenance = item.get("provenance") or {}
+        item["provenance"] = {
+            "worker": worker,
+            "auditedAt": provenance.get("auditedAt", previous_audit.get("auditedAt")),
+            "carriedForward": True
+        }
+        carried.append(item)
+    return carried
 
-Task: Generate a JSON object roastSummary with:
+def finding_status_map(items):
+    """{elementName: status} for a list of findings - what the next re-audit compares against."""
+    return {item.get("elementName"): item.get("status") for item in items if item.get("elementName")}
 
-hook: Exactly 3 lines. Witty, savage, and specific. Hook the reader immediately. Each line should be punchy and memorable.
+def mark_finding_changes(items, previous_status):
+    """
+    Compare findings with the previous audit's {elementName: status} map and set item["change"] to
+    "new" (failing now, not before), "unchanged" (same status) or "changed".
+    Returns the previously failing elements that are reported again and now pass ("fixed");
+    an element missing from this audit is not counted as fixed.
+    """
+    failing = ("Failed", "Needs Improvement")
+    passing = ("Excellent", "Good", "Satisfactory")
+    current_status = {}
+    for item in items:
+        name, status = item.get("elementName"), item.get("status")
+        current_status[name] = status
+        before = previous_status.get(name)
+        if before == status:
+            item["change"] = "unchanged"
+        elif status in failing and before not in failing:
+            item["change"] = "new"
+        else:
+            item["change"] = "changed"
+    return [
+        {"elementName": name, "previousStatus": status, "status": current_status[name]}
+        for name, status in previous_status.items()
+        if status in failing and current_status.get(name) in passing
+    ]
 
-analysis: A single block of text (10-12 sentences). No bullet points. Discuss the Good, the Bad, and the Ugly truths of the audit. Be honest, direct, and helpful. No fluff. Cover what's working well, what's broken, and what needs urgent attention.
+def normalize_audit_domain(url):
+    """Registrable-ish domain of an audited URL: lowercase host without www."""
+    return normalize_audit_url(url).split("/", 1)[0].split("?", 1)[0]
 
-Return ONLY valid JSON in this format:
-{{
-  "hook": "Line 1\\nLine 2\\nLine 3",
-  "analysis": "A comprehensive 10-12 sentence analysis covering the Good, the Bad, and the Ugly. Be brutally honest but helpful."
-}}
 
-Be witty, direct, and focus on conversion impact."""
-            
-            roast_response = model.generate_content(
-                roast_prompt,
-                generation_config={
-                    "temperature": 0.8,
-                    "top_p": 0.95,
-                    "top_k": 40,
-                    "max_output_tokens": 512,
-                    "response_mime_type": "application/json"
-                }
-            )
-            
-            roast_text = roast_response.text.strip()
-            roast_text = clean_json_text(roast_text)
+class AuditHistoryStore:
+    """
+    Local audit history in SQLite, indexed by normalized URL, domain, timestamp and score.
+    Audits are stored in the pack_audit format (older plain-JSON rows still load).
+    record() only enqueues: a background writer thread inserts the row and then hands the
+    audit to the optional sink(url, roast_data, score) - e.g. WriteBehindWriter.submit for
+    Firestore - so persistence never blocks the UI.
+    """
+    def __init__(self, path, sink=None, max_pending=256):
+        self.path = str(path)
+        self.sink = sink
+        self.db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS audits (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                domain TEXT NOT NULL,
+                raw_url TEXT,
+                audited_at REAL NOT NULL,
+                score INTEGER,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS audits_url_time ON audits (url, audited_at DESC);
+            CREATE INDEX IF NOT EXISTS audits_domain_time ON audits (domain, audited_at);
+            CREATE INDEX IF NOT EXISTS audits_score ON audits (score);
+        """)
+        self.db.commit()
+        self.lock = threading.Lock()
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.writer = threading.Thread(target=self._drain, name="audit-history-writer", daemon=True)
+        self.writer.start()
+    
+    def record(self, url, roast_data, score=None, audited_at=None):
+        """Queue an audit for persistence. Returns False (and drops it) if the queue is full."""
+        if score is None:
+            score = roast_data.get("overall_score", roast_data.get("overview", {}).get("overallScore"))
+        try:
+            self.pending.put_nowait((url, roast_data, score, audited_at or time.time()))
+            return True
+        except queue.Full:
+            safe_print(f"[WARN] Audit history queue full, dropping audit for {url}")
+            return False
+    
+    def _drain(self):
+        """Writer thread: SQLite first (local history), then the optional remote sink."""
+        while True:
+            url, roast_data, score, audited_at = self.pending.get()
             try:
-                roast_summary_json = json.loads(roast_text)
-                # Convert new format to legacy format for backward compatibility
-                if "hook" in roast_summary_json and "analysis" in roast_summary_json:
-                    roast_summary_json["executiveSummary"] = roast_summary_json.get("hook", "")
-                    roast_summary_json["roastAnalysis"] = roast_summary_json.get("analysis", "")
-            except json.JSONDecodeError as e:
-                fixed_text = repair_json(roast_text, getattr(e, 'pos', None))
-                roast_summary_json = json.loads(fixed_text)
-                # Convert new format to legacy format
-                if "hook" in roast_summary_json and "analysis" in roast_summary_json:
-                    roast_summary_json["executiveSummary"] = roast_summary_json.get("hook", "")
-                    roast_summary_json["roastAnalysis"] = roast_summary_json.get("analysis", "")
-        except Exception as e:
-            safe_print(f"[WARN] Roast summary generation failed: {safe_error_message(e)}")
-            # Fallback: generate a basic summary from items
-            if failed_items:
-                failed_names = [item.get("elementName", "Issue") for item in failed_items[:3]]
-                roast_summary_json = {
-                    "hook": f"Found {len(failed_items)} areas needing attention.\nFocus on: {', '.join(failed_names)}.\nThese improvements can boost conversions.",
-                    "analysis": f"Analysis identified {len(failed_items)} critical issues that impact conversion rates. Addressing these top priorities will improve user experience and drive better results. The audit reveals both strengths and weaknesses across key conversion elements.",
-                    "executiveSummary": f"Found {len(failed_items)} areas needing attention.\nFocus on: {', '.join(failed_names)}.\nThese improvements can boost conversions.",
-                    "roastAnalysis": f"Analysis identified {len(failed_items)} critical issues that impact conversion rates. Addressing these top priorities will improve user experience and drive better results."
-                }
-    
-    # Ensure roastSummary is always set with both new and legacy formats
-    if not roast_summary_json.get("hook") and not roast_summary_json.get("executiveSummary"):
-        roast_summary_json = {
-            "hook": f"Site Score: {overall_score}/100\nAnalysis complete across all key areas.\nReview detailed findings below.",
-            "analysis": "Comprehensive audit completed. Review the detailed findings to identify improvement opportunities. The analysis covers all critical conversion elements and provides actionable insights.",
-            "executiveSummary": f"Site Score: {overall_score}/100\nAnalysis complete across all key areas.\nReview detailed findings below.",
-            "roastAnalysis": "Comprehensive audit completed. Review the detailed findings to identify improvement opportunities."
-        }
-    elif "hook" in roast_summary_json and "executiveSummary" not in roast_summary_json:
-        roast_summary_json["executiveSummary"] = roast_summary_json.get("hook", "")
-        roast_summary_json["roastAnalysis"] = roast_summary_json.get("analysis", "")
-    
-    # Build quick wins: Use Badness Score system to always return top 3 priorities
-    def calculate_badness_score(item):
-        """Calculate badness score for an item. Higher score = higher priority."""
-        status = item.get("status", "Satisfactory")
-        impact = item.get("impact", "MI")
-        
-        # Badness Score calculation
-        if status == "Failed" and impact == "HI":
-            return 100
-        elif status == "Failed" and impact == "MI":
-            return 80
-        elif status == "Needs Improvement" and impact == "HI":
-            return 60
-        elif status == "Needs Improvement" and impact == "MI":
-            return 40
-        elif status == "Satisfactory":
-            return 10
-        elif status == "Good":
-            return 5
-        elif status == "Excellent":
-            return 0
-        else:
-            # Default for unknown status/impact combinations
-            if status in ["Failed", "Needs Improvement"]:
-                return 50
-            return 10
-    
-    # Calculate badness score for all items and sort by score (descending)
-    items_with_scores = [(item, calculate_badness_score(item)) for item in all_items]
-    sorted_items = sorted(items_with_scores, key=lambda x: x[1], reverse=True)
-    
-    # Always take top 3 items (guarantees we always have 3 quick wins)
-    quick_wins = []
-    for item, score in sorted_items[:3]:
-        quick_wins.append({
-            "title": item.get("elementName", "Fix Required"),
-            "elementName": item.get("elementName", "Fix Required"),
-            "problem": "; ".join(item.get("notWorking", [])[:2]) if item.get("notWorking") else "Review and improve",
-            "fix": item.get("fix", {}).get("quickFix", "Review and improve") if isinstance(item.get("fix"), dict) else str(item.get("fix", "Review and improve")),
-            "example": item.get("fix", {}).get("example", "") if isinstance(item.get("fix"), dict) else "",
-            "effort": "15min",
-            "lift": item.get("fix", {}).get("expectedImpact", "Expected conversion improvement") if isinstance(item.get("fix"), dict) else "Expected conversion improvement"
-        })
+                self._insert(url, roast_data, score, audited_at)
+                if self.sink:
+                    self.sink(url, roast_data, score)
+            except Exception as e:
+                safe_print(f"[WARNING] Failed to persist audit for {url}: {safe_error_message(e)}")
+            finally:
+                self.pending.task_done()
+    
+    def _insert(self, url, roast_data, score, audited_at):
+        data = pack_audit(roast_data)
+        with self.lock:
+            self.db.execute(
+                "INSERT INTO audits (url, domain, raw_url, audited_at, score, data) VALUES (?, ?, ?, ?, ?, ?)",
+                (normalize_audit_url(url), normalize_audit_domain(url), url, audited_at, score, data)
+            )
+            self.db.commit()
+    
+    def flush(self):
+        """Block until every queued audit has been written (used on shutdown and in scripts)."""
+        self.pending.join()
+    
+    def latest_audit(self, url):
+        """Most recent audit of a URL: {"url", "auditedAt", "score", "data"} or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT raw_url, audited_at, score, data FROM audits WHERE url = ? ORDER BY audited_at DESC LIMIT 1",
+                (normalize_audit_url(url),)
+            ).fetchone()
+        if not row:
+            return None
+        return {"url": row[0], "auditedAt": row[1], "score": row[2], "data": unpack_audit(row[3])}
+    
+    def load_audits(self, domain=None, limit=None):
+        """Stored audits, newest first, optionally for one domain: [{"url", "auditedAt", "score", "data"}]."""
+        query = "SELECT raw_url, audited_at, score, data FROM audits"
+        params = []
+        if domain:
+            query += " WHERE domain = ?"
+            params.append(normalize_audit_domain(domain))
+        query += " ORDER BY audited_at DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.db.execute(query, params).fetchall()
+        return [{"url": url, "auditedAt": audited_at, "score": score, "data": unpack_audit(data)}
+                for url, audited_at, score, data in rows]
+    
+    def latest_audits(self, domain=None, urls=None, limit=None):
+        """
+        Most recent audit of each page, newest first (or in the order of urls):
+        [{"url", "auditedAt", "score", "data"}]. Only the selected rows are decoded.
+        """
+        # SQLite takes the bare columns of a MAX() aggregate from the row holding the maximum
+        query = "SELECT raw_url, MAX(audited_at), score, data, url FROM audits"
+        params = []
+        if urls:
+            keys = list(dict.fromkeys(normalize_audit_url(url) for url in urls))[:limit or None]
+            query += f" WHERE url IN ({', '.join('?' * len(keys))})"
+            params.extend(keys)
+        elif domain:
+            query += " WHERE domain = ?"
+            params.append(normalize_audit_domain(domain))
+        query += " GROUP BY url ORDER BY MAX(audited_at) DESC"
+        if limit:
+            query += " LIMIT ?"
+            params.append(limit)
+        with self.lock:
+            rows = self.db.execute(query, params).fetchall()
+        if urls:
+            order = {key: index for index, key in enumerate(keys)}
+            rows.sort(key=lambda row: order[row[4]])
+        return [{"url": url, "auditedAt": audited_at, "score": score, "data": unpack_audit(data)}
+                for url, audited_at, score, data, _ in rows]
+    
+    def score_trend(self, domain, limit=50):
+        """Scores for every audited page of a domain, oldest first: [{"url", "auditedAt", "score"}]."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT raw_url, audited_at, score FROM ("
+                "  SELECT raw_url, audited_at, score FROM audits WHERE domain = ? ORDER BY audited_at DESC LIMIT ?"
+                ") ORDER BY audited_at",
+                (normalize_audit_domain(domain), limit)
+            ).fetchall()
+        return [{"url": url, "auditedAt": audited_at, "score": score} for url, audited_at, score in rows]
+
+class WriteBehindWriter:
+    """
+    Background writer for a slow or flaky remote store (Firestore). submit() never blocks:
+    records go into a bounded queue and a worker thread writes them in batches, retrying with
+    exponential backoff. Batches that still fail, and records that don't fit in the queue, are
+    appended to a local JSON-lines spill file and replayed after the next successful write.
+    
+    write_batch(records) must return how many leading records it wrote (raising counts as 0),
+    so a retry resumes after the last successful record. Any callable works - tests can pass a
+    fake with no network. sleep is injectable for the same reason.
+    """
+    def __init__(self, write_batch, spill_path, max_queue=500, batch_size=20, flush_interval=1.0,
+                 max_retries=4, base_backoff=0.5, sleep=time.sleep, name="remote"):
+        self.write_batch = write_batch
+        self.spill_path = pathlib.Path(spill_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.sleep = sleep
+        self.name = name
+        self.pending = queue.Queue(maxsize=max_queue)
+        self.spill_lock = threading.Lock()
+        # submit() runs on caller threads, the rest on the worker thread
+        self.stats_lock = threading.Lock()
+        self.stats = {"submitted": 0, "written": 0, "writeCalls": 0, "retries": 0, "spilled": 0, "replayed": 0,
+                      "maxQueueDepth": 0, "lastWriteLatencyMs": 0.0, "maxWriteLatencyMs": 0.0, "totalWriteLatencyMs": 0.0}
+        self.worker = threading.Thread(target=self._run, name=f"{name}-write-behind", daemon=True)
+        self.worker.start()
+    
+    def submit(self, *record):
+        """Queue one record (e.g. url, roast_data, score). Spills to disk instead of blocking when full."""
+        with self.stats_lock:
+            self.stats["submitted"] += 1
+        try:
+            self.pending.put_nowait(record)
+        except queue.Full:
+            safe_print(f"[WARN] {self.name} write queue full, spilling record to disk")
+            self._spill([record])
+            return False
+        with self.stats_lock:
+            self.stats["maxQueueDepth"] = max(self.stats["maxQueueDepth"], self.pending.qsize())
+        return True
+    
+    def _next_batch(self):
+        """Wait for one record, then take whatever else is already queued (up to batch_size)."""
+        batch = [self.pending.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self.pending.get(timeout=remaining) if remaining > 0 else self.pending.get_nowait())
+            except queue.Empty:
+                break
+        return batch
     
-    # Build detailedAudit: Group items by radarCategory (case-insensitive matching)
-    detailed_audit = {}
-    for category in radar_categories:
-        # Normalize category to lowercase for consistent matching
-        cat_lower = category.lower()
-        category_items = [
-            item for item in all_items 
-            if item.get("radarCategory", "").lower() == cat_lower
-        ]
-        
-        # Data validity check: If Visuals category is empty, add placeholder
-        if category.lower() == "visuals" and not category_items:
-            category_items = [{
-                "elementName": "Visual Analysis",
-                "status": "Satisfactory",
-                "impact": "MI",
-                "radarCategory": "visuals",
-                "rationale": "Visual analysis data was not available. This may indicate the visuals worker did not return structured findings.",
-                "workingWell": ["Visual elements present on page"],
-                "notWorking": ["Unable to perform detailed visual analysis"],
-                "fix": {
-                    "quickFix": "Review visual elements manually. Ensure images, colors, and layout align with brand guidelines.",
-                    "expectedImpact": "Maintains visual consistency"
-                }
-            }]
+    def _write_with_retry(self, batch):
+        """Write a batch, resuming after partial success; returns the records that could not be written."""
+        for attempt in range(self.max_retries + 1):
+            started = time.perf_counter()
+            try:
+                written = self.write_batch(batch) or 0
+            except Exception as e:
+                safe_print(f"[WARN] {self.name} write failed (attempt {attempt + 1}): {safe_error_message(e)}")
+                written = 0
+            latency_ms = (time.perf_counter() - started) * 1000
+            with self.stats_lock:
+                self.stats["lastWriteLatencyMs"] = round(latency_ms, 1)
+                self.stats["maxWriteLatencyMs"] = round(max(self.stats["maxWriteLatencyMs"], latency_ms), 1)
+                self.stats["totalWriteLatencyMs"] += latency_ms
+                self.stats["writeCalls"] += 1
+                self.stats["written"] += written
+            batch = batch[written:]
+            if not batch:
+                return []
+            if attempt < self.max_retries:
+                with self.stats_lock:
+                    self.stats["retries"] += 1
+                self.sleep(self.base_backoff * (2 ** attempt) * random.uniform(0.8, 1.2))
+        return batch
+    
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                failed = self._write_with_retry(batch)
+                if failed:
+                    self._spill(failed)
+                elif self.spill_path.exists():
+                    self._replay_spill()
+                safe_print(f"[DEBUG] {self.name} write-behind: {len(batch) - len(failed)}/{len(batch)} written, "
+                           f"queue depth {self.pending.qsize()}, last write {self.stats['lastWriteLatencyMs']}ms")
+            except Exception as e:
+                safe_print(f"[ERROR] {self.name} writer error: {safe_error_message(e)}")
+            finally:
+                for _ in batch:
+                    self.pending.task_done()
+    
+    def _spill(self, records):
+        with self.spill_lock:
+            with open(self.spill_path, "a", encoding="utf-8") as spill:
+                for record in records:
+                    spill.write(json.dumps(list(record), default=str) + "\n")
+        with self.stats_lock:
+            self.stats["spilled"] += len(records)
+        safe_print(f"[WARN] {self.name} unavailable, spilled {len(records)} record(s) to {self.spill_path}")
+    
+    def _replay_spill(self):
+        """Remote is reachable again: write spilled records back in batches, re-spilling what fails."""
+        with self.spill_lock:
+            replay_path = self.spill_path.with_suffix(".replaying")
+            os.replace(self.spill_path, replay_path)
+        with open(replay_path, encoding="utf-8") as spill:
+            records = [tuple(json.loads(line)) for line in spill if line.strip()]
+        replay_path.unlink()
+        for start in range(0, len(records), self.batch_size):
+            batch = records[start:start + self.batch_size]
+            failed = self._write_with_retry(batch)
+            with self.stats_lock:
+                self.stats["replayed"] += len(batch) - len(failed)
+            if failed:
+                self._spill(failed + records[start + self.batch_size:])
+                return
+    
+    def flush(self):
+        """Block until everything queued so far has been written or spilled."""
+        self.pending.join()
+    
+    def metrics(self):
+        """Queue depth and write latency, plus throughput/retry/spill counters."""
+        with self.stats_lock:
+            stats = dict(self.stats)
+        write_calls = stats["writeCalls"]
+        total_latency = stats.pop("totalWriteLatencyMs")
+        return {
+            **stats,
+            "queueDepth": self.pending.qsize(),
+            "avgWriteLatencyMs": round(total_latency / write_calls, 1) if write_calls else 0.0
+        }
+
+def save_scan_batch(records):
+    """
+    write_batch adapter for Firebase save_scan: writes (url, roast_data, score) records in order
+    and returns how many succeeded (save_scan returns the document ID, or nothing on failure).
+    """
+    for index, (url, roast_data, score) in enumerate(records):
+        if not save_scan(url, roast_data, score):
+            return index
+    return len(records)
+
+_audit_history = None
+_remote_writer = None
+
+def get_audit_history():
+    """
+    Shared AuditHistoryStore (None if the database can't be opened). Location from
+    AUDIT_HISTORY_DB; when Firebase is available, audits are forwarded to Firestore through a
+    WriteBehindWriter (spill file from FIREBASE_SPILL_PATH).
+    """
+    global _audit_history, _remote_writer
+    if _audit_history is None:
+        try:
+            path = os.getenv("AUDIT_HISTORY_DB") or os.path.join(tempfile.gettempdir(), "siteroast_history.sqlite3")
+            sink = None
+            if FIREBASE_AVAILABLE:
+                spill_path = os.getenv("FIREBASE_SPILL_PATH") or os.path.join(tempfile.gettempdir(), "siteroast_firestore_spill.jsonl")
+                if _remote_writer is None:
+                    _remote_writer = WriteBehindWriter(save_scan_batch, spill_path, name="Firestore")
+                sink = _remote_writer.submit
+            _audit_history = AuditHistoryStore(path, sink=sink)
+        except Exception as e:
+            safe_print(f"[WARN] Audit history unavailable: {safe_error_message(e)}")
+            return None
+    return _audit_history
+
+def remote_write_metrics():
+    """WriteBehindWriter.metrics() of the Firestore forwarder, or None when audits aren't forwarded."""
+    return _remote_writer.metrics() if _remote_writer else None
+
+
+# Named scoring profiles. "default" is the standard methodology; other profiles override parts
+# of it: status points, impact multipliers, badness (quick-win priority by status and impact,
+# with badnessByStatus for other impacts) and the category weights of the overall score.
+# Extra profiles or overrides load from the JSON file named by SCORING_PROFILES_PATH.
+SCORING_PROFILES = {
+    "default": {
+        "label": "General",
+        "statusPoints": {"Excellent": 95, "Good": 80, "Satisfactory": 60, "Needs Improvement": 35, "Failed": 5},
+        "impactMultipliers": {"HI": 1.5, "MI": 1.0, "LI": 0.5},
+        "badness": {"Failed": {"HI": 100, "MI": 80}, "Needs Improvement": {"HI": 60, "MI": 40}},
+        "badnessByStatus": {"Failed": 50, "Needs Improvement": 50, "Satisfactory": 10, "Good": 5, "Excellent": 0},
+        "categoryWeights": {category: 1.0 for category in RADAR_CATEGORIES}
+    },
+    "ecommerce": {
+        "label": "E-commerce",
+        "categoryWeights": {"ux": 1.0, "conversion": 1.5, "copy": 0.8, "visuals": 1.0, "trust": 1.4, "speed": 1.3}
+    },
+    "saas": {
+        "label": "SaaS",
+        "categoryWeights": {"ux": 1.0, "conversion": 1.3, "copy": 1.4, "visuals": 0.8, "trust": 1.0, "speed": 0.8}
+    },
+    "local-services": {
+        "label": "Local services",
+        "categoryWeights": {"ux": 0.9, "conversion": 1.4, "copy": 0.8, "visuals": 0.8, "trust": 1.6, "speed": 1.0}
+    }
+}
+
+_scoring_profiles = None
+
+def load_scoring_profiles():
+    """Built-in profiles merged with the JSON file in SCORING_PROFILES_PATH (profile name -> partial profile)."""
+    global _scoring_profiles
+    if _scoring_profiles is None:
+        profiles = {name: dict(profile) for name, profile in SCORING_PROFILES.items()}
+        path = os.getenv("SCORING_PROFILES_PATH")
+        if path:
+            try:
+                with open(path, encoding="utf-8") as config:
+                    for name, overrides in json.load(config).items():
+                        profiles[name] = {**profiles.get(name, {}), **overrides}
+            except Exception as e:
+                safe_print(f"[WARN] Could not load scoring profiles from {path}: {safe_error_message(e)}")
+        _scoring_profiles = profiles
+    return _scoring_profiles
+
+def get_scoring_profile(name=None):
+    """
+    Resolved scoring profile (every key filled in from "default") plus its "name".
+    name defaults to SCORING_PROFILE; unknown names fall back to "default".
+    """
+    profiles = load_scoring_profiles()
+    name = name or os.getenv("SCORING_PROFILE", "default")
+    if name not in profiles:
+        safe_print(f"[WARN] Unknown scoring profile '{name}', using default")
+        name = "default"
+    default = profiles["default"]
+    profile = {key: value for key, value in default.items()}
+    for key, value in profiles[name].items():
+        profile[key] = {**default[key], **value} if isinstance(value, dict) and isinstance(default.get(key), dict) else value
+    profile["name"] = name
+    return profile
+
+def build_item_table(findings, profile=None):
+    """
+    Scoring table: one (finding, weighted points, weight, badness) row per Finding, resolved once
+    under the scoring profile, in input order. Every scoring view is built from these rows.
+    """
+    profile = profile or get_scoring_profile()
+    status_points = profile["statusPoints"]
+    impact_multipliers = profile["impactMultipliers"]
+    badness = profile["badness"]
+    badness_by_status = profile["badnessByStatus"]
+    table = []
+    for finding in findings:
+        multiplier = impact_multipliers.get(finding.impact, 1.0)
+        table.append((
+            finding,
+            status_points.get(finding.status, 60) * multiplier,
+            95 * multiplier,
+            badness.get(finding.status, {}).get(finding.impact, badness_by_status.get(finding.status, 10))
+        ))
+    return table
+
+def weighted_overall_score(radar_metrics, profile):
+    """Overall score: category scores averaged with the profile's category weights."""
+    weights = profile["categoryWeights"]
+    total_weight = sum(weights.get(category, 1.0) for category in radar_metrics)
+    return round(sum(score * weights.get(category, 1.0) for category, score in radar_metrics.items()) / total_weight)
+
+def score_audit_items(all_items, top_k=3, profile=None):
+    """
+    Single-pass scoring engine over Findings (raw item dicts are normalized first). Buckets
+    findings by radar category while accumulating weighted category scores and collecting the
+    roast-summary failed items, and takes the top_k findings by badness with a heap (ties keep
+    input order). Categories without findings score 50; overallScore weights them by the
+    profile's categoryWeights. JSON views are left to finding_views.
+    """
+    profile = profile or get_scoring_profile()
+    findings = [item if isinstance(item, Finding) else Finding.from_item(item) for item in all_items]
+    table = build_item_table(findings, profile)
+    buckets = {category: [] for category in RADAR_CATEGORIES}
+    totals = {category: [0.0, 0.0] for category in RADAR_CATEGORIES}
+    failed_items = []
+    for finding, points, weight, _ in table:
+        if finding.category in buckets:
+            buckets[finding.category].append(finding)
+            totals[finding.category][0] += points
+            totals[finding.category][1] += weight
+        if finding.is_failing:
+            failed_items.append({
+                "elementName": finding.element_name or "Unknown Element",
+                "status": finding.status,
+                "impact": finding.impact,
+                "radarCategory": finding.category or "ux"
+            })
+    
+    radar_metrics = {
+        category: round((weighted_sum / weight_sum) * 100) if weight_sum > 0 else 50
+        for category, (weighted_sum, weight_sum) in totals.items()
+    }
+    top_rows = heapq.nlargest(top_k, range(len(table)), key=lambda index: (table[index][3], -index))
+    return {
+        "radarMetrics": radar_metrics,
+        "overallScore": weighted_overall_score(radar_metrics, profile),
+        "findings": findings,
+        "buckets": buckets,
+        "topFindings": [findings[index] for index in top_rows],
+        "failedItems": failed_items
+    }
+
+def finding_views(scoring):
+    """Legacy JSON views of a score_audit_items result: detailedAudit, quickWins, summary_bullets and audit_items."""
+    findings = scoring["findings"]
+    return {
+        "detailedAudit": {category: [finding.to_item() for finding in bucket] for category, bucket in scoring["buckets"].items()},
+        "quickWins": [finding.quick_win() for finding in scoring["topFindings"]],
+        "summaryBullets": [f"✅ {finding.element_name}" for finding in findings if finding.is_passing][:10] +
+                          [f"❌ {finding.element_name}" for finding in findings if finding.is_failing][:10],
+        "auditItems": [finding.audit_item() for finding in findings]
+    }
+
+def audit_item_frame(audits):
+    """
+    Item matrix of stored audits: one row per finding in each audit's detailedAudit with its
+    audit index, category, status and impact (the empty-visuals placeholder is skipped).
+    """
+    rows = [
+        (audit_index, category.lower(), item.get("status", "Satisfactory"), item.get("impact", "MI"))
+        for audit_index, audit in enumerate(audits)
+        for category, items in (audit.get("detailedAudit") or {}).items()
+        for item in items
+        if not item.get("placeholder")
+    ]
+    return pd.DataFrame(rows, columns=["audit", "category", "status", "impact"])
+
+def rescore_audits(audits, profile=None):
+    """
+    Recompute radar and overall scores of stored audit results under a scoring profile in one
+    vectorized pass over their item matrix - no LLM calls. Returns a DataFrame with one row per
+    audit: a column per radar category, overallScore and previousScore.
+    """
+    profile = get_scoring_profile(profile) if not isinstance(profile, dict) else profile
+    frame = audit_item_frame(audits)
+    audit_count, category_count = len(audits), len(RADAR_CATEGORIES)
+    
+    category_codes = pd.Categorical(frame["category"], categories=RADAR_CATEGORIES).codes
+    known = category_codes >= 0
+    multipliers = frame["impact"].map(profile["impactMultipliers"]).fillna(1.0).to_numpy(dtype=float)
+    points = frame["status"].map(profile["statusPoints"]).fillna(60).to_numpy(dtype=float) * multipliers
+    slots = frame["audit"].to_numpy(dtype=np.int64)[known] * category_count + category_codes[known]
+    
+    size = audit_count * category_count
+    weighted_sum = np.bincount(slots, weights=points[known], minlength=size).reshape(audit_count, category_count)
+    weight_sum = np.bincount(slots, weights=95 * multipliers[known], minlength=size).reshape(audit_count, category_count)
+    radar = np.where(weight_sum > 0, np.round(weighted_sum / np.where(weight_sum > 0, weight_sum, 1) * 100), 50)
+    
+    category_weights = np.array([profile["categoryWeights"].get(category, 1.0) for category in RADAR_CATEGORIES])
+    result = pd.DataFrame(radar.astype(int), columns=RADAR_CATEGORIES)
+    result["overallScore"] = np.round(radar @ category_weights / category_weights.sum()).astype(int)
+    result["previousScore"] = [audit.get("overall_score") for audit in audits]
+    return result
+
+def rescore_audit_history(profile=None, domain=None, limit=None):
+    """Rescore the audits in the local history store under a profile; rescore_audits columns plus url and auditedAt."""
+    history = get_audit_history()
+    stored = history.load_audits(domain=domain, limit=limit) if history else []
+    result = rescore_audits([audit["data"] for audit in stored], profile)
+    result.insert(0, "auditedAt", [audit["auditedAt"] for audit in stored])
+    result.insert(0, "url", [audit["url"] for audit in stored])
+    return result
+
+def get_gemini_model():
+    """Configure the Gemini client and return the model shared by the workers and the roast summary."""
+    api_key = get_api_key()
+    if not api_key:
+        raise ValueError("GOOGLE_GENAI_API_KEY not found. For Streamlit Cloud, add it to Secrets. For local, add it to .env.local file.")
+    
+    try:
+        genai.configure(api_key=api_key)
+        return genai.GenerativeModel('gemini-2.0-flash-001')
+    except Exception as e:
+        raise ValueError(f"Failed to configure Gemini API: {str(e)}")
+
+# Audits per multi-audit roast summary request (each summary needs ~512 output tokens)
+ROAST_SUMMARY_BATCH_SIZE = int(os.getenv("ROAST_SUMMARY_BATCH_SIZE", "8"))
+
+ROAST_SUMMARY_TASK = """hook: Exactly 3 lines. Witty, savage, and specific. Hook the reader immediately. Each line should be punchy and memorable.
+
+analysis: A single block of text (10-12 sentences). No bullet points. Discuss the Good, the Bad, and the Ugly truths of the audit. Be honest, direct, and helpful. No fluff. Cover what's working well, what's broken, and what needs urgent attention."""
+
+def format_audit_dump(failed_items):
+    """Bullet list of failed items for the roast prompt, limited to 15 items for token efficiency."""
+    audit_dump = [f"- {item['elementName']}: {item['status']}" for item in failed_items[:15]]
+    return "\n".join(audit_dump) if audit_dump else "No critical issues found."
+
+def normalize_roast_summary(summary):
+    """Add the legacy executiveSummary/roastAnalysis keys to a hook/analysis summary; None if unusable."""
+    if not isinstance(summary, dict) or not (summary.get("hook") or summary.get("executiveSummary")):
+        return None
+    if "hook" in summary and "executiveSummary" not in summary:
+        summary["executiveSummary"] = summary.get("hook", "")
+        summary["roastAnalysis"] = summary.get("analysis", "")
+    return summary
+
+# Template roast summary bank: hook lines and analysis sentences keyed by score band, radar
+# category and failing element. Variants are picked by a hash of the audit, so the same audit
+# always gets the same summary.
+ROAST_SCORE_BANDS = [(80, "strong"), (60, "mixed"), (40, "weak"), (0, "critical")]
+
+ROAST_TEMPLATE_OPENERS = {
+    "strong": [
+        "Scoring {score}/100 - this page mostly knows what it's doing.",
+        "{score}/100: solid bones, a few loose screws.",
+        "At {score}/100 you're close to great. Close doesn't convert, though."
+    ],
+    "mixed": [
+        "{score}/100: a page with good intentions and mixed results.",
+        "Scoring {score}/100 - half sales page, half guessing game.",
+        "{score}/100. Visitors are interested; the page keeps talking them out of it."
+    ],
+    "weak": [
+        "{score}/100: this page is working hard at losing customers.",
+        "Scoring {score}/100 - your visitors deserve a better first date.",
+        "{score}/100. The bounce rate is writing this roast for us."
+    ],
+    "critical": [
+        "{score}/100: this isn't a landing page, it's a leaving page.",
+        "Scoring {score}/100 - somewhere a conversion is crying.",
+        "{score}/100. We've seen 404 pages with a clearer pitch."
+    ]
+}
+
+ROAST_TEMPLATE_CATEGORY_JABS = {
+    "ux": ["{element} is making visitors work for it - and they won't.", "{element} turns a simple visit into an obstacle course."],
+    "conversion": ["{element} is where your funnel springs a leak.", "{element} asks for commitment before earning trust."],
+    "copy": ["{element} says a lot without saying why anyone should care.", "{element} reads like it was written for the team, not the buyer."],
+    "visuals": ["{element} makes the eye wander everywhere except the CTA.", "{element} looks busy; it should look confident."],
+    "trust": ["{element} leaves skeptics with nothing to hold on to.", "{element} is the missing handshake before the sale."],
+    "speed": ["{element} has people waiting - and waiting people leave.", "{element} is burning seconds you don't have."]
+}
+
+ROAST_TEMPLATE_CLOSERS = {
+    "strong": ["Polish the last {count} issue(s) and this page earns its keep.", "Fix {element} first - it's the cheapest win left."],
+    "mixed": ["Fix {element} first; the rest gets easier from there.", "{count} issue(s) stand between this page and real results."],
+    "weak": ["Start with {element} - today, not next sprint.", "{count} issue(s) to fix, and every one is costing you signups."],
+    "critical": ["Triage: {element} first, then everything else on the list.", "{count} issue(s). Pick up the shovel and start with {element}."]
+}
+
+ROAST_TEMPLATE_BAND_ANALYSIS = {
+    "strong": "The page scores {score}/100, so the fundamentals are in place and the remaining work is about sharpening rather than rebuilding.",
+    "mixed": "The page scores {score}/100, which means real strengths are being undercut by avoidable friction.",
+    "weak": "The page scores {score}/100, so most visitors are meeting more friction than persuasion.",
+    "critical": "The page scores {score}/100, which means the page is actively working against the people who arrive on it."
+}
+
+ROAST_TEMPLATE_CATEGORY_ANALYSIS = {
+    "ux": "Usability suffers at {elements}, adding friction that makes visitors work harder than they should to find the next step.",
+    "conversion": "Conversion leaks at {elements}, weakening the path from interest to action where revenue quietly disappears.",
+    "copy": "The copy falls short at {elements}, where the value isn't obvious quickly enough for a visitor skimming the page.",
+    "visuals": "The visuals let the page down at {elements}, pulling attention away from the message and the call to action.",
+    "trust": "Trust breaks down at {elements}, leaving doubts unanswered at the exact moment a visitor is deciding.",
+    "speed": "Speed problems show up in {elements}, costing load time that visitors on slower connections will not wait out."
+}
+
+ROAST_TEMPLATE_CATEGORY_LABELS = {
+    "ux": "usability", "conversion": "conversion", "copy": "copy", "visuals": "visuals", "trust": "trust", "speed": "speed"
+}
+
+def roast_score_band(overall_score):
+    """Score band used to key the template roast summary."""
+    for floor, band in ROAST_SCORE_BANDS:
+        if overall_score >= floor:
+            return band
+    return "critical"
+
+def template_roast_summary(failed_items, overall_score):
+    """
+    Deterministic local roast summary built from the template bank: the hook and analysis are
+    assembled from the score band, the failing categories and the worst failing elements.
+    Used when the LLM is saturated or over the latency budget, and whenever the summary call fails.
+    """
+    band = roast_score_band(overall_score)
+    ranked = sorted(
+        failed_items,
+        key=lambda item: (item.get("status") != "Failed", {"HI": 0, "MI": 1, "LI": 2}.get(item.get("impact"), 1))
+    )
+    seed = zlib.crc32(f"{overall_score}|{'|'.join(item['elementName'] for item in ranked)}".encode("utf-8"))
+    
+    def pick(options, salt):
+        return options[(seed + salt) % len(options)]
+    
+    by_category = {}
+    for item in ranked:
+        by_category.setdefault(item.get("radarCategory", "ux"), []).append(item["elementName"])
+    worst = ranked[0] if ranked else None
+    worst_name = worst["elementName"] if worst else "the details"
+    
+    hook = [pick(ROAST_TEMPLATE_OPENERS[band], 0).format(score=overall_score)]
+    if worst:
+        jabs = ROAST_TEMPLATE_CATEGORY_JABS.get(worst.get("radarCategory"), ROAST_TEMPLATE_CATEGORY_JABS["ux"])
+        hook.append(pick(jabs, 1).format(element=worst_name))
+        hook.append(pick(ROAST_TEMPLATE_CLOSERS[band], 2).format(element=worst_name, count=len(ranked)))
+    else:
+        hook.append("No failing elements - the audit had to work hard to find anything to roast.")
+        hook.append("Keep testing; today's best page is tomorrow's baseline.")
+    
+    analysis = [ROAST_TEMPLATE_BAND_ANALYSIS[band].format(score=overall_score)]
+    if ranked:
+        failed_count = sum(1 for item in ranked if item.get("status") == "Failed")
+        analysis.append(f"The audit flagged {len(ranked)} element(s) for attention, {failed_count} of them outright failures.")
+        for category, names in sorted(by_category.items(), key=lambda entry: -len(entry[1]))[:3]:
+            template = ROAST_TEMPLATE_CATEGORY_ANALYSIS.get(category, ROAST_TEMPLATE_CATEGORY_ANALYSIS["ux"])
+            analysis.append(template.format(elements=" and ".join(names[:2])))
+        analysis.append(f"The most urgent problem is {worst_name}, rated {worst['status']} with "
+                        f"{'high' if worst.get('impact') == 'HI' else 'moderate' if worst.get('impact') == 'MI' else 'low'} conversion impact.")
+        healthy = [label for category, label in ROAST_TEMPLATE_CATEGORY_LABELS.items() if category not in by_category]
+        if healthy:
+            healthy_text = healthy[0] if len(healthy) == 1 else f"{', '.join(healthy[:-1])} and {healthy[-1]}"
+            analysis.append(f"The good news is that {healthy_text} held up, so there is something solid to build on.")
+        else:
+            analysis.append("No category came through clean, so the fixes need to be prioritized rather than tackled all at once.")
+        analysis.append("Every one of these issues is fixable with targeted changes rather than a redesign.")
+        analysis.append(f"Start with {worst_name}, then work down the quick wins in order of impact.")
+        analysis.append("Re-run the audit after each round of fixes to confirm the score moves in the right direction.")
+    else:
+        analysis.append("No element was rated Failed or Needs Improvement, which puts this page ahead of most of what we audit.")
+        analysis.append("The remaining gains come from testing headlines, offers and calls to action against each other.")
+        analysis.append("Review the detailed findings for the smaller refinements that separate good from great.")
+    
+    return {
+        "hook": "\n".join(hook),
+        "analysis": " ".join(analysis),
+        "executiveSummary": "\n".join(hook),
+        "roastAnalysis": " ".join(analysis)
+    }
+
+# Switch the roast summary to the template path when this many summary calls are already in
+# flight, or when the expected call latency exceeds the audit's latency budget (seconds; unset = no limit)
+ROAST_SUMMARY_MAX_IN_FLIGHT = int(os.getenv("ROAST_SUMMARY_MAX_IN_FLIGHT", "4"))
+ROAST_SUMMARY_LATENCY_BUDGET = float(os.getenv("ROAST_SUMMARY_LATENCY_BUDGET", "0")) or None
+ROAST_SUMMARY_EXPECTED_MS = 3000.0
+# The observed latency decays back towards ROAST_SUMMARY_EXPECTED_MS with this half-life (seconds), so one
+# slow call doesn't keep every later audit on the template path (which never measures latency)
+ROAST_SUMMARY_LATENCY_HALF_LIFE = float(os.getenv("ROAST_SUMMARY_LATENCY_HALF_LIFE", "120"))
+
+_roast_summary_calls = {"inFlight": 0, "latencyMs": ROAST_SUMMARY_EXPECTED_MS, "observedAt": 0.0}
+_roast_summary_lock = threading.Lock()
+
+def expected_summary_latency_ms(now=None):
+    """Moving average of direct summary call latency, decayed towards ROAST_SUMMARY_EXPECTED_MS since the last call."""
+    now = time.monotonic() if now is None else now
+    with _roast_summary_lock:
+        latency_ms, observed_at = _roast_summary_calls["latencyMs"], _roast_summary_calls["observedAt"]
+    if not observed_at or ROAST_SUMMARY_LATENCY_HALF_LIFE <= 0:
+        return latency_ms
+    weight = 0.5 ** (max(0.0, now - observed_at) / ROAST_SUMMARY_LATENCY_HALF_LIFE)
+    return ROAST_SUMMARY_EXPECTED_MS + (latency_ms - ROAST_SUMMARY_EXPECTED_MS) * weight
+
+def choose_summary_path(latency_budget=None):
+    """Return "template" when the summary call is saturated or can't fit in latency_budget seconds, else "direct"."""
+    expected_ms = expected_summary_latency_ms()
+    with _roast_summary_lock:
+        in_flight = _roast_summary_calls["inFlight"]
+    if in_flight >= ROAST_SUMMARY_MAX_IN_FLIGHT:
+        safe_print(f"[DEBUG] Roast summary: {in_flight} call(s) in flight, using template path")
+        return "template"
+    if latency_budget is not None and expected_ms > latency_budget * 1000:
+        safe_print(f"[DEBUG] Roast summary: expected {expected_ms:.0f}ms exceeds {latency_budget}s budget, using template path")
+        return "template"
+    return "direct"
+
+def generate_roast_summary(model, failed_items, overall_score, latency_budget=None):
+    """
+    Interactive path: one direct Gemini call for the hook/analysis roast summary of a single audit.
+    Uses template_roast_summary instead when choose_summary_path says so, and when the call fails
+    or exceeds latency_budget seconds. Returns (summary, path) with path "direct" or "template".
+    """
+    if choose_summary_path(latency_budget) == "template":
+        return template_roast_summary(failed_items, overall_score), "template"
+    
+    roast_prompt = f"""You are a brutally honest, no-nonsense CRO Consultant who uses humor to soften the blow.
+
+Input: The list of failed audit items:
+{format_audit_dump(failed_items)}
+
+Task: Generate a JSON object roastSummary with:
+
+{ROAST_SUMMARY_TASK}
+
+Return ONLY valid JSON in this format:
+{{
+  "hook": "Line 1\\nLine 2\\nLine 3",
+  "analysis": "A comprehensive 10-12 sentence analysis covering the Good, the Bad, and the Ugly. Be brutally honest but helpful."
+}}
+
+Be witty, direct, and focus on conversion impact."""
+    
+    with _roast_summary_lock:
+        _roast_summary_calls["inFlight"] += 1
+    started = time.perf_counter()
+    try:
+        roast_response = model.generate_content(
+            roast_prompt,
+            generation_config={
+                "temperature": 0.8,
+                "top_p": 0.95,
+                "top_k": 40,
+                "max_output_tokens": 512,
+                "response_mime_type": "application/json"
+            },
+            request_options={"timeout": latency_budget} if latency_budget else None
+        )
+        roast_summary_json, _ = parse_llm_json(roast_response.text)
+        roast_summary_json = normalize_roast_summary(roast_summary_json)
+        if roast_summary_json is None:
+            raise ValueError("Roast summary response was not a JSON object with a hook")
+        return roast_summary_json, "direct"
+    except Exception as e:
+        safe_print(f"[WARN] Roast summary generation failed, using template path: {safe_error_message(e)}")
+        return template_roast_summary(failed_items, overall_score), "template"
+    finally:
+        latency_ms = (time.perf_counter() - started) * 1000
+        expected_ms = expected_summary_latency_ms()
+        with _roast_summary_lock:
+            _roast_summary_calls["inFlight"] -= 1
+            # Moving average of observed call latency (timeouts included) for choose_summary_path
+            _roast_summary_calls["latencyMs"] = 0.7 * expected_ms + 0.3 * latency_ms
+            _roast_summary_calls["observedAt"] = time.monotonic()
+
+def generate_roast_summaries_batch(model, summary_requests, batch_size=None):
+    """
+    Batch path: roast summaries for several audits in one multi-audit request per chunk of
+    batch_size audits, de-multiplexed by audit id. summary_requests maps audit id to a
+    compile_roast "summaryRequest". Audits missing from (or malformed in) the batched response
+    get a direct generate_roast_summary call. Returns {audit_id: (summary, path)}.
+    """
+    batch_size = batch_size or ROAST_SUMMARY_BATCH_SIZE
+    audit_ids = list(summary_requests)
+    summaries = {}
+    for start in range(0, len(audit_ids), batch_size):
+        chunk = audit_ids[start:start + batch_size]
+        audits_block = "\n\n".join(
+            f"### Audit {audit_id}\n{format_audit_dump(summary_requests[audit_id]['failedItems'])}" for audit_id in chunk
+        )
+        batch_prompt = f"""You are a brutally honest, no-nonsense CRO Consultant who uses humor to soften the blow.
+
+Input: {len(chunk)} separate website audits, each with its list of failed audit items:
+
+{audits_block}
+
+Task: For EACH audit, independently, generate a roastSummary with:
+
+{ROAST_SUMMARY_TASK}
+
+Return ONLY valid JSON: one object keyed by the audit id, with exactly these keys: {json.dumps(chunk)}
+{{
+  "{chunk[0]}": {{"hook": "Line 1\\nLine 2\\nLine 3", "analysis": "10-12 sentences about this audit only."}}
+}}
+
+Be witty, direct, and focus on conversion impact. Never mix findings between audits."""
         
-        detailed_audit[category] = category_items
+        batched = {}
+        try:
+            response = model.generate_content(
+                batch_prompt,
+                generation_config={
+                    "temperature": 0.8,
+                    "top_p": 0.95,
+                    "top_k": 40,
+                    "max_output_tokens": min(8192, 512 * len(chunk)),
+                    "response_mime_type": "application/json"
+                }
+            )
+            batched, _ = parse_llm_json(response.text)
+            if not isinstance(batched, dict):
+                raise ValueError("Batched roast summary response was not a JSON object")
+        except Exception as e:
+            safe_print(f"[WARN] Batched roast summary failed for {len(chunk)} audit(s): {safe_error_message(e)}")
+            batched = {}
+        
+        re_requested = 0
+        for audit_id in chunk:
+            summary = normalize_roast_summary(batched.get(str(audit_id)))
+            if summary is None:
+                re_requested += 1
+                request = summary_requests[audit_id]
+                summaries[audit_id] = generate_roast_summary(model, request["failedItems"], request["overallScore"])
+            else:
+                summaries[audit_id] = (summary, "batched")
+        safe_print(f"[DEBUG] Batched roast summaries: {len(chunk)} audit(s) in one request, {re_requested} re-requested directly")
+    return summaries
+
+def apply_roast_summary(final_json, summary, summary_path):
+    """Write a roast summary into a compile_roast result and record which path produced it."""
+    final_json["overview"]["executiveSummary"] = summary.get("executiveSummary", "Analysis complete.")
+    final_json["overview"]["roastAnalysis"] = summary.get("roastAnalysis", "Review findings below.")
+    final_json["roastSummary"] = summary.get("executiveSummary", "Analysis complete.")
+    final_json["summaryPath"] = summary_path
+    final_json["summaryRequest"] = None
+    return final_json
+
+def compile_roast(images, text_content, html_source, progress_manager=None, page_features=None, device_captures=None,
+                  previous_audit=None, summary_mode="direct", latency_budget=None, scoring_profile=None):
+    """
+    Manager function: Orchestrates the 3 workers and merges their unified JSON outputs
+    into the final God Mode JSON schema with scoring, roast summary, and aggregation.
+    device_captures is capture_devices()["devices"]; non-desktop frames go to the visuals worker.
+    previous_audit is the "auditSnapshot" of an earlier audit of the same page: workers whose inputs
+    are unchanged are not re-run and their items are carried forward, and findings are marked
+    new/changed/unchanged with the fixed ones listed under "auditDiff".
+    summary_mode "deferred" skips the roast summary call and leaves a "summaryRequest" for
+    generate_roast_summaries_batch (see generate_roasts_batch, used by the --batch command line);
+    interactive runs use "direct".
+    latency_budget (seconds, default ROAST_SUMMARY_LATENCY_BUDGET) caps the direct summary call;
+    when it can't be met or the LLM is saturated the summary comes from the local template bank.
+    scoring_profile names the SCORING_PROFILES entry used for scores and quick wins (default SCORING_PROFILE).
+    """
+    model = get_gemini_model()
+    
+    # Incremental re-audit: only re-run workers whose inputs changed since the previous audit
+    audited_at = time.time()
+    fingerprint = build_audit_fingerprint(images, text_content, html_source, page_features, device_captures)
+    plan = plan_incremental_audit(previous_audit, fingerprint) if previous_audit else None
+    reuse = set(plan["reuse"]) if plan else set()
+    if plan:
+        safe_print(f"[DEBUG] Incremental re-audit: reusing {sorted(reuse) or 'nothing'}, re-running {plan['rerun']}")
+    
+    # Worker 1: Analyze Visuals (Progress step 13)
+    if progress_manager:
+        progress_manager.update(13)
+    worker_salvage = {}
+    # Which workers produced a usable result this run (carried-forward results count as usable)
+    worker_ok = {worker: worker in reuse for worker in ("visuals", "copy", "tech")}
+    visual_frames = None
+    if "visuals" in reuse:
+        visuals_items = carry_forward_items(previous_audit["workerItems"]["visuals"], previous_audit, "visuals")
+    else:
+        try:
+            device_images = {
+                device: capture.get("screenshots", [])
+                for device, capture in (device_captures or {}).items() if device != "desktop"
+            }
+            visuals_data = analyze_visuals(images, model, device_images=device_images)
+            visuals_items = visuals_data.get("items", [])
+            worker_ok["visuals"] = "error" not in visuals_data
+            if visuals_data.get("salvage"):
+                worker_salvage["visuals"] = visuals_data["salvage"]
+            visual_frames = visuals_data.get("frames")
+        except Exception as e:
+            safe_print(f"[ERROR] Visuals worker failed: {safe_error_message(e)}")
+            visuals_items = []
+    
+    # Worker 2: Analyze Copy (Progress step 15)
+    if progress_manager:
+        progress_manager.update(15)
+    if "copy" in reuse:
+        copy_items = carry_forward_items(previous_audit["workerItems"]["copy"], previous_audit, "copy")
+    else:
+        try:
+            copy_data = analyze_copy(text_content, model, html_source=html_source)
+            copy_items = copy_data.get("items", [])
+            worker_ok["copy"] = "error" not in copy_data
+            if copy_data.get("salvage"):
+                worker_salvage["copy"] = copy_data["salvage"]
+        except Exception as e:
+            safe_print(f"[ERROR] Copy worker failed: {safe_error_message(e)}")
+            copy_items = []
+    
+    # Worker 3: Analyze Tech (Progress step 17)
+    if progress_manager:
+        progress_manager.update(17)
+    if "tech" in reuse:
+        # Deterministic checks are cheap - always re-score them; carry forward only the LLM-judged items
+        local_items = score_page_features(page_features) if page_features else []
+        local_names = {item["elementName"] for item in local_items}
+        tech_items = local_items + carry_forward_items(
+            [item for item in previous_audit["workerItems"]["tech"] if item.get("elementName") not in local_names],
+            previous_audit, "tech"
+        )
+    else:
+        try:
+            tech_data = analyze_tech(html_source, model, page_features=page_features)
+            tech_items = tech_data.get("items", [])
+            worker_ok["tech"] = "error" not in tech_data
+            if tech_data.get("salvage"):
+                worker_salvage["tech"] = tech_data["salvage"]
+        except Exception as e:
+            safe_print(f"[ERROR] Tech worker failed: {safe_error_message(e)}")
+            tech_items = []
+    
+    for worker, worker_items in (("visuals", visuals_items), ("copy", copy_items), ("tech", tech_items)):
+        for item in worker_items:
+            item.setdefault("provenance", {"worker": worker, "auditedAt": audited_at, "carriedForward": False})
+    
+    # Findings marked new/fixed/unchanged against the previous audit
+    audit_diff = None
+    if previous_audit:
+        previous_status = previous_audit.get("findingStatus") or finding_status_map(
+            [item for items in previous_audit.get("workerItems", {}).values() for item in items]
+        )
+        fixed = mark_finding_changes(visuals_items + copy_items + tech_items, previous_status)
+        audit_diff = {
+            "previousAuditAt": previous_audit.get("auditedAt"),
+            "rerunWorkers": plan["rerun"],
+            "reusedWorkers": plan["reuse"],
+            "changedSections": plan["changedSections"],
+            "textChanged": plan["textChanged"],
+            "fixed": fixed
+        }
+    
+    # Merge all items
+    all_items = visuals_items + copy_items + tech_items
+    
+    # Score every view (radar, quick wins, category buckets, bullets) in one pass over the items
+    profile = get_scoring_profile(scoring_profile)
+    scoring = score_audit_items(all_items, profile=profile)
+    radar_metrics = scoring["radarMetrics"]
+    overall_score = scoring["overallScore"]
+    
+    # Generate roast summary using AI (Progress step 18)
+    if progress_manager:
+        progress_manager.update(18)
+    
+    failed_items = scoring["failedItems"]
+    summary_request = None
+    if summary_mode == "deferred" and all_items:
+        # Batch runs: the caller collects these and sends them in one multi-audit request
+        roast_summary_json = template_roast_summary(failed_items, overall_score)
+        summary_path = "pending"
+        summary_request = {"failedItems": failed_items, "overallScore": overall_score}
+    elif all_items:
+        budget = latency_budget if latency_budget is not None else ROAST_SUMMARY_LATENCY_BUDGET
+        roast_summary_json, summary_path = generate_roast_summary(model, failed_items, overall_score, latency_budget=budget)
+    else:
+        roast_summary_json, summary_path = template_roast_summary(failed_items, overall_score), "template"
+    
+    # Serialize the scored findings into the legacy JSON views
+    views = finding_views(scoring)
+    # Quick wins: top 3 by badness score (always 3 when there are at least 3 findings)
+    quick_wins = views["quickWins"]
+    
+    # detailedAudit: findings grouped by radarCategory
+    detailed_audit = views["detailedAudit"]
+    # Data validity check: If Visuals category is empty, add placeholder
+    if not detailed_audit["visuals"]:
+        detailed_audit["visuals"] = [{
+            "elementName": "Visual Analysis",
+            "status": "Satisfactory",
+            "impact": "MI",
+            "radarCategory": "visuals",
+            "placeholder": True,
+            "rationale": VISUALS_PLACEHOLDER_RATIONALE,
+            "workingWell": ["Visual elements present on page"],
+            "notWorking": ["Unable to perform detailed visual analysis"],
+            "fix": {
+                "quickFix": "Review visual elements manually. Ensure images, colors, and layout align with brand guidelines.",
+                "expectedImpact": "Maintains visual consistency"
+            }
+        }]
     
     # Build final JSON structure (backward compatible with existing display_dashboard and generate_pdf)
     final_json = {
@@ -1524,18 +2882,19 @@ Be witty, direct, and focus on conversion impact."""
             "roastAnalysis": roast_summary_json.get("roastAnalysis", "Review findings below.")
         },
         "roastSummary": roast_summary_json.get("executiveSummary", "Analysis complete."),
+        # How the roast summary was produced: "direct" call, "batched" multi-audit request, local "template", or "pending" until batched
+        "summaryPath": summary_path,
+        "summaryRequest": summary_request,
         "headline_roast": f"Site Score: {overall_score}/100",
         "radarMetrics": radar_metrics,
+        # Scoring profile the scores were computed with (rescore_audits can recompute under another)
+        "scoringProfile": profile["name"],
         "quickWins": quick_wins,
         "detailedAudit": detailed_audit,
         # Backward compatibility fields
         "overall_score": overall_score,
         "quick_wins": quick_wins,
-        "summary_bullets": [
-            f"✅ {item.get('elementName')}" for item in all_items if item.get("status") in ["Excellent", "Good"]
-        ][:10] + [
-            f"❌ {item.get('elementName')}" for item in all_items if item.get("status") in ["Needs Improvement", "Failed"]
-        ][:10],
+        "summary_bullets": views["summaryBullets"],
         "sections": [],  # Empty for now, can be populated if needed
         "radar_scores": {
             "UX": radar_metrics.get("ux", 50),
@@ -1546,23 +2905,45 @@ Be witty, direct, and focus on conversion impact."""
             "Speed": radar_metrics.get("speed", 50)
         },
         "categories": [],
-        "audit_items": [
-            {
-                "element": item.get("elementName", ""),
-                "status": item.get("status", "Satisfactory"),
-                "rationale": item.get("rationale", ""),
-                "working": item.get("workingWell", []),
-                "not_working": item.get("notWorking", []),
-                "fix": item.get("fix", {}).get("quickFix", ""),
-                "expected_impact": item.get("conversionImpact", "")
+        # Workers whose output was truncated and which elements were salvaged/re-requested
+        "workerSalvage": worker_salvage,
+        # Metrics measured in the browser during capture (None when unavailable)
+        "pageSpeed": (page_features or {}).get("speed"),
+        # What the capture request blocker dropped (profile, counts by reason, estimated bytes saved)
+        "captureBlocking": (page_features or {}).get("blocking"),
+        # Incremental re-audit: which workers re-ran and which findings were fixed (None on a first audit)
+        "auditDiff": audit_diff,
+        # What the next re-audit of this page compares against
+        "auditSnapshot": {
+            "auditedAt": audited_at,
+            "fingerprint": fingerprint,
+            "workerItems": {
+                "visuals": visuals_items,
+                "copy": copy_items,
+                "tech": [item for item in tech_items if item.get("source") not in ("dom", "measured")]
+            },
+            "workerOk": worker_ok,
+            # Every finding's status, including the deterministic tech checks that aren't carried forward
+            "findingStatus": finding_status_map(all_items)
+        },
+        # Frames sent to the visuals worker after dedup/cropping (counts and estimated image tokens)
+        "visualFrames": visual_frames,
+        # Per-device capture evidence: frame count, viewport and measured speed (primary device only)
+        "devices": {
+            device: {
+                "frames": len(capture.get("screenshots", [])),
+                "viewport": CAPTURE_DEVICE_PROFILES.get(device, {}).get("viewport"),
+                "pageSpeed": (capture.get("features") or {}).get("speed")
             }
-            for item in all_items
-        ]
+            for device, capture in (device_captures or {}).items()
+        },
+        "audit_items": views["auditItems"]
     }
     
     return final_json
 
-def generate_roast(images, html_content="", page_text="", progress_manager=None):
+def generate_roast(images, html_content="", page_text="", progress_manager=None, page_features=None, device_captures=None,
+                   previous_audit=None, latency_budget=None, scoring_profile=None):
     """
     Main entry point for website analysis. Uses Assembly Line architecture:
     - Worker 1: analyze_visuals (screenshots)
@@ -1570,28 +2951,1396 @@ def generate_roast(images, html_content="", page_text="", progress_manager=None)
     - Worker 3: analyze_tech (HTML source)
     - Manager: compile_roast (merges results)
     """
-    return compile_roast(images, page_text, html_content, progress_manager)
+    return compile_roast(images, page_text, html_content, progress_manager, page_features=page_features,
+                         device_captures=device_captures, previous_audit=previous_audit, latency_budget=latency_budget,
+                         scoring_profile=scoring_profile)
+
+def generate_roasts_batch(audits, progress_manager=None):
+    """
+    Batch entry point: compile several audits, then fetch all their roast summaries through
+    generate_roast_summaries_batch instead of one summary call per audit. audits is a list of
+    generate_roast keyword-argument dicts; returns the roast results in the same order.
+    """
+    results = [
+        compile_roast(audit.get("images", []), audit.get("page_text", ""), audit.get("html_content", ""), progress_manager,
+                      page_features=audit.get("page_features"), device_captures=audit.get("device_captures"),
+                      previous_audit=audit.get("previous_audit"), summary_mode="deferred",
+                      scoring_profile=audit.get("scoring_profile"))
+        for audit in audits
+    ]
+    summary_requests = {
+        str(index): result["summaryRequest"] for index, result in enumerate(results) if result.get("summaryRequest")
+    }
+    if summary_requests:
+        summaries = generate_roast_summaries_batch(get_gemini_model(), summary_requests)
+        for audit_id, (summary, summary_path) in summaries.items():
+            apply_roast_summary(results[int(audit_id)], summary, summary_path)
+    return results
+
+def run_batch_audit(urls, scoring_profile=None, incremental=True):
+    """
+    Headless batch audit: capture each URL, compile all audits through generate_roasts_batch
+    (one batched summary request instead of one per audit) and record them in the audit history.
+    With incremental, each URL is re-audited against its latest stored snapshot.
+    Returns [(url, roast_data)]; URLs whose capture fails are logged and left out.
+    """
+    history = get_audit_history()
+    audits, audited_urls = [], []
+    for url in urls:
+        try:
+            capture = asyncio.run(capture_devices(url, devices=AUDIT_DEVICES))
+        except Exception as e:
+            safe_print(f"[ERROR] Batch capture failed for {url}: {safe_error_message(e)}")
+            continue
+        device_captures = capture["devices"]
+        desktop = device_captures[AUDIT_DEVICES[0]]
+        latest = history.latest_audit(url) if history and incremental else None
+        audits.append({
+            "images": desktop["screenshots"],
+            "page_text": desktop["text"],
+            "html_content": desktop["html"],
+            "page_features": desktop["features"],
+            "device_captures": device_captures,
+            "previous_audit": latest["data"].get("auditSnapshot") if latest else None,
+            "scoring_profile": scoring_profile
+        })
+        audited_urls.append(url)
+    results = generate_roasts_batch(audits) if audits else []
+    if history:
+        for url, roast_data in zip(audited_urls, results):
+            history.record(url, roast_data)
+        history.flush()
+    if _remote_writer:
+        _remote_writer.flush()
+    return list(zip(audited_urls, results))
+
+def batch_main(argv):
+    """Command line for run_batch_audit: python main.py --batch urls.txt [--profile NAME] [--out results.json]"""
+    parser = argparse.ArgumentParser(prog="main.py --batch", description="Audit a list of URLs without the dashboard.")
+    parser.add_argument("--batch", required=True, metavar="URLS_FILE", help="text file with one URL per line ('-' for stdin)")
+    parser.add_argument("--profile", default=None, help="scoring profile (default: SCORING_PROFILE env)")
+    parser.add_argument("--out", default=None, help="write the full audit results as JSON to this file")
+    parser.add_argument("--full", action="store_true", help="re-run every worker instead of diffing against the last audit")
+    args = parser.parse_args(argv)
+    
+    with (sys.stdin if args.batch == "-" else open(args.batch, encoding="utf-8")) as url_file:
+        urls = [line.strip() for line in url_file if line.strip() and not line.lstrip().startswith("#")]
+    results = run_batch_audit(urls, scoring_profile=args.profile, incremental=not args.full)
+    for url, roast_data in results:
+        print(f"{roast_data.get('overall_score', 0):>3}/100  {url}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as out:
+            json.dump({url: roast_data for url, roast_data in results}, out, indent=2, default=str)
+    return 0 if len(results) == len(urls) else 1
+
+def _status_from_issue_count(issue_count):
+    """Map a number of failed deterministic checks onto the 5-level status scale."""
+    return ["Excellent", "Good", "Satisfactory", "Needs Improvement"][issue_count] if issue_count < 4 else "Failed"
+
+def score_page_features(features):
+    """
+    Score the deterministic tech checks locally from the in-browser page features record.
+    Returns unified-schema items for SEO Tags, Legal Compliance and Mobile Form Usability,
+    tagged with source "dom", plus Page Speed Indicators when measured timings are attached
+    under "speed" (otherwise that element is left to the LLM).
+    """
+    items = []
+    
+    # SEO Tags: H1 structure, title, meta description, canonical, lang, Open Graph
+    h1_count = features.get("h1Count", 0)
+    title = features.get("title") or ""
+    description = features.get("metaDescription") or ""
+    working, broken = [], []
+    if h1_count == 1:
+        working.append(f"Single H1: \"{(features.get('h1') or [''])[0][:80]}\"")
+    elif h1_count == 0:
+        broken.append("No <h1> on the page")
+    else:
+        broken.append(f"{h1_count} <h1> tags - the page has no single primary heading")
+    if 10 <= len(title) <= 60:
+        working.append(f"<title> is {len(title)} characters")
+    else:
+        broken.append(f"<title> is {len(title)} characters (aim for 10-60)")
+    if 50 <= len(description) <= 160:
+        working.append(f"Meta description is {len(description)} characters")
+    elif not description:
+        broken.append("Missing <meta name=\"description\">")
+    else:
+        broken.append(f"Meta description is {len(description)} characters (aim for 50-160)")
+    if features.get("canonical"):
+        working.append("Canonical URL declared")
+    else:
+        broken.append("No <link rel=\"canonical\">")
+    if not features.get("lang"):
+        broken.append("<html> has no lang attribute")
+    if features.get("ogTags", 0) == 0:
+        broken.append("No Open Graph tags for social previews")
+    items.append({
+        "elementName": "SEO Tags",
+        "status": _status_from_issue_count(len(broken)),
+        "impact": "HI" if h1_count == 0 or not description else "MI",
+        "radarCategory": "copy",
+        "rationale": f"Measured in the rendered page: {h1_count} H1 tag(s), {len(title)}-character title, "
+                     f"{len(description)}-character meta description.",
+        "workingWell": working,
+        "notWorking": broken,
+        "conversionImpact": "Clear heading structure and search snippets determine how many qualified visitors arrive.",
+        "fix": {
+            "quickFix": "Use exactly one benefit-driven <h1>, a 10-60 character <title> and a 50-160 character meta description.",
+            "example": '<title>Product - Core Benefit</title>\n<meta name="description" content="One-sentence value proposition with a call to action.">',
+            "expectedImpact": "Higher click-through from search results"
+        },
+        "source": "dom"
+    })
+    
+    # Legal Compliance: privacy, terms, cookie policy/banner, disclaimer
+    legal = features.get("legal") or {}
+    labels = {"privacy": "Privacy Policy", "terms": "Terms & Conditions", "cookie": "Cookie Policy", "disclaimer": "Disclaimer / Imprint"}
+    has_cookie = bool(legal.get("cookie")) or bool(features.get("cookieBanner"))
+    found = {key: (has_cookie if key == "cookie" else bool(legal.get(key))) for key in labels}
+    working = [f"{labels[key]} linked" + (f" ({legal[key]})" if legal.get(key) else " (consent banner)") for key, ok in found.items() if ok]
+    broken = [f"No {labels[key]} link found" for key, ok in found.items() if not ok]
+    status = _status_from_issue_count(len(broken))
+    if not found["privacy"] and status in ("Excellent", "Good", "Satisfactory"):
+        status = "Needs Improvement"
+    items.append({
+        "elementName": "Legal Compliance",
+        "status": status,
+        "impact": "HI" if not found["privacy"] and features.get("forms", 0) else "MI",
+        "radarCategory": "trust",
+        "rationale": f"{len(working)} of 4 required legal links/notices were found in the rendered page.",
+        "workingWell": working,
+        "notWorking": broken,
+        "conversionImpact": "Missing legal pages erode trust at the moment visitors are asked for personal data.",
+        "fix": {
+            "quickFix": "Link Privacy Policy, Terms & Conditions, Cookie Policy and a Disclaimer from the footer of every page.",
+            "example": '<footer><a href="/privacy">Privacy Policy</a> | <a href="/terms">Terms</a> | <a href="/cookies">Cookies</a> | <a href="/disclaimer">Disclaimer</a></footer>',
+            "expectedImpact": "Removes a trust objection before form submission"
+        },
+        "source": "dom"
+    })
+    
+    # Mobile Form Usability: keyboard types, autocomplete, labels, viewport
+    fields = features.get("fields") or []
+    working, broken = [], []
+    viewport = features.get("viewport") or ""
+    if "width=device-width" in viewport:
+        working.append("Responsive viewport meta tag")
+    else:
+        broken.append("Missing <meta name=\"viewport\" content=\"width=device-width, initial-scale=1\">")
+    expected_types = [("email", "email"), ("phone", "tel"), ("tel", "tel"), ("mobile", "tel"), ("quantity", "number")]
+    mistyped, unlabeled = [], 0
+    text_fields = [f for f in fields if f.get("tag") == "input" and f.get("type") not in ("submit", "button", "checkbox", "radio", "image", "reset")]
+    for field in text_fields:
+        hint = f"{field.get('name', '')} {field.get('placeholder', '')} {field.get('autocomplete', '')}".lower()
+        for keyword, input_type in expected_types:
+            if keyword in hint and field.get("type") != input_type and field.get("inputmode") not in ("email", "tel", "numeric"):
+                mistyped.append(f"\"{field.get('name') or keyword}\" uses type=\"{field.get('type') or 'text'}\" instead of type=\"{input_type}\"")
+                break
+        if not field.get("hasLabel"):
+            unlabeled += 1
+    if text_fields:
+        if mistyped:
+            broken.extend(mistyped[:3])
+        else:
+            working.append(f"All {len(text_fields)} input fields use appropriate keyboard types")
+        if unlabeled:
+            broken.append(f"{unlabeled} of {len(text_fields)} fields have no label or aria-label")
+        if not any(f.get("autocomplete") for f in text_fields):
+            broken.append("No autocomplete attributes - mobile autofill will not work")
+    items.append({
+        "elementName": "Mobile Form Usability",
+        "status": _status_from_issue_count(len(broken)) if text_fields else "Satisfactory",
+        "impact": "HI" if mistyped else ("MI" if text_fields else "LI"),
+        "radarCategory": "ux",
+        "rationale": (f"Checked {len(text_fields)} visible input field(s) across {features.get('forms', 0)} form(s) in the rendered page."
+                      if text_fields else "No visible form fields were found on the page."),
+        "workingWell": working,
+        "notWorking": broken,
+        "conversionImpact": "Wrong keyboards and missing autofill add friction to every mobile form submission.",
+        "fix": {
+            "quickFix": "Use type=\"email\"/\"tel\"/\"number\" with matching autocomplete tokens and a visible label on every field.",
+            "example": '<label for="email">Email</label>\n<input id="email" type="email" name="email" autocomplete="email">',
+            "expectedImpact": "Faster mobile form completion"
+        },
+        "source": "dom"
+    })
+    
+    speed = features.get("speed") or {}
+    if any(speed.get(metric) is not None for metric in PAGE_SPEED_THRESHOLDS):
+        items.append(score_page_speed(speed))
+    
+    return items
+
+# Third-party domains grouped by category for capture-time request blocking (subdomains match too)
+BLOCKED_DOMAIN_CATEGORIES = {
+    "analytics": [
+        "google-analytics.com", "analytics.google.com", "googletagmanager.com", "segment.com", "segment.io",
+        "mixpanel.com", "hotjar.com", "hotjar.io", "fullstory.com", "clarity.ms", "amplitude.com",
+        "heapanalytics.com", "plausible.io", "mouseflow.com", "nr-data.net", "quantserve.com", "scorecardresearch.com"
+    ],
+    "advertising": [
+        "doubleclick.net", "googlesyndication.com", "googleadservices.com", "adservice.google.com",
+        "connect.facebook.net", "ads.linkedin.com", "px.ads.linkedin.com", "bat.bing.com", "criteo.com",
+        "criteo.net", "taboola.com", "outbrain.com", "adnxs.com", "analytics.tiktok.com", "ads-twitter.com"
+    ],
+    "chat": [
+        "intercom.io", "intercomcdn.com", "drift.com", "driftt.com", "crisp.chat", "tawk.to", "zdassets.com",
+        "livechatinc.com", "olark.com", "tidio.co", "tidiochat.com"
+    ],
+    "video": [
+        "youtube.com", "youtube-nocookie.com", "vimeo.com", "vimeocdn.com", "wistia.com", "wistia.net",
+        "vidyard.com", "jwplayer.com"
+    ]
+}
+
+# Capture request-blocking profiles. "analysis-safe" keeps HTML, layout-affecting CSS, images and
+# first-party scripts, and drops media, fonts, beacons and tracker/ad/chat/video domains.
+CAPTURE_BLOCK_PROFILES = {
+    "off": {
+        "resource_types": [],
+        "domain_categories": []
+    },
+    "analysis-safe": {
+        "resource_types": ["media", "font", "websocket", "eventsource", "ping", "manifest", "texttrack"],
+        "domain_categories": ["analytics", "advertising", "chat", "video"]
+    }
+}
+
+# Rough median transfer size per resource type, used to estimate bytes saved by blocked requests
+BLOCKED_BYTES_ESTIMATE = {
+    "media": 500 * 1024,
+    "font": 30 * 1024,
+    "script": 25 * 1024,
+    "image": 15 * 1024,
+    "stylesheet": 10 * 1024,
+    "document": 20 * 1024
+}
+
+# Static resource types worth caching on disk between captures
+CACHEABLE_RESOURCE_TYPES = {"stylesheet", "script", "image", "font"}
+
+# Response headers not replayed from the cache (body is stored decoded)
+_UNCACHED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie", "date", "age"}
+
+def parse_cache_control(value):
+    """Parse a Cache-Control header into {directive: value or True}."""
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else True
+    return directives
+
+def cache_expiry(headers, now=None):
+    """
+    Compute when a response stops being fresh, from Cache-Control (s-maxage/max-age)
+    or Expires. Returns None if the response must not be stored, 0 if it must be
+    revalidated on every use.
+    """
+    now = time.time() if now is None else now
+    directives = parse_cache_control(headers.get("cache-control"))
+    if "no-store" in directives or "private" in directives:
+        return None
+    vary = {v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()}
+    if vary - {"accept-encoding"}:
+        return None  # Variants we can't key on
+    if "no-cache" in directives:
+        return 0
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return now + max(0, int(directives[name]))
+            except (TypeError, ValueError):
+                return 0
+    if headers.get("expires"):
+        try:
+            return parsedate_to_datetime(headers["expires"]).timestamp()
+        except (TypeError, ValueError):
+            return 0
+    return 0
+
+class AssetCache:
+    """
+    Disk-backed cache for static assets, shared by every capture context in the process.
+    Entries are keyed by URL with their validators (ETag/Last-Modified) so stale entries
+    are revalidated with a conditional request; the total size is capped with LRU eviction.
+    """
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024):
+        self.directory = pathlib.Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.db = sqlite3.connect(str(self.directory / "index.sqlite3"), timeout=10, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS assets (
+                key TEXT PRIMARY KEY, url TEXT, status INTEGER, headers TEXT,
+                etag TEXT, last_modified TEXT, expires REAL, size INTEGER, last_access REAL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS assets_lru ON assets (last_access)")
+        self.db.commit()
+        self.lock = threading.Lock()
+        self.stats = {"hits": 0, "revalidated": 0, "misses": 0, "stored": 0, "evicted": 0, "bytesServed": 0}
+    
+    def _body_path(self, key):
+        return self.directory / key[:2] / f"{key}.bin"
+    
+    def lookup(self, url):
+        """Return the cached entry for a URL (dict) or None."""
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, headers, etag, last_modified, expires FROM assets WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        try:
+            body = self._body_path(key).read_bytes()
+        except OSError:
+            return None
+        status, headers, etag, last_modified, expires = row
+        return {"key": key, "status": status, "headers": json.loads(headers), "etag": etag,
+                "last_modified": last_modified, "expires": expires, "body": body}
+    
+    def touch(self, key, expires=None):
+        """Mark an entry as recently used (and refresh its expiry after revalidation)."""
+        with self.lock:
+            if expires is None:
+                self.db.execute("UPDATE assets SET last_access = ? WHERE key = ?", (time.time(), key))
+            else:
+                self.db.execute("UPDATE assets SET last_access = ?, expires = ? WHERE key = ?", (time.time(), expires, key))
+            self.db.commit()
+    
+    def store(self, url, status, headers, body, expires):
+        """Write an asset to disk and index it, then evict least-recently-used entries over the cap."""
+        if len(body) > self.max_bytes // 10:
+            return  # One asset shouldn't flush a tenth of the cache
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        path = self._body_path(key)
+        path.parent.mkdir(exist_ok=True)
+        # Per-writer temp name: contexts fetching the same asset can store it at the same time
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(body)
+        os.replace(tmp_path, path)
+        kept = {k: v for k, v in headers.items() if k.lower() not in _UNCACHED_HEADERS}
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO assets VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, url, status, json.dumps(kept), headers.get("etag"), headers.get("last-modified"),
+                 expires, len(body), time.time())
+            )
+            self.db.commit()
+            self.stats["stored"] += 1
+        self.evict()
+    
+    def evict(self):
+        """Drop least-recently-used entries until the cache is back under 90% of max_bytes."""
+        with self.lock:
+            total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM assets").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            target = self.max_bytes * 0.9
+            for key, size in self.db.execute("SELECT key, size FROM assets ORDER BY last_access").fetchall():
+                if total <= target:
+                    break
+                try:
+                    self._body_path(key).unlink()
+                except OSError:
+                    pass
+                self.db.execute("DELETE FROM assets WHERE key = ?", (key,))
+                total -= size
+                self.stats["evicted"] += 1
+            self.db.commit()
+    
+    async def handle(self, route):
+        """
+        Serve a GET for a static asset from disk, revalidating or fetching from the origin as needed.
+        Returns "hit", "revalidated", "miss" or "bypass".
+        """
+        request = route.request
+        if request.method != "GET" or request.resource_type not in CACHEABLE_RESOURCE_TYPES:
+            await route.continue_()
+            return "bypass"
+        try:
+            # sqlite and file I/O run on a worker thread so other routes on the event loop aren't stalled
+            entry = await asyncio.to_thread(self.lookup, request.url)
+            if entry and entry["expires"] and entry["expires"] > time.time():
+                await asyncio.to_thread(self.touch, entry["key"])
+                self.stats["hits"] += 1
+                self.stats["bytesServed"] += len(entry["body"])
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+                return "hit"
+            
+            conditional = {}
+            if entry and entry["etag"]:
+                conditional["if-none-match"] = entry["etag"]
+            if entry and entry["last_modified"]:
+                conditional["if-modified-since"] = entry["last_modified"]
+            response = await route.fetch(headers={**request.headers, **conditional} if conditional else None)
+            
+            if response.status == 304 and entry:
+                expires = cache_expiry({**entry["headers"], **response.headers})
+                await asyncio.to_thread(self.touch, entry["key"], expires or 0)
+                self.stats["revalidated"] += 1
+                self.stats["bytesServed"] += len(entry["body"])
+                await route.fulfill(status=entry["status"], headers=entry["headers"], body=entry["body"])
+                return "revalidated"
+            
+            self.stats["misses"] += 1
+            body = await response.body()
+            expires = cache_expiry(response.headers)
+            has_validators = response.headers.get("etag") or response.headers.get("last-modified")
+            if response.status == 200 and expires is not None and (expires > time.time() or has_validators):
+                await asyncio.to_thread(self.store, request.url, response.status, response.headers, body, expires)
+            await route.fulfill(response=response, body=body)
+            return "miss"
+        except Exception as e:
+            safe_print(f"[WARN] Asset cache failed for {request.url[:80]}: {safe_error_message(e)}")
+            try:
+                await route.continue_()
+            except Exception:
+                pass  # Route was already handled
+            return "bypass"
+    
+    def summary(self):
+        """Cache counters since startup, plus the current on-disk size."""
+        with self.lock:
+            entries, size = self.db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM assets").fetchone()
+        return {**self.stats, "entries": entries, "diskBytes": size}
+
+_asset_cache = None
+
+def get_asset_cache():
+    """
+    Shared AssetCache for this process (None when disabled with ASSET_CACHE_MB=0).
+    Location and size cap come from ASSET_CACHE_DIR / ASSET_CACHE_MB.
+    """
+    global _asset_cache
+    if _asset_cache is None:
+        try:
+            max_mb = int(os.getenv("ASSET_CACHE_MB", "256"))
+            if max_mb <= 0:
+                return None
+            directory = os.getenv("ASSET_CACHE_DIR") or os.path.join(tempfile.gettempdir(), "roast_asset_cache")
+            _asset_cache = AssetCache(directory, max_bytes=max_mb * 1024 * 1024)
+        except Exception as e:
+            safe_print(f"[WARN] Asset cache unavailable: {safe_error_message(e)}")
+            return None
+    return _asset_cache
+
+class RequestBlocker:
+    """
+    Playwright route handler that aborts requests matching a blocking profile
+    and keeps per-audit counters of what was blocked. Allowed requests go through
+    the shared AssetCache when one is given.
+    """
+    def __init__(self, profile="analysis-safe", site_url=None, asset_cache=None):
+        if isinstance(profile, str):
+            if profile not in CAPTURE_BLOCK_PROFILES:
+                raise ValueError(f"Unknown capture block profile {profile!r} (expected one of: {', '.join(CAPTURE_BLOCK_PROFILES)})")
+            profile_name = profile
+            profile = CAPTURE_BLOCK_PROFILES[profile]
+        else:
+            profile_name = "custom"
+        self.profile_name = profile_name
+        self.resource_types = set(profile.get("resource_types", []))
+        self.domain_category = {
+            domain: category
+            for category in profile.get("domain_categories", [])
+            for domain in BLOCKED_DOMAIN_CATEGORIES.get(category, [])
+        }
+        self.site_host = (urlparse(site_url).hostname or "") if site_url else ""
+        self.asset_cache = asset_cache
+        self.allowed = 0
+        self.blocked = 0
+        self.blocked_by_reason = {}
+        self.estimated_bytes_saved = 0
+        self.served_from_cache = 0
+    
+    def category_for_host(self, host):
+        """Return the blocked category for a host (or any parent domain), else None."""
+        labels = host.split(".")
+        for i in range(len(labels) - 1):
+            category = self.domain_category.get(".".join(labels[i:]))
+            if category:
+                return category
+        return None
+    
+    def block_reason(self, request):
+        """Decide whether a request should be blocked; returns the reason or None."""
+        resource_type = request.resource_type
+        if resource_type == "document" and request.is_navigation_request() and request.frame.parent_frame is None:
+            return None  # Never block the page itself
+        host = urlparse(request.url).hostname or ""
+        if host and host != self.site_host:
+            category = self.category_for_host(host)
+            if category:
+                return f"domain:{category}"
+        if resource_type in self.resource_types:
+            return f"type:{resource_type}"
+        return None
+    
+    async def handle(self, route):
+        """Route callback: abort blocked requests, let everything else through."""
+        request = route.request
+        reason = self.block_reason(request)
+        if reason is None:
+            self.allowed += 1
+            if self.asset_cache:
+                if await self.asset_cache.handle(route) in ("hit", "revalidated"):
+                    self.served_from_cache += 1
+            else:
+                await route.continue_()
+            return
+        self.blocked += 1
+        self.blocked_by_reason[reason] = self.blocked_by_reason.get(reason, 0) + 1
+        self.estimated_bytes_saved += BLOCKED_BYTES_ESTIMATE.get(request.resource_type, 5 * 1024)
+        await route.abort("blockedbyclient")
+    
+    def summary(self):
+        """Per-audit counters for the report."""
+        return {
+            "profile": self.profile_name,
+            "allowedRequests": self.allowed,
+            "blockedRequests": self.blocked,
+            "blockedByReason": dict(sorted(self.blocked_by_reason.items(), key=lambda kv: -kv[1])),
+            "estimatedBytesSaved": self.estimated_bytes_saved,
+            "servedFromCache": self.served_from_cache
+        }
+
+# Registered before navigation so LCP, layout shifts and long tasks are observed from the first paint
+PAGE_SPEED_OBSERVER_SCRIPT = """
+(() => {
+    try { performance.setResourceTimingBufferSize(1000); } catch (e) {}
+    const metrics = { lcp: null, lcpElement: null, cls: 0, longTaskCount: 0, longTaskTotal: 0, longTaskMax: 0, totalBlockingTime: 0 };
+    window.__pageSpeedMetrics = metrics;
+    const observe = (type, callback) => {
+        try { new PerformanceObserver(list => list.getEntries().forEach(callback)).observe({ type: type, buffered: true }); } catch (e) {}
+    };
+    observe('largest-contentful-paint', entry => {
+        metrics.lcp = entry.renderTime || entry.loadTime || entry.startTime;
+        metrics.lcpElement = entry.element ? entry.element.tagName.toLowerCase() : null;
+    });
+    // CLS = largest session window (shifts < 1s apart, window < 5s), ignoring shifts caused by input
+    let sessionValue = 0, sessionStart = 0, sessionLast = 0;
+    observe('layout-shift', entry => {
+        if (entry.hadRecentInput) return;
+        if (sessionValue && entry.startTime - sessionLast < 1000 && entry.startTime - sessionStart < 5000) {
+            sessionValue += entry.value;
+        } else {
+            sessionValue = entry.value;
+            sessionStart = entry.startTime;
+        }
+        sessionLast = entry.startTime;
+        metrics.cls = Math.max(metrics.cls, sessionValue);
+    });
+    observe('longtask', entry => {
+        metrics.longTaskCount += 1;
+        metrics.longTaskTotal += entry.duration;
+        metrics.longTaskMax = Math.max(metrics.longTaskMax, entry.duration);
+        metrics.totalBlockingTime += Math.max(0, entry.duration - 50);
+    });
+})();
+"""
+
+PAGE_SPEED_SCRIPT = """
+() => {
+    const round = (value) => value == null ? null : Math.round(value);
+    const nav = performance.getEntriesByType('navigation')[0];
+    const paint = performance.getEntriesByName('first-contentful-paint')[0];
+    const observed = window.__pageSpeedMetrics || {};
+    const resources = performance.getEntriesByType('resource');
+    const byType = {};
+    let totalBytes = 0, unsizedRequests = 0, thirdPartyRequests = 0;
+    const sized = [];
+    for (const entry of resources) {
+        const type = entry.initiatorType || 'other';
+        const bytes = entry.transferSize || entry.encodedBodySize || 0;
+        if (!byType[type]) byType[type] = { requests: 0, bytes: 0 };
+        byType[type].requests += 1;
+        byType[type].bytes += bytes;
+        totalBytes += bytes;
+        if (!bytes) unsizedRequests += 1;
+        try { if (new URL(entry.name).host !== location.host) thirdPartyRequests += 1; } catch (e) {}
+        sized.push({ url: entry.name.slice(0, 160), type: type, bytes: bytes, duration: round(entry.duration) });
+    }
+    const documentBytes = nav ? (nav.transferSize || nav.encodedBodySize || 0) : 0;
+    sized.sort((a, b) => b.bytes - a.bytes);
+    return {
+        ttfb: nav ? round(nav.responseStart - nav.startTime) : null,
+        fcp: paint ? round(paint.startTime) : null,
+        domContentLoaded: nav ? round(nav.domContentLoadedEventEnd - nav.startTime) : null,
+        load: nav && nav.loadEventEnd ? round(nav.loadEventEnd - nav.startTime) : null,
+        lcp: round(observed.lcp),
+        lcpElement: observed.lcpElement || null,
+        cls: Math.round((observed.cls || 0) * 1000) / 1000,
+        longTasks: {
+            count: observed.longTaskCount || 0,
+            totalMs: round(observed.longTaskTotal || 0),
+            maxMs: round(observed.longTaskMax || 0)
+        },
+        totalBlockingTime: round(observed.totalBlockingTime || 0),
+        requests: resources.length + 1,
+        thirdPartyRequests: thirdPartyRequests,
+        unsizedRequests: unsizedRequests,
+        totalBytes: totalBytes + documentBytes,
+        documentBytes: documentBytes,
+        byType: byType,
+        largest: sized.slice(0, 5)
+    };
+}
+"""
+
+# (good, poor) thresholds per measured metric - Core Web Vitals where they exist
+PAGE_SPEED_THRESHOLDS = {
+    "lcp": (2500, 4000),
+    "cls": (0.1, 0.25),
+    "ttfb": (800, 1800),
+    "fcp": (1800, 3000),
+    "totalBlockingTime": (200, 600),
+    "totalBytes": (1600 * 1024, 4000 * 1024),
+    "requests": (50, 100)
+}
+
+
+def score_page_speed(speed):
+    """
+    Score Page Speed Indicators from metrics measured in the browser (PAGE_SPEED_SCRIPT).
+    Each metric is rated good/needs improvement/poor against PAGE_SPEED_THRESHOLDS; the
+    penalty total maps onto the status scale. Returns a unified-schema item tagged source "measured".
+    """
+    labels = {
+        "lcp": ("Largest Contentful Paint", lambda v: f"{v / 1000:.1f}s"),
+        "cls": ("Cumulative Layout Shift", lambda v: f"{v:.3f}"),
+        "ttfb": ("Time to First Byte", lambda v: f"{v:.0f}ms"),
+        "fcp": ("First Contentful Paint", lambda v: f"{v / 1000:.1f}s"),
+        "totalBlockingTime": ("Main-thread blocking time", lambda v: f"{v:.0f}ms"),
+        "totalBytes": ("Page weight", format_bytes),
+        "requests": ("Requests", lambda v: f"{v:.0f}")
+    }
+    working, broken = [], []
+    penalty = 0
+    poor_vitals = False
+    for metric, (good, poor) in PAGE_SPEED_THRESHOLDS.items():
+        value = speed.get(metric)
+        if value is None:
+            continue
+        label, fmt = labels[metric]
+        if value <= good:
+            working.append(f"{label}: {fmt(value)} (good, <= {fmt(good)})")
+        elif value <= poor:
+            penalty += 1
+            broken.append(f"{label}: {fmt(value)} (needs improvement, target <= {fmt(good)})")
+        else:
+            penalty += 2
+            poor_vitals = poor_vitals or metric in ("lcp", "cls", "totalBlockingTime")
+            broken.append(f"{label}: {fmt(value)} (poor, target <= {fmt(good)})")
+    
+    if penalty == 0:
+        status = "Excellent"
+    elif penalty <= 2:
+        status = "Good"
+    elif penalty <= 4:
+        status = "Satisfactory"
+    elif penalty <= 7:
+        status = "Needs Improvement"
+    else:
+        status = "Failed"
+    
+    largest = [r for r in speed.get("largest") or [] if r.get("bytes")]
+    if largest and status not in ("Excellent", "Good"):
+        top = largest[0]
+        broken.append(f"Largest resource: {top['url'].rsplit('/', 1)[-1][:60] or top['url'][:60]} ({top['type']}, {format_bytes(top['bytes'])})")
+    by_type = speed.get("byType") or {}
+    heaviest_type = max(by_type.items(), key=lambda kv: kv[1].get("bytes", 0))[0] if by_type else None
+    
+    lcp = speed.get("lcp")
+    rationale = (f"Measured in Chromium: LCP {lcp / 1000:.1f}s, " if lcp is not None else "Measured in Chromium: ")
+    rationale += (f"CLS {speed.get('cls', 0):.3f}, {format_bytes(speed.get('totalBytes', 0))} across "
+                  f"{speed.get('requests', 0)} requests ({speed.get('thirdPartyRequests', 0)} third-party), "
+                  f"{speed.get('longTasks', {}).get('count', 0)} long tasks.")
+    
+    return {
+        "elementName": "Page Speed Indicators",
+        "status": status,
+        "impact": "HI" if poor_vitals else ("MI" if penalty else "LI"),
+        "radarCategory": "speed",
+        "rationale": rationale,
+        "workingWell": working,
+        "notWorking": broken,
+        "conversionImpact": "Every extra second before the main content renders costs visitors before they see the offer.",
+        "fix": {
+            "quickFix": (f"Start with {heaviest_type} resources (the heaviest category): compress, lazy-load below-the-fold media, "
+                         "and defer non-critical scripts." if heaviest_type else
+                         "Compress images, lazy-load below-the-fold media and defer non-critical scripts."),
+            "example": '<img src="hero.webp" width="1200" height="600" fetchpriority="high">\n<script src="widget.js" defer></script>',
+            "expectedImpact": "Faster LCP and lower bounce rate"
+        },
+        "source": "measured",
+        "metrics": speed
+    }
+
+PAGE_FEATURES_SCRIPT = """
+() => {
+    const text = (el) => (el.innerText || el.textContent || '').trim().replace(/\\s+/g, ' ');
+    const meta = (selector) => {
+        const el = document.querySelector(selector);
+        return el ? (el.getAttribute('content') || '') : null;
+    };
+    const links = Array.from(document.querySelectorAll('a[href]'));
+    const legalPatterns = {
+        privacy: /privacy|datenschutz/i,
+        terms: /terms|conditions|\\btos\\b/i,
+        cookie: /cookie/i,
+        disclaimer: /disclaimer|imprint|impressum|legal notice/i
+    };
+    const legal = {};
+    for (const [key, pattern] of Object.entries(legalPatterns)) {
+        const hit = links.find(a => pattern.test(a.getAttribute('href')) || pattern.test(text(a)));
+        legal[key] = hit ? hit.getAttribute('href').slice(0, 200) : null;
+    }
+    const fields = Array.from(document.querySelectorAll('input, select, textarea'))
+        .filter(el => (el.getAttribute('type') || '').toLowerCase() !== 'hidden')
+        .slice(0, 50)
+        .map(el => ({
+            tag: el.tagName.toLowerCase(),
+            type: (el.getAttribute('type') || '').toLowerCase(),
+            name: (el.name || el.id || '').slice(0, 60),
+            placeholder: (el.getAttribute('placeholder') || '').slice(0, 60),
+            autocomplete: el.getAttribute('autocomplete') || '',
+            inputmode: el.getAttribute('inputmode') || '',
+            hasLabel: !!((el.labels && el.labels.length) || el.getAttribute('aria-label') || el.getAttribute('aria-labelledby'))
+        }));
+    const scripts = Array.from(document.scripts);
+    const external = scripts.filter(s => s.src);
+    const images = Array.from(document.images);
+    return {
+        title: document.title || '',
+        lang: document.documentElement.getAttribute('lang') || '',
+        metaDescription: meta('meta[name="description"]'),
+        viewport: meta('meta[name="viewport"]'),
+        canonical: (document.querySelector('link[rel="canonical"]') || {}).href || null,
+        ogTags: document.querySelectorAll('meta[property^="og:"]').length,
+        h1: Array.from(document.querySelectorAll('h1')).slice(0, 5).map(h => text(h).slice(0, 120)),
+        h1Count: document.querySelectorAll('h1').length,
+        h2Count: document.querySelectorAll('h2').length,
+        h3Count: document.querySelectorAll('h3').length,
+        forms: document.forms.length,
+        fields: fields,
+        legal: legal,
+        cookieBanner: !!document.querySelector('[id*="cookie" i], [class*="cookie" i], [id*="consent" i], [class*="consent" i]'),
+        scripts: {
+            total: scripts.length,
+            external: external.length,
+            asyncOrDefer: external.filter(s => s.async || s.defer).length,
+            thirdParty: external.filter(s => { try { return new URL(s.src).host !== location.host; } catch (e) { return false; } }).length
+        },
+        images: {
+            total: images.length,
+            missingAlt: images.filter(img => !img.getAttribute('alt')).length,
+            missingDimensions: images.filter(img => !img.getAttribute('width') || !img.getAttribute('height')).length,
+            lazy: images.filter(img => img.loading === 'lazy').length,
+            oversized: images.filter(img => img.clientWidth > 0 && img.naturalWidth > 2 * img.clientWidth).length
+        },
+        stylesheets: document.querySelectorAll('link[rel="stylesheet"]').length,
+        iframes: document.querySelectorAll('iframe').length
+    };
+}
+"""
+
+# Hide fixed/sticky overlays before capture. Only likely candidates are style-checked: headers/navs,
+# overlay-ish class names, the top two levels under <body>, and whatever covers the viewport edges.
+HIDE_STICKY_SCRIPT = """
+() => {
+    const candidates = new Set();
+    const add = (el) => { if (el && el !== document.body && el !== document.documentElement) candidates.add(el); };
+    document.querySelectorAll(
+        'header, nav, [role="banner"], [role="dialog"], [aria-modal="true"], [style*="fixed"], [style*="sticky"], ' +
+        '[class*="sticky" i], [class*="fixed" i], [class*="cookie" i], [class*="consent" i], [class*="chat" i], ' +
+        '[class*="popup" i], [class*="modal" i], [class*="banner" i], [id*="cookie" i], [id*="chat" i]'
+    ).forEach(add);
+    for (const el of document.body.children) {
+        add(el);
+        for (const child of el.children) add(child);
+    }
+    const w = window.innerWidth, h = window.innerHeight;
+    for (const [x, y] of [[w / 2, 5], [w / 2, h - 5], [w - 20, h - 20], [20, h - 20], [w / 2, h / 2]]) {
+        for (let el = document.elementFromPoint(x, y); el && el !== document.body; el = el.parentElement) add(el);
+    }
+    let hidden = 0;
+    for (const el of candidates) {
+        const style = window.getComputedStyle(el);
+        if (style.position === 'fixed' || style.position === 'sticky') {
+            el.dataset.originalDisplay = style.display;
+            el.style.display = 'none';
+            hidden += 1;
+        }
+    }
+    return { checked: candidates.size, hidden: hidden };
+}
+"""
+
+# Split the page into top-level blocks along DOM boundaries and label them (hero, pricing, footer, ...).
+# Generic wrappers taller than 1.5 viewports are split into their children.
+PAGE_SECTIONS_SCRIPT = """
+() => {
+    const vh = window.innerHeight;
+    const docHeight = Math.max(document.body.scrollHeight, document.documentElement.scrollHeight);
+    const box = (el) => {
+        const r = el.getBoundingClientRect();
+        return { top: Math.round(r.top + window.scrollY), height: Math.round(r.height) };
+    };
+    const visibleChildren = (el) => Array.from(el.children).filter(child => {
+        if (['SCRIPT', 'STYLE', 'NOSCRIPT', 'TEMPLATE', 'LINK', 'META'].includes(child.tagName)) return false;
+        return box(child).height >= 40;
+    });
+    const leaves = [];
+    const walk = (el, depth) => {
+        const kids = visibleChildren(el);
+        const b = box(el);
+        const covered = kids.reduce((sum, child) => sum + box(child).height, 0);
+        const isWrapper = ['BODY', 'DIV', 'MAIN', 'ARTICLE'].includes(el.tagName) || el.id === 'root' || el.id === '__next';
+        if (depth < 8 && leaves.length < 60 && isWrapper && kids.length >= 2 && b.height > 1.5 * vh && covered >= 0.8 * b.height) {
+            kids.forEach(child => walk(child, depth + 1));
+        } else if (depth < 8 && kids.length === 1 && isWrapper) {
+            walk(kids[0], depth + 1);
+        } else if (b.height >= 40) {
+            leaves.push(el);
+        }
+    };
+    walk(document.body, 0);
+    const patterns = [
+        ['pricing', /pricing|\\bplans?\\b|per month|\\/mo\\b|\\$\\s?\\d/],
+        ['testimonials', /testimonial|reviews?|what (our )?(customers|clients) say|trusted by|rated/],
+        ['faq', /\\bfaq\\b|frequently asked|questions/],
+        ['features', /features?|benefits|how it works|why choose|what you get/],
+        ['cta', /get started|sign up|start (your )?free|book a demo|contact us|subscribe/]
+    ];
+    let heroFound = false;
+    const sections = leaves.map((el, index) => {
+        const b = box(el);
+        const headingEl = el.querySelector('h1, h2, h3');
+        const label_source = ((el.id || '') + ' ' + (typeof el.className === 'string' ? el.className : '') + ' ' +
+            (el.innerText || '').slice(0, 600)).toLowerCase();
+        let label = 'content';
+        const tag = el.tagName.toLowerCase();
+        if (tag === 'footer' || el.getAttribute('role') === 'contentinfo' || (index === leaves.length - 1 && /footer|copyright|©/.test(label_source))) {
+            label = 'footer';
+        } else if ((tag === 'header' || tag === 'nav') && b.height < vh * 0.5) {
+            label = 'header';
+        } else if (!heroFound && (el.querySelector('h1') || b.top < vh)) {
+            label = 'hero';
+            heroFound = true;
+        } else {
+            for (const [name, pattern] of patterns) {
+                if (pattern.test(label_source)) { label = name; break; }
+            }
+        }
+        return {
+            label: label,
+            top: b.top,
+            height: b.height,
+            tag: tag,
+            heading: headingEl ? (headingEl.innerText || '').trim().slice(0, 80) : ''
+        };
+    });
+    return { width: window.innerWidth, viewportHeight: vh, height: docHeight, sections: sections };
+}
+"""
+
+# Full-page capture: pages whose screenshot is up to this height (device px) are shot in one pass, taller ones per section
+FULL_PAGE_MAX_HEIGHT = 12000
+MAX_CAPTURE_SECTIONS = 6
+# Tall pages: page areas outside the selected sections are shot as tiles, at most this many
+MAX_CAPTURE_TILES = 6
+# Which sections to keep when a page has more than MAX_CAPTURE_SECTIONS
+SECTION_PRIORITY = ["hero", "pricing", "features", "testimonials", "cta", "faq", "footer", "content"]
+
+def select_capture_sections(layout, max_sections=MAX_CAPTURE_SECTIONS):
+    """
+    Turn the PAGE_SECTIONS_SCRIPT layout into at most max_sections capture regions in page order.
+    Blocks shorter than a third of the viewport are merged into the next block (a small header
+    joins the hero), each region is capped at two viewports, and the highest-priority labels win.
+    """
+    viewport_height = layout.get("viewportHeight") or 900
+    page_height = layout.get("height") or 0
+    blocks = sorted((s for s in layout.get("sections", []) if s.get("height", 0) > 0), key=lambda s: s["top"])
+    if not blocks:
+        return [{"label": "hero", "top": 0, "height": min(page_height or viewport_height, 2 * viewport_height), "heading": ""}]
+    
+    merged = []
+    pending = None
+    for block in blocks:
+        if pending:
+            # Keep the more specific label of the two
+            specific = [l for l in (block["label"], pending["label"]) if l not in ("content", "header")]
+            bottom = max(block["top"] + block["height"], pending["top"] + pending["height"])
+            block = dict(block, top=pending["top"], height=bottom - pending["top"],
+                         label=specific[0] if specific else block["label"],
+                         heading=block.get("heading") or pending.get("heading", ""))
+            pending = None
+        if block["height"] < viewport_height / 3 and block is not blocks[-1]:
+            pending = block
+            continue
+        # Drop blocks nested inside the previous one (overlapping DOM boxes)
+        if merged and block["top"] + block["height"] <= merged[-1]["top"] + merged[-1]["height"]:
+            continue
+        merged.append(block)
+    if pending:
+        merged.append(pending)
+    
+    ranked = sorted(
+        range(len(merged)),
+        key=lambda i: (SECTION_PRIORITY.index(merged[i]["label"]) if merged[i]["label"] in SECTION_PRIORITY else len(SECTION_PRIORITY), i)
+    )
+    keep = sorted(ranked[:max_sections])
+    return [
+        {
+            "label": merged[i]["label"],
+            "top": max(0, merged[i]["top"]),
+            "height": min(merged[i]["height"], 2 * viewport_height),
+            "heading": merged[i].get("heading", "")
+        }
+        for i in keep
+    ]
+
+def uncovered_tiles(sections, page_height, tile_height, max_tiles=MAX_CAPTURE_TILES):
+    """
+    Capture regions ("content" label) for the parts of a page_height page outside sections:
+    each gap between, above or below them is cut into tiles of at most tile_height, top first,
+    and at most max_tiles are returned.
+    """
+    tiles = []
+    covered_to = 0
+    for top, bottom in sorted((s["top"], s["top"] + s["height"]) for s in sections) + [(page_height, page_height)]:
+        while covered_to < top and len(tiles) < max_tiles:
+            height = min(tile_height, top - covered_to)
+            tiles.append({"label": "content", "top": covered_to, "height": height, "heading": ""})
+            covered_to += height
+        covered_to = max(covered_to, bottom)
+    return tiles
+
+async def capture_sections(page):
+    """
+    Full-page capture mode: one full-page screenshot cropped into semantic sections, or for
+    pages whose full screenshot would be taller than FULL_PAGE_MAX_HEIGHT device pixels, one
+    clipped screenshot per section plus tiles for the page areas between and below them
+    (uncovered_tiles). Returns (images, sections) in page order, one section per image; each
+    image also carries its label in img.info["section"]. Sections too thin to crop are dropped.
+    """
+    layout = await page.evaluate(PAGE_SECTIONS_SCRIPT)
+    sections = select_capture_sections(layout)
+    page_width = layout.get("width") or 1280
+    page_height = layout.get("height") or 0
+    device_scale = await page.evaluate("window.devicePixelRatio") or 1
+    images, captured = [], []
+    if page_height <= FULL_PAGE_MAX_HEIGHT / device_scale:
+        full_page = Image.open(io.BytesIO(await page.screenshot(type='png', full_page=True)))
+        scale = full_page.width / page_width  # device pixels per CSS pixel
+        for section in sections:
+            top = int(section["top"] * scale)
+            bottom = min(full_page.height, int((section["top"] + section["height"]) * scale))
+            if bottom - top > 10:
+                crop = full_page.crop((0, top, full_page.width, bottom))
+                crop.info["section"] = section["label"]
+                images.append(crop)
+                captured.append(section)
+    else:
+        tile_height = 2 * (layout.get("viewportHeight") or 900)
+        tiles = uncovered_tiles(sections, page_height, tile_height)
+        for section in sorted(sections + tiles, key=lambda s: s["top"]):
+            clip = {'x': 0, 'y': section["top"], 'width': page_width, 'height': section["height"]}
+            img = Image.open(io.BytesIO(await page.screenshot(type='png', full_page=True, clip=clip)))
+            img.info["section"] = section["label"]
+            images.append(img)
+            captured.append(section)
+        if tiles:
+            safe_print(f"[DEBUG] Tiled {len(tiles)} area(s) outside the selected sections")
+    safe_print(f"[DEBUG] Full-page capture: {page_height}px page, sections: "
+               f"{', '.join(s['label'] for s in captured)}")
+    return images, captured
+
+# Browser context settings per capture device
+CAPTURE_DEVICE_PROFILES = {
+    "desktop": {
+        "viewport": {'width': 1920, 'height': 1080},
+        "user_agent": 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+        "is_mobile": False,
+        "has_touch": False,
+        "device_scale_factor": 1
+    },
+    "mobile": {
+        # iPhone 14
+        "viewport": {'width': 390, 'height': 844},
+        "user_agent": 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1',
+        "is_mobile": True,
+        "has_touch": True,
+        "device_scale_factor": 3
+    },
+    "tablet": {
+        # iPad Air
+        "viewport": {'width': 820, 'height': 1180},
+        "user_agent": 'Mozilla/5.0 (iPad; CPU OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1',
+        "is_mobile": True,
+        "has_touch": True,
+        "device_scale_factor": 2
+    }
+}
+
+# Devices captured for every audit - desktop first (primary), extra devices from AUDIT_DEVICES (e.g. "mobile,tablet")
+AUDIT_DEVICES = ["desktop"] + [
+    d.strip() for d in os.getenv("AUDIT_DEVICES", "mobile").split(",") if d.strip() in ("mobile", "tablet")
+]
+
+# Clean page-speed load alongside the device captures (MEASURE_PAGE_SPEED=0 skips the extra visit; speed
+# is then judged by the tech worker). It may run PAGE_SPEED_GRACE seconds past the captures before it is dropped.
+MEASURE_PAGE_SPEED = os.getenv("MEASURE_PAGE_SPEED", "1").lower() not in ("0", "false", "no")
+PAGE_SPEED_GRACE = float(os.getenv("PAGE_SPEED_GRACE", "5"))
+
+# Realistic browser headers to avoid detection
+CAPTURE_HEADERS = {
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br',
+    'DNT': '1',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1',
+    'Sec-Fetch-Dest': 'document',
+    'Sec-Fetch-Mode': 'navigate',
+    'Sec-Fetch-Site': 'none',
+    'Sec-Fetch-User': '?1',
+    'Cache-Control': 'max-age=0'
+}
+
+def capture_context_options(device):
+    """browser.new_context() keyword arguments for a device in CAPTURE_DEVICE_PROFILES."""
+    profile = CAPTURE_DEVICE_PROFILES[device]
+    return {
+        "viewport": profile["viewport"],
+        "user_agent": profile["user_agent"],
+        "extra_http_headers": CAPTURE_HEADERS,
+        "locale": 'en-US',
+        "timezone_id": 'America/New_York',
+        "permissions": ['geolocation'],
+        "color_scheme": 'light',
+        "screen": profile["viewport"],
+        "has_touch": profile["has_touch"],
+        "is_mobile": profile["is_mobile"],
+        "device_scale_factor": profile["device_scale_factor"],
+    }
+
+async def measure_page_speed(browser, url, device='desktop', wait_strategy='domcontentloaded'):
+    """
+    Load a URL once in a fresh context with no request blocking and no asset cache, and return the
+    PAGE_SPEED_SCRIPT metrics (None on failure). capture_devices runs this in its own context next to
+    the device captures, so blocked fonts/trackers and asset cache hits don't skew the numbers.
+    """
+    context = None
+    try:
+        context = await browser.new_context(**capture_context_options(device))
+        page = await context.new_page()
+        await page.add_init_script(PAGE_SPEED_OBSERVER_SCRIPT)
+        await page.goto(url, wait_until=wait_strategy, timeout=60000, referer='https://www.google.com/')
+        # Give LCP and long tasks time to settle (matches the capture's post-navigation wait)
+        await page.wait_for_timeout(3000)
+        page_speed = await page.evaluate(PAGE_SPEED_SCRIPT)
+        safe_print(f"[DEBUG] [{device}] Page speed: LCP={page_speed.get('lcp')}ms CLS={page_speed.get('cls')} "
+                   f"{page_speed.get('requests')} requests, {page_speed.get('totalBytes', 0) // 1024} KB")
+        return page_speed
+    except Exception as e:
+        safe_print(f"[WARN] Page speed measurement failed: {safe_error_message(e)}")
+        return None
+    finally:
+        if context:
+            try:
+                await context.close()
+            except:
+                pass
+
+async def capture_page(browser, url, device='desktop', block_profile=None, wait_strategy='domcontentloaded', capture_mode=None):
+    """
+    Capture one device's view of a URL in its own context of an already-launched browser.
+    Navigation errors propagate so the caller can retry with another wait strategy.
+    capture_mode 'full' (default, CAPTURE_MODE env) shoots semantic page sections; 'rolling' takes viewport chunks.
+    Page speed is not measured here (see measure_page_speed).
+    
+    Returns:
+        {"device", "screenshots", "html", "text", "features"} - features as documented
+        in capture_screenshot_from_url
+    """
+    viewport_config = CAPTURE_DEVICE_PROFILES[device]["viewport"]
+    capture_mode = capture_mode or os.getenv("CAPTURE_MODE", "full")
+    
+    context = None
+    try:
+        safe_print("[DEBUG] Creating context with stealth configuration...")
+        context = await browser.new_context(**capture_context_options(device))
+        
+        # Drop trackers, media and fonts that don't affect the screenshots; serve static assets from the disk cache
+        asset_cache = get_asset_cache()
+        blocker = RequestBlocker(block_profile or os.getenv("CAPTURE_BLOCK_PROFILE", "analysis-safe"), site_url=url, asset_cache=asset_cache)
+        if blocker.resource_types or blocker.domain_category or asset_cache:
+            await context.route("**/*", blocker.handle)
+        page = await context.new_page()
+        
+        # Set additional headers on the page
+        await page.set_extra_http_headers(CAPTURE_HEADERS)
+        
+        # Enhanced stealth JavaScript injection (before navigation)
+        await page.add_init_script("""
+            // Remove webdriver flag completely
+            Object.defineProperty(navigator, 'webdriver', {
+                get: () => undefined,
+                configurable: true
+            });
+            delete navigator.__proto__.webdriver;
+            
+            // Mock plugins with realistic data
+            Object.defineProperty(navigator, 'plugins', {
+                get: () => [1, 2, 3, 4, 5],
+                configurable: true
+            });
+            
+            // Mock languages
+            Object.defineProperty(navigator, 'languages', {
+                get: () => ['en-US', 'en'],
+                configurable: true
+            });
+            
+            // Override permissions API
+            const originalQuery = window.navigator.permissions.query;
+            window.navigator.permissions.query = (parameters) => (
+                parameters.name === 'notifications' ?
+                    Promise.resolve({ state: Notification.permission }) :
+                    originalQuery(parameters)
+            );
+            
+            // Mock chrome object (essential for Chrome detection)
+            if (!window.chrome) {
+                window.chrome = {};
+            }
+            if (!window.chrome.runtime) {
+                window.chrome.runtime = {};
+            }
+            if (!window.chrome.runtime.onConnect) {
+                window.chrome.runtime.onConnect = undefined;
+            }
+            
+            // Override WebGL vendor and renderer
+            const getParameter = WebGLRenderingContext.prototype.getParameter;
+            WebGLRenderingContext.prototype.getParameter = function(parameter) {
+                if (parameter === 37445) {
+                    return 'Intel Inc.';
+                }
+                if (parameter === 37446) {
+                    return 'Intel Iris OpenGL Engine';
+                }
+                return getParameter.call(this, parameter);
+            };
+            
+            // Override canvas fingerprinting
+            const toBlob = HTMLCanvasElement.prototype.toBlob;
+            const toDataURL = HTMLCanvasElement.prototype.toDataURL;
+            const getImageData = CanvasRenderingContext2D.prototype.getImageData;
+            
+            // Mock notification permissions
+            Object.defineProperty(Notification, 'permission', {
+                get: () => 'default'
+            });
+            
+            // Override iframe contentWindow
+            Object.defineProperty(HTMLIFrameElement.prototype, 'contentWindow', {
+                get: function() {
+                    return window;
+                }
+            });
+        """)
+        
+        # Additional CDP commands for Chromium to hide automation
+        try:
+            cdp_session = await context.new_cdp_session(page)
+            # Hide webdriver property via CDP (executes before page scripts)
+            await cdp_session.send('Page.addScriptToEvaluateOnNewDocument', {
+                'source': '''
+                    Object.defineProperty(navigator, 'webdriver', {
+                        get: () => false
+                    });
+                    // Override Chrome runtime
+                    if (!window.chrome) {
+                        window.chrome = {};
+                    }
+                    if (!window.chrome.runtime) {
+                        window.chrome.runtime = {};
+                    }
+                '''
+            })
+        except Exception as cdp_error:
+            # CDP is optional, don't fail if it doesn't work
+            safe_print(f"[WARN] CDP stealth injection failed (non-critical): {safe_error_message(str(cdp_error))}")
+        
+        safe_print(f"[DEBUG] [{device}] Navigating to {url}...")
+        await page.goto(
+            url, 
+            wait_until=wait_strategy, 
+            timeout=60000,
+            referer='https://www.google.com/'  # Add referer to look more legitimate
+        )
+        safe_print(f"[DEBUG] [{device}] Navigation complete (used {wait_strategy} wait strategy)")
+        
+        # CRITICAL: Wait 3 seconds for firewall/security analysis to complete
+        safe_print("[DEBUG] Waiting 3 seconds for firewall analysis...")
+        await page.wait_for_timeout(3000)
+        
+        # Human-like behavior: Random mouse movement to prove we're not a robot
+        try:
+            # Move mouse to random position (human-like behavior)
+            viewport_height = viewport_config['height']
+            viewport_width = viewport_config['width']
+            random_x = random.randint(100, viewport_width - 100)
+            random_y = random.randint(100, viewport_height - 100)
+            await page.mouse.move(random_x, random_y)
+            safe_print("[DEBUG] Performed human-like mouse movement")
+            await asyncio.sleep(random.uniform(0.5, 1.5))  # Random delay
+        except Exception as mouse_error:
+            safe_print(f"[WARN] Mouse movement failed (non-critical): {safe_error_message(str(mouse_error))}")
+        
+        # Hard sleep to let images settle (prevents hanging on background scripts)
+        await asyncio.sleep(2)
+        
+        # Human-like scrolling to trigger lazy loading (proves we're not a robot)
+        safe_print("[DEBUG] Performing human-like scroll to trigger lazy loading...")
+        await page.evaluate("""
+            async () => {
+                await new Promise((resolve) => {
+                    let totalHeight = 0;
+                    const distance = 100;
+                    const timer = setInterval(() => {
+                        const scrollHeight = document.body.scrollHeight;
+                        window.scrollBy(0, distance);
+                        totalHeight += distance;
+                        if(totalHeight >= scrollHeight || totalHeight > 50000){
+                            clearInterval(timer);
+                            resolve();
+                        }
+                    }, 100);
+                });
+            }
+        """)
+        
+        # Scroll back to top with smooth behavior
+        await page.evaluate("window.scrollTo({ top: 0, behavior: 'smooth' })")
+        await asyncio.sleep(500 / 1000)  # 500ms wait
+        
+        # Extract HTML content and visible text
+        safe_print("[DEBUG] Extracting HTML and text content...")
+        html_content = await page.content()
+        page_text = await page.evaluate("document.body.innerText")
+        safe_print(f"[DEBUG] Extracted {len(html_content)} chars of HTML and {len(page_text)} chars of text")
+        
+        # Extract structured DOM features in one round trip (feeds the deterministic tech checks)
+        try:
+            page_features = await page.evaluate(PAGE_FEATURES_SCRIPT)
+            safe_print(f"[DEBUG] Extracted page features: {page_features.get('h1Count', 0)} H1, "
+                       f"{len(page_features.get('fields', []))} form fields, {page_features['scripts']['total']} scripts")
+        except Exception as e:
+            safe_print(f"[WARN] Page feature extraction failed: {safe_error_message(e)}")
+            page_features = None
+        blocking = blocker.summary()
+        safe_print(f"[DEBUG] Request blocking ({blocking['profile']}): {blocking['blockedRequests']} blocked, "
+                   f"~{blocking['estimatedBytesSaved'] // 1024} KB saved")
+        if page_features is not None:
+            page_features["blocking"] = blocking
+        if asset_cache:
+            cache_stats = asset_cache.summary()
+            safe_print(f"[DEBUG] Asset cache (process totals): {cache_stats['hits']} hits, {cache_stats['revalidated']} revalidated, "
+                       f"{cache_stats['misses']} misses, {cache_stats['diskBytes'] // 1024} KB on disk")
+        
+        # Get dynamic viewport height
+        viewport_height = await page.evaluate("window.innerHeight")
+        safe_print(f"[DEBUG] Viewport height: {viewport_height}px")
+        
+        # Hide sticky/fixed elements for cleaner stitching (Optional Pro feature)
+        sticky = await page.evaluate(HIDE_STICKY_SCRIPT)
+        safe_print(f"[DEBUG] Hidden {sticky['hidden']} sticky/fixed elements ({sticky['checked']} candidates checked)")
+        
+        screenshots = []
+        if capture_mode == 'full':
+            try:
+                screenshots, sections = await capture_sections(page)
+                if page_features is not None:
+                    page_features["sections"] = sections
+            except Exception as e:
+                safe_print(f"[WARN] Full-page capture failed, falling back to rolling capture: {safe_error_message(e)}")
+                screenshots = []
+        
+        # Precise Rolling Screenshot Capture (No overlap for stitching) - rolling mode or full-page fallback
+        if not screenshots:
+            sanity_limit = 15
+            current_scroll = 0
+            chunk_index = 0
+            
+            total_height = await page.evaluate("document.body.scrollHeight")
+            
+            while current_scroll < total_height and chunk_index < sanity_limit:
+                # Take screenshot of current viewport
+                screenshot_bytes = await page.screenshot(type='png', full_page=False)
+                
+                # Convert to PIL Image
+                from io import BytesIO
+                img = Image.open(BytesIO(screenshot_bytes))
+                screenshots.append(img)
+                
+                # Break condition: Do not scrape infinite scroll pages forever
+                chunk_index += 1
+                if chunk_index >= 2:  # Limited to 2 chunks while resolving errors
+                    break
+                
+                # Precise scroll (exactly viewport_height, no overlap)
+                current_scroll += viewport_height
+                await page.mouse.wheel(0, viewport_height)  # Precise mouse wheel scroll
+                await asyncio.sleep(1)
+                
+                # Recalculate total height (in case of dynamic content)
+                total_height = await page.evaluate("document.body.scrollHeight")
+        
+        safe_print(f"[DEBUG] Captured {len(screenshots)} frames successfully")
+        
+        return {
+            "device": device,
+            "screenshots": screenshots,
+            "html": html_content,
+            "text": page_text,
+            "features": page_features
+        }
+    finally:
+        if context:
+            try:
+                await context.close()
+            except:
+                pass
 
-async def capture_screenshot_from_url(url: str, device: str = 'desktop'):
+async def capture_devices(url: str, devices=('desktop', 'mobile'), block_profile=None, capture_mode=None):
     """
-    Capture rolling screenshots from a URL using Playwright with stealth mode.
-    Supports both desktop and mobile device emulation.
+    Capture several device profiles of one URL concurrently in a single browser.
+    The contexts share the browser's network stack (DNS, connections) and the disk asset cache,
+    so wall time stays close to a single capture. The first device is primary: if it fails the
+    whole capture is retried; other devices that fail are logged and left out. Page speed is
+    measured for the primary device only, in a separate unblocked and uncached load that runs
+    alongside the captures (see MEASURE_PAGE_SPEED / PAGE_SPEED_GRACE).
     
     Args:
         url: The URL to capture (supports all TLDs)
-        device: 'desktop' or 'mobile' (default: 'desktop')
+        devices: names from CAPTURE_DEVICE_PROFILES, primary first
+        block_profile: see capture_screenshot_from_url
+        capture_mode: 'full' (semantic sections) or 'rolling' (viewport chunks); default CAPTURE_MODE env, else 'full'
     
     Returns:
-        (screenshots: list, html_content: str, page_text: str)
+        {"url": str, "devices": {device: {"device", "screenshots", "html", "text", "features"}}}
     """
     browser = None
     max_retries = 3
     retry_delay = 2  # seconds
-    
-    # Normalize device parameter
-    device = device.lower() if device else 'desktop'
-    if device not in ['desktop', 'mobile']:
-        device = 'desktop'
+    devices = [d for d in devices if d in CAPTURE_DEVICE_PROFILES] or ['desktop']
     
     # Ensure URL has protocol (handles all TLDs: .com, .ai, .io, .co, etc.)
     if not url.startswith(('http://', 'https://')):
@@ -1600,43 +4349,10 @@ async def capture_screenshot_from_url(url: str, device: str = 'desktop'):
         url = 'https://' + url
     
     safe_print(f"[DEBUG] Normalized URL: {url}")
-    safe_print(f"[DEBUG] Device mode: {device}")
+    safe_print(f"[DEBUG] Devices: {', '.join(devices)}")
     safe_print(f"[DEBUG] Starting playwright for URL: {url}")
     
-    # Device-specific configuration
-    if device == 'mobile':
-        # Mobile device configuration (iPhone 14)
-        viewport_config = {'width': 390, 'height': 844}
-        screen_config = {'width': 390, 'height': 844}
-        user_agent = 'Mozilla/5.0 (iPhone; CPU iPhone OS 16_6 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Mobile/15E148 Safari/604.1'
-        is_mobile = True
-        has_touch = True
-        device_scale_factor = 3
-    else:
-        # Desktop configuration
-        viewport_config = {'width': 1920, 'height': 1080}
-        screen_config = {'width': 1920, 'height': 1080}
-        user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-        is_mobile = False
-        has_touch = False
-        device_scale_factor = 1
-    
-    # Realistic browser headers to avoid detection
-    realistic_headers = {
-        'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'DNT': '1',
-        'Connection': 'keep-alive',
-        'Upgrade-Insecure-Requests': '1',
-        'Sec-Fetch-Dest': 'document',
-        'Sec-Fetch-Mode': 'navigate',
-        'Sec-Fetch-Site': 'none',
-        'Sec-Fetch-User': '?1',
-        'Cache-Control': 'max-age=0'
-    }
-    
-    # Enhanced stealth browser launch arguments (The 'Human' Mask)
+    # Enhanced stealth browser launch arguments (The 'Human' Mask) - user agent is set per context
     stealth_args = [
         '--disable-blink-features=AutomationControlled',
         '--no-sandbox',
@@ -1645,7 +4361,6 @@ async def capture_screenshot_from_url(url: str, device: str = 'desktop'):
         '--window-position=0,0',
         '--ignore-certifcate-errors',
         '--ignore-certificate-errors-spki-list',
-        '--user-agent=' + user_agent,  # Use device-specific user agent
     ]
     
     # Try headless first, fallback to headless=False if needed
@@ -1671,269 +4386,43 @@ async def capture_screenshot_from_url(url: str, device: str = 'desktop'):
                         )
                     raise launch_error
                 
-                safe_print("[DEBUG] Creating context with stealth configuration...")
-                context = await browser.new_context(
-                    viewport=viewport_config,
-                    user_agent=user_agent,
-                    extra_http_headers=realistic_headers,
-                    locale='en-US',
-                    timezone_id='America/New_York',
-                    permissions=['geolocation'],
-                    color_scheme='light',
-                    screen=screen_config,
-                    has_touch=has_touch,
-                    is_mobile=is_mobile,
-                    device_scale_factor=device_scale_factor,
-                )
-                page = await context.new_page()
-                
-                # Set additional headers on the page
-                await page.set_extra_http_headers(realistic_headers)
-                
-                # Enhanced stealth JavaScript injection (before navigation)
-                await page.add_init_script("""
-                    // Remove webdriver flag completely
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined,
-                        configurable: true
-                    });
-                    delete navigator.__proto__.webdriver;
-                    
-                    // Mock plugins with realistic data
-                    Object.defineProperty(navigator, 'plugins', {
-                        get: () => [1, 2, 3, 4, 5],
-                        configurable: true
-                    });
-                    
-                    // Mock languages
-                    Object.defineProperty(navigator, 'languages', {
-                        get: () => ['en-US', 'en'],
-                        configurable: true
-                    });
-                    
-                    // Override permissions API
-                    const originalQuery = window.navigator.permissions.query;
-                    window.navigator.permissions.query = (parameters) => (
-                        parameters.name === 'notifications' ?
-                            Promise.resolve({ state: Notification.permission }) :
-                            originalQuery(parameters)
-                    );
-                    
-                    // Mock chrome object (essential for Chrome detection)
-                    if (!window.chrome) {
-                        window.chrome = {};
-                    }
-                    if (!window.chrome.runtime) {
-                        window.chrome.runtime = {};
-                    }
-                    if (!window.chrome.runtime.onConnect) {
-                        window.chrome.runtime.onConnect = undefined;
-                    }
-                    
-                    // Override WebGL vendor and renderer
-                    const getParameter = WebGLRenderingContext.prototype.getParameter;
-                    WebGLRenderingContext.prototype.getParameter = function(parameter) {
-                        if (parameter === 37445) {
-                            return 'Intel Inc.';
-                        }
-                        if (parameter === 37446) {
-                            return 'Intel Iris OpenGL Engine';
-                        }
-                        return getParameter.call(this, parameter);
-                    };
-                    
-                    // Override canvas fingerprinting
-                    const toBlob = HTMLCanvasElement.prototype.toBlob;
-                    const toDataURL = HTMLCanvasElement.prototype.toDataURL;
-                    const getImageData = CanvasRenderingContext2D.prototype.getImageData;
-                    
-                    // Mock notification permissions
-                    Object.defineProperty(Notification, 'permission', {
-                        get: () => 'default'
-                    });
-                    
-                    // Override iframe contentWindow
-                    Object.defineProperty(HTMLIFrameElement.prototype, 'contentWindow', {
-                        get: function() {
-                            return window;
-                        }
-                    });
-                """)
-                
-                # Additional CDP commands for Chromium to hide automation
-                try:
-                    cdp_session = await context.new_cdp_session(page)
-                    # Hide webdriver property via CDP (executes before page scripts)
-                    await cdp_session.send('Page.addScriptToEvaluateOnNewDocument', {
-                        'source': '''
-                            Object.defineProperty(navigator, 'webdriver', {
-                                get: () => false
-                            });
-                            // Override Chrome runtime
-                            if (!window.chrome) {
-                                window.chrome = {};
-                            }
-                            if (!window.chrome.runtime) {
-                                window.chrome.runtime = {};
-                            }
-                        '''
-                    })
-                except Exception as cdp_error:
-                    # CDP is optional, don't fail if it doesn't work
-                    safe_print(f"[WARN] CDP stealth injection failed (non-critical): {safe_error_message(str(cdp_error))}")
-                
-                safe_print(f"[DEBUG] Navigating to {url}...")
-                # Navigate to URL with retry logic - try different wait strategies
+                # Try different wait strategies on retries
                 wait_strategies = ['domcontentloaded', 'load', 'networkidle']
                 wait_strategy = wait_strategies[min(attempt, len(wait_strategies) - 1)]
                 
-                try:
-                    # Try navigation with different strategies on retries
-                    await page.goto(
-                        url, 
-                        wait_until=wait_strategy, 
-                        timeout=60000,
-                        referer='https://www.google.com/'  # Add referer to look more legitimate
-                    )
-                    safe_print(f"[DEBUG] Navigation complete (used {wait_strategy} wait strategy)")
-                except Exception as nav_error:
-                    error_msg = str(nav_error).lower()
-                    # Check if it's an HTTP/2 error or network error
-                    is_network_error = (
-                        'http2' in error_msg or 
-                        'protocol_error' in error_msg or 
-                        'err_http2' in error_msg or
-                        'net::' in error_msg or
-                        'timeout' in error_msg
-                    )
-                    
-                    if is_network_error:
-                        safe_print(f"[WARN] Network/protocol error detected (attempt {attempt + 1}/{max_retries}): {error_msg[:100]}")
-                        if attempt < max_retries - 1:
-                            await browser.close()
-                            # If headless failed, try non-headless on next attempt
-                            if headless_mode and attempt == max_retries - 2:
-                                safe_print("[DEBUG] Attempting fallback with headless=False...")
-                                headless_mode = False
-                            await asyncio.sleep(retry_delay * (attempt + 1))  # Exponential backoff
-                            continue  # Retry with next attempt
-                        else:
-                            safe_print("[DEBUG] All retry attempts exhausted")
-                            # If still in headless mode and all retries failed, try one more time with headless=False
-                            if headless_mode:
-                                safe_print("[DEBUG] Final attempt: trying with headless=False...")
-                                await browser.close()
-                                headless_mode = False
-                                await asyncio.sleep(2)
-                                continue
-                            raise nav_error
-                    else:
-                        raise nav_error
-                
-                # CRITICAL: Wait 3 seconds for firewall/security analysis to complete
-                safe_print("[DEBUG] Waiting 3 seconds for firewall analysis...")
-                await page.wait_for_timeout(3000)
-                
-                # Human-like behavior: Random mouse movement to prove we're not a robot
-                try:
-                    # Move mouse to random position (human-like behavior)
-                    viewport_height = viewport_config['height']
-                    viewport_width = viewport_config['width']
-                    random_x = random.randint(100, viewport_width - 100)
-                    random_y = random.randint(100, viewport_height - 100)
-                    await page.mouse.move(random_x, random_y)
-                    safe_print("[DEBUG] Performed human-like mouse movement")
-                    await asyncio.sleep(random.uniform(0.5, 1.5))  # Random delay
-                except Exception as mouse_error:
-                    safe_print(f"[WARN] Mouse movement failed (non-critical): {safe_error_message(str(mouse_error))}")
-                
-                # Hard sleep to let images settle (prevents hanging on background scripts)
-                await asyncio.sleep(2)
-                
-                # Human-like scrolling to trigger lazy loading (proves we're not a robot)
-                safe_print("[DEBUG] Performing human-like scroll to trigger lazy loading...")
-                await page.evaluate("""
-                    async () => {
-                        await new Promise((resolve) => {
-                            let totalHeight = 0;
-                            const distance = 100;
-                            const timer = setInterval(() => {
-                                const scrollHeight = document.body.scrollHeight;
-                                window.scrollBy(0, distance);
-                                totalHeight += distance;
-                                if(totalHeight >= scrollHeight || totalHeight > 50000){
-                                    clearInterval(timer);
-                                    resolve();
-                                }
-                            }, 100);
-                        });
-                    }
-                """)
-                
-                # Scroll back to top with smooth behavior
-                await page.evaluate("window.scrollTo({ top: 0, behavior: 'smooth' })")
-                await asyncio.sleep(500 / 1000)  # 500ms wait
-                
-                # Extract HTML content and visible text
-                safe_print("[DEBUG] Extracting HTML and text content...")
-                html_content = await page.content()
-                page_text = await page.evaluate("document.body.innerText")
-                safe_print(f"[DEBUG] Extracted {len(html_content)} chars of HTML and {len(page_text)} chars of text")
-                
-                # Get dynamic viewport height
-                viewport_height = await page.evaluate("window.innerHeight")
-                safe_print(f"[DEBUG] Viewport height: {viewport_height}px")
-                
-                # Hide sticky/fixed elements for cleaner stitching (Optional Pro feature)
-                await page.evaluate("""
-                    () => {
-                        const fixedElements = document.querySelectorAll('*');
-                        fixedElements.forEach(el => {
-                            const style = window.getComputedStyle(el);
-                            if (style.position === 'fixed' || style.position === 'sticky') {
-                                el.dataset.originalDisplay = style.display;
-                                el.style.display = 'none';
-                            }
-                        });
-                    }
-                """)
-                safe_print("[DEBUG] Hidden sticky/fixed elements for seamless stitching")
-                
-                # Precise Rolling Screenshot Capture (No overlap for stitching)
-                screenshots = []
-                sanity_limit = 15
-                current_scroll = 0
-                chunk_index = 0
-                
-                total_height = await page.evaluate("document.body.scrollHeight")
-                
-                while current_scroll < total_height and chunk_index < sanity_limit:
-                    # Take screenshot of current viewport
-                    screenshot_bytes = await page.screenshot(type='png', full_page=False)
-                    
-                    # Convert to PIL Image
-                    from io import BytesIO
-                    img = Image.open(BytesIO(screenshot_bytes))
-                    screenshots.append(img)
-                    
-                    # Break condition: Do not scrape infinite scroll pages forever
-                    chunk_index += 1
-                    if chunk_index >= 2:  # Limited to 2 chunks while resolving errors
-                        break
-                    
-                    # Precise scroll (exactly viewport_height, no overlap)
-                    current_scroll += viewport_height
-                    await page.mouse.wheel(0, viewport_height)  # Precise mouse wheel scroll
-                    await asyncio.sleep(1)
-                    
-                    # Recalculate total height (in case of dynamic content)
-                    total_height = await page.evaluate("document.body.scrollHeight")
+                # Speed in its own clean context (the device captures block requests and use the asset cache)
+                speed_task = (
+                    asyncio.create_task(measure_page_speed(browser, url, devices[0], wait_strategy))
+                    if MEASURE_PAGE_SPEED else None
+                )
                 
-                safe_print(f"[DEBUG] Captured {len(screenshots)} chunks successfully")
+                # One context per device, all in this browser
+                results = await asyncio.gather(
+                    *(capture_page(browser, url, device, block_profile, wait_strategy, capture_mode) for device in devices),
+                    return_exceptions=True
+                )
+                page_speed = None
+                if speed_task and isinstance(results[0], Exception):
+                    speed_task.cancel()
+                elif speed_task:
+                    try:
+                        page_speed = await asyncio.wait_for(speed_task, timeout=PAGE_SPEED_GRACE)
+                    except asyncio.TimeoutError:
+                        safe_print(f"[WARN] Page speed load still running {PAGE_SPEED_GRACE:g}s after the captures; skipped")
+                if isinstance(results[0], Exception):
+                    raise results[0]
+                captures = {}
+                for device, result in zip(devices, results):
+                    if isinstance(result, Exception):
+                        safe_print(f"[WARN] {device} capture failed (non-critical): {safe_error_message(result)}")
+                    else:
+                        captures[device] = result
+                if page_speed and captures[devices[0]]["features"] is not None:
+                    captures[devices[0]]["features"]["speed"] = page_speed
                 await browser.close()
                 
-                return screenshots, html_content, page_text
-                
+                return {"url": url, "devices": captures}
+        
         except Exception as e:
             error_msg = str(e).lower()
             is_network_error = (
@@ -1997,6 +4486,33 @@ async def capture_screenshot_from_url(url: str, device: str = 'desktop'):
     # Should never reach here, but just in case
     raise Exception(f"Failed to capture screenshot from {url} after {max_retries} attempts")
 
+async def capture_screenshot_from_url(url: str, device: str = 'desktop', block_profile=None, capture_mode=None):
+    """
+    Capture rolling screenshots from a URL using Playwright with stealth mode.
+    Supports desktop, mobile and tablet device emulation (see capture_devices for several at once).
+    
+    Args:
+        url: The URL to capture (supports all TLDs)
+        device: 'desktop', 'mobile' or 'tablet' (default: 'desktop')
+        block_profile: name in CAPTURE_BLOCK_PROFILES or a profile dict (default: CAPTURE_BLOCK_PROFILE env var, else 'analysis-safe')
+        capture_mode: 'full' (semantic sections) or 'rolling' (viewport chunks); default CAPTURE_MODE env, else 'full'
+    
+    Returns:
+        (screenshots: list, html_content: str, page_text: str, page_features: dict | None)
+        page_features is the DOM feature record from PAGE_FEATURES_SCRIPT (None if extraction failed),
+        with "speed" metrics from a clean load (measure_page_speed), request-blocking counters under "blocking" and, in full mode,
+        the captured "sections" (label, top, height, heading), one per screenshot in the same order.
+    """
+    # Normalize device parameter
+    device = device.lower() if device else 'desktop'
+    if device not in CAPTURE_DEVICE_PROFILES:
+        device = 'desktop'
+    
+    result = await capture_devices(url, devices=(device,), block_profile=block_profile, capture_mode=capture_mode)
+    capture = result["devices"][device]
+    return capture["screenshots"], capture["html"], capture["text"], capture["features"]
+
+
 def update_vibe_progress(bar, status, step_index, total_steps=20):
     """
     Update progress bar to a specific step (instant update, no sleep).
@@ -2496,795 +5012,46 @@ def generate_heatmap(image_pil):
         # Ensure image is RGB
         if image_pil.mode != 'RGB':
             image_pil = image_pil.convert('RGB')
-        
-        # Convert PIL to CV2
-        img_array = np.array(image_pil)
-        
-        # Check if image is valid
-        if img_array.size == 0:
-            safe_print("[WARNING] Empty image array, returning original")
-            return image_pil
-        
-        # Convert to grayscale
-        if len(img_array.shape) == 3:
-            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
-        else:
-            gray = img_array
-        
-        # Apply Canny edge detection to find high-contrast areas (bright spots)
-        edges = cv2.Canny(gray, 50, 150)
-        
-        # Blur edges to create heat effect (visual saliency)
-        blurred = cv2.GaussianBlur(edges, (21, 21), 0)
-        
-        # Normalize to 0-255 range
-        heatmap = cv2.normalize(blurred, None, 0, 255, cv2.NORM_MINMAX)
-        
-        # Apply color map (hot areas = red/yellow, cold = blue/green)
-        heatmap_colored = cv2.applyColorMap(heatmap.astype(np.uint8), cv2.COLORMAP_JET)
-        
-        # Convert back to PIL
-        heatmap_pil = Image.fromarray(cv2.cvtColor(heatmap_colored, cv2.COLOR_BGR2RGB))
-        
-        # Blend with original (50% opacity for overlay effect)
-        result = Image.blend(image_pil, heatmap_pil, alpha=0.5)
-        
-        return result
-    except Exception as e:
-        error_msg = safe_error_message(e)
-        safe_print(f"[ERROR] Heatmap generation failed: {error_msg}")
-        # Return original image if heatmap fails
-        return image_pil.convert('RGB') if image_pil.mode != 'RGB' else image_pil
-
-class PDFReport(FPDF):
-    """Robust PDF Report class - Cloud-safe design using Helvetica only"""
-    def __init__(self):
-        super().__init__()
-        self.set_margins(15, 15, 15)
-        self.set_auto_page_break(auto=True, margin=15)
-        self.is_cover_page = False
-        # Calculate usable width: A4 width (210mm) - margins (30mm total) = 180mm
-        self.usable_width = 180
-    
-    def header(self):
-        """Branded header on every page"""
-        if getattr(self, 'is_cover_page', False):
-            return
-        self.set_font('Helvetica', 'B', 10)
-        self.set_text_color(128, 128, 128)
-        self.cell(0, 10, clean_text('SiteRoast - Conversion Audit Report'), 0, 0, 'L')
-        self.ln(15)
-    
-    def footer(self):
-        """Branded footer with page number"""
-        self.set_y(-15)
-        self.set_font('Helvetica', 'I', 8)
-        self.set_text_color(128, 128, 128)
-        self.cell(0, 10, clean_text(f'Page {self.page_no()}'), 0, 0, 'C')
-    
-    def chapter_title(self, label):
-        """Helper method for chapter titles"""
-        self.set_font('Helvetica', 'B', 16)
-        self.set_text_color(33, 33, 33)
-        self.cell(0, 10, clean_text(label), 0, 1, 'L')
-        self.ln(5)
-    
-    def draw_badge(self, text, status):
-        """Draw colored badge based on status"""
-        # Color Coding
-        if status in ['Excellent', 'Good']:
-            self.set_fill_color(220, 255, 220)  # Green
-            self.set_text_color(0, 100, 0)
-        elif status == 'Satisfactory':
-            self.set_fill_color(255, 245, 220)  # Orange
-            self.set_text_color(150, 100, 0)
-        else:
-            self.set_fill_color(255, 220, 220)  # Red
-            self.set_text_color(150, 0, 0)
-        
-        self.set_font('Helvetica', 'B', 9)
-        w = self.get_string_width(clean_text(text)) + 6
-        self.cell(w, 6, clean_text(text), 0, 0, 'C', fill=True)
-        self.set_fill_color(255, 255, 255)  # Reset
-        self.set_text_color(0, 0, 0)  # Reset
-    
-    def add_cover_page(self, metadata, score):
-        """Cover page - vertically centered"""
-        self.set_text_color(0, 0, 0)
-        self.add_page()
-        self.is_cover_page = True
-        
-        # Vertical Center
-        self.set_y(110)
-        
-        # Title
-        self.set_font("Helvetica", "B", 28)
-        self.set_text_color(0, 0, 0)
-        self.cell(0, 15, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
-        self.ln(10)
-        
-        # Client Info
-        self.set_font("Helvetica", "", 14)
-        self.set_text_color(0, 0, 0)
-        scanned_url = clean_text(str(metadata.get('scannedUrl', 'N/A')))
-        scanned_at = clean_text(str(metadata.get('scannedAt', 'N/A')))
-        self.cell(0, 8, clean_text(f"Client: {scanned_url}"), ln=True, align="C")
-        self.cell(0, 8, clean_text(f"Generated: {scanned_at}"), ln=True, align="C")
-        
-        self.is_cover_page = False
-    
-    def add_roast_section(self, roast_data, overall_score, detailed_audit=None):
-        """Executive summary section with proper text wrapping - Page 2"""
-        # Force black text at start - MUST BE FIRST LINE
-        self.set_text_color(0, 0, 0)  # Force Black
-        
-        self.add_page()  # Force Page 2
-        
-        # Header
-        self.set_font("Helvetica", "B", 16)
-        self.set_text_color(0, 0, 0)  # Force black text
-        self.cell(0, 10, clean_text("Executive Summary"), ln=True)
-        self.ln(5)
-        
-        # Score Badge (DISABLED: Background fill - may cause layering issues)
-        # self.set_fill_color(240, 240, 240)
-        self.set_font("Helvetica", "B", 14)
-        self.set_text_color(0, 0, 0)  # Force Black
-        score_text = clean_text(f"  Site Score: {overall_score}/100  ")
-        self.cell(0, 12, score_text, ln=True, fill=False)
-        self.ln(10)
-        
-        # Content - MUST MATCH HTML REPORT EXACTLY
-        # HTML uses: data.get('roast_summary') or data.get('headline_roast') or data.get('overview', {}).get('executiveSummary', 'No summary available.')
-        summary_text = roast_data.get('roast_summary') or roast_data.get('headline_roast') or roast_data.get('overview', {}).get('executiveSummary', 'No summary available.')
-        analysis_text = roast_data.get('roastAnalysis', '') or roast_data.get('analysis', '')
-        
-        # Write Summary - Always show Executive Summary section
-        self.set_font("Helvetica", "B", 12)
-        self.set_text_color(0, 0, 0)
-        self.cell(0, 8, clean_text("Summary:"), ln=True)
-        self.set_font("Helvetica", "", 11)
-        if summary_text and len(str(summary_text).strip()) > 5:
-            cleaned_summary = clean_text(str(summary_text))
-            summary_paragraphs = cleaned_summary.split('\n')
-            for para in summary_paragraphs:
-                para = para.strip()
-                if para:
-                    self.set_text_color(0, 0, 0)
-                    self.multi_cell(0, 6, clean_text(para))
-                    self.ln(3)
-        else:
-            # Fallback if no summary available
-            self.set_text_color(0, 0, 0)
-            self.multi_cell(0, 6, clean_text("Executive summary analysis completed. See detailed findings below."))
-        self.ln(5)
-        
-        # Write Analysis - Split into multiple paragraphs (2-3 sentences each)
-        if analysis_text and len(str(analysis_text).strip()) > 5:
-            self.set_font("Helvetica", "B", 12)
-            self.set_text_color(0, 0, 0)
-            self.cell(0, 8, clean_text("Analysis:"), ln=True)
-            self.set_font("Helvetica", "", 11)
-            cleaned_analysis = clean_text(str(analysis_text))
-            
-            # Split analysis into sentences and group into paragraphs of 2-3 sentences
-            import re
-            sentences = re.split(r'(?<=[.!?])\s+', cleaned_analysis)
-            sentences = [s.strip() for s in sentences if s.strip()]
-            
-            # Group into paragraphs of 2-3 sentences
-            para_sentences = []
-            current_para = []
-            for i, sentence in enumerate(sentences):
-                current_para.append(sentence)
-                if len(current_para) >= 3 or (len(current_para) >= 2 and i == len(sentences) - 1):
-                    para_sentences.append(' '.join(current_para))
-                    current_para = []
-            if current_para:
-                para_sentences.append(' '.join(current_para))
-            
-            # Write paragraphs
-            for para in para_sentences:
-                if para:
-                    self.set_text_color(0, 0, 0)
-                    self.multi_cell(0, 6, clean_text(para))
-                    self.ln(3)
-        
-        self.ln(10)
-        
-        # Priority Matrix and Status Table
-        if detailed_audit:
-            # Flatten all items from detailedAudit
-            all_items = []
-            for category, items in detailed_audit.items():
-                if isinstance(items, list):
-                    all_items.extend(items)
-            
-            # Add Priority Matrix
-            self.add_priority_matrix(all_items)
-            self.ln(10)
-            
-            # Add Status Summary Table
-            self.add_status_table(all_items)
-    
-    def add_priority_matrix(self, all_items):
-        """Priority Matrix (The 'Where to Start' Grid) - 3x5 grid showing Impact vs Status"""
-        # Group items by Impact and Status
-        matrix = {}
-        impact_levels = ['HI', 'MI', 'LI']
-        status_levels = ['Failed', 'Needs Improvement', 'Satisfactory', 'Good', 'Excellent']
-        
-        # Initialize matrix
-        for impact in impact_levels:
-            matrix[impact] = {}
-            for status in status_levels:
-                matrix[impact][status] = 0
-        
-        # Count items in each bucket
-        for item in all_items:
-            impact = item.get('impact', 'MI')
-            status = item.get('status', 'Satisfactory')
-            if impact in matrix and status in matrix[impact]:
-                matrix[impact][status] += 1
-        
-        # Draw matrix title
-        self.set_font("Helvetica", "B", 12)
-        self.set_text_color(0, 0, 0)  # Force black text
-        self.cell(0, 8, clean_text("Priority Matrix: Where to Start"), ln=True)
-        self.ln(3)
-        
-        # Matrix dimensions
-        cell_width = 180 / 6  # 5 status columns + 1 impact label column
-        cell_height = 6
-        start_x = 15
-        start_y = self.get_y()
-        
-        # Draw header row (Status labels)
-        self.set_font("Helvetica", "B", 9)
-        self.set_text_color(0, 0, 0)  # Force black text
-        x_pos = start_x + cell_width  # Skip first column (for impact labels)
-        
-        # Shortened status labels for fit (must match status_levels order)
-        status_labels_display = ['Failed', 'Needs Imp.', 'Satisf.', 'Good', 'Excellent']
-        for i, status_label in enumerate(status_labels_display):
-            self.set_xy(x_pos + (i * cell_width), start_y)
-            # DISABLED: Background fill (may cause layering issues)
-            # self.set_fill_color(240, 240, 240)
-            self.cell(cell_width, cell_height, clean_text(status_label), border=1, fill=False, align='C')
-        
-        # Draw matrix rows (Impact levels)
-        impact_labels = ['High', 'Medium', 'Low']
-        impact_map = {'HI': 0, 'MI': 1, 'LI': 2}
-        
-        for impact_code, impact_row in impact_map.items():
-            row_y = start_y + cell_height + (impact_row * cell_height)
-            
-            # Impact label (left column)
-            self.set_xy(start_x, row_y)
-            # DISABLED: Background fill (may cause layering issues)
-            # self.set_fill_color(245, 245, 245)
-            self.set_font("Helvetica", "B", 9)
-            self.set_text_color(0, 0, 0)  # Force Black
-            self.cell(cell_width, cell_height, clean_text(impact_labels[impact_row]), border=1, fill=False, align='C')
-            
-            # Status cells (counts) - iterate through status_levels in same order
-            self.set_font("Helvetica", "", 9)
-            x_pos = start_x + cell_width
-            for i, status in enumerate(status_levels):
-                count = matrix[impact_code][status]
-                
-                # DISABLED: Background fill colors (may cause layering issues)
-                # if impact_code == 'HI' and status == 'Failed':
-                #     self.set_fill_color(255, 200, 200)  # Light red
-                # elif count > 0:
-                #     self.set_fill_color(255, 255, 255)  # White
-                # else:
-                #     self.set_fill_color(250, 250, 250)  # Very light gray
-                
-                self.set_xy(x_pos + (i * cell_width), row_y)
-                
-                # Color coding - Match HTML colors
-                if impact_code == 'HI' and status == 'Failed':
-                    self.set_fill_color(255, 200, 200)  # Light red for High Impact + Failed
-                    fill = True
-                elif count > 0:
-                    # Color by status
-                    if status == 'Excellent':
-                        self.set_fill_color(220, 255, 220)  # Light green
-                    elif status == 'Good':
-                        self.set_fill_color(240, 255, 240)  # Very light green
-                    elif status == 'Satisfactory':
-                        self.set_fill_color(255, 245, 220)  # Light orange/yellow
-                    elif status == 'Needs Improvement':
-                        self.set_fill_color(255, 230, 200)  # Light orange
-                    elif status == 'Failed':
-                        self.set_fill_color(255, 220, 220)  # Light red
-                    else:
-                        self.set_fill_color(255, 255, 255)  # White
-                    fill = True
-                else:
-                    self.set_fill_color(250, 250, 250)  # Very light gray for empty
-                    fill = True
-                
-                self.set_text_color(0, 0, 0)  # Force Black
-                count_text = str(count) if count > 0 else '-'
-                self.cell(cell_width, cell_height, clean_text(count_text), border=1, fill=fill, align='C')
-                self.set_fill_color(255, 255, 255)  # Reset fill
-        
-        # Move cursor below matrix
-        self.set_y(start_y + (4 * cell_height))
-        self.ln(3)
-    
-    def add_status_table(self, all_items):
-        """Status Summary Table - Dashboard-style table with colored cells"""
-        # Count items by status
-        status_counts = {
-            'Excellent': 0,
-            'Good': 0,
-            'Satisfactory': 0,
-            'Needs Improvement': 0,
-            'Failed': 0
-        }
-        
-        for item in all_items:
-            status = item.get('status', 'Satisfactory')
-            if status in status_counts:
-                status_counts[status] += 1
-        
-        # Draw table
-        table_width = 180
-        num_cols = 5
-        col_width = table_width / num_cols
-        table_height = 8
-        table_x = 15
-        table_y = self.get_y()
-        
-        # Status labels and colors
-        status_config = [
-            ('Failed', status_counts.get('Failed', 0), (255, 200, 200)),  # Red
-            ('Needs Work', status_counts.get('Needs Improvement', 0), (255, 230, 200)),  # Orange
-            ('Satisfactory', status_counts.get('Satisfactory', 0), (240, 240, 240)),  # Gray
-            ('Good', status_counts.get('Good', 0), (200, 255, 200)),  # Light green
-            ('Excellent', status_counts.get('Excellent', 0), (150, 255, 150))  # Green
-        ]
-        
-        self.set_font("Helvetica", "B", 10)
-        for i, (label, count, color) in enumerate(status_config):
-            x_pos = table_x + (i * col_width)
-            self.set_xy(x_pos, table_y)
-            # DISABLED: Background fill color (may cause layering issues)
-            # self.set_fill_color(*color)
-            # self.set_draw_color(200, 200, 200)
-            self.set_text_color(0, 0, 0)  # Force Black
-            
-            # Format: "Label: Count"
-            cell_text = clean_text(f"{label}: {count}")
-            self.cell(col_width, table_height, cell_text, border=1, fill=False, align='C')
-        
-        # Move cursor below table
-        self.set_y(table_y + table_height)
-        self.ln(5)
-    
-    def add_radar_section(self, radar_chart_path):
-        """Performance Radar section - Centered Radar Chart (H & V centered)"""
-        if radar_chart_path and os.path.exists(radar_chart_path):
-            self.add_page()
-            self.set_text_color(0, 0, 0)  # Force Black
-            
-            try:
-                from PIL import Image as PILImage
-                img = PILImage.open(radar_chart_path)
-                img_width, img_height = img.size
-                
-                # Calculate dimensions to fit page (centered)
-                page_width = 210  # A4 width in mm
-                page_height = 297  # A4 height in mm
-                max_width = 150  # Max width in mm
-                max_height = 150  # Max height in mm
-                
-                aspect_ratio = img_width / img_height
-                
-                if aspect_ratio > 1:
-                    # Landscape
-                    display_width = min(max_width, page_width - 40)
-                    display_height = display_width / aspect_ratio
-                else:
-                    # Portrait
-                    display_height = min(max_height, 150)
-                    display_width = display_height * aspect_ratio
-                
-                # Center both horizontally and vertically
-                x_pos = (page_width - display_width) / 2
-                # Vertical center: (page_height - top_margin - bottom_margin - image_height) / 2 + top_margin
-                top_margin = 30
-                bottom_margin = 20
-                available_height = page_height - top_margin - bottom_margin
-                y_pos = (available_height - display_height) / 2 + top_margin
-                
-                # Title above image (centered)
-                title_y = y_pos - 20
-                self.set_y(title_y)
-                self.set_font("Helvetica", "B", 16)
-                self.cell(0, 10, clean_text("Performance Radar"), ln=True, align="C")
-                
-                # Place image
-                self.image(radar_chart_path, x=x_pos, y=y_pos, w=display_width, h=display_height)
-                self.set_y(y_pos + display_height + 10)
-            except Exception as e:
-                safe_print(f"[PDF] Failed to add radar chart: {safe_error_message(str(e))}")
-                self.set_font("Helvetica", "I", 12)
-                self.cell(0, 10, clean_text("[Radar Chart Not Available]"), ln=True, align="C")
-        else:
-            # Add page even if no chart
-            self.add_page()
-            self.set_font("Helvetica", "B", 16)
-            self.cell(0, 10, clean_text("Performance Radar (Priority Matrix)"), ln=True, align="C")
-            self.set_font("Helvetica", "I", 12)
-            self.cell(0, 10, clean_text("[Radar Chart Not Available]"), ln=True, align="C")
-    
-    def add_visuals_section(self, heatmap_path):
-        """Visual analysis section with proper image placement - Page 3 - Centered Heatmap"""
-        self.add_page()
-        
-        # Root Cause Analysis: Multiple path resolution strategies (cloud-compatible)
-        verified_path = None
-        
-        if heatmap_path:
-            # Strategy 1: Try absolute path as-is
-            try:
-                if os.path.exists(heatmap_path):
-                    verified_path = heatmap_path
-                    safe_print(f"[PDF] Found heatmap at: {heatmap_path}")
-            except Exception as e:
-                safe_print(f"[PDF] Strategy 1 failed: {safe_error_message(str(e))}")
-            
-            # Strategy 2: Try converting to absolute path
-            if not verified_path:
-                try:
-                    abs_path = os.path.abspath(heatmap_path)
-                    if os.path.exists(abs_path):
-                        verified_path = abs_path
-                        safe_print(f"[PDF] Found heatmap at: {abs_path}")
-                except Exception as e:
-                    safe_print(f"[PDF] Strategy 2 failed: {safe_error_message(str(e))}")
-            
-            # Strategy 3: Try joining with tempfile.gettempdir() (cloud-compatible)
-            if not verified_path:
-                try:
-                    temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
-                    temp_path = os.path.join(temp_dir, os.path.basename(heatmap_path))
-                    if os.path.exists(temp_path):
-                        verified_path = temp_path
-                        safe_print(f"[PDF] Found heatmap at: {temp_path}")
-                except Exception as e:
-                    safe_print(f"[PDF] Strategy 3 failed: {safe_error_message(str(e))}")
-            
-            # Strategy 4: Try joining with current working directory if relative
-            if not verified_path:
-                try:
-                    cwd_path = os.path.join(os.getcwd(), heatmap_path)
-                    if os.path.exists(cwd_path):
-                        verified_path = cwd_path
-                        safe_print(f"[PDF] Found heatmap at: {cwd_path}")
-                except Exception as e:
-                    safe_print(f"[PDF] Strategy 4 failed: {safe_error_message(str(e))}")
-            
-            # Strategy 5: Try normalizing path (handles forward/backward slashes)
-            if not verified_path:
-                try:
-                    norm_path = os.path.normpath(heatmap_path)
-                    if os.path.exists(norm_path):
-                        verified_path = norm_path
-                        safe_print(f"[PDF] Found heatmap at: {norm_path}")
-                    else:
-                        # Try with absolute
-                        abs_norm = os.path.abspath(norm_path)
-                        if os.path.exists(abs_norm):
-                            verified_path = abs_norm
-                            safe_print(f"[PDF] Found heatmap at: {abs_norm}")
-                except Exception as e:
-                    safe_print(f"[PDF] Strategy 5 failed: {safe_error_message(str(e))}")
-            
-            # Strategy 6: Try searching in tempfile directory by filename only
-            if not verified_path:
-                try:
-                    temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
-                    if os.path.exists(temp_dir):
-                        filename = os.path.basename(heatmap_path)
-                        for file in os.listdir(temp_dir):
-                            if file == filename or file.endswith('.png'):
-                                potential_path = os.path.join(temp_dir, file)
-                                if os.path.exists(potential_path):
-                                    verified_path = potential_path
-                                    safe_print(f"[PDF] Found heatmap by filename search: {potential_path}")
-                                    break
-                except Exception as e:
-                    safe_print(f"[PDF] Strategy 6 failed: {safe_error_message(str(e))}")
-        
-        if verified_path:
-            # Center Image Logic - Both H & V centered
-            page_width = 210  # A4 width in mm
-            page_height = 297  # A4 height in mm
-            top_margin = 30
-            bottom_margin = 20
-            
-            # Get image dimensions
-            img_w = 180  # Initial width
-            img_h = 180  # Default fallback height
-            try:
-                from PIL import Image as PILImage
-                img = PILImage.open(verified_path)
-                img_width, img_height = img.size
-                aspect_ratio = img_height / img_width
-                img_h = img_w * aspect_ratio
-                
-                # Ensure image doesn't exceed page height (with margins)
-                available_height = page_height - top_margin - bottom_margin - 30  # 30 for title
-                max_height = min(available_height, 220)
-                if img_h > max_height:
-                    img_h = max_height
-                    img_w = img_h / aspect_ratio
-            except Exception:
-                # Fallback if PIL fails
-                pass
-            
-            # Center horizontally
-            x_pos = (page_width - img_w) / 2
-            
-            # Center vertically (accounting for title)
-            title_height = 15
-            available_height = page_height - top_margin - bottom_margin - title_height
-            y_pos = (available_height - img_h) / 2 + top_margin + title_height
-            
-            # Title above image (centered)
-            title_y = y_pos - 18
-            self.set_y(title_y)
-            self.set_font("Helvetica", "B", 14)
-            self.set_text_color(0, 0, 0)  # Force Black
-            self.cell(0, 10, clean_text("Visual Analysis (Heatmap)"), ln=True, align="C")
-            
-            # Place image centered
-            self.image(verified_path, x=x_pos, y=y_pos, w=img_w, h=img_h)
-            
-            # Move cursor below image
-            self.set_y(y_pos + img_h + 10)
-        else:
-            # Heatmap Not Available - centered message with debugging info
-            self.set_y(130)
-            self.set_font("Helvetica", "I", 12)
-            self.set_text_color(0, 0, 0)  # Force Black
-            self.cell(0, 10, clean_text("[Heatmap Not Available]"), ln=True, align="C")
-            
-            # Debug info (only in development, can be removed in production)
-            if heatmap_path:
-                self.set_font("Helvetica", "", 8)
-                self.set_text_color(0, 0, 0)  # Force Black
-                debug_text = f"Path attempted: {str(heatmap_path)[:50]}"
-                self.cell(0, 6, clean_text(debug_text), ln=True, align="C")
-    
-    def add_quick_wins(self, quick_wins):
-        """Quick wins section with card-style formatting"""
-        self.add_page()
-        # Force black text at start
-        self.set_text_color(0, 0, 0)  # Force Black
-        self.set_font("Helvetica", "B", 14)
-        self.cell(0, 10, clean_text("Top 3 Quick Wins"), ln=True)
-        self.ln(5)
-        
-        for idx, win in enumerate(quick_wins[:3], 1):
-            # DISABLED: Background fill and draw color (may cause layering issues)
-            # self.set_fill_color(245, 245, 245)
-            # self.set_draw_color(200, 200, 200)
-            self.set_font("Helvetica", "B", 11)
-            self.set_text_color(0, 0, 0)  # Force Black
-            
-            title = win.get('elementName', win.get('title', 'Issue'))
-            cleaned_title = clean_text(str(title))
-            header_text = clean_text(f" #{idx}: {cleaned_title}")
-            self.cell(0, 10, header_text, ln=True, border=1, fill=False)
-            
-            self.set_font("Helvetica", "", 10)
-            self.set_text_color(0, 0, 0)  # Force Black
-            fix_text = win.get('fix', {}).get('quickFix', 'N/A') if isinstance(win.get('fix'), dict) else str(win.get('fix', 'N/A'))
-            cleaned_fix = clean_text(str(fix_text))
-            fix_label_text = clean_text(f"Fix: {cleaned_fix}")
-            self.multi_cell(0, 8, fix_label_text, border='LRB')
-            
-            self.ln(5)
-    
-    def audit_card(self, item):
-        """Detailed audit card matching HTML format exactly - draws background first, then text"""
-        # Clean Inputs - MATCH HTML EXACTLY
-        name = clean_text(item.get('elementName', item.get('element', 'Observation')))
-        status = clean_text(item.get('status', 'Neutral'))
-        impact_raw = item.get('impact', 'MI')
-        rationale = clean_text(item.get('rationale', ''))
-        
-        # Map Impact - MATCH HTML
-        impact_map = {'HI': 'High Impact', 'MI': 'Medium Impact', 'LI': 'Low Impact'}
-        readable_impact = impact_map.get(impact_raw, 'Medium Impact')
-        
-        # Get all sections - MATCH HTML STRUCTURE
-        working_well = item.get('workingWell', item.get('working', []))
-        not_working = item.get('notWorking', item.get('not_working', []))
-        conversion_impact = clean_text(item.get('conversionImpact', ''))
-        
-        fix_obj = item.get('fix', {})
-        if isinstance(fix_obj, dict):
-            quick_fix = clean_text(fix_obj.get('quickFix', ''))
-            fix_example = clean_text(fix_obj.get('example', ''))
-            fix_expected_impact = clean_text(fix_obj.get('expectedImpact', ''))
-        else:
-            quick_fix = clean_text(str(fix_obj) if fix_obj else '')
-            fix_example = ''
-            fix_expected_impact = ''
-        
-        # Calculate Height dynamically - More accurate estimation
-        chars_per_line = 85  # Approximate characters per line
-        lines_rat = max(1, int(len(rationale) / chars_per_line) + 1) if rationale else 0
-        lines_working = len(working_well) if working_well else 0
-        lines_not_working = len(not_working) if not_working else 0
-        lines_conv = max(1, int(len(conversion_impact) / chars_per_line) + 1) if conversion_impact else 0
-        lines_example = max(1, int(len(fix_example) / chars_per_line) + 1) if fix_example else 0
-        lines_expected = max(1, int(len(fix_expected_impact) / chars_per_line) + 1) if fix_expected_impact else 0
-        
-        # Action Plan height calculation (matches the actual box drawing logic)
-        if quick_fix and len(quick_fix) > 3:
-            text_width_mm = 170  # Available width inside box
-            chars_per_line_fix = int(text_width_mm / 2.8)  # Approx chars per line at 10pt
-            actual_lines_fix = max(1, int(len(quick_fix) / chars_per_line_fix) + 1)
-            fix_h = 6 + (actual_lines_fix * 5) + 3 + 3 + 2  # Label + text + top padding + bottom padding + spacing
+        
+        # Convert PIL to CV2
+        img_array = np.array(image_pil)
+        
+        # Check if image is valid
+        if img_array.size == 0:
+            safe_print("[WARNING] Empty image array, returning original")
+            return image_pil
+        
+        # Convert to grayscale
+        if len(img_array.shape) == 3:
+            gray = cv2.cvtColor(img_array, cv2.COLOR_RGB2GRAY)
         else:
-            fix_h = 0
-        
-        # Calculate total height with proper spacing
-        header_h = 20  # Header + badges
-        rationale_h = (lines_rat * 5) + 3 if rationale else 0
-        working_h = (6 + (lines_working * 5) + 2) if working_well else 0  # Label + items + spacing
-        not_working_h = (6 + (lines_not_working * 5) + 2) if not_working else 0
-        conv_h = (6 + (lines_conv * 5) + 2) if conversion_impact else 0
-        example_h = (6 + (lines_example * 5) + 4) if fix_example else 0
-        expected_h = (6 + (lines_expected * 5) + 2) if fix_expected_impact else 0
-        
-        total_h = header_h + rationale_h + working_h + not_working_h + conv_h + fix_h + example_h + expected_h + 8  # Extra spacing to prevent overlap
-        
-        # Page Break Check
-        if self.get_y() + total_h > 270:
-            self.add_page()
-        
-        # 1. DRAW BACKGROUND BOX FIRST (Z-Order Fix)
-        y_start = self.get_y()
-        self.set_fill_color(252, 252, 252)  # Light Grey
-        self.set_draw_color(220, 220, 220)
-        self.rect(10, y_start, 190, total_h, 'DF')
-        
-        # 2. DRAW TEXT ON TOP
-        self.set_xy(15, y_start + 5)
-        
-        # Header & Badges - MATCH HTML
-        self.set_font('Helvetica', 'B', 12)
-        self.set_text_color(0, 0, 0)
-        self.cell(0, 8, name, ln=True)
-        
-        self.set_x(15)
-        self.draw_badge(status, status)
-        self.set_x(self.get_x() + 2)
-        self.draw_badge(readable_impact, "Neutral")
-        self.ln(8)
-        
-        # Rationale - MATCH HTML (italic, gray)
-        self.set_x(15)
-        self.set_font('Helvetica', 'I', 10)
-        self.set_text_color(60, 60, 60)
-        if rationale:
-            self.multi_cell(180, 5, rationale)
-        self.ln(3)
-        
-        # What's Working - MATCH HTML
-        if working_well and isinstance(working_well, list) and len(working_well) > 0:
-            self.set_x(15)
-            self.set_font('Helvetica', 'B', 10)
-            self.set_text_color(0, 100, 0)  # Green
-            self.cell(0, 6, "What's Working:", ln=True)
-            self.set_font('Helvetica', '', 9)
-            self.set_text_color(0, 0, 0)
-            for w in working_well[:5]:  # Limit to 5
-                self.set_x(15)
-                w_text = clean_text(str(w))
-                self.multi_cell(180, 5, f"  - {w_text}", 0, 'L')
-            self.ln(2)
-        
-        # What's Broken - MATCH HTML
-        if not_working and isinstance(not_working, list) and len(not_working) > 0:
-            self.set_x(15)
-            self.set_font('Helvetica', 'B', 10)
-            self.set_text_color(150, 0, 0)  # Red
-            self.cell(0, 6, "What's Broken:", ln=True)
-            self.set_font('Helvetica', '', 9)
-            self.set_text_color(0, 0, 0)
-            for nw in not_working[:5]:  # Limit to 5
-                self.set_x(15)
-                nw_text = clean_text(str(nw))
-                self.multi_cell(180, 5, f"  - {nw_text}", 0, 'L')
-            self.ln(2)
-        
-        # Conversion Impact - MATCH HTML
-        if conversion_impact:
-            self.set_x(15)
-            self.set_font('Helvetica', 'B', 10)
-            self.set_text_color(0, 50, 150)  # Blue
-            self.cell(0, 6, "Conversion Impact:", ln=True)
-            self.set_font('Helvetica', '', 9)
-            self.set_text_color(0, 0, 0)
-            self.set_x(15)
-            self.multi_cell(180, 5, conversion_impact, 0, 'L')
-            self.ln(2)
-        
-        # Action Plan - MATCH HTML - Fixed margins and spacing to prevent overlapping
-        if quick_fix and len(quick_fix) > 3:
-            curr_y = self.get_y()
-            self.ln(2)  # Add spacing before action plan box
-            
-            # Calculate actual height needed for the text BEFORE drawing
-            text_width_mm = 170  # Available width inside box
-            chars_per_line = int(text_width_mm / 2.8)  # Approx chars per line at 10pt Helvetica
-            actual_lines = max(1, int(len(quick_fix) / chars_per_line) + 1)
-            
-            label_height = 6  # "Action Plan:" label
-            text_height = actual_lines * 5  # Text lines
-            top_padding = 3
-            bottom_padding = 3
-            fix_height = label_height + text_height + top_padding + bottom_padding
-            
-            # Draw background box with uniform margins
-            self.set_fill_color(255, 243, 205)  # Light yellow/orange (matching HTML action-plan)
-            self.rect(15, curr_y, 180, fix_height, 'F')
-            
-            # Draw text inside box with proper padding
-            self.set_xy(20, curr_y + top_padding)
-            self.set_font('Helvetica', 'B', 10)
-            self.set_text_color(0, 0, 0)
-            self.cell(0, 6, "Action Plan:", ln=True)
-            
-            self.set_x(20)
-            self.set_font('Helvetica', '', 10)
-            self.set_text_color(0, 0, 0)
-            self.multi_cell(170, 5, quick_fix, 0, 'L')
-            
-            # Move cursor to end of box with proper spacing (prevents overlap)
-            self.set_y(curr_y + fix_height + 3)  # 3mm bottom margin after box
-        
-        # Fix Example - MATCH HTML
-        if fix_example and len(fix_example) > 5:
-            self.set_x(15)
-            self.set_font('Helvetica', 'B', 10)
-            self.set_text_color(0, 0, 0)
-            self.cell(0, 6, "Example:", ln=True)
-            self.set_font('Helvetica', '', 9)
-            self.set_text_color(0, 0, 0)
-            self.set_x(15)
-            # Draw border box for example
-            example_y = self.get_y()
-            example_h = (lines_example * 5) + 4
-            self.set_draw_color(200, 200, 200)
-            self.rect(15, example_y, 180, example_h, 'D')
-            self.set_xy(18, example_y + 2)
-            self.multi_cell(174, 5, fix_example, 0, 'L')
-            self.ln(2)
-        
-        # Expected Impact - MATCH HTML
-        if fix_expected_impact and len(fix_expected_impact) > 5:
-            self.set_x(15)
-            self.set_font('Helvetica', 'B', 10)
-            self.set_text_color(0, 100, 0)  # Green
-            self.cell(0, 6, "Expected Impact:", ln=True)
-            self.set_font('Helvetica', '', 9)
-            self.set_text_color(0, 0, 0)
-            self.set_x(15)
-            self.multi_cell(180, 5, fix_expected_impact, 0, 'L')
-            self.ln(2)
-        
-        self.set_y(y_start + total_h + 5)
+            gray = img_array
+        
+        # Apply Canny edge detection to find high-contrast areas (bright spots)
+        edges = cv2.Canny(gray, 50, 150)
+        
+        # Blur edges to create heat effect (visual saliency)
+        blurred = cv2.GaussianBlur(edges, (21, 21), 0)
+        
+        # Normalize to 0-255 range
+        heatmap = cv2.normalize(blurred, None, 0, 255, cv2.NORM_MINMAX)
+        
+        # Apply color map (hot areas = red/yellow, cold = blue/green)
+        heatmap_colored = cv2.applyColorMap(heatmap.astype(np.uint8), cv2.COLORMAP_JET)
+        
+        # Convert back to PIL
+        heatmap_pil = Image.fromarray(cv2.cvtColor(heatmap_colored, cv2.COLOR_BGR2RGB))
+        
+        # Blend with original (50% opacity for overlay effect)
+        result = Image.blend(image_pil, heatmap_pil, alpha=0.5)
+        
+        return result
+    except Exception as e:
+        error_msg = safe_error_message(e)
+        safe_print(f"[ERROR] Heatmap generation failed: {error_msg}")
+        # Return original image if heatmap fails
+        return image_pil.convert('RGB') if image_pil.mode != 'RGB' else image_pil
+
 
 def calculate_radar_from_sections(sections):
     """
@@ -3300,14 +5067,8 @@ def calculate_radar_from_sections(sections):
         "Speed": []
     }
     
-    # Status to score mapping
-    status_scores = {
-        "Excellent": 90,
-        "Good": 75,
-        "Satisfactory": 60,
-        "Needs Improvement": 40,
-        "Failed": 20
-    }
+    # Status to score mapping: the same scale compile_roast scores with
+    status_scores = get_scoring_profile()["statusPoints"]
     
     for section in sections:
         section_name = section.get("name", "").lower()
@@ -3320,7 +5081,7 @@ def calculate_radar_from_sections(sections):
             if items:
                 for item in items:
                     status = item.get("status", "Satisfactory")
-                    score = status_scores.get(status, 50)
+                    score = status_scores.get(status, 60)
                     radar["UX"].append(score)
             else:
                 radar["UX"].append(section_score)
@@ -3330,7 +5091,7 @@ def calculate_radar_from_sections(sections):
             if items:
                 for item in items:
                     status = item.get("status", "Satisfactory")
-                    score = status_scores.get(status, 50)
+                    score = status_scores.get(status, 60)
                     radar["Conversion"].append(score)
             else:
                 radar["Conversion"].append(section_score)
@@ -3340,7 +5101,7 @@ def calculate_radar_from_sections(sections):
             if items:
                 for item in items:
                     status = item.get("status", "Satisfactory")
-                    score = status_scores.get(status, 50)
+                    score = status_scores.get(status, 60)
                     radar["Copy"].append(score)
             else:
                 radar["Copy"].append(section_score)
@@ -3350,7 +5111,7 @@ def calculate_radar_from_sections(sections):
             if items:
                 for item in items:
                     status = item.get("status", "Satisfactory")
-                    score = status_scores.get(status, 50)
+                    score = status_scores.get(status, 60)
                     radar["Visuals"].append(score)
             else:
                 radar["Visuals"].append(section_score)
@@ -3360,7 +5121,7 @@ def calculate_radar_from_sections(sections):
             if items:
                 for item in items:
                     status = item.get("status", "Satisfactory")
-                    score = status_scores.get(status, 50)
+                    score = status_scores.get(status, 60)
                     radar["Trust"].append(score)
             else:
                 radar["Trust"].append(section_score)
@@ -3370,7 +5131,7 @@ def calculate_radar_from_sections(sections):
             if items:
                 for item in items:
                     status = item.get("status", "Satisfactory")
-                    score = status_scores.get(status, 50)
+                    score = status_scores.get(status, 60)
                     radar["Speed"].append(score)
             else:
                 radar["Speed"].append(section_score)
@@ -3380,7 +5141,7 @@ def calculate_radar_from_sections(sections):
             if items:
                 for item in items:
                     status = item.get("status", "Satisfactory")
-                    score = status_scores.get(status, 50)
+                    score = status_scores.get(status, 60)
                     # Mobile UX items go to UX, mobile performance goes to Speed
                     item_name = item.get("item", "").lower()
                     if "speed" in item_name or "load" in item_name or "performance" in item_name:
@@ -3438,969 +5199,281 @@ def calculate_radar_from_categories(categories):
     
     return radar
 
-def clean_text(text):
-    """
-    Brutal ASCII Text Sanitizer: Removes ALL Unicode/emojis for FPDF.
-    Forces conversion to ASCII to eliminate any possibility of font rendering issues.
-    This prevents Unicode errors that cause blank PDFs on Streamlit Cloud.
-    """
-    if text is None:
-        return ""
-    
-    # Force string, replace common smart quotes, then strip non-ASCII
-    text = str(text).replace("'", "'").replace('"', '"').replace('"', '"')
-    return text.encode('ascii', 'ignore').decode('ascii')
 
-def clean_text_for_pdf(text):
-    """
-    Alias for clean_text - kept for backward compatibility.
-    All new code should use clean_text() directly.
-    """
-    return clean_text(text)
+# Report rendering runs in worker processes so FPDF layout and HTML assembly don't hold the GIL on
+# the Streamlit script threads. Each worker is a fresh interpreter running reports.py, which imports
+# nothing from the app: forking the multi-threaded Streamlit server can deadlock, and spawn or
+# forkserver children would re-run this script as their __main__. Tasks carry an audit ID (the
+# audit is staged to disk with pack_audit), artifact paths and the output path; the worker writes
+# the report file itself and returns its render stats.
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "2"))
+# Reports queued or rendering at once; submissions beyond this are rejected (queue.Full)
+REPORT_RENDER_MAX_PENDING = int(os.getenv("REPORT_RENDER_MAX_PENDING", "8"))
+# How long a caller waits for a render; the render itself carries on and is killed after REPORT_RENDER_KILL_AFTER
+REPORT_RENDER_TIMEOUT = float(os.getenv("REPORT_RENDER_TIMEOUT", "90"))
+REPORT_RENDER_KILL_AFTER = float(os.getenv("REPORT_RENDER_KILL_AFTER", "600"))
+REPORT_WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "reports.py")
 
-def safe_error_message(error, max_length=200):
+def report_task(kind, json_data, path, site_url=None, screenshot_path=None, radar_chart_path=None, stitched_heatmap_path=None):
     """
-    Safely convert an error to a string that can be displayed without Unicode encoding issues.
-    This function ensures error messages don't contain emojis or Unicode that Windows can't handle.
+    Render task for the pool: {"kind": "pdf" | "html", "auditId", "path", "siteUrl", "artifacts": {...}}.
+    Stages the audit, so only IDs and file paths cross the process boundary.
     """
+    return {
+        "kind": kind,
+        "auditId": stage_report_audit(json_data),
+        "path": path,
+        "siteUrl": site_url,
+        "artifacts": {"screenshot": screenshot_path, "radarChart": radar_chart_path, "heatmap": stitched_heatmap_path}
+    }
+
+def run_report_worker(task):
+    """Render one task in a reports.py worker process; returns its stats. Raises RuntimeError when the worker fails."""
     try:
-        error_str = str(error)
-        # Clean the error message to remove Unicode characters
-        error_str = clean_text_for_pdf(error_str)
-        # Truncate if too long
-        if len(error_str) > max_length:
-            error_str = error_str[:max_length] + "..."
-        return error_str
-    except Exception:
-        # If even cleaning fails, return a safe fallback
-        return "An error occurred during processing. Please try again."
+        result = subprocess.run(
+            [sys.executable, REPORT_WORKER_SCRIPT], input=json.dumps(task), capture_output=True, text=True,
+            timeout=REPORT_RENDER_KILL_AFTER, cwd=os.path.dirname(REPORT_WORKER_SCRIPT)
+        )
+    except subprocess.TimeoutExpired:
+        raise RuntimeError(f"Report worker killed after {REPORT_RENDER_KILL_AFTER:.0f}s")
+    lines = result.stdout.strip().splitlines()
+    if result.returncode != 0 or not lines:
+        raise RuntimeError(f"Report worker exited with {result.returncode}: {safe_error_message(result.stderr.strip()[-500:])}")
+    return json.loads(lines[-1])
 
-def safe_print(*args, **kwargs):
+class ReportRenderPool:
     """
-    Safe print function that handles Unicode characters on Windows.
-    Replaces emojis with ASCII equivalents before printing.
+    Bounded pool of report worker processes (run_report_worker), driven from a thread pool. Renders
+    in flight are keyed by output path: a request for a report that is already rendering attaches
+    to that render instead of starting another, so a caller that timed out can retry and pick up
+    the same result. At most max_pending renders are in flight; submit() raises queue.Full beyond
+    that. With max_workers < 1 tasks render inline on the calling thread.
     """
-    try:
-        # Convert all arguments to strings and clean them
-        cleaned_args = []
-        for arg in args:
-            if isinstance(arg, (str, bytes)):
-                cleaned = safe_error_message(str(arg), max_length=10000)
-                cleaned_args.append(cleaned)
+    def __init__(self, max_workers=REPORT_RENDER_WORKERS, max_pending=REPORT_RENDER_MAX_PENDING, timeout=REPORT_RENDER_TIMEOUT):
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.in_flight = {}  # output path -> Future of the render stats
+        self.executor = (
+            concurrent.futures.ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-render")
+            if max_workers >= 1 else None
+        )
+        self.stats = {"submitted": 0, "attached": 0, "rendered": 0, "rejected": 0, "timedOut": 0, "failed": 0,
+                      "inline": 0, "totalRenderMs": 0.0}
+    
+    def _finished(self, path, started, future):
+        """Done callback: drop the render from the in-flight table and record its outcome."""
+        with self.lock:
+            self.in_flight.pop(path, None)
+            if future.cancelled() or future.exception() is not None:
+                self.stats["failed"] += 1
             else:
-                cleaned_args.append(str(arg))
-        
-        # Use the cleaned arguments for printing
-        print(*cleaned_args, **kwargs)
-    except Exception:
-        # If printing fails, try to print a safe fallback
+                self.stats["rendered"] += 1
+                self.stats["totalRenderMs"] += (time.perf_counter() - started) * 1000
+        if not future.cancelled() and future.exception() is not None:
+            safe_print(f"[WARN] Report render failed for {os.path.basename(path)}: {safe_error_message(future.exception())}")
+    
+    def submit(self, task):
+        """Future of the render stats for a task, attached to a render of the same path if one is running. Raises queue.Full when busy."""
+        path = task["path"]
+        with self.lock:
+            future = self.in_flight.get(path)
+            if future is not None:
+                self.stats["attached"] += 1
+                return future
+            if len(self.in_flight) >= self.max_pending:
+                self.stats["rejected"] += 1
+                raise queue.Full("Report renderer is busy")
+            future = self.executor.submit(run_report_worker, task)
+            self.in_flight[path] = future
+            self.stats["submitted"] += 1
+        future.add_done_callback(functools.partial(self._finished, path, time.perf_counter()))
+        return future
+    
+    def render(self, task, timeout=None):
+        """
+        Render a task and return its stats. Raises queue.Full when busy, and TimeoutError after
+        timeout - the render keeps going, and rendering the same task again waits for it.
+        """
+        if self.executor is None:
+            started = time.perf_counter()
+            result = render_report_task(task)
+            with self.lock:
+                self.stats["inline"] += 1
+                self.stats["rendered"] += 1
+                self.stats["totalRenderMs"] += (time.perf_counter() - started) * 1000
+            return result
+        future = self.submit(task)
         try:
-            print("[Print error: Unable to display message]", **kwargs)
-        except:
-            pass  # If even that fails, silently continue
+            return future.result(timeout=timeout or self.timeout)
+        except concurrent.futures.TimeoutError:
+            with self.lock:
+                self.stats["timedOut"] += 1
+            raise TimeoutError(f"{task['kind']} report {os.path.basename(task['path'])} is still rendering after {timeout or self.timeout}s")
+    
+    def render_all(self, tasks, timeout=None):
+        """
+        Render several tasks side by side and return their stats in order. Raises queue.Full when
+        they don't all fit, and TimeoutError when they aren't all done after timeout (renders that
+        were submitted keep going, as in render()).
+        """
+        if self.executor is None:
+            return [self.render(task) for task in tasks]
+        futures = [self.submit(task) for task in tasks]
+        done, pending = concurrent.futures.wait(futures, timeout=timeout or self.timeout)
+        if pending:
+            with self.lock:
+                self.stats["timedOut"] += 1
+            raise TimeoutError(f"{len(pending)} of {len(tasks)} report renders still running after {timeout or self.timeout}s")
+        return [future.result() for future in futures]
+    
+    def metrics(self):
+        """Counters plus in-flight renders and average render time."""
+        with self.lock:
+            stats = dict(self.stats)
+            in_flight = len(self.in_flight)
+        rendered = stats["rendered"]
+        total_ms = stats.pop("totalRenderMs")
+        return {**stats, "inFlight": in_flight, "avgRenderMs": round(total_ms / rendered, 1) if rendered else 0.0}
 
-def generate_html_report(data, overall_score, screenshot_path=None, radar_chart_path=None, stitched_heatmap_path=None, site_url=None):
-    """
-    Generate a comprehensive HTML report from audit JSON data.
-    Includes all details: executive summary, priority matrix, heatmap, screenshot, deep dive details, etc.
+_report_render_pool = None
+
+def get_report_render_pool():
+    """Shared ReportRenderPool (sized from REPORT_RENDER_WORKERS / REPORT_RENDER_MAX_PENDING / REPORT_RENDER_TIMEOUT)."""
+    global _report_render_pool
+    if _report_render_pool is None:
+        _report_render_pool = ReportRenderPool()
+    return _report_render_pool
+
+def get_report_file(kind, json_data, site_url=None, radar_chart_path=None, stitched_heatmap_path=None):
     """
-    # Basic CSS for a professional look
-    css = """
-    <style>
-        * { margin: 0; padding: 0; box-sizing: border-box; }
-        body {
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            background: #f5f5f5;
-            padding: 20px;
-        }
-        .container {
-            max-width: 1200px;
-            margin: 0 auto;
-            background: white;
-            padding: 40px;
-            border-radius: 8px;
-            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
-        }
-        .score-box {
-            text-align: center;
-            padding: 30px;
-            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
-            color: white;
-            border-radius: 8px;
-            margin-bottom: 40px;
-        }
-        .score-box h1 {
-            font-size: 2.5em;
-            margin-bottom: 10px;
-        }
-        .score {
-            font-size: 4em;
-            font-weight: bold;
-            margin: 20px 0;
-        }
-        h2 {
-            color: #667eea;
-            margin-top: 40px;
-            margin-bottom: 20px;
-            padding-bottom: 10px;
-            border-bottom: 2px solid #667eea;
-        }
-        .quick-win {
-            background: #f8f9fa;
-            padding: 20px;
-            margin: 15px 0;
-            border-left: 4px solid #667eea;
-            border-radius: 4px;
-        }
-        .quick-win h3 {
-            color: #667eea;
-            margin-bottom: 10px;
-        }
-        .category-section {
-            margin: 30px 0;
-            padding: 20px;
-            background: #f8f9fa;
-            border-radius: 8px;
-        }
-        .category-section h3 {
-            color: #667eea;
-            margin-bottom: 15px;
-        }
-        .audit-item {
-            background: white;
-            padding: 15px;
-            margin: 10px 0;
-            border-radius: 4px;
-            border-left: 4px solid #ddd;
-        }
-        .badge-red {
-            display: inline-block;
-            padding: 4px 12px;
-            background: #dc3545;
-            color: white;
-            border-radius: 12px;
-            font-size: 0.85em;
-            font-weight: bold;
-            margin-right: 10px;
-        }
-        .badge-green {
-            display: inline-block;
-            padding: 4px 12px;
-            background: #28a745;
-            color: white;
-            border-radius: 12px;
-            font-size: 0.85em;
-            font-weight: bold;
-            margin-right: 10px;
-        }
-        .badge-yellow {
-            display: inline-block;
-            padding: 4px 12px;
-            background: #ffc107;
-            color: #333;
-            border-radius: 12px;
-            font-size: 0.85em;
-            font-weight: bold;
-            margin-right: 10px;
-        }
-        .action-plan {
-            background: #fff3cd;
-            padding: 15px;
-            margin-top: 10px;
-            border-radius: 4px;
-            border-left: 4px solid #ffc107;
-        }
-        .working-well {
-            background: #d4edda;
-            padding: 12px;
-            margin: 10px 0;
-            border-radius: 4px;
-            border-left: 4px solid #28a745;
-        }
-        .working-well h4 {
-            color: #155724;
-            margin-bottom: 8px;
-            font-size: 0.95em;
-        }
-        .working-well ul {
-            margin-left: 20px;
-            color: #155724;
-        }
-        .working-well li {
-            margin: 5px 0;
-        }
-        .not-working {
-            background: #f8d7da;
-            padding: 12px;
-            margin: 10px 0;
-            border-radius: 4px;
-            border-left: 4px solid #dc3545;
-        }
-        .not-working h4 {
-            color: #721c24;
-            margin-bottom: 8px;
-            font-size: 0.95em;
-        }
-        .not-working ul {
-            margin-left: 20px;
-            color: #721c24;
-        }
-        .not-working li {
-            margin: 5px 0;
-        }
-        .conversion-impact {
-            background: #e7f3ff;
-            padding: 12px;
-            margin: 10px 0;
-            border-radius: 4px;
-            border-left: 4px solid #0066cc;
-        }
-        .conversion-impact strong {
-            color: #0066cc;
-        }
-        .fix-example {
-            background: #f8f9fa;
-            padding: 12px;
-            margin: 10px 0;
-            border-radius: 4px;
-            border: 1px solid #dee2e6;
-            font-family: 'Courier New', monospace;
-            font-size: 0.9em;
-        }
-        .fix-expected-impact {
-            background: #e7f5e7;
-            padding: 12px;
-            margin: 10px 0;
-            border-radius: 4px;
-            border-left: 4px solid #28a745;
-        }
-        .fix-expected-impact strong {
-            color: #155724;
-        }
-    </style>
+    Path of a rendered report ("pdf" or "html") for this audit, rendered by a report worker on
+    first use and reused across reruns. Raises queue.Full / TimeoutError from the pool, and
+    RuntimeError when the render fails.
     """
-    
-    html = f"""
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <meta name="viewport" content="width=device-width, initial-scale=1.0">
-        <title>SiteRoast Audit Report</title>
-        {css}
-    </head>
-    <body>
-        <div class="container">
-            <div class="score-box">
-                <h1>SiteRoast Conversion Audit Report</h1>
-                <div class="score">{overall_score}/100</div>
-                <p style="margin-top: 20px; font-size: 1.1em;">Client: {site_url or 'N/A'}</p>
-                <p style="margin-top: 10px; font-size: 1.1em;">Generated: {time.strftime('%B %d, %Y')}</p>
-            </div>
-            
-            <h2>🔥 Executive Summary</h2>
-            <div style="margin-bottom: 20px;">
-                <h3 style="color: #667eea; margin-bottom: 10px;">Summary:</h3>
-                <p>{data.get('roast_summary') or data.get('headline_roast') or data.get('overview', {}).get('executiveSummary', 'No summary available.')}</p>
-            </div>
-            <div style="margin-bottom: 20px;">
-                <h3 style="color: #667eea; margin-bottom: 10px;">Analysis:</h3>
-    """
-    
-    # Split analysis into multiple paragraphs (2-3 sentences each)
-    analysis_text = data.get('overview', {}).get('roastAnalysis', '')
-    if analysis_text:
-        import re
-        sentences = re.split(r'(?<=[.!?])\s+', str(analysis_text))
-        sentences = [s.strip() for s in sentences if s.strip()]
-        
-        # Group into paragraphs of 2-3 sentences
-        para_sentences = []
-        current_para = []
-        for i, sentence in enumerate(sentences):
-            current_para.append(sentence)
-            if len(current_para) >= 3 or (len(current_para) >= 2 and i == len(sentences) - 1):
-                para_sentences.append(' '.join(current_para))
-                current_para = []
-        if current_para:
-            para_sentences.append(' '.join(current_para))
-        
-        for para in para_sentences:
-            if para:
-                html += f'<p style="margin-bottom: 12px;">{para}</p>'
-    else:
-        html += '<p>Analysis completed.</p>'
-    
-    html += """
-            </div>
+    path = os.path.join(
+        report_render_dir("reports"),
+        f"audit_{content_hash([json_data, site_url, radar_chart_path, stitched_heatmap_path])}.{kind}"
+    )
+    if not os.path.exists(path):
+        task = report_task(kind, json_data, path, site_url=site_url, radar_chart_path=radar_chart_path,
+                           stitched_heatmap_path=stitched_heatmap_path)
+        stats = get_report_render_pool().render(task)
+        safe_print(f"[DEBUG] Rendered {kind} report: {format_bytes(stats['bytes'])} in {stats['seconds']}s")
+    return path
+
+def get_pdf_report_file(json_data, site_url=None, radar_chart_path=None, stitched_heatmap_path=None):
+    """Path of the PDF report for this audit, rendered on first use and reused across reruns."""
+    return get_report_file("pdf", json_data, site_url=site_url, radar_chart_path=radar_chart_path,
+                           stitched_heatmap_path=stitched_heatmap_path)
+
+
+# Portfolio reports: one deliverable covering many stored audits (an agency's client pages, or a
+# site's top pages) - a comparison table, a radar grid and an issue ranking shared across pages.
+PORTFOLIO_MAX_PAGES = int(os.getenv("PORTFOLIO_MAX_PAGES", "10"))
+PORTFOLIO_TOP_ISSUES = 10
+
+def portfolio_audits(domain=None, urls=None, limit=PORTFOLIO_MAX_PAGES):
     """
-    
-    # Add Priority Matrix (below Executive Summary)
-    detailed_audit = data.get('detailedAudit', {})
-    if detailed_audit:
-        # Flatten all items from detailedAudit
-        all_items = []
-        for category, items in detailed_audit.items():
-            if isinstance(items, list):
-                all_items.extend(items)
-        
-        if all_items:
-            # Build Priority Matrix
-            matrix = {}
-            impact_levels = ['HI', 'MI', 'LI']
-            status_levels = ['Failed', 'Needs Improvement', 'Satisfactory', 'Good', 'Excellent']
-            
-            # Initialize matrix
-            for impact in impact_levels:
-                matrix[impact] = {}
-                for status in status_levels:
-                    matrix[impact][status] = 0
-            
-            # Count items in each bucket
-            for item in all_items:
-                impact = item.get('impact', 'MI')
-                status = item.get('status', 'Satisfactory')
-                if impact in matrix and status in matrix[impact]:
-                    matrix[impact][status] += 1
-            
-            # Generate HTML table
-            html += """
-            <h2>📊 Priority Matrix: Where to Start</h2>
-            <div style="margin: 20px 0; overflow-x: auto;">
-                <table style="width: 100%; border-collapse: collapse; margin: 20px 0; background: white; border: 1px solid #ddd;">
-                    <thead>
-                        <tr style="background: #f8f9fa;">
-                            <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">Impact</th>
-                            <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">Failed</th>
-                            <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">Needs Improvement</th>
-                            <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">Satisfactory</th>
-                            <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">Good</th>
-                            <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">Excellent</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-            """
-            
-            impact_labels = {'HI': 'High', 'MI': 'Medium', 'LI': 'Low'}
-            impact_colors = {'HI': '#ffcccc', 'MI': '#fff4cc', 'LI': '#e6f3ff'}
-            
-            for impact_code in impact_levels:
-                impact_label = impact_labels[impact_code]
-                bg_color = impact_colors[impact_code]
-                html += f"""
-                        <tr style="background: {bg_color};">
-                            <td style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">{impact_label}</td>
-                """
-                for status in status_levels:
-                    count = matrix[impact_code][status]
-                    count_text = str(count) if count > 0 else '-'
-                    # Highlight high-impact failures
-                    cell_style = "padding: 12px; border: 1px solid #ddd; text-align: center;"
-                    if impact_code == 'HI' and status == 'Failed' and count > 0:
-                        cell_style += " background: #ff9999; font-weight: bold; color: #cc0000;"
-                    html += f'<td style="{cell_style}">{count_text}</td>'
-                html += "</tr>"
-            
-            html += """
-                    </tbody>
-                </table>
-            </div>
-            <p style="color: #666; font-size: 0.9em; margin-top: 10px;">Focus on High Impact + Failed items first for maximum conversion gains.</p>
-            """
-    
-    # Add Radar Chart (Priority Matrix)
-    if radar_chart_path and os.path.exists(radar_chart_path):
-        try:
-            with open(radar_chart_path, 'rb') as img_file:
-                img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                html += f"""
-            <h2>📊 Performance Radar (Priority Matrix)</h2>
-            <div style="text-align: center; margin: 20px 0;">
-                <img src="data:image/png;base64,{img_data}" alt="Performance Radar Chart" style="max-width: 100%; height: auto; margin: 0 auto; display: block;" />
-            </div>
-            """
-        except Exception as e:
-            safe_print(f"[HTML Report] Failed to include radar chart: {safe_error_message(str(e))}")
-    
-    # Add Screenshot
-    if screenshot_path and os.path.exists(screenshot_path):
-        try:
-            with open(screenshot_path, 'rb') as img_file:
-                img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                html += f"""
-            <h2>📸 Landing Page Screenshot</h2>
-            <img src="data:image/png;base64,{img_data}" alt="Landing Page Screenshot" style="max-width: 100%; height: auto; margin: 20px 0; border: 1px solid #ddd; border-radius: 8px;" />
-            """
-        except Exception as e:
-            safe_print(f"[HTML Report] Failed to include screenshot: {safe_error_message(str(e))}")
-    
-    # Add Heatmap
-    if stitched_heatmap_path and os.path.exists(stitched_heatmap_path):
-        try:
-            with open(stitched_heatmap_path, 'rb') as img_file:
-                img_data = base64.b64encode(img_file.read()).decode('utf-8')
-                html += f"""
-            <h2>🔥 Visual Saliency Heatmap</h2>
-            <p>Heatmap showing where users' eyes are drawn on your landing page.</p>
-            <img src="data:image/png;base64,{img_data}" alt="Heatmap" style="max-width: 100%; height: auto; margin: 20px 0; border: 1px solid #ddd; border-radius: 8px;" />
-            """
-        except Exception as e:
-            safe_print(f"[HTML Report] Failed to include heatmap: {safe_error_message(str(e))}")
-    
-    html += """
-            <h2>🚀 Quick Wins</h2>
+    Latest stored audit of each page for a portfolio report: every page of a domain, or the given
+    URLs (in that order). Returns AuditHistoryStore.load_audits records, at most limit pages.
     """
-    
-    # Add Quick Wins
-    quick_wins = data.get('quick_wins', [])
-    if quick_wins:
-        for win in quick_wins[:5]:
-            element_name = win.get('elementName', win.get('title', 'Issue'))
-            fix_obj = win.get('fix', {})
-            if isinstance(fix_obj, dict):
-                quick_fix = fix_obj.get('quickFix', 'N/A')
-            else:
-                quick_fix = str(fix_obj) if fix_obj else 'N/A'
-            
-            html += f"""
-            <div class="quick-win">
-                <h3>{element_name}</h3>
-                <p><strong>Fix:</strong> {quick_fix}</p>
-            </div>
-            """
-    else:
-        html += "<p>No quick wins available.</p>"
-    
-    # Add Deep Dive Analysis
-    html += """
-            <h2>🔍 Deep Dive Analysis</h2>
+    history = get_audit_history()
+    if not history:
+        return []
+    return history.latest_audits(domain=domain, urls=urls, limit=limit)
+
+def stored_audit_findings(audit):
+    """Findings of a stored audit's detailedAudit (the empty-visuals placeholder is skipped, as in audit_item_frame)."""
+    return [
+        Finding.from_item(item)
+        for items in (audit.get("detailedAudit") or {}).values()
+        for item in items
+        if not item.get("placeholder")
+    ]
+
+def first_sentence(text):
+    """First sentence of a summary (a line break also ends it: roast hooks are one line per sentence)."""
+    return re.split(r"(?<=[.!?])\s+|\n", (text or "").strip(), maxsplit=1)[0].strip()
+
+def build_portfolio(stored_audits, profile=None):
     """
-    
-    detailed_audit = data.get('detailedAudit', {})
-    if detailed_audit:
-        category_names = {
-            "ux": "UX & Layout",
-            "conversion": "Conversion & Funnel",
-            "copy": "Copy & Messaging",
-            "visuals": "Visuals & Brand",
-            "trust": "Trust & Credibility",
-            "speed": "Speed & Technical Health"
-        }
-        
-        for cat_key, items in detailed_audit.items():
-            if items:
-                cat_name = category_names.get(cat_key.lower(), cat_key.capitalize())
-                html += f"""
-                <div class="category-section">
-                    <h3>{cat_name.upper()}</h3>
-                """
-                
-                for item in items:
-                    status = item.get('status', 'Unknown')
-                    element_name = item.get('elementName', item.get('element', 'Element'))
-                    rationale = item.get('rationale', 'No rationale provided.')
-                    impact_raw = item.get('impact', 'MI')
-                    impact_map = {'HI': 'High Impact', 'MI': 'Medium Impact', 'LI': 'Low Impact'}
-                    readable_impact = impact_map.get(impact_raw, 'Medium Impact')
-                    
-                    working_well = item.get('workingWell', item.get('working', []))
-                    not_working = item.get('notWorking', item.get('not_working', []))
-                    conversion_impact = item.get('conversionImpact', '')
-                    
-                    fix_obj = item.get('fix', {})
-                    if isinstance(fix_obj, dict):
-                        quick_fix = fix_obj.get('quickFix', '')
-                        fix_example = fix_obj.get('example', '')
-                        fix_expected_impact = fix_obj.get('expectedImpact', '')
-                    else:
-                        quick_fix = str(fix_obj) if fix_obj else ''
-                        fix_example = ''
-                        fix_expected_impact = ''
-                    
-                    # Determine badge class based on status
-                    if status in ['Failed', 'Needs Improvement']:
-                        badge_class = "badge-red"
-                    elif status in ['Excellent', 'Good']:
-                        badge_class = "badge-green"
-                    else:
-                        badge_class = "badge-yellow"
-                    
-                    html += f"""
-                    <div class="audit-item">
-                        <div style="margin-bottom: 10px;">
-                            <span class="{badge_class}">{status}</span>
-                            <span class="badge-yellow" style="background: #6c757d;">{readable_impact}</span>
-                            <strong style="font-size: 1.1em; margin-left: 10px;">{element_name}</strong>
-                        </div>
-                        <p style="font-style: italic; color: #666; margin: 10px 0;">{rationale}</p>
-                    """
-                    
-                    # What's Working
-                    if working_well and isinstance(working_well, list) and len(working_well) > 0:
-                        html += """
-                        <div class="working-well">
-                            <h4>✅ What's Working:</h4>
-                            <ul>
-                        """
-                        for w in working_well:
-                            html += f"<li>{w}</li>"
-                        html += """
-                            </ul>
-                        </div>
-                        """
-                    
-                    # What's Broken
-                    if not_working and isinstance(not_working, list) and len(not_working) > 0:
-                        html += """
-                        <div class="not-working">
-                            <h4>❌ What's Broken:</h4>
-                            <ul>
-                        """
-                        for nw in not_working:
-                            html += f"<li>{nw}</li>"
-                        html += """
-                            </ul>
-                        </div>
-                        """
-                    
-                    # Conversion Impact
-                    if conversion_impact:
-                        html += f"""
-                        <div class="conversion-impact">
-                            <strong>📊 Conversion Impact:</strong> {conversion_impact}
-                        </div>
-                        """
-                    
-                    # Action Plan
-                    if quick_fix:
-                        html += f"""
-                        <div class="action-plan">
-                            <strong>💡 Action Plan:</strong> {quick_fix}
-                        </div>
-                        """
-                    
-                    # Fix Example
-                    if fix_example:
-                        html += f"""
-                        <div class="fix-example">
-                            <strong>📝 Example:</strong><br>
-                            {fix_example}
-                        </div>
-                        """
-                    
-                    # Expected Impact
-                    if fix_expected_impact:
-                        html += f"""
-                        <div class="fix-expected-impact">
-                            <strong>🎯 Expected Impact:</strong> {fix_expected_impact}
-                        </div>
-                        """
-                    
-                    html += "</div>"
-                
-                html += "</div>"
-    else:
-        html += "<p>No detailed audit data available.</p>"
-    
-    html += """
-        </div>
-    </body>
-    </html>
+    Portfolio model of stored audits under one scoring profile. Each page gets its radar metrics,
+    overall score, headline (first sentence of the executive summary) and top findings; failing
+    findings are grouped by element name across pages into a shared ranking (most pages affected
+    first, then total badness).
     """
-    
-    return html
+    profile = get_scoring_profile(profile) if not isinstance(profile, dict) else profile
+    pages, issues = [], {}
+    for index, stored in enumerate(stored_audits):
+        audit = stored["data"]
+        findings = stored_audit_findings(audit)
+        scoring = score_audit_items(findings, top_k=3, profile=profile)
+        summary = (audit.get("overview") or {}).get("executiveSummary") or audit.get("roastSummary") or ""
+        pages.append({
+            "index": index + 1,
+            "url": stored["url"],
+            "auditedAt": time.strftime("%Y-%m-%d", time.localtime(stored["auditedAt"])),
+            "overallScore": scoring["overallScore"],
+            "radarMetrics": scoring["radarMetrics"],
+            "headline": first_sentence(summary),
+            "topFindings": [
+                {"elementName": finding.element_name, "status": finding.status, "impact": finding.impact_label,
+                 "quickFix": finding.quick_fix}
+                for finding in scoring["topFindings"] if finding.is_failing
+            ]
+        })
+        for finding, _, _, badness in build_item_table(findings, profile):
+            if not finding.is_failing or not finding.element_name:
+                continue
+            issue = issues.setdefault(finding.element_name.strip().lower(), {
+                "elementName": finding.element_name, "category": finding.category, "pages": [],
+                "badness": 0, "worstStatus": finding.status, "quickFix": finding.quick_fix
+            })
+            if index + 1 not in issue["pages"]:
+                issue["pages"].append(index + 1)
+            issue["badness"] += badness
+            if STATUS_SCALE.index(finding.status) > STATUS_SCALE.index(issue["worstStatus"]):
+                issue["worstStatus"] = finding.status
+            issue["quickFix"] = issue["quickFix"] or finding.quick_fix
+    ranking = sorted(issues.values(), key=lambda issue: (-len(issue["pages"]), -issue["badness"]))
+    return {
+        "profile": profile["name"],
+        "profileLabel": profile.get("label", profile["name"]),
+        "generatedAt": time.strftime("%Y-%m-%d %H:%M"),
+        "pages": pages,
+        "averageScore": round(sum(page["overallScore"] for page in pages) / len(pages)) if pages else 0,
+        "topIssues": ranking[:PORTFOLIO_TOP_ISSUES]
+    }
 
-def generate_pdf_report(json_data, screenshot_path=None, site_url=None, radar_chart_path=None, stitched_heatmap_path=None):
+def get_portfolio_report_file(kind, portfolio):
     """
-    Generate a PDF report from the audit JSON data.
-    
-    Args:
-        json_data: Dictionary containing the audit results
-        screenshot_path: Optional path to screenshot image file
-        site_url: Optional URL of the audited site (will extract base URL if full URL provided)
-        radar_chart_path: Optional path to radar chart image file
-    
-    Returns:
-        PDF bytes
+    Path of the portfolio report ("pdf" or "html") for a build_portfolio model, rendered by report
+    workers on first use. For HTML the radar cards are split into one portfolio-cards task per
+    worker and merged by a portfolio-html task; the PDF is laid out by a single portfolio-pdf task
+    (pyfpdf documents can't be merged). Raises queue.Full / TimeoutError / RuntimeError like get_report_file.
     """
-    # Validate input data - return error PDF if empty
-    if not json_data or not isinstance(json_data, dict):
-        safe_print("[ERROR] PDF generation: json_data is None or empty")
-        try:
-            error_pdf = PDFReport()
-            error_pdf.add_page()
-            error_pdf.set_font("Helvetica", "B", 16)
-            error_pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
-            error_pdf.set_font("Helvetica", "", 11)
-            error_pdf.cell(0, 10, clean_text("Error: No audit data available to generate report."), ln=True, align="C")
-            return error_pdf.output(dest='S')
-        except:
-            return b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
-    
-    try:
-        pdf = PDFReport()
-        
-        # Extract base URL if full URL provided
-        base_url = None
-        if site_url:
-            try:
-                from urllib.parse import urlparse
-                parsed = urlparse(site_url)
-                base_url = f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else site_url
-            except:
-                base_url = site_url
-        
-        # Prepare metadata for cover page
-        metadata = {
-            'scannedUrl': base_url or site_url or 'N/A',
-            'scannedAt': time.strftime('%B %d, %Y')
-        }
-        
-        # Prepare roast data for executive summary - MUST MATCH HTML REPORT EXACTLY
-        # HTML uses: data.get('roast_summary') or data.get('headline_roast') or data.get('overview', {}).get('executiveSummary', 'No summary available.')
-        roast_summary = json_data.get('roast_summary') or json_data.get('headline_roast') or json_data.get('overview', {}).get('executiveSummary', 'No summary available.')
-        roast_data = {
-            'roast_summary': roast_summary,  # Match HTML key
-            'headline_roast': json_data.get('headline_roast', ''),
-            'broadRoast': roast_summary,
-            'hook': json_data.get('headline_roast', ''),
-            'analysis': json_data.get('overview', {}).get('roastAnalysis', ''),
-            'roastAnalysis': json_data.get('overview', {}).get('roastAnalysis', ''),
-            'executiveSummary': json_data.get('overview', {}).get('executiveSummary', ''),
-            'overview': json_data.get('overview', {})  # Include full overview for consistency
-        }
-        
-        # Get overall score
-        overall_score = json_data.get('overall_score', json_data.get('overview', {}).get('overallScore', 50))
-        
-        # Get detailedAudit for status summary table
-        detailed_audit = json_data.get('detailedAudit', {})
-        
-        # Call new methods in order - with error handling for each section
-        safe_print(f"[PDF] Starting PDF generation with {len(json_data)} keys in json_data")
-        safe_print(f"[PDF] Heatmap path: {stitched_heatmap_path}")
-        safe_print(f"[PDF] Screenshot path: {screenshot_path}")
-        
-        try:
-            pdf.add_cover_page(metadata, overall_score)
-            safe_print(f"[PDF] Cover page added successfully. Page count: {pdf.page_no()}")
-        except Exception as e:
-            safe_print(f"[ERROR] Cover page failed: {safe_error_message(str(e))}")
-            # Ensure at least one page exists
-            if pdf.page_no() == 0:
-                pdf.add_page()
-                pdf.set_font("Helvetica", "B", 16)
-                pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
-                pdf.set_font("Helvetica", "", 11)
-                pdf.cell(0, 10, clean_text(f"Site: {base_url or site_url or 'N/A'}"), ln=True, align="C")
-                pdf.cell(0, 10, clean_text(f"Score: {overall_score}/100"), ln=True, align="C")
-                safe_print(f"[PDF] Fallback cover page added. Page count: {pdf.page_no()}")
-        
-        try:
-            pdf.add_roast_section(roast_data, overall_score, detailed_audit)
-            safe_print(f"[PDF] Roast section added successfully. Page count: {pdf.page_no()}")
-        except Exception as e:
-            safe_print(f"[ERROR] Roast section failed: {safe_error_message(str(e))}")
-            # Add fallback content
-            if pdf.page_no() == 0:
-                pdf.add_page()
-            else:
-                pdf.add_page()
-            pdf.set_font("Helvetica", "B", 16)
-            pdf.cell(0, 10, clean_text("Executive Summary"), ln=True)
-            pdf.set_font("Helvetica", "", 11)
-            summary_text = clean_text(str(roast_summary))[:500] if roast_summary else "Analysis completed"
-            pdf.multi_cell(0, 6, summary_text)
-            pdf.ln(5)
-            pdf.cell(0, 10, clean_text(f"Overall Score: {overall_score}/100"), ln=True)
-            safe_print(f"[PDF] Fallback roast section added. Page count: {pdf.page_no()}")
-        
-        # Add Radar Chart Section (centered)
-        try:
-            pdf.add_radar_section(radar_chart_path)
-            safe_print(f"[PDF] Radar section added successfully. Page count: {pdf.page_no()}")
-        except Exception as e:
-            safe_print(f"[ERROR] Radar section failed: {safe_error_message(str(e))}")
-        
-        try:
-            pdf.add_visuals_section(stitched_heatmap_path)
-            safe_print(f"[PDF] Visuals section added successfully. Page count: {pdf.page_no()}")
-        except Exception as e:
-            safe_print(f"[ERROR] Visuals section failed: {safe_error_message(str(e))}")
-            # Add fallback page
-            pdf.add_page()
-            pdf.set_font("Helvetica", "B", 14)
-            pdf.cell(0, 10, clean_text("Visual Analysis"), ln=True, align="C")
-            pdf.set_font("Helvetica", "I", 12)
-            pdf.cell(0, 10, clean_text("[Heatmap Not Available]"), ln=True, align="C")
-            if stitched_heatmap_path:
-                pdf.set_font("Helvetica", "", 8)
-                debug_text = f"Path attempted: {str(stitched_heatmap_path)[:60]}"
-                pdf.cell(0, 6, clean_text(debug_text), ln=True, align="C")
-            safe_print(f"[PDF] Fallback visuals section added. Page count: {pdf.page_no()}")
-        
-        # Quick Wins section
-        quick_wins = json_data.get('quick_wins', [])
-        if quick_wins and len(quick_wins) > 0:
-            try:
-                pdf.add_quick_wins(quick_wins)
-                safe_print(f"[PDF] Quick wins section added successfully. Page count: {pdf.page_no()}")
-            except Exception as e:
-                safe_print(f"[ERROR] Quick wins section failed: {safe_error_message(str(e))}")
-                # Add fallback content
-                pdf.add_page()
-                pdf.set_font("Helvetica", "B", 14)
-                pdf.cell(0, 10, clean_text("Quick Wins"), ln=True)
-                pdf.set_font("Helvetica", "", 11)
-                for i, win in enumerate(quick_wins[:3], 1):
-                    title = win.get('title', win.get('elementName', 'Quick Win'))
-                    pdf.cell(0, 8, clean_text(f"{i}. {str(title)}"), ln=True)
-                safe_print(f"[PDF] Fallback quick wins added. Page count: {pdf.page_no()}")
-    
-        # --- PAGE 3: VISUAL CONTEXT (Hero Shot) ---
-        if screenshot_path:
-            # Try multiple path resolution strategies for cloud compatibility
-            verified_screenshot_path = None
-            if os.path.exists(screenshot_path):
-                verified_screenshot_path = screenshot_path
-            else:
-                # Try tempfile directory
-                try:
-                    temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
-                    filename = os.path.basename(screenshot_path)
-                    temp_path = os.path.join(temp_dir, filename)
-                    if os.path.exists(temp_path):
-                        verified_screenshot_path = temp_path
-                except:
-                    pass
-            
-            if verified_screenshot_path and os.path.exists(verified_screenshot_path):
-                pdf.add_page()
-                pdf.set_font("Helvetica", 'B', 16)
-                pdf.set_text_color(0, 0, 0)  # Force black text
-                pdf.cell(pdf.usable_width, 10, clean_text("Landing Page Screenshot"), 0, 1, 'L')
-                pdf.ln(5)
-                
-                try:
-                    # Open image to get dimensions
-                    from PIL import Image as PILImage
-                    img = PILImage.open(verified_screenshot_path)
-                    img_width, img_height = img.size
-                    
-                    # Calculate dimensions: Make it double height (or as much as fits)
-                    # A4 height = 297mm, margins = 40mm total, title space ≈ 30mm
-                    # Usable height ≈ 227mm
-                    max_height_mm = 220  # Leave some margin
-                    
-                    # Calculate aspect ratio
-                    aspect_ratio = img_width / img_height
-                    
-                    # Start with full width
-                    display_width = pdf.usable_width
-                    display_height = display_width / aspect_ratio
-                    
-                    # Double the height (or use max available)
-                    target_height = min(max_height_mm, display_height * 2)
-                    
-                    # If target is taller, adjust width to maintain aspect ratio
-                    if target_height > display_height:
-                        display_height = target_height
-                        display_width = display_height * aspect_ratio
-                        # If wider than usable width, scale down
-                        if display_width > pdf.usable_width:
-                            scale = pdf.usable_width / display_width
-                            display_width = pdf.usable_width
-                            display_height = display_height * scale
-                    
-                    # Center horizontally if narrower than usable width
-                    x_offset = 20 + (pdf.usable_width - display_width) / 2 if display_width < pdf.usable_width else 20
-                    
-                    # Place image with proper spacing (y position is already set by pdf.ln(8))
-                    current_y = pdf.get_y()
-                    pdf.image(verified_screenshot_path, x=x_offset, y=current_y, w=display_width)
-                    safe_print(f"[PDF] Screenshot added successfully. Page count: {pdf.page_no()}")
-                except Exception as e:
-                    pdf.set_font("Helvetica", '', 10)
-                    pdf.set_text_color(0, 0, 0)  # Force black text
-                    error_msg = str(e)[:150]
-                    pdf.multi_cell(pdf.usable_width, 8, clean_text(f"Note: Could not load screenshot: {error_msg}"), 0, 'L')
-                    safe_print(f"[PDF] Screenshot load failed: {safe_error_message(str(e))}")
-            else:
-                safe_print(f"[PDF] Screenshot path not found: {screenshot_path}")
-        
-        # --- PAGE 4+: ELEMENT-BY-ELEMENT AUDIT (if available) ---
-        audit_items = json_data.get('audit_items', [])
-        if audit_items and len(audit_items) > 0:
-            safe_print(f"[PDF] Adding {len(audit_items)} audit items")
-            # Split audit_items into pages (3-4 per page)
-            items_per_page = 3
-            for page_start in range(0, len(audit_items), items_per_page):
-                pdf.add_page()
-                if page_start == 0:
-                    pdf.set_font("Helvetica", 'B', 18)
-                    pdf.set_text_color(0, 0, 0)  # Force black text
-                    pdf.cell(pdf.usable_width, 12, clean_text("Element-by-Element Audit"), 0, 1, 'L')
-                    pdf.ln(3)
-                
-                page_items = audit_items[page_start:page_start + items_per_page]
-                for item in page_items:
-                    try:
-                        # Use the new professional audit_card method
-                        pdf.audit_card(item)
-                        
-                        # Add separator line between cards
-                        pdf.line(15, pdf.get_y(), 195, pdf.get_y())
-                        pdf.ln(3)
-                    except Exception as e:
-                        safe_print(f"[PDF] Audit card failed: {safe_error_message(str(e))}")
-                        # Add fallback content for this item
-                        element_name = item.get('element', item.get('elementName', 'Element'))
-                        pdf.set_font("Helvetica", 'B', 12)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        pdf.cell(pdf.usable_width, 8, clean_text(str(element_name)), ln=True)
-                        pdf.set_font("Helvetica", '', 10)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        pdf.cell(pdf.usable_width, 6, clean_text(f"Status: {item.get('status', 'Unknown')}"), ln=True)
-                        pdf.ln(3)
-            safe_print(f"[PDF] Audit items added. Page count: {pdf.page_no()}")
-        
-        # --- PAGE N+: DEEP DIVES (God-Tier Schema) ---
-        categories = json_data.get('categories', [])
-        if categories:
-            safe_print(f"[PDF] Adding {len(categories)} category pages")
-            for cat in categories:
-                try:
-                    pdf.add_page()
-                    # Title
-                    pdf.set_font("Helvetica", 'B', 16)
-                    pdf.set_text_color(0, 0, 0)  # Force black text
-                    cat_name = clean_text(cat.get('name', 'Unknown'))[:80]
-                    cat_score = cat.get('score', 0)
-                    pdf.multi_cell(pdf.usable_width, 10, clean_text(f"{cat_name} (Score: {cat_score}/100)"), 0, 'L')
-                    
-                    # Verdict & Impact
-                    pdf.set_font("Helvetica", '', 11)
-                    pdf.set_text_color(0, 0, 0)  # Force black text
-                    verdict = clean_text(cat.get('verdict', 'Unknown'))[:40]
-                    impact = clean_text(cat.get('impact', 'Unknown'))[:40]
-                    pdf.multi_cell(pdf.usable_width, 8, clean_text(f"Verdict: {verdict} | Impact: {impact}"), 0, 'L')
-                    pdf.ln(4)
-                    
-                    # What Works
-                    what_works = cat.get('what_works', '')
-                    if what_works:
-                        pdf.set_font("Helvetica", 'B', 11)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        pdf.cell(pdf.usable_width, 8, clean_text("What Works:"), 0, 1, 'L')
-                        pdf.set_font("Helvetica", '', 10)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        pdf.multi_cell(pdf.usable_width, 6, clean_text(str(what_works))[:400], 0, 'L')
-                        pdf.ln(3)
-                    
-                    # What Failed
-                    what_failed = cat.get('what_failed', '')
-                    if what_failed:
-                        pdf.set_font("Helvetica", 'B', 11)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        pdf.cell(pdf.usable_width, 8, clean_text("What Failed:"), 0, 1, 'L')
-                        pdf.set_font("Helvetica", '', 10)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        pdf.multi_cell(pdf.usable_width, 6, clean_text(str(what_failed))[:400], 0, 'L')
-                        pdf.ln(3)
-                    
-                    # Fix Steps
-                    fix_steps = cat.get('fix_steps', [])
-                    if fix_steps:
-                        pdf.set_font("Helvetica", 'B', 11)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        pdf.cell(pdf.usable_width, 8, clean_text("Fix Steps:"), 0, 1, 'L')
-                        pdf.set_font("Helvetica", '', 10)
-                        pdf.set_text_color(0, 0, 0)  # Force black text
-                        for i, step in enumerate(fix_steps[:5]):  # Max 5 steps
-                            step_text = clean_text(str(step))[:300]
-                            pdf.multi_cell(pdf.usable_width, 6, clean_text(f"{i+1}. {step_text}"), 0, 'L')
-                            pdf.ln(2)
-                except Exception as e:
-                    safe_print(f"[PDF] Category page failed: {safe_error_message(str(e))}")
-                    # Add minimal fallback
-                    pdf.add_page()
-                    pdf.set_font("Helvetica", 'B', 16)
-                    pdf.set_text_color(0, 0, 0)  # Force black text
-                    cat_name = clean_text(cat.get('name', 'Category'))[:80]
-                    pdf.cell(pdf.usable_width, 10, clean_text(f"{cat_name}"), 0, 1, 'L')
-            safe_print(f"[PDF] Categories added. Page count: {pdf.page_no()}")
-        
-        # CRITICAL: Ensure PDF has at least one page with content BEFORE output
-        page_count = pdf.page_no()
-        safe_print(f"[PDF] Page count before output: {page_count}")
-        
-        if page_count == 0:
-            safe_print("[PDF] WARNING: No pages found, adding fallback page")
-            pdf.add_page()
-            pdf.set_font("Helvetica", "B", 16)
-            pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
-            pdf.set_font("Helvetica", "", 11)
-            pdf.cell(0, 10, clean_text("Report generated successfully"), ln=True, align="C")
-            pdf.cell(0, 10, clean_text(f"Site: {base_url or site_url or 'N/A'}"), ln=True, align="C")
-            pdf.cell(0, 10, clean_text(f"Score: {overall_score}/100"), ln=True, align="C")
-        
-        # Verify we have content by checking page count again
-        final_page_count = pdf.page_no()
-        safe_print(f"[PDF] Final page count: {final_page_count}")
-        
-        if final_page_count == 0:
-            raise ValueError("PDF has zero pages - cannot generate empty PDF")
-        
-        # pdf.output(dest='S') returns bytes/bytearray directly
-        # Handle encoding errors gracefully (Windows charmap issue)
-        try:
-            pdf_bytes = pdf.output(dest='S')
-            safe_print(f"[PDF] Output size: {len(pdf_bytes) if pdf_bytes else 0} bytes")
-            # Verify PDF is not empty
-            if not pdf_bytes or len(pdf_bytes) < 100:
-                raise ValueError(f"PDF output is too small ({len(pdf_bytes) if pdf_bytes else 0} bytes), likely empty")
-        except (UnicodeEncodeError, UnicodeDecodeError, ValueError) as e:
-            # If encoding fails, use BytesIO buffer which handles encoding better
-            try:
-                buffer = io.BytesIO()
-                pdf.output(buffer)
-                pdf_bytes = buffer.getvalue()
-                # Verify again
-                if not pdf_bytes or len(pdf_bytes) < 100:
-                    raise ValueError("PDF buffer is too small")
-            except Exception as e2:
-                # Last resort: create a minimal valid PDF
-                safe_print(f"[ERROR] PDF generation failed: {safe_error_message(str(e2))}")
-                try:
-                    # Create a minimal PDF with error message
-                    fallback_pdf = PDFReport()
-                    fallback_pdf.add_page()
-                    fallback_pdf.set_font("Helvetica", "B", 16)
-                    fallback_pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
-                    fallback_pdf.set_font("Helvetica", "", 11)
-                    error_msg = clean_text("PDF generation encountered an error. Please try again.")
-                    fallback_pdf.multi_cell(0, 6, error_msg)
-                    pdf_bytes = fallback_pdf.output(dest='S')
-                except:
-                    # Absolute last resort - return minimal valid PDF
-                    pdf_bytes = b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
-        
-        # Convert bytearray to bytes if needed (Streamlit download_button expects bytes)
-        if isinstance(pdf_bytes, bytearray):
-            pdf_bytes = bytes(pdf_bytes)
-        
-        # Final verification
-        if not pdf_bytes or len(pdf_bytes) < 100:
-            safe_print("[ERROR] PDF bytes are empty or too small")
-            # Return minimal valid PDF
-            pdf_bytes = b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
-        
-        return pdf_bytes
-    except Exception as e:
-        safe_print(f"[CRITICAL ERROR] PDF generation completely failed: {safe_error_message(str(e))}")
-        # Return minimal valid PDF structure
-        return b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
+    pool = get_report_render_pool()
+    portfolio_id = stage_report_data(portfolio)
+    path = os.path.join(report_render_dir("reports"), f"portfolio_{portfolio_id}.{kind}")
+    if os.path.exists(path):
+        return path
+    if kind == "pdf":
+        stats = pool.render({"kind": "portfolio-pdf", "dataId": portfolio_id, "path": path})
+    else:
+        # Contiguous chunks of pages, one per worker, so the card files concatenate in page order
+        pages = portfolio["pages"]
+        chunk_size = max(1, -(-len(pages) // max(1, REPORT_RENDER_WORKERS)))
+        card_tasks = []
+        for start in range(0, len(pages), chunk_size):
+            cards_id = stage_report_data(pages[start:start + chunk_size])
+            card_tasks.append({"kind": "portfolio-cards", "dataId": cards_id,
+                               "path": os.path.join(report_render_dir("render"), f"cards_{cards_id}.html")})
+        pool.render_all(card_tasks)
+        stats = pool.render({"kind": "portfolio-html", "dataId": portfolio_id, "path": path,
+                             "artifacts": {"cards": [task["path"] for task in card_tasks]}})
+    safe_print(f"[DEBUG] Rendered portfolio {kind}: {format_bytes(stats['bytes'])} in {stats['seconds']}s")
+    return path
 
 def validate_url(url):
     """
@@ -4578,6 +5651,36 @@ def main():
         """
         st.markdown(enter_key_script, unsafe_allow_html=True)
         
+        # Offer an incremental re-audit when this page was already roasted in this session
+        previous_audit = None
+        if site_url and site_url.strip():
+            previous_audit = st.session_state.get("audit_snapshots", {}).get(normalize_audit_url(site_url))
+            history = get_audit_history() if previous_audit is None else None
+            latest = history.latest_audit(site_url) if history else None
+            if latest:
+                previous_audit = latest["data"].get("auditSnapshot")
+        if previous_audit:
+            incremental = st.checkbox(
+                "Only re-analyze what changed since the last roast",
+                value=True,
+                key="incremental_reaudit",
+                help=f"Last roasted {time.strftime('%H:%M', time.localtime(previous_audit['auditedAt']))}. "
+                     "Unchanged sections reuse their findings."
+            )
+            if not incremental:
+                previous_audit = None
+        
+        scoring_profiles = load_scoring_profiles()
+        default_profile = os.getenv("SCORING_PROFILE", "default")
+        scoring_profile = st.selectbox(
+            "Scoring profile",
+            list(scoring_profiles),
+            index=list(scoring_profiles).index(default_profile) if default_profile in scoring_profiles else 0,
+            format_func=lambda name: scoring_profiles[name].get("label", name),
+            key="scoring_profile",
+            help="Weights the overall score for your industry."
+        )
+        
         # Show button always - ALWAYS ENABLED (no disabled state)
         button_clicked = st.button("🔥 Roast My Site", type="primary", use_container_width=True, key="roast_button", disabled=False)
         
@@ -4610,7 +5713,11 @@ def main():
                         
                         # Steps 3-12: Screenshot capture (takes ~15-30 seconds)
                         progress.update(3)
-                        images, html_content, page_text = asyncio.run(capture_screenshot_from_url(site_url))
+                        # Desktop is primary (reports, copy and tech workers); other devices feed the visuals worker
+                        capture = asyncio.run(capture_devices(site_url, devices=AUDIT_DEVICES))
+                        device_captures = capture["devices"]
+                        desktop = device_captures[AUDIT_DEVICES[0]]
+                        images, html_content, page_text, page_features = desktop["screenshots"], desktop["html"], desktop["text"], desktop["features"]
                         
                         # Run quick_scan in parallel (light scan for ROI dashboard)
                         try:
@@ -4632,6 +5739,8 @@ def main():
                         # Store data
                         st.session_state.html_content = html_content
                         st.session_state.page_text = page_text
+                        st.session_state.page_features = page_features
+                        st.session_state.device_captures = device_captures
                         st.session_state.captured_images = images
                         st.session_state.audit_url = site_url
                         
@@ -4656,6 +5765,8 @@ def main():
                 if images:
                     html_content = st.session_state.get("html_content", "")
                     page_text = st.session_state.get("page_text", "")
+                    page_features = st.session_state.get("page_features")
+                    device_captures = st.session_state.get("device_captures")
                     
                     # Steps 13-14: Preparing AI request
                     progress.update(13)
@@ -4663,20 +5774,23 @@ def main():
                     progress.update(14)
                     
                     # Steps 15-18: AI generation using Assembly Line (takes ~10-20 seconds)
-                    roast_data = generate_roast(images, html_content=html_content, page_text=page_text, progress_manager=progress)
+                    roast_data = generate_roast(images, html_content=html_content, page_text=page_text, progress_manager=progress,
+                                                page_features=page_features, device_captures=device_captures,
+                                                previous_audit=previous_audit, scoring_profile=scoring_profile)
                     
                     st.session_state.roast_data = roast_data
+                    if roast_data.get("auditSnapshot"):
+                        st.session_state.setdefault("audit_snapshots", {})[normalize_audit_url(site_url)] = roast_data["auditSnapshot"]
                     
-                    # Save scan to Firestore (optional - only if Firebase is available)
-                    if FIREBASE_AVAILABLE:
-                        try:
-                            audit_url = st.session_state.get("audit_url", site_url)
-                            overall_score = roast_data.get("overall_score", roast_data.get("overview", {}).get("overallScore", 0))
-                            scan_id = save_scan(audit_url, roast_data, overall_score)
-                            if scan_id:
-                                safe_print(f"[INFO] Scan saved to Firestore with ID: {scan_id}")
-                        except Exception as e:
-                            safe_print(f"[WARNING] Failed to save scan to Firestore: {safe_error_message(str(e))}")
+                    # Persist in the background: local history (SQLite) plus Firestore when available
+                    try:
+                        audit_url = st.session_state.get("audit_url", site_url)
+                        overall_score = roast_data.get("overall_score", roast_data.get("overview", {}).get("overallScore", 0))
+                        history = get_audit_history()
+                        if history:
+                            history.record(audit_url, roast_data, overall_score)
+                    except Exception as e:
+                        safe_print(f"[WARNING] Failed to queue audit for saving: {safe_error_message(str(e))}")
                     
                     # Store first screenshot for PDF (use tempfile for cloud compatibility)
                     temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
@@ -4755,7 +5869,6 @@ def render_main_audit_dashboard(roast_data):
         with col_top3:
             # Dual-button setup: PDF Download + HTML View
             try:
-                overall_score = roast_data.get("overall_score", 50)
                 site_url = st.session_state.get("audit_url", st.session_state.get("site_url", None))
                 
                 # Create two columns for buttons
@@ -4764,28 +5877,39 @@ def render_main_audit_dashboard(roast_data):
                 with col_pdf:
                     # PDF Download
                     try:
-                        pdf_bytes = generate_pdf_report(
+                        pdf_path = get_pdf_report_file(
                             roast_data,
                             site_url=site_url,
                             radar_chart_path=st.session_state.get("radar_chart_path"),
                             stitched_heatmap_path=st.session_state.get("stitched_heatmap_path")
                         )
-                        if pdf_bytes and len(pdf_bytes) > 100:
-                            st.download_button(
-                                "📄 Download PDF",
-                                pdf_bytes,
-                                f"audit_{int(time.time())}.pdf",
-                                "application/pdf",
-                                use_container_width=True
-                            )
+                        if os.path.getsize(pdf_path) > 100:
+                            with open(pdf_path, "rb") as pdf_file:
+                                st.download_button(
+                                    "📄 Download PDF",
+                                    pdf_file,
+                                    f"audit_{int(time.time())}.pdf",
+                                    "application/pdf",
+                                    use_container_width=True
+                                )
                         else:
                             st.error("PDF generation failed")
+                    except (queue.Full, TimeoutError) as e:
+                        st.info(f"PDF report is still rendering - try again in a moment. ({safe_error_message(e)})")
                     except Exception as e:
                         st.error(f"PDF Error: {safe_error_message(str(e))}")
                 
                 with col_html:
                     # HTML View in Browser - Use components.html for reliable JavaScript execution
-                    html_report = generate_html_report(roast_data, overall_score, site_url=site_url)
+                    try:
+                        with open(get_report_file("html", roast_data, site_url=site_url), encoding="utf-8") as html_file:
+                            html_report = html_file.read()
+                    except (queue.Full, TimeoutError) as e:
+                        st.info(f"HTML report is still rendering - try again in a moment. ({safe_error_message(e)})")
+                        html_report = None
+                    except Exception as e:
+                        st.error(f"HTML Error: {safe_error_message(str(e))}")
+                        html_report = None
                     if html_report and len(html_report) > 100:
                         try:
                             import streamlit.components.v1 as components
@@ -4829,7 +5953,7 @@ def render_main_audit_dashboard(roast_data):
                             </a>
                             """
                             st.markdown(html_link, unsafe_allow_html=True)
-                    else:
+                    elif html_report is not None:
                         st.error("HTML generation failed")
             except Exception as e:
                 error_msg = safe_error_message(e)
@@ -4933,11 +6057,10 @@ def render_main_audit_dashboard(roast_data):
                 
                 # Save radar chart as image for PDF (with transparent background)
                 try:
-                    temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
-                    os.makedirs(temp_dir, exist_ok=True)
-                    radar_chart_path = os.path.join(temp_dir, f"radar_{int(time.time())}.png")
-                    # Save with transparent background
-                    fig.write_image(radar_chart_path, width=400, height=400, scale=2, format='png')
+                    radar_metrics = {category: ordered_radar[RADAR_AXIS_LABELS[category]] for category in RADAR_CATEGORIES}
+                    radar_chart_path = os.path.join(report_render_dir("charts"), f"radar_{content_hash(radar_metrics)}.png")
+                    if not os.path.exists(radar_chart_path):
+                        render_radar_png(radar_metrics, radar_chart_path)
                     st.session_state.radar_chart_path = radar_chart_path
                 except Exception as e:
                     st.caption(f"Note: Chart export error: {str(e)[:30]}")
@@ -5194,6 +6317,70 @@ def render_main_audit_dashboard(roast_data):
                 if win.get('example'):
                     st.code(win.get('example'), language='html')
     
+    # Changes since the previous roast of this page (incremental re-audit)
+    audit_diff = roast_data.get("auditDiff")
+    if audit_diff:
+        st.markdown("---")
+        st.subheader("🔁 Since Your Last Roast")
+        reused = ", ".join(audit_diff.get("reusedWorkers", [])) or "none"
+        rerun = ", ".join(audit_diff.get("rerunWorkers", [])) or "none"
+        st.caption(f"Re-analyzed: {rerun} · Carried forward unchanged: {reused}")
+        for fixed in audit_diff.get("fixed", []):
+            st.success(f"✅ Fixed: **{fixed['elementName']}** ({fixed['previousStatus']} → {fixed['status']})")
+        new_items = [item for item in roast_data.get("audit_items", []) if item.get("change") == "new"]
+        for item in new_items:
+            st.error(f"🆕 New issue: **{item.get('element', 'Element')}** - {item.get('status')}")
+    
+    # Score trend across every audit of this domain (from the local history store)
+    audit_url = st.session_state.get("audit_url")
+    history = get_audit_history() if audit_url else None
+    trend = history.score_trend(audit_url) if history else []
+    if len(trend) >= 2:
+        st.markdown("---")
+        st.subheader(f"📈 Score Trend for {normalize_audit_domain(audit_url)}")
+        trend_df = pd.DataFrame(trend)
+        trend_df["auditedAt"] = pd.to_datetime(trend_df["auditedAt"], unit="s")
+        st.line_chart(trend_df.set_index("auditedAt")["score"])
+        
+        # Portfolio report over the latest audit of each page of this domain
+        page_count = len({normalize_audit_url(point["url"]) for point in trend})
+        if page_count >= 2:
+            if st.button(f"📚 Build portfolio report ({min(page_count, PORTFOLIO_MAX_PAGES)} pages)", key="portfolio_report"):
+                with st.spinner("Rendering portfolio report..."):
+                    portfolio = build_portfolio(
+                        portfolio_audits(domain=audit_url),
+                        profile=roast_data.get("scoringProfile") or st.session_state.get("scoring_profile")
+                    )
+                    # Only the rendered file paths are kept in session state
+                    st.session_state.portfolio_reports = {}
+                    for kind in ("pdf", "html"):
+                        try:
+                            st.session_state.portfolio_reports[kind] = get_portfolio_report_file(kind, portfolio)
+                        except (queue.Full, TimeoutError) as e:
+                            st.info(f"Portfolio {kind.upper()} is still rendering - try again in a moment. ({safe_error_message(e)})")
+                        except Exception as e:
+                            st.error(f"Portfolio {kind.upper()} Error: {safe_error_message(str(e))}")
+            portfolio_reports = st.session_state.get("portfolio_reports")
+            if portfolio_reports:
+                col_pdf, col_html = st.columns(2)
+                for column, kind, label, mime in ((col_pdf, "pdf", "📄 Portfolio PDF", "application/pdf"),
+                                                  (col_html, "html", "🌏 Portfolio HTML", "text/html")):
+                    report_path = portfolio_reports.get(kind)
+                    if report_path and os.path.exists(report_path):
+                        with column, open(report_path, "rb") as report_file:
+                            st.download_button(label, report_file, f"portfolio_{int(time.time())}.{kind}", mime,
+                                               use_container_width=True)
+    
+    # Cloud history sync health (write-behind queue to Firestore)
+    sync_metrics = remote_write_metrics()
+    if sync_metrics:
+        with st.expander("☁️ Cloud sync status"):
+            col_written, col_queue, col_latency, col_spilled = st.columns(4)
+            col_written.metric("Written", f"{sync_metrics['written']}/{sync_metrics['submitted']}")
+            col_queue.metric("Queue depth", sync_metrics["queueDepth"])
+            col_latency.metric("Avg write", f"{sync_metrics['avgWriteLatencyMs']:.0f} ms")
+            col_spilled.metric("Spilled to disk", sync_metrics["spilled"], help=f"{sync_metrics['replayed']} replayed so far")
+
     # Audit Items Section
     audit_items = roast_data.get("audit_items", [])
     if audit_items:
@@ -5209,7 +6396,8 @@ def render_main_audit_dashboard(roast_data):
                 "Failed": "❌"
             }.get(status, "⚪")
             
-            with st.expander(f"{status_color} **{item.get('element', 'Element')}** - {status}"):
+            change_tag = {"new": " · 🆕 new", "unchanged": " · unchanged", "changed": " · changed"}.get(item.get("change"), "")
+            with st.expander(f"{status_color} **{item.get('element', 'Element')}** - {status}{change_tag}"):
                 st.markdown(f"**Rationale:** {item.get('rationale', 'N/A')}")
                 
                 col_work1, col_work2 = st.columns(2)
@@ -5252,27 +6440,22 @@ def render_main_audit_dashboard(roast_data):
                 if items:  # Only add categories that have items
                     cat_name = category_names.get(cat_key.lower(), cat_key.capitalize())
                 # Calculate score for this category
-                status_points = {"Excellent": 95, "Good": 80, "Satisfactory": 60, "Needs Improvement": 35, "Failed": 5}
-                scores = [status_points.get(item.get("status", "Satisfactory"), 60) for item in items]
+                findings = [Finding.from_item(item) for item in items]
+                status_points = get_scoring_profile(roast_data.get("scoringProfile"))["statusPoints"]
+                scores = [status_points.get(finding.status, 60) for finding in findings]
                 avg_score = round(sum(scores) / len(scores)) if scores else 50
                 
                 # Build what_works and what_failed from items
-                what_works_items = [item for item in items if item.get("status") in ["Excellent", "Good"]]
-                what_failed_items = [item for item in items if item.get("status") in ["Failed", "Needs Improvement"]]
+                what_works_items = [finding for finding in findings if finding.is_passing]
+                what_failed_items = [finding for finding in findings if finding.is_failing]
                 
-                what_works = "; ".join([item.get("elementName", "") for item in what_works_items[:3]]) if what_works_items else ""
-                what_failed = "; ".join([item.get("elementName", "") for item in what_failed_items[:3]]) if what_failed_items else ""
+                what_works = "; ".join([finding.element_name for finding in what_works_items[:3]]) if what_works_items else ""
+                what_failed = "; ".join([finding.element_name for finding in what_failed_items[:3]]) if what_failed_items else ""
                 
                 # Build fix_steps from items
-                fix_steps = []
-                for item in what_failed_items[:3]:
-                    fix = item.get("fix", {})
-                    if isinstance(fix, dict):
-                        quick_fix = fix.get("quickFix", "")
-                        if quick_fix:
-                            fix_steps.append(f"{item.get('elementName', 'Item')}: {quick_fix}")
-                    elif fix:
-                        fix_steps.append(f"{item.get('elementName', 'Item')}: {str(fix)}")
+                fix_steps = [
+                    f"{finding.element_name or 'Item'}: {finding.quick_fix}" for finding in what_failed_items[:3] if finding.quick_fix
+                ]
                 
                 categories.append({
                     "name": cat_name,
@@ -5348,4 +6531,6 @@ def render_main_audit_dashboard(roast_data):
         st.info("No category data available. The AI may not have returned structured findings.")
 
 if __name__ == "__main__":
+    if "--batch" in sys.argv[1:]:
+        sys.exit(batch_main(sys.argv[1:]))
     main()
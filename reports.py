@@ -0,0 +1,2232 @@
+"""
+Report rendering for SiteRoast: the PDF (FPDF) and HTML (Jinja2) audit reports, the portfolio
+reports, report image preparation, the PIL radar chart and the report temp directories. Importing this module has no
+side effects - it doesn't touch Streamlit or the app - so render workers can load it on its own:
+`python reports.py` reads a render task as JSON on stdin, renders it to the task's path and
+prints the render stats as the last line of stdout (see ReportRenderPool in main.py).
+"""
+import base64
+import contextlib
+import html
+import io
+import json
+import math
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+
+import jinja2
+from fpdf import FPDF
+from PIL import Image, ImageDraw, ImageFont
+
+from audit_model import (
+    IMPACT_LEVELS, RADAR_CATEGORIES, STATUS_SCALE, Finding, clean_text, content_hash, pack_audit,
+    safe_error_message, safe_print, unpack_audit
+)
+
+def format_bytes(num_bytes):
+    """Human readable byte size (KB/MB) for report text."""
+    if num_bytes >= 1024 * 1024:
+        return f"{num_bytes / (1024 * 1024):.1f} MB"
+    return f"{num_bytes / 1024:.0f} KB"
+
+class PDFReport(FPDF):
+    """Robust PDF Report class - Cloud-safe design using Helvetica only"""
+    def __init__(self):
+        super().__init__()
+        self.set_margins(15, 15, 15)
+        self.set_auto_page_break(auto=True, margin=15)
+        self.is_cover_page = False
+        # Calculate usable width: A4 width (210mm) - margins (30mm total) = 180mm
+        self.usable_width = 180
+        # Source image path -> print-resolution copy, so each image is embedded once
+        self.embedded_images = {}
+    
+    def embed_image(self, path, x=None, y=None, w=0, h=0, kind=None):
+        """
+        Place an image prepared for print (prepare_report_image at PDF_IMAGE_DPI for its printed
+        width). The prepared copy is cached per source path, and FPDF stores an image once per
+        file name, so repeated placements reference the same embedded object.
+        """
+        key = os.path.abspath(path)
+        if key not in self.embedded_images:
+            width_px = round((w or self.usable_width) / 25.4 * PDF_IMAGE_DPI)
+            self.embedded_images[key] = prepare_report_image(path, width_px, kind=kind, target="pdf")[0]
+        self.image(self.embedded_images[key], x=x, y=y, w=w, h=h)
+    
+    def header(self):
+        """Branded header on every page"""
+        if getattr(self, 'is_cover_page', False):
+            return
+        self.set_font('Helvetica', 'B', 10)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 10, clean_text('SiteRoast - Conversion Audit Report'), 0, 0, 'L')
+        self.ln(15)
+    
+    def footer(self):
+        """Branded footer with page number"""
+        self.set_y(-15)
+        self.set_font('Helvetica', 'I', 8)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 10, clean_text(f'Page {self.page_no()}'), 0, 0, 'C')
+    
+    def chapter_title(self, label):
+        """Helper method for chapter titles"""
+        self.set_font('Helvetica', 'B', 16)
+        self.set_text_color(33, 33, 33)
+        self.cell(0, 10, clean_text(label), 0, 1, 'L')
+        self.ln(5)
+    
+    def draw_radar(self, radar_metrics, cx, cy, radius):
+        """Radar chart drawn as vector lines: grid rings, axes with labels and the score polygon."""
+        def outline(points):
+            for (x1, y1), (x2, y2) in zip(points, points[1:] + points[:1]):
+                self.line(x1, y1, x2, y2)
+        
+        self.set_draw_color(200, 200, 200)
+        self.set_line_width(0.2)
+        for level in (20, 40, 60, 80, 100):
+            outline(radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, level), cx, cy, radius))
+        for x, y in radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, 100), cx, cy, radius):
+            self.line(cx, cy, x, y)
+        
+        self.set_font("Helvetica", "", 7)
+        self.set_text_color(80, 80, 80)
+        label_points = radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, 100), cx, cy, radius + 5)
+        for category, (x, y) in zip(RADAR_CATEGORIES, label_points):
+            self.set_xy(x - 12, y - 2)
+            self.cell(24, 4, f"{RADAR_AXIS_LABELS[category]} {radar_metrics.get(category, 50)}", align="C")
+        
+        self.set_draw_color(102, 126, 234)
+        self.set_line_width(0.6)
+        outline(radar_polygon_points(radar_metrics, cx, cy, radius))
+        self.set_draw_color(0, 0, 0)
+        self.set_line_width(0.2)
+        self.set_text_color(0, 0, 0)
+    
+    def draw_badge(self, text, status):
+        """Draw colored badge based on status"""
+        # Color Coding
+        if status in ['Excellent', 'Good']:
+            self.set_fill_color(220, 255, 220)  # Green
+            self.set_text_color(0, 100, 0)
+        elif status == 'Satisfactory':
+            self.set_fill_color(255, 245, 220)  # Orange
+            self.set_text_color(150, 100, 0)
+        else:
+            self.set_fill_color(255, 220, 220)  # Red
+            self.set_text_color(150, 0, 0)
+        
+        self.set_font('Helvetica', 'B', 9)
+        w = self.get_string_width(clean_text(text)) + 6
+        self.cell(w, 6, clean_text(text), 0, 0, 'C', fill=True)
+        self.set_fill_color(255, 255, 255)  # Reset
+        self.set_text_color(0, 0, 0)  # Reset
+    
+    def add_cover_page(self, metadata, score):
+        """Cover page - vertically centered"""
+        self.set_text_color(0, 0, 0)
+        self.add_page()
+        self.is_cover_page = True
+        
+        # Vertical Center
+        self.set_y(110)
+        
+        # Title
+        self.set_font("Helvetica", "B", 28)
+        self.set_text_color(0, 0, 0)
+        self.cell(0, 15, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
+        self.ln(10)
+        
+        # Client Info
+        self.set_font("Helvetica", "", 14)
+        self.set_text_color(0, 0, 0)
+        scanned_url = clean_text(str(metadata.get('scannedUrl', 'N/A')))
+        scanned_at = clean_text(str(metadata.get('scannedAt', 'N/A')))
+        self.cell(0, 8, clean_text(f"Client: {scanned_url}"), ln=True, align="C")
+        self.cell(0, 8, clean_text(f"Generated: {scanned_at}"), ln=True, align="C")
+        
+        self.is_cover_page = False
+    
+    def add_roast_section(self, roast_data, overall_score, detailed_audit=None):
+        """Executive summary section with proper text wrapping - Page 2"""
+        # Force black text at start - MUST BE FIRST LINE
+        self.set_text_color(0, 0, 0)  # Force Black
+        
+        self.add_page()  # Force Page 2
+        
+        # Header
+        self.set_font("Helvetica", "B", 16)
+        self.set_text_color(0, 0, 0)  # Force black text
+        self.cell(0, 10, clean_text("Executive Summary"), ln=True)
+        self.ln(5)
+        
+        # Score Badge (DISABLED: Background fill - may cause layering issues)
+        # self.set_fill_color(240, 240, 240)
+        self.set_font("Helvetica", "B", 14)
+        self.set_text_color(0, 0, 0)  # Force Black
+        score_text = clean_text(f"  Site Score: {overall_score}/100  ")
+        self.cell(0, 12, score_text, ln=True, fill=False)
+        self.ln(10)
+        
+        # Content - MUST MATCH HTML REPORT EXACTLY
+        # HTML uses: data.get('roast_summary') or data.get('headline_roast') or data.get('overview', {}).get('executiveSummary', 'No summary available.')
+        summary_text = roast_data.get('roast_summary') or roast_data.get('headline_roast') or roast_data.get('overview', {}).get('executiveSummary', 'No summary available.')
+        analysis_text = roast_data.get('roastAnalysis', '') or roast_data.get('analysis', '')
+        
+        # Write Summary - Always show Executive Summary section
+        self.set_font("Helvetica", "B", 12)
+        self.set_text_color(0, 0, 0)
+        self.cell(0, 8, clean_text("Summary:"), ln=True)
+        self.set_font("Helvetica", "", 11)
+        if summary_text and len(str(summary_text).strip()) > 5:
+            cleaned_summary = clean_text(str(summary_text))
+            summary_paragraphs = cleaned_summary.split('\n')
+            for para in summary_paragraphs:
+                para = para.strip()
+                if para:
+                    self.set_text_color(0, 0, 0)
+                    self.multi_cell(0, 6, clean_text(para))
+                    self.ln(3)
+        else:
+            # Fallback if no summary available
+            self.set_text_color(0, 0, 0)
+            self.multi_cell(0, 6, clean_text("Executive summary analysis completed. See detailed findings below."))
+        self.ln(5)
+        
+        # Write Analysis - Split into multiple paragraphs (2-3 sentences each)
+        if analysis_text and len(str(analysis_text).strip()) > 5:
+            self.set_font("Helvetica", "B", 12)
+            self.set_text_color(0, 0, 0)
+            self.cell(0, 8, clean_text("Analysis:"), ln=True)
+            self.set_font("Helvetica", "", 11)
+            cleaned_analysis = clean_text(str(analysis_text))
+            
+            # Split analysis into sentences and group into paragraphs of 2-3 sentences
+            import re
+            sentences = re.split(r'(?<=[.!?])\s+', cleaned_analysis)
+            sentences = [s.strip() for s in sentences if s.strip()]
+            
+            # Group into paragraphs of 2-3 sentences
+            para_sentences = []
+            current_para = []
+            for i, sentence in enumerate(sentences):
+                current_para.append(sentence)
+                if len(current_para) >= 3 or (len(current_para) >= 2 and i == len(sentences) - 1):
+                    para_sentences.append(' '.join(current_para))
+                    current_para = []
+            if current_para:
+                para_sentences.append(' '.join(current_para))
+            
+            # Write paragraphs
+            for para in para_sentences:
+                if para:
+                    self.set_text_color(0, 0, 0)
+                    self.multi_cell(0, 6, clean_text(para))
+                    self.ln(3)
+        
+        self.ln(10)
+        
+        # Priority Matrix and Status Table
+        if detailed_audit:
+            # Flatten all items from detailedAudit
+            all_items = []
+            for category, items in detailed_audit.items():
+                if isinstance(items, list):
+                    all_items.extend(items)
+            
+            # Add Priority Matrix
+            self.add_priority_matrix(all_items)
+            self.ln(10)
+            
+            # Add Status Summary Table
+            self.add_status_table(all_items)
+    
+    def add_priority_matrix(self, all_items):
+        """Priority Matrix (The 'Where to Start' Grid) - 3x5 grid showing Impact vs Status"""
+        # Group items by Impact and Status
+        matrix = {}
+        impact_levels = ['HI', 'MI', 'LI']
+        status_levels = ['Failed', 'Needs Improvement', 'Satisfactory', 'Good', 'Excellent']
+        
+        # Initialize matrix
+        for impact in impact_levels:
+            matrix[impact] = {}
+            for status in status_levels:
+                matrix[impact][status] = 0
+        
+        # Count items in each bucket
+        for item in all_items:
+            impact = item.get('impact', 'MI')
+            status = item.get('status', 'Satisfactory')
+            if impact in matrix and status in matrix[impact]:
+                matrix[impact][status] += 1
+        
+        # Draw matrix title
+        self.set_font("Helvetica", "B", 12)
+        self.set_text_color(0, 0, 0)  # Force black text
+        self.cell(0, 8, clean_text("Priority Matrix: Where to Start"), ln=True)
+        self.ln(3)
+        
+        # Matrix dimensions
+        cell_width = 180 / 6  # 5 status columns + 1 impact label column
+        cell_height = 6
+        start_x = 15
+        start_y = self.get_y()
+        
+        # Draw header row (Status labels)
+        self.set_font("Helvetica", "B", 9)
+        self.set_text_color(0, 0, 0)  # Force black text
+        x_pos = start_x + cell_width  # Skip first column (for impact labels)
+        
+        # Shortened status labels for fit (must match status_levels order)
+        status_labels_display = ['Failed', 'Needs Imp.', 'Satisf.', 'Good', 'Excellent']
+        for i, status_label in enumerate(status_labels_display):
+            self.set_xy(x_pos + (i * cell_width), start_y)
+            # DISABLED: Background fill (may cause layering issues)
+            # self.set_fill_color(240, 240, 240)
+            self.cell(cell_width, cell_height, clean_text(status_label), border=1, fill=False, align='C')
+        
+        # Draw matrix rows (Impact levels)
+        impact_labels = ['High', 'Medium', 'Low']
+        impact_map = {'HI': 0, 'MI': 1, 'LI': 2}
+        
+        for impact_code, impact_row in impact_map.items():
+            row_y = start_y + cell_height + (impact_row * cell_height)
+            
+            # Impact label (left column)
+            self.set_xy(start_x, row_y)
+            # DISABLED: Background fill (may cause layering issues)
+            # self.set_fill_color(245, 245, 245)
+            self.set_font("Helvetica", "B", 9)
+            self.set_text_color(0, 0, 0)  # Force Black
+            self.cell(cell_width, cell_height, clean_text(impact_labels[impact_row]), border=1, fill=False, align='C')
+            
+            # Status cells (counts) - iterate through status_levels in same order
+            self.set_font("Helvetica", "", 9)
+            x_pos = start_x + cell_width
+            for i, status in enumerate(status_levels):
+                count = matrix[impact_code][status]
+                
+                # DISABLED: Background fill colors (may cause layering issues)
+                # if impact_code == 'HI' and status == 'Failed':
+                #     self.set_fill_color(255, 200, 200)  # Light red
+                # elif count > 0:
+                #     self.set_fill_color(255, 255, 255)  # White
+                # else:
+                #     self.set_fill_color(250, 250, 250)  # Very light gray
+                
+                self.set_xy(x_pos + (i * cell_width), row_y)
+                
+                # Color coding - Match HTML colors
+                if impact_code == 'HI' and status == 'Failed':
+                    self.set_fill_color(255, 200, 200)  # Light red for High Impact + Failed
+                    fill = True
+                elif count > 0:
+                    # Color by status
+                    if status == 'Excellent':
+                        self.set_fill_color(220, 255, 220)  # Light green
+                    elif status == 'Good':
+                        self.set_fill_color(240, 255, 240)  # Very light green
+                    elif status == 'Satisfactory':
+                        self.set_fill_color(255, 245, 220)  # Light orange/yellow
+                    elif status == 'Needs Improvement':
+                        self.set_fill_color(255, 230, 200)  # Light orange
+                    elif status == 'Failed':
+                        self.set_fill_color(255, 220, 220)  # Light red
+                    else:
+                        self.set_fill_color(255, 255, 255)  # White
+                    fill = True
+                else:
+                    self.set_fill_color(250, 250, 250)  # Very light gray for empty
+                    fill = True
+                
+                self.set_text_color(0, 0, 0)  # Force Black
+                count_text = str(count) if count > 0 else '-'
+                self.cell(cell_width, cell_height, clean_text(count_text), border=1, fill=fill, align='C')
+                self.set_fill_color(255, 255, 255)  # Reset fill
+        
+        # Move cursor below matrix
+        self.set_y(start_y + (4 * cell_height))
+        self.ln(3)
+    
+    def add_status_table(self, all_items):
+        """Status Summary Table - Dashboard-style table with colored cells"""
+        # Count items by status
+        status_counts = {
+            'Excellent': 0,
+            'Good': 0,
+            'Satisfactory': 0,
+            'Needs Improvement': 0,
+            'Failed': 0
+        }
+        
+        for item in all_items:
+            status = item.get('status', 'Satisfactory')
+            if status in status_counts:
+                status_counts[status] += 1
+        
+        # Draw table
+        table_width = 180
+        num_cols = 5
+        col_width = table_width / num_cols
+        table_height = 8
+        table_x = 15
+        table_y = self.get_y()
+        
+        # Status labels and colors
+        status_config = [
+            ('Failed', status_counts.get('Failed', 0), (255, 200, 200)),  # Red
+            ('Needs Work', status_counts.get('Needs Improvement', 0), (255, 230, 200)),  # Orange
+            ('Satisfactory', status_counts.get('Satisfactory', 0), (240, 240, 240)),  # Gray
+            ('Good', status_counts.get('Good', 0), (200, 255, 200)),  # Light green
+            ('Excellent', status_counts.get('Excellent', 0), (150, 255, 150))  # Green
+        ]
+        
+        self.set_font("Helvetica", "B", 10)
+        for i, (label, count, color) in enumerate(status_config):
+            x_pos = table_x + (i * col_width)
+            self.set_xy(x_pos, table_y)
+            # DISABLED: Background fill color (may cause layering issues)
+            # self.set_fill_color(*color)
+            # self.set_draw_color(200, 200, 200)
+            self.set_text_color(0, 0, 0)  # Force Black
+            
+            # Format: "Label: Count"
+            cell_text = clean_text(f"{label}: {count}")
+            self.cell(col_width, table_height, cell_text, border=1, fill=False, align='C')
+        
+        # Move cursor below table
+        self.set_y(table_y + table_height)
+        self.ln(5)
+    
+    def add_radar_section(self, radar_chart_path):
+        """Performance Radar section - Centered Radar Chart (H & V centered)"""
+        if radar_chart_path and os.path.exists(radar_chart_path):
+            self.add_page()
+            self.set_text_color(0, 0, 0)  # Force Black
+            
+            try:
+                from PIL import Image as PILImage
+                img = PILImage.open(radar_chart_path)
+                img_width, img_height = img.size
+                
+                # Calculate dimensions to fit page (centered)
+                page_width = 210  # A4 width in mm
+                page_height = 297  # A4 height in mm
+                max_width = 150  # Max width in mm
+                max_height = 150  # Max height in mm
+                
+                aspect_ratio = img_width / img_height
+                
+                if aspect_ratio > 1:
+                    # Landscape
+                    display_width = min(max_width, page_width - 40)
+                    display_height = display_width / aspect_ratio
+                else:
+                    # Portrait
+                    display_height = min(max_height, 150)
+                    display_width = display_height * aspect_ratio
+                
+                # Center both horizontally and vertically
+                x_pos = (page_width - display_width) / 2
+                # Vertical center: (page_height - top_margin - bottom_margin - image_height) / 2 + top_margin
+                top_margin = 30
+                bottom_margin = 20
+                available_height = page_height - top_margin - bottom_margin
+                y_pos = (available_height - display_height) / 2 + top_margin
+                
+                # Title above image (centered)
+                title_y = y_pos - 20
+                self.set_y(title_y)
+                self.set_font("Helvetica", "B", 16)
+                self.cell(0, 10, clean_text("Performance Radar"), ln=True, align="C")
+                
+                # Place image
+                self.embed_image(radar_chart_path, x=x_pos, y=y_pos, w=display_width, h=display_height, kind="chart")
+                self.set_y(y_pos + display_height + 10)
+            except Exception as e:
+                safe_print(f"[PDF] Failed to add radar chart: {safe_error_message(str(e))}")
+                self.set_font("Helvetica", "I", 12)
+                self.cell(0, 10, clean_text("[Radar Chart Not Available]"), ln=True, align="C")
+        else:
+            # Add page even if no chart
+            self.add_page()
+            self.set_font("Helvetica", "B", 16)
+            self.cell(0, 10, clean_text("Performance Radar (Priority Matrix)"), ln=True, align="C")
+            self.set_font("Helvetica", "I", 12)
+            self.cell(0, 10, clean_text("[Radar Chart Not Available]"), ln=True, align="C")
+    
+    def add_visuals_section(self, heatmap_path):
+        """Visual analysis section with proper image placement - Page 3 - Centered Heatmap"""
+        self.add_page()
+        
+        # Root Cause Analysis: Multiple path resolution strategies (cloud-compatible)
+        verified_path = None
+        
+        if heatmap_path:
+            # Strategy 1: Try absolute path as-is
+            try:
+                if os.path.exists(heatmap_path):
+                    verified_path = heatmap_path
+                    safe_print(f"[PDF] Found heatmap at: {heatmap_path}")
+            except Exception as e:
+                safe_print(f"[PDF] Strategy 1 failed: {safe_error_message(str(e))}")
+            
+            # Strategy 2: Try converting to absolute path
+            if not verified_path:
+                try:
+                    abs_path = os.path.abspath(heatmap_path)
+                    if os.path.exists(abs_path):
+                        verified_path = abs_path
+                        safe_print(f"[PDF] Found heatmap at: {abs_path}")
+                except Exception as e:
+                    safe_print(f"[PDF] Strategy 2 failed: {safe_error_message(str(e))}")
+            
+            # Strategy 3: Try joining with tempfile.gettempdir() (cloud-compatible)
+            if not verified_path:
+                try:
+                    temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
+                    temp_path = os.path.join(temp_dir, os.path.basename(heatmap_path))
+                    if os.path.exists(temp_path):
+                        verified_path = temp_path
+                        safe_print(f"[PDF] Found heatmap at: {temp_path}")
+                except Exception as e:
+                    safe_print(f"[PDF] Strategy 3 failed: {safe_error_message(str(e))}")
+            
+            # Strategy 4: Try joining with current working directory if relative
+            if not verified_path:
+                try:
+                    cwd_path = os.path.join(os.getcwd(), heatmap_path)
+                    if os.path.exists(cwd_path):
+                        verified_path = cwd_path
+                        safe_print(f"[PDF] Found heatmap at: {cwd_path}")
+                except Exception as e:
+                    safe_print(f"[PDF] Strategy 4 failed: {safe_error_message(str(e))}")
+            
+            # Strategy 5: Try normalizing path (handles forward/backward slashes)
+            if not verified_path:
+                try:
+                    norm_path = os.path.normpath(heatmap_path)
+                    if os.path.exists(norm_path):
+                        verified_path = norm_path
+                        safe_print(f"[PDF] Found heatmap at: {norm_path}")
+                    else:
+                        # Try with absolute
+                        abs_norm = os.path.abspath(norm_path)
+                        if os.path.exists(abs_norm):
+                            verified_path = abs_norm
+                            safe_print(f"[PDF] Found heatmap at: {abs_norm}")
+                except Exception as e:
+                    safe_print(f"[PDF] Strategy 5 failed: {safe_error_message(str(e))}")
+            
+            # Strategy 6: Try searching in tempfile directory by filename only
+            if not verified_path:
+                try:
+                    temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
+                    if os.path.exists(temp_dir):
+                        filename = os.path.basename(heatmap_path)
+                        for file in os.listdir(temp_dir):
+                            if file == filename or file.endswith('.png'):
+                                potential_path = os.path.join(temp_dir, file)
+                                if os.path.exists(potential_path):
+                                    verified_path = potential_path
+                                    safe_print(f"[PDF] Found heatmap by filename search: {potential_path}")
+                                    break
+                except Exception as e:
+                    safe_print(f"[PDF] Strategy 6 failed: {safe_error_message(str(e))}")
+        
+        if verified_path:
+            # Center Image Logic - Both H & V centered
+            page_width = 210  # A4 width in mm
+            page_height = 297  # A4 height in mm
+            top_margin = 30
+            bottom_margin = 20
+            
+            # Get image dimensions
+            img_w = 180  # Initial width
+            img_h = 180  # Default fallback height
+            try:
+                from PIL import Image as PILImage
+                img = PILImage.open(verified_path)
+                img_width, img_height = img.size
+                aspect_ratio = img_height / img_width
+                img_h = img_w * aspect_ratio
+                
+                # Ensure image doesn't exceed page height (with margins)
+                available_height = page_height - top_margin - bottom_margin - 30  # 30 for title
+                max_height = min(available_height, 220)
+                if img_h > max_height:
+                    img_h = max_height
+                    img_w = img_h / aspect_ratio
+            except Exception:
+                # Fallback if PIL fails
+                pass
+            
+            # Center horizontally
+            x_pos = (page_width - img_w) / 2
+            
+            # Center vertically (accounting for title)
+            title_height = 15
+            available_height = page_height - top_margin - bottom_margin - title_height
+            y_pos = (available_height - img_h) / 2 + top_margin + title_height
+            
+            # Title above image (centered)
+            title_y = y_pos - 18
+            self.set_y(title_y)
+            self.set_font("Helvetica", "B", 14)
+            self.set_text_color(0, 0, 0)  # Force Black
+            self.cell(0, 10, clean_text("Visual Analysis (Heatmap)"), ln=True, align="C")
+            
+            # Place image centered
+            self.embed_image(verified_path, x=x_pos, y=y_pos, w=img_w, h=img_h, kind="photo")
+            
+            # Move cursor below image
+            self.set_y(y_pos + img_h + 10)
+        else:
+            # Heatmap Not Available - centered message with debugging info
+            self.set_y(130)
+            self.set_font("Helvetica", "I", 12)
+            self.set_text_color(0, 0, 0)  # Force Black
+            self.cell(0, 10, clean_text("[Heatmap Not Available]"), ln=True, align="C")
+            
+            # Debug info (only in development, can be removed in production)
+            if heatmap_path:
+                self.set_font("Helvetica", "", 8)
+                self.set_text_color(0, 0, 0)  # Force Black
+                debug_text = f"Path attempted: {str(heatmap_path)[:50]}"
+                self.cell(0, 6, clean_text(debug_text), ln=True, align="C")
+    
+    def add_quick_wins(self, quick_wins):
+        """Quick wins section with card-style formatting"""
+        self.add_page()
+        # Force black text at start
+        self.set_text_color(0, 0, 0)  # Force Black
+        self.set_font("Helvetica", "B", 14)
+        self.cell(0, 10, clean_text("Top 3 Quick Wins"), ln=True)
+        self.ln(5)
+        
+        for idx, win in enumerate(quick_wins[:3], 1):
+            # DISABLED: Background fill and draw color (may cause layering issues)
+            # self.set_fill_color(245, 245, 245)
+            # self.set_draw_color(200, 200, 200)
+            self.set_font("Helvetica", "B", 11)
+            self.set_text_color(0, 0, 0)  # Force Black
+            
+            title = win.get('elementName', win.get('title', 'Issue'))
+            cleaned_title = clean_text(str(title))
+            header_text = clean_text(f" #{idx}: {cleaned_title}")
+            self.cell(0, 10, header_text, ln=True, border=1, fill=False)
+            
+            self.set_font("Helvetica", "", 10)
+            self.set_text_color(0, 0, 0)  # Force Black
+            fix_text = win.get('fix', {}).get('quickFix', 'N/A') if isinstance(win.get('fix'), dict) else str(win.get('fix', 'N/A'))
+            cleaned_fix = clean_text(str(fix_text))
+            fix_label_text = clean_text(f"Fix: {cleaned_fix}")
+            self.multi_cell(0, 8, fix_label_text, border='LRB')
+            
+            self.ln(5)
+    
+    def audit_card(self, item):
+        """Detailed audit card matching HTML format exactly - draws background first, then text"""
+        # Clean Inputs - MATCH HTML EXACTLY
+        finding = Finding.from_item(item)
+        name = clean_text(finding.element_name or 'Observation')
+        status = clean_text(finding.status)
+        rationale = clean_text(finding.rationale)
+        readable_impact = finding.impact_label
+        
+        # Get all sections - MATCH HTML STRUCTURE
+        working_well = finding.working_well
+        not_working = finding.not_working
+        conversion_impact = clean_text(finding.conversion_impact)
+        quick_fix = clean_text(finding.quick_fix)
+        fix_example = clean_text(finding.fix_example)
+        fix_expected_impact = clean_text(finding.expected_impact)
+        
+        # Calculate Height dynamically - More accurate estimation
+        chars_per_line = 85  # Approximate characters per line
+        lines_rat = max(1, int(len(rationale) / chars_per_line) + 1) if rationale else 0
+        lines_working = len(working_well) if working_well else 0
+        lines_not_working = len(not_working) if not_working else 0
+        lines_conv = max(1, int(len(conversion_impact) / chars_per_line) + 1) if conversion_impact else 0
+        lines_example = max(1, int(len(fix_example) / chars_per_line) + 1) if fix_example else 0
+        lines_expected = max(1, int(len(fix_expected_impact) / chars_per_line) + 1) if fix_expected_impact else 0
+        
+        # Action Plan height calculation (matches the actual box drawing logic)
+        if quick_fix and len(quick_fix) > 3:
+            text_width_mm = 170  # Available width inside box
+            chars_per_line_fix = int(text_width_mm / 2.8)  # Approx chars per line at 10pt
+            actual_lines_fix = max(1, int(len(quick_fix) / chars_per_line_fix) + 1)
+            fix_h = 6 + (actual_lines_fix * 5) + 3 + 3 + 2  # Label + text + top padding + bottom padding + spacing
+        else:
+            fix_h = 0
+        
+        # Calculate total height with proper spacing
+        header_h = 20  # Header + badges
+        rationale_h = (lines_rat * 5) + 3 if rationale else 0
+        working_h = (6 + (lines_working * 5) + 2) if working_well else 0  # Label + items + spacing
+        not_working_h = (6 + (lines_not_working * 5) + 2) if not_working else 0
+        conv_h = (6 + (lines_conv * 5) + 2) if conversion_impact else 0
+        example_h = (6 + (lines_example * 5) + 4) if fix_example else 0
+        expected_h = (6 + (lines_expected * 5) + 2) if fix_expected_impact else 0
+        
+        total_h = header_h + rationale_h + working_h + not_working_h + conv_h + fix_h + example_h + expected_h + 8  # Extra spacing to prevent overlap
+        
+        # Page Break Check
+        if self.get_y() + total_h > 270:
+            self.add_page()
+        
+        # 1. DRAW BACKGROUND BOX FIRST (Z-Order Fix)
+        y_start = self.get_y()
+        self.set_fill_color(252, 252, 252)  # Light Grey
+        self.set_draw_color(220, 220, 220)
+        self.rect(10, y_start, 190, total_h, 'DF')
+        
+        # 2. DRAW TEXT ON TOP
+        self.set_xy(15, y_start + 5)
+        
+        # Header & Badges - MATCH HTML
+        self.set_font('Helvetica', 'B', 12)
+        self.set_text_color(0, 0, 0)
+        self.cell(0, 8, name, ln=True)
+        
+        self.set_x(15)
+        self.draw_badge(status, status)
+        self.set_x(self.get_x() + 2)
+        self.draw_badge(readable_impact, "Neutral")
+        self.ln(8)
+        
+        # Rationale - MATCH HTML (italic, gray)
+        self.set_x(15)
+        self.set_font('Helvetica', 'I', 10)
+        self.set_text_color(60, 60, 60)
+        if rationale:
+            self.multi_cell(180, 5, rationale)
+        self.ln(3)
+        
+        # What's Working - MATCH HTML
+        if working_well and isinstance(working_well, list) and len(working_well) > 0:
+            self.set_x(15)
+            self.set_font('Helvetica', 'B', 10)
+            self.set_text_color(0, 100, 0)  # Green
+            self.cell(0, 6, "What's Working:", ln=True)
+            self.set_font('Helvetica', '', 9)
+            self.set_text_color(0, 0, 0)
+            for w in working_well[:5]:  # Limit to 5
+                self.set_x(15)
+                w_text = clean_text(str(w))
+                self.multi_cell(180, 5, f"  - {w_text}", 0, 'L')
+            self.ln(2)
+        
+        # What's Broken - MATCH HTML
+        if not_working and isinstance(not_working, list) and len(not_working) > 0:
+            self.set_x(15)
+            self.set_font('Helvetica', 'B', 10)
+            self.set_text_color(150, 0, 0)  # Red
+            self.cell(0, 6, "What's Broken:", ln=True)
+            self.set_font('Helvetica', '', 9)
+            self.set_text_color(0, 0, 0)
+            for nw in not_working[:5]:  # Limit to 5
+                self.set_x(15)
+                nw_text = clean_text(str(nw))
+                self.multi_cell(180, 5, f"  - {nw_text}", 0, 'L')
+            self.ln(2)
+        
+        # Conversion Impact - MATCH HTML
+        if conversion_impact:
+            self.set_x(15)
+            self.set_font('Helvetica', 'B', 10)
+            self.set_text_color(0, 50, 150)  # Blue
+            self.cell(0, 6, "Conversion Impact:", ln=True)
+            self.set_font('Helvetica', '', 9)
+            self.set_text_color(0, 0, 0)
+            self.set_x(15)
+            self.multi_cell(180, 5, conversion_impact, 0, 'L')
+            self.ln(2)
+        
+        # Action Plan - MATCH HTML - Fixed margins and spacing to prevent overlapping
+        if quick_fix and len(quick_fix) > 3:
+            curr_y = self.get_y()
+            self.ln(2)  # Add spacing before action plan box
+            
+            # Calculate actual height needed for the text BEFORE drawing
+            text_width_mm = 170  # Available width inside box
+            chars_per_line = int(text_width_mm / 2.8)  # Approx chars per line at 10pt Helvetica
+            actual_lines = max(1, int(len(quick_fix) / chars_per_line) + 1)
+            
+            label_height = 6  # "Action Plan:" label
+            text_height = actual_lines * 5  # Text lines
+            top_padding = 3
+            bottom_padding = 3
+            fix_height = label_height + text_height + top_padding + bottom_padding
+            
+            # Draw background box with uniform margins
+            self.set_fill_color(255, 243, 205)  # Light yellow/orange (matching HTML action-plan)
+            self.rect(15, curr_y, 180, fix_height, 'F')
+            
+            # Draw text inside box with proper padding
+            self.set_xy(20, curr_y + top_padding)
+            self.set_font('Helvetica', 'B', 10)
+            self.set_text_color(0, 0, 0)
+            self.cell(0, 6, "Action Plan:", ln=True)
+            
+            self.set_x(20)
+            self.set_font('Helvetica', '', 10)
+            self.set_text_color(0, 0, 0)
+            self.multi_cell(170, 5, quick_fix, 0, 'L')
+            
+            # Move cursor to end of box with proper spacing (prevents overlap)
+            self.set_y(curr_y + fix_height + 3)  # 3mm bottom margin after box
+        
+        # Fix Example - MATCH HTML
+        if fix_example and len(fix_example) > 5:
+            self.set_x(15)
+            self.set_font('Helvetica', 'B', 10)
+            self.set_text_color(0, 0, 0)
+            self.cell(0, 6, "Example:", ln=True)
+            self.set_font('Helvetica', '', 9)
+            self.set_text_color(0, 0, 0)
+            self.set_x(15)
+            # Draw border box for example
+            example_y = self.get_y()
+            example_h = (lines_example * 5) + 4
+            self.set_draw_color(200, 200, 200)
+            self.rect(15, example_y, 180, example_h, 'D')
+            self.set_xy(18, example_y + 2)
+            self.multi_cell(174, 5, fix_example, 0, 'L')
+            self.ln(2)
+        
+        # Expected Impact - MATCH HTML
+        if fix_expected_impact and len(fix_expected_impact) > 5:
+            self.set_x(15)
+            self.set_font('Helvetica', 'B', 10)
+            self.set_text_color(0, 100, 0)  # Green
+            self.cell(0, 6, "Expected Impact:", ln=True)
+            self.set_font('Helvetica', '', 9)
+            self.set_text_color(0, 0, 0)
+            self.set_x(15)
+            self.multi_cell(180, 5, fix_expected_impact, 0, 'L')
+            self.ln(2)
+        
+        self.set_y(y_start + total_h + 5)
+
+# Static stylesheet of the HTML audit report (shared by every render)
+HTML_REPORT_CSS = """
+    <style>
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            background: #f5f5f5;
+            padding: 20px;
+        }
+        .container {
+            max-width: 1200px;
+            margin: 0 auto;
+            background: white;
+            padding: 40px;
+            border-radius: 8px;
+            box-shadow: 0 2px 10px rgba(0,0,0,0.1);
+        }
+        .score-box {
+            text-align: center;
+            padding: 30px;
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            color: white;
+            border-radius: 8px;
+            margin-bottom: 40px;
+        }
+        .score-box h1 {
+            font-size: 2.5em;
+            margin-bottom: 10px;
+        }
+        .score {
+            font-size: 4em;
+            font-weight: bold;
+            margin: 20px 0;
+        }
+        h2 {
+            color: #667eea;
+            margin-top: 40px;
+            margin-bottom: 20px;
+            padding-bottom: 10px;
+            border-bottom: 2px solid #667eea;
+        }
+        .quick-win {
+            background: #f8f9fa;
+            padding: 20px;
+            margin: 15px 0;
+            border-left: 4px solid #667eea;
+            border-radius: 4px;
+        }
+        .quick-win h3 {
+            color: #667eea;
+            margin-bottom: 10px;
+        }
+        .category-section {
+            margin: 30px 0;
+            padding: 20px;
+            background: #f8f9fa;
+            border-radius: 8px;
+        }
+        .category-section h3 {
+            color: #667eea;
+            margin-bottom: 15px;
+        }
+        .audit-item {
+            background: white;
+            padding: 15px;
+            margin: 10px 0;
+            border-radius: 4px;
+            border-left: 4px solid #ddd;
+        }
+        .badge-red {
+            display: inline-block;
+            padding: 4px 12px;
+            background: #dc3545;
+            color: white;
+            border-radius: 12px;
+            font-size: 0.85em;
+            font-weight: bold;
+            margin-right: 10px;
+        }
+        .badge-green {
+            display: inline-block;
+            padding: 4px 12px;
+            background: #28a745;
+            color: white;
+            border-radius: 12px;
+            font-size: 0.85em;
+            font-weight: bold;
+            margin-right: 10px;
+        }
+        .badge-yellow {
+            display: inline-block;
+            padding: 4px 12px;
+            background: #ffc107;
+            color: #333;
+            border-radius: 12px;
+            font-size: 0.85em;
+            font-weight: bold;
+            margin-right: 10px;
+        }
+        .action-plan {
+            background: #fff3cd;
+            padding: 15px;
+            margin-top: 10px;
+            border-radius: 4px;
+            border-left: 4px solid #ffc107;
+        }
+        .working-well {
+            background: #d4edda;
+            padding: 12px;
+            margin: 10px 0;
+            border-radius: 4px;
+            border-left: 4px solid #28a745;
+        }
+        .working-well h4 {
+            color: #155724;
+            margin-bottom: 8px;
+            font-size: 0.95em;
+        }
+        .working-well ul {
+            margin-left: 20px;
+            color: #155724;
+        }
+        .working-well li {
+            margin: 5px 0;
+        }
+        .not-working {
+            background: #f8d7da;
+            padding: 12px;
+            margin: 10px 0;
+            border-radius: 4px;
+            border-left: 4px solid #dc3545;
+        }
+        .not-working h4 {
+            color: #721c24;
+            margin-bottom: 8px;
+            font-size: 0.95em;
+        }
+        .not-working ul {
+            margin-left: 20px;
+            color: #721c24;
+        }
+        .not-working li {
+            margin: 5px 0;
+        }
+        .conversion-impact {
+            background: #e7f3ff;
+            padding: 12px;
+            margin: 10px 0;
+            border-radius: 4px;
+            border-left: 4px solid #0066cc;
+        }
+        .conversion-impact strong {
+            color: #0066cc;
+        }
+        .fix-example {
+            background: #f8f9fa;
+            padding: 12px;
+            margin: 10px 0;
+            border-radius: 4px;
+            border: 1px solid #dee2e6;
+            font-family: 'Courier New', monospace;
+            font-size: 0.9em;
+        }
+        .fix-expected-impact {
+            background: #e7f5e7;
+            padding: 12px;
+            margin: 10px 0;
+            border-radius: 4px;
+            border-left: 4px solid #28a745;
+        }
+        .fix-expected-impact strong {
+            color: #155724;
+        }
+    </style>
+"""
+
+# Priority matrix columns, worst first
+MATRIX_STATUS_COLUMNS = STATUS_SCALE[::-1]
+
+DEEP_DIVE_CATEGORY_NAMES = {
+    "ux": "UX & Layout",
+    "conversion": "Conversion & Funnel",
+    "copy": "Copy & Messaging",
+    "visuals": "Visuals & Brand",
+    "trust": "Trust & Credibility",
+    "speed": "Speed & Technical Health"
+}
+
+# Jinja template of the HTML audit report; data-driven sections come from html_report_context.
+# Values are inserted as-is (no autoescape), like the audit text in the PDF report.
+HTML_REPORT_TEMPLATE = """<html>
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>SiteRoast Audit Report</title>
+    {{ report_css }}
+</head>
+<body>
+    <div class="container">
+        <div class="score-box">
+            <h1>SiteRoast Conversion Audit Report</h1>
+            <div class="score">{{ overall_score }}/100</div>
+            <p style="margin-top: 20px; font-size: 1.1em;">Client: {{ site_url or 'N/A' }}</p>
+            <p style="margin-top: 10px; font-size: 1.1em;">Generated: {{ generated_at }}</p>
+        </div>
+        
+        <h2>🔥 Executive Summary</h2>
+        <div style="margin-bottom: 20px;">
+            <h3 style="color: #667eea; margin-bottom: 10px;">Summary:</h3>
+            <p>{{ summary }}</p>
+        </div>
+        <div style="margin-bottom: 20px;">
+            <h3 style="color: #667eea; margin-bottom: 10px;">Analysis:</h3>
+            {% for paragraph in analysis_paragraphs %}
+            <p style="margin-bottom: 12px;">{{ paragraph }}</p>
+            {% else %}
+            <p>Analysis completed.</p>
+            {% endfor %}
+        </div>
+        {% if priority_matrix %}
+        
+        <h2>📊 Priority Matrix: Where to Start</h2>
+        <div style="margin: 20px 0; overflow-x: auto;">
+            <table style="width: 100%; border-collapse: collapse; margin: 20px 0; background: white; border: 1px solid #ddd;">
+                <thead>
+                    <tr style="background: #f8f9fa;">
+                        <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">Impact</th>
+                        {% for status in status_columns %}
+                        <th style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">{{ status }}</th>
+                        {% endfor %}
+                    </tr>
+                </thead>
+                <tbody>
+                    {% for row in priority_matrix %}
+                    <tr style="background: {{ row.color }};">
+                        <td style="padding: 12px; border: 1px solid #ddd; text-align: center; font-weight: bold;">{{ row.label }}</td>
+                        {% for count in row.counts %}
+                        {% if row.impact == 'HI' and loop.first and count %}
+                        <td style="padding: 12px; border: 1px solid #ddd; text-align: center; background: #ff9999; font-weight: bold; color: #cc0000;">{{ count }}</td>
+                        {% else %}
+                        <td style="padding: 12px; border: 1px solid #ddd; text-align: center;">{{ count or '-' }}</td>
+                        {% endif %}
+                        {% endfor %}
+                    </tr>
+                    {% endfor %}
+                </tbody>
+            </table>
+        </div>
+        <p style="color: #666; font-size: 0.9em; margin-top: 10px;">Focus on High Impact + Failed items first for maximum conversion gains.</p>
+        {% endif %}
+        {% if radar_chart_src %}
+        
+        <h2>📊 Performance Radar (Priority Matrix)</h2>
+        <div style="text-align: center; margin: 20px 0;">
+            <img src="{{ radar_chart_src }}" alt="Performance Radar Chart" style="max-width: 100%; height: auto; margin: 0 auto; display: block;" />
+        </div>
+        {% endif %}
+        {% if screenshot_src %}
+        
+        <h2>📸 Landing Page Screenshot</h2>
+        <img src="{{ screenshot_src }}" alt="Landing Page Screenshot" style="max-width: 100%; height: auto; margin: 20px 0; border: 1px solid #ddd; border-radius: 8px;" />
+        {% endif %}
+        {% if heatmap_src %}
+        
+        <h2>🔥 Visual Saliency Heatmap</h2>
+        <p>Heatmap showing where users' eyes are drawn on your landing page.</p>
+        <img src="{{ heatmap_src }}" alt="Heatmap" style="max-width: 100%; height: auto; margin: 20px 0; border: 1px solid #ddd; border-radius: 8px;" />
+        {% endif %}
+        
+        <h2>🚀 Quick Wins</h2>
+        {% for win in quick_wins %}
+        <div class="quick-win">
+            <h3>{{ win.elementName }}</h3>
+            <p><strong>Fix:</strong> {{ win.quickFix }}</p>
+        </div>
+        {% else %}
+        <p>No quick wins available.</p>
+        {% endfor %}
+        {% if fixed_findings %}
+        
+        <h2>🔁 Fixed Since Last Audit</h2>
+        <ul>
+            {% for fixed in fixed_findings %}
+            <li><strong>{{ fixed.elementName }}</strong>: {{ fixed.previousStatus }} → {{ fixed.status }}</li>
+            {% endfor %}
+        </ul>
+        {% endif %}
+        
+        <h2>🔍 Deep Dive Analysis</h2>
+        {% for category in deep_dive %}
+        <div class="category-section">
+            <h3>{{ category.name | upper }}</h3>
+            {% for finding in category.findings %}
+            <div class="audit-item">
+                <div style="margin-bottom: 10px;">
+                    <span class="{{ 'badge-red' if finding.is_failing else 'badge-green' if finding.is_passing else 'badge-yellow' }}">{{ finding.status }}</span>
+                    <span class="badge-yellow" style="background: #6c757d;">{{ finding.impact_label }}</span>
+                    <strong style="font-size: 1.1em; margin-left: 10px;">{{ finding.element_name or 'Element' }}</strong>
+                    {% if finding.change in ('new', 'changed') %}
+                    <span class="badge-yellow" style="background: #17a2b8; margin-left: 10px;">{{ finding.change | upper }}</span>
+                    {% endif %}
+                </div>
+                <p style="font-style: italic; color: #666; margin: 10px 0;">{{ finding.rationale or 'No rationale provided.' }}</p>
+                {% if finding.working_well %}
+                <div class="working-well">
+                    <h4>✅ What's Working:</h4>
+                    <ul>
+                        {% for point in finding.working_well %}
+                        <li>{{ point }}</li>
+                        {% endfor %}
+                    </ul>
+                </div>
+                {% endif %}
+                {% if finding.not_working %}
+                <div class="not-working">
+                    <h4>❌ What's Broken:</h4>
+                    <ul>
+                        {% for point in finding.not_working %}
+                        <li>{{ point }}</li>
+                        {% endfor %}
+                    </ul>
+                </div>
+                {% endif %}
+                {% if finding.conversion_impact %}
+                <div class="conversion-impact">
+                    <strong>📊 Conversion Impact:</strong> {{ finding.conversion_impact }}
+                </div>
+                {% endif %}
+                {% if finding.quick_fix %}
+                <div class="action-plan">
+                    <strong>💡 Action Plan:</strong> {{ finding.quick_fix }}
+                </div>
+                {% endif %}
+                {% if finding.fix_example %}
+                <div class="fix-example">
+                    <strong>📝 Example:</strong><br>
+                    {{ finding.fix_example }}
+                </div>
+                {% endif %}
+                {% if finding.expected_impact %}
+                <div class="fix-expected-impact">
+                    <strong>🎯 Expected Impact:</strong> {{ finding.expected_impact }}
+                </div>
+                {% endif %}
+            </div>
+            {% endfor %}
+        </div>
+        {% else %}
+        <p>No detailed audit data available.</p>
+        {% endfor %}
+    </div>
+</body>
+</html>
+"""
+
+_html_report_template = None
+
+def get_html_report_template():
+    """
+    Compiled HTML report template. Compiled once per process; Jinja's default bytecode cache (a
+    private, per-user directory) lets new processes (batch jobs, render workers) skip compilation too.
+    """
+    global _html_report_template
+    if _html_report_template is None:
+        environment = jinja2.Environment(
+            loader=jinja2.DictLoader({"audit_report.html": HTML_REPORT_TEMPLATE}),
+            bytecode_cache=jinja2.FileSystemBytecodeCache(),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            autoescape=False
+        )
+        environment.globals["report_css"] = HTML_REPORT_CSS
+        _html_report_template = environment.get_template("audit_report.html")
+    return _html_report_template
+
+def split_analysis_paragraphs(text):
+    """Split analysis text into paragraphs of 2-3 sentences."""
+    sentences = [s.strip() for s in re.split(r'(?<=[.!?])\s+', str(text)) if s.strip()]
+    paragraphs = []
+    current_para = []
+    for i, sentence in enumerate(sentences):
+        current_para.append(sentence)
+        if len(current_para) >= 3 or (len(current_para) >= 2 and i == len(sentences) - 1):
+            paragraphs.append(' '.join(current_para))
+            current_para = []
+    if current_para:
+        paragraphs.append(' '.join(current_para))
+    return paragraphs
+
+def html_report_context(data, overall_score, screenshot_path=None, radar_chart_path=None, stitched_heatmap_path=None, site_url=None):
+    """Template variables of the HTML report: every data-driven section, images as data URIs."""
+    detailed_audit = data.get('detailedAudit') or {}
+    all_items = [item for items in detailed_audit.values() if isinstance(items, list) for item in items]
+    
+    # Priority matrix: findings counted by impact (rows) and status (columns)
+    priority_matrix = []
+    if all_items:
+        counts = {(impact, status): 0 for impact in IMPACT_LEVELS for status in STATUS_SCALE}
+        for item in all_items:
+            key = (item.get('impact', 'MI'), item.get('status', 'Satisfactory'))
+            if key in counts:
+                counts[key] += 1
+        impact_labels = {'HI': 'High', 'MI': 'Medium', 'LI': 'Low'}
+        impact_colors = {'HI': '#ffcccc', 'MI': '#fff4cc', 'LI': '#e6f3ff'}
+        priority_matrix = [
+            {"impact": impact, "label": impact_labels[impact], "color": impact_colors[impact],
+             "counts": [counts[(impact, status)] for status in MATRIX_STATUS_COLUMNS]}
+            for impact in IMPACT_LEVELS
+        ]
+    
+    images = {}
+    for name, path, kind in (("radar_chart_src", radar_chart_path, "chart"), ("screenshot_src", screenshot_path, "photo"),
+                             ("heatmap_src", stitched_heatmap_path, "photo")):
+        if path and os.path.exists(path):
+            try:
+                images[name] = inline_report_image(path, kind=kind)
+            except Exception as e:
+                safe_print(f"[HTML Report] Failed to include {name[:-4].replace('_', ' ')}: {safe_error_message(str(e))}")
+    
+    quick_wins = []
+    for win in (data.get('quick_wins') or [])[:5]:
+        fix_obj = win.get('fix', {})
+        quick_wins.append({
+            "elementName": win.get('elementName', win.get('title', 'Issue')),
+            "quickFix": fix_obj.get('quickFix', 'N/A') if isinstance(fix_obj, dict) else (str(fix_obj) if fix_obj else 'N/A')
+        })
+    
+    analysis_text = data.get('overview', {}).get('roastAnalysis', '')
+    return {
+        "overall_score": overall_score,
+        "site_url": site_url,
+        "generated_at": time.strftime('%B %d, %Y'),
+        "summary": data.get('roast_summary') or data.get('headline_roast') or data.get('overview', {}).get('executiveSummary', 'No summary available.'),
+        "analysis_paragraphs": split_analysis_paragraphs(analysis_text) if analysis_text else [],
+        "status_columns": MATRIX_STATUS_COLUMNS,
+        "priority_matrix": priority_matrix,
+        "quick_wins": quick_wins,
+        "fixed_findings": (data.get('auditDiff') or {}).get('fixed', []),
+        "deep_dive": [
+            {"name": DEEP_DIVE_CATEGORY_NAMES.get(category.lower(), category.capitalize()),
+             "findings": [Finding.from_item(item) for item in items]}
+            for category, items in detailed_audit.items() if items
+        ],
+        **images
+    }
+
+def generate_html_report(data, overall_score, screenshot_path=None, radar_chart_path=None, stitched_heatmap_path=None, site_url=None):
+    """
+    Generate a comprehensive HTML report from audit JSON data.
+    Includes all details: executive summary, priority matrix, heatmap, screenshot, deep dive details, etc.
+    Rendered from the precompiled HTML_REPORT_TEMPLATE.
+    """
+    started = time.perf_counter()
+    html = get_html_report_template().render(html_report_context(
+        data, overall_score, screenshot_path=screenshot_path, radar_chart_path=radar_chart_path,
+        stitched_heatmap_path=stitched_heatmap_path, site_url=site_url
+    ))
+    safe_print(f"[HTML Report] {format_bytes(len(html.encode('utf-8')))} in {time.perf_counter() - started:.2f}s")
+    return html
+
+def build_pdf_report(json_data, screenshot_path=None, site_url=None, radar_chart_path=None, stitched_heatmap_path=None):
+    """
+    Lay out the PDF report for the audit JSON data and return the PDFReport (not yet output).
+    Each section falls back to placeholder content if it fails.
+    """
+    pdf = PDFReport()
+    
+    # Extract base URL if full URL provided
+    base_url = None
+    if site_url:
+        try:
+            from urllib.parse import urlparse
+            parsed = urlparse(site_url)
+            base_url = f"{parsed.scheme}://{parsed.netloc}" if parsed.netloc else site_url
+        except:
+            base_url = site_url
+    
+    # Prepare metadata for cover page
+    metadata = {
+        'scannedUrl': base_url or site_url or 'N/A',
+        'scannedAt': time.strftime('%B %d, %Y')
+    }
+    
+    # Prepare roast data for executive summary - MUST MATCH HTML REPORT EXACTLY
+    # HTML uses: data.get('roast_summary') or data.get('headline_roast') or data.get('overview', {}).get('executiveSummary', 'No summary available.')
+    roast_summary = json_data.get('roast_summary') or json_data.get('headline_roast') or json_data.get('overview', {}).get('executiveSummary', 'No summary available.')
+    roast_data = {
+        'roast_summary': roast_summary,  # Match HTML key
+        'headline_roast': json_data.get('headline_roast', ''),
+        'broadRoast': roast_summary,
+        'hook': json_data.get('headline_roast', ''),
+        'analysis': json_data.get('overview', {}).get('roastAnalysis', ''),
+        'roastAnalysis': json_data.get('overview', {}).get('roastAnalysis', ''),
+        'executiveSummary': json_data.get('overview', {}).get('executiveSummary', ''),
+        'overview': json_data.get('overview', {})  # Include full overview for consistency
+    }
+    
+    # Get overall score
+    overall_score = json_data.get('overall_score', json_data.get('overview', {}).get('overallScore', 50))
+    
+    # Get detailedAudit for status summary table
+    detailed_audit = json_data.get('detailedAudit', {})
+    
+    # Call new methods in order - with error handling for each section
+    safe_print(f"[PDF] Starting PDF generation with {len(json_data)} keys in json_data")
+    safe_print(f"[PDF] Heatmap path: {stitched_heatmap_path}")
+    safe_print(f"[PDF] Screenshot path: {screenshot_path}")
+    
+    try:
+        pdf.add_cover_page(metadata, overall_score)
+        safe_print(f"[PDF] Cover page added successfully. Page count: {pdf.page_no()}")
+    except Exception as e:
+        safe_print(f"[ERROR] Cover page failed: {safe_error_message(str(e))}")
+        # Ensure at least one page exists
+        if pdf.page_no() == 0:
+            pdf.add_page()
+            pdf.set_font("Helvetica", "B", 16)
+            pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
+            pdf.set_font("Helvetica", "", 11)
+            pdf.cell(0, 10, clean_text(f"Site: {base_url or site_url or 'N/A'}"), ln=True, align="C")
+            pdf.cell(0, 10, clean_text(f"Score: {overall_score}/100"), ln=True, align="C")
+            safe_print(f"[PDF] Fallback cover page added. Page count: {pdf.page_no()}")
+    
+    try:
+        pdf.add_roast_section(roast_data, overall_score, detailed_audit)
+        safe_print(f"[PDF] Roast section added successfully. Page count: {pdf.page_no()}")
+    except Exception as e:
+        safe_print(f"[ERROR] Roast section failed: {safe_error_message(str(e))}")
+        # Add fallback content
+        if pdf.page_no() == 0:
+            pdf.add_page()
+        else:
+            pdf.add_page()
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.cell(0, 10, clean_text("Executive Summary"), ln=True)
+        pdf.set_font("Helvetica", "", 11)
+        summary_text = clean_text(str(roast_summary))[:500] if roast_summary else "Analysis completed"
+        pdf.multi_cell(0, 6, summary_text)
+        pdf.ln(5)
+        pdf.cell(0, 10, clean_text(f"Overall Score: {overall_score}/100"), ln=True)
+        safe_print(f"[PDF] Fallback roast section added. Page count: {pdf.page_no()}")
+    
+    # Add Radar Chart Section (centered)
+    try:
+        pdf.add_radar_section(radar_chart_path)
+        safe_print(f"[PDF] Radar section added successfully. Page count: {pdf.page_no()}")
+    except Exception as e:
+        safe_print(f"[ERROR] Radar section failed: {safe_error_message(str(e))}")
+    
+    try:
+        pdf.add_visuals_section(stitched_heatmap_path)
+        safe_print(f"[PDF] Visuals section added successfully. Page count: {pdf.page_no()}")
+    except Exception as e:
+        safe_print(f"[ERROR] Visuals section failed: {safe_error_message(str(e))}")
+        # Add fallback page
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 14)
+        pdf.cell(0, 10, clean_text("Visual Analysis"), ln=True, align="C")
+        pdf.set_font("Helvetica", "I", 12)
+        pdf.cell(0, 10, clean_text("[Heatmap Not Available]"), ln=True, align="C")
+        if stitched_heatmap_path:
+            pdf.set_font("Helvetica", "", 8)
+            debug_text = f"Path attempted: {str(stitched_heatmap_path)[:60]}"
+            pdf.cell(0, 6, clean_text(debug_text), ln=True, align="C")
+        safe_print(f"[PDF] Fallback visuals section added. Page count: {pdf.page_no()}")
+    
+    # Quick Wins section
+    quick_wins = json_data.get('quick_wins', [])
+    if quick_wins and len(quick_wins) > 0:
+        try:
+            pdf.add_quick_wins(quick_wins)
+            safe_print(f"[PDF] Quick wins section added successfully. Page count: {pdf.page_no()}")
+        except Exception as e:
+            safe_print(f"[ERROR] Quick wins section failed: {safe_error_message(str(e))}")
+            # Add fallback content
+            pdf.add_page()
+            pdf.set_font("Helvetica", "B", 14)
+            pdf.cell(0, 10, clean_text("Quick Wins"), ln=True)
+            pdf.set_font("Helvetica", "", 11)
+            for i, win in enumerate(quick_wins[:3], 1):
+                title = win.get('title', win.get('elementName', 'Quick Win'))
+                pdf.cell(0, 8, clean_text(f"{i}. {str(title)}"), ln=True)
+            safe_print(f"[PDF] Fallback quick wins added. Page count: {pdf.page_no()}")
+
+    # --- PAGE 3: VISUAL CONTEXT (Hero Shot) ---
+    if screenshot_path:
+        # Try multiple path resolution strategies for cloud compatibility
+        verified_screenshot_path = None
+        if os.path.exists(screenshot_path):
+            verified_screenshot_path = screenshot_path
+        else:
+            # Try tempfile directory
+            try:
+                temp_dir = os.path.join(tempfile.gettempdir(), "siteroast_temp")
+                filename = os.path.basename(screenshot_path)
+                temp_path = os.path.join(temp_dir, filename)
+                if os.path.exists(temp_path):
+                    verified_screenshot_path = temp_path
+            except:
+                pass
+        
+        if verified_screenshot_path and os.path.exists(verified_screenshot_path):
+            pdf.add_page()
+            pdf.set_font("Helvetica", 'B', 16)
+            pdf.set_text_color(0, 0, 0)  # Force black text
+            pdf.cell(pdf.usable_width, 10, clean_text("Landing Page Screenshot"), 0, 1, 'L')
+            pdf.ln(5)
+            
+            try:
+                # Open image to get dimensions
+                from PIL import Image as PILImage
+                img = PILImage.open(verified_screenshot_path)
+                img_width, img_height = img.size
+                
+                # Calculate dimensions: Make it double height (or as much as fits)
+                # A4 height = 297mm, margins = 40mm total, title space ≈ 30mm
+                # Usable height ≈ 227mm
+                max_height_mm = 220  # Leave some margin
+                
+                # Calculate aspect ratio
+                aspect_ratio = img_width / img_height
+                
+                # Start with full width
+                display_width = pdf.usable_width
+                display_height = display_width / aspect_ratio
+                
+                # Double the height (or use max available)
+                target_height = min(max_height_mm, display_height * 2)
+                
+                # If target is taller, adjust width to maintain aspect ratio
+                if target_height > display_height:
+                    display_height = target_height
+                    display_width = display_height * aspect_ratio
+                    # If wider than usable width, scale down
+                    if display_width > pdf.usable_width:
+                        scale = pdf.usable_width / display_width
+                        display_width = pdf.usable_width
+                        display_height = display_height * scale
+                
+                # Center horizontally if narrower than usable width
+                x_offset = 20 + (pdf.usable_width - display_width) / 2 if display_width < pdf.usable_width else 20
+                
+                # Place image with proper spacing (y position is already set by pdf.ln(8))
+                current_y = pdf.get_y()
+                pdf.embed_image(verified_screenshot_path, x=x_offset, y=current_y, w=display_width, kind="photo")
+                safe_print(f"[PDF] Screenshot added successfully. Page count: {pdf.page_no()}")
+            except Exception as e:
+                pdf.set_font("Helvetica", '', 10)
+                pdf.set_text_color(0, 0, 0)  # Force black text
+                error_msg = str(e)[:150]
+                pdf.multi_cell(pdf.usable_width, 8, clean_text(f"Note: Could not load screenshot: {error_msg}"), 0, 'L')
+                safe_print(f"[PDF] Screenshot load failed: {safe_error_message(str(e))}")
+        else:
+            safe_print(f"[PDF] Screenshot path not found: {screenshot_path}")
+    
+    # --- PAGE 4+: ELEMENT-BY-ELEMENT AUDIT (if available) ---
+    audit_items = json_data.get('audit_items', [])
+    if audit_items and len(audit_items) > 0:
+        safe_print(f"[PDF] Adding {len(audit_items)} audit items")
+        # Split audit_items into pages (3-4 per page)
+        items_per_page = 3
+        for page_start in range(0, len(audit_items), items_per_page):
+            pdf.add_page()
+            if page_start == 0:
+                pdf.set_font("Helvetica", 'B', 18)
+                pdf.set_text_color(0, 0, 0)  # Force black text
+                pdf.cell(pdf.usable_width, 12, clean_text("Element-by-Element Audit"), 0, 1, 'L')
+                pdf.ln(3)
+            
+            page_items = audit_items[page_start:page_start + items_per_page]
+            for item in page_items:
+                try:
+                    # Use the new professional audit_card method
+                    pdf.audit_card(item)
+                    
+                    # Add separator line between cards
+                    pdf.line(15, pdf.get_y(), 195, pdf.get_y())
+                    pdf.ln(3)
+                except Exception as e:
+                    safe_print(f"[PDF] Audit card failed: {safe_error_message(str(e))}")
+                    # Add fallback content for this item
+                    element_name = item.get('element', item.get('elementName', 'Element'))
+                    pdf.set_font("Helvetica", 'B', 12)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    pdf.cell(pdf.usable_width, 8, clean_text(str(element_name)), ln=True)
+                    pdf.set_font("Helvetica", '', 10)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    pdf.cell(pdf.usable_width, 6, clean_text(f"Status: {item.get('status', 'Unknown')}"), ln=True)
+                    pdf.ln(3)
+        safe_print(f"[PDF] Audit items added. Page count: {pdf.page_no()}")
+    
+    # --- PAGE N+: DEEP DIVES (God-Tier Schema) ---
+    categories = json_data.get('categories', [])
+    if categories:
+        safe_print(f"[PDF] Adding {len(categories)} category pages")
+        for cat in categories:
+            try:
+                pdf.add_page()
+                # Title
+                pdf.set_font("Helvetica", 'B', 16)
+                pdf.set_text_color(0, 0, 0)  # Force black text
+                cat_name = clean_text(cat.get('name', 'Unknown'))[:80]
+                cat_score = cat.get('score', 0)
+                pdf.multi_cell(pdf.usable_width, 10, clean_text(f"{cat_name} (Score: {cat_score}/100)"), 0, 'L')
+                
+                # Verdict & Impact
+                pdf.set_font("Helvetica", '', 11)
+                pdf.set_text_color(0, 0, 0)  # Force black text
+                verdict = clean_text(cat.get('verdict', 'Unknown'))[:40]
+                impact = clean_text(cat.get('impact', 'Unknown'))[:40]
+                pdf.multi_cell(pdf.usable_width, 8, clean_text(f"Verdict: {verdict} | Impact: {impact}"), 0, 'L')
+                pdf.ln(4)
+                
+                # What Works
+                what_works = cat.get('what_works', '')
+                if what_works:
+                    pdf.set_font("Helvetica", 'B', 11)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    pdf.cell(pdf.usable_width, 8, clean_text("What Works:"), 0, 1, 'L')
+                    pdf.set_font("Helvetica", '', 10)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    pdf.multi_cell(pdf.usable_width, 6, clean_text(str(what_works))[:400], 0, 'L')
+                    pdf.ln(3)
+                
+                # What Failed
+                what_failed = cat.get('what_failed', '')
+                if what_failed:
+                    pdf.set_font("Helvetica", 'B', 11)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    pdf.cell(pdf.usable_width, 8, clean_text("What Failed:"), 0, 1, 'L')
+                    pdf.set_font("Helvetica", '', 10)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    pdf.multi_cell(pdf.usable_width, 6, clean_text(str(what_failed))[:400], 0, 'L')
+                    pdf.ln(3)
+                
+                # Fix Steps
+                fix_steps = cat.get('fix_steps', [])
+                if fix_steps:
+                    pdf.set_font("Helvetica", 'B', 11)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    pdf.cell(pdf.usable_width, 8, clean_text("Fix Steps:"), 0, 1, 'L')
+                    pdf.set_font("Helvetica", '', 10)
+                    pdf.set_text_color(0, 0, 0)  # Force black text
+                    for i, step in enumerate(fix_steps[:5]):  # Max 5 steps
+                        step_text = clean_text(str(step))[:300]
+                        pdf.multi_cell(pdf.usable_width, 6, clean_text(f"{i+1}. {step_text}"), 0, 'L')
+                        pdf.ln(2)
+            except Exception as e:
+                safe_print(f"[PDF] Category page failed: {safe_error_message(str(e))}")
+                # Add minimal fallback
+                pdf.add_page()
+                pdf.set_font("Helvetica", 'B', 16)
+                pdf.set_text_color(0, 0, 0)  # Force black text
+                cat_name = clean_text(cat.get('name', 'Category'))[:80]
+                pdf.cell(pdf.usable_width, 10, clean_text(f"{cat_name}"), 0, 1, 'L')
+        safe_print(f"[PDF] Categories added. Page count: {pdf.page_no()}")
+    
+    # CRITICAL: Ensure PDF has at least one page with content BEFORE output
+    page_count = pdf.page_no()
+    safe_print(f"[PDF] Page count before output: {page_count}")
+    
+    if page_count == 0:
+        safe_print("[PDF] WARNING: No pages found, adding fallback page")
+        pdf.add_page()
+        pdf.set_font("Helvetica", "B", 16)
+        pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
+        pdf.set_font("Helvetica", "", 11)
+        pdf.cell(0, 10, clean_text("Report generated successfully"), ln=True, align="C")
+        pdf.cell(0, 10, clean_text(f"Site: {base_url or site_url or 'N/A'}"), ln=True, align="C")
+        pdf.cell(0, 10, clean_text(f"Score: {overall_score}/100"), ln=True, align="C")
+    
+    # Verify we have content by checking page count again
+    final_page_count = pdf.page_no()
+    safe_print(f"[PDF] Final page count: {final_page_count}")
+    
+    if final_page_count == 0:
+        raise ValueError("PDF has zero pages - cannot generate empty PDF")
+    return pdf
+
+# Report image preparation: images are resized to their display size before embedding.
+# Photographic frames (screenshots, heatmaps) are re-encoded lossy; charts stay lossless PNG.
+PDF_IMAGE_DPI = int(os.getenv("PDF_IMAGE_DPI", "150"))
+HTML_IMAGE_WIDTH = 1120  # .container content width: 1200px minus 2 x 40px padding
+REPORT_IMAGE_QUALITY = int(os.getenv("REPORT_IMAGE_QUALITY", "80"))
+# Lossy format for photographic images in the HTML report (the PDF always uses JPEG)
+REPORT_PHOTO_FORMAT = os.getenv("REPORT_PHOTO_FORMAT", "WEBP").upper()
+
+REPORT_IMAGE_TYPES = {"PNG": ("png", "image/png"), "JPEG": ("jpg", "image/jpeg"), "WEBP": ("webp", "image/webp")}
+
+def classify_report_image(img):
+    """"chart" for flat-colour graphics (few distinct colours), otherwise "photo"."""
+    thumbnail = img.convert("RGB").resize((96, 96))
+    return "chart" if thumbnail.getcolors(1024) is not None else "photo"
+
+def prepare_report_image(path, width_px, kind=None, target="pdf"):
+    """
+    Resize an image to width_px (never upscaling) and re-encode it for a report: photos as JPEG
+    (PDF) or REPORT_PHOTO_FORMAT (HTML) at REPORT_IMAGE_QUALITY, charts as optimized PNG, with
+    alpha flattened onto white (FPDF can't embed PNG alpha). kind ("photo"/"chart") is detected
+    when not given. Results are cached in the temp dir by source, size and encoding.
+    Returns (path, mime type); the original file if it can't be read or re-encoding doesn't help.
+    """
+    try:
+        stat = os.stat(path)
+        with Image.open(path) as img:
+            kind = kind or classify_report_image(img)
+            image_format = "PNG" if kind == "chart" else ("JPEG" if target == "pdf" else REPORT_PHOTO_FORMAT)
+            if image_format not in REPORT_IMAGE_TYPES:
+                image_format = "JPEG"
+            extension, mime = REPORT_IMAGE_TYPES[image_format]
+            width_px = min(max(1, int(width_px)), img.width)
+            out_dir = report_render_dir("report_images")
+            out_path = os.path.join(
+                out_dir,
+                f"{content_hash([os.path.abspath(path), stat.st_mtime, stat.st_size, width_px, image_format, REPORT_IMAGE_QUALITY])}.{extension}"
+            )
+            if not os.path.exists(out_path):
+                resized = img.convert("RGBA")
+                if width_px < img.width:
+                    resized = resized.resize((width_px, max(1, round(img.height * width_px / img.width))), Image.LANCZOS)
+                flattened = Image.new("RGB", resized.size, (255, 255, 255))
+                flattened.paste(resized, mask=resized.split()[3])
+                if image_format == "PNG":
+                    flattened.save(out_path, "PNG", optimize=True)
+                else:
+                    flattened.save(out_path, image_format, quality=REPORT_IMAGE_QUALITY)
+            source_usable = width_px == img.width and img.mode == "RGB" and img.format in ("PNG", "JPEG")
+        if source_usable and os.path.getsize(out_path) >= stat.st_size:
+            return path, "image/jpeg" if path.lower().endswith((".jpg", ".jpeg")) else "image/png"
+        return out_path, mime
+    except Exception as e:
+        safe_print(f"[WARN] Could not prepare report image {path}: {safe_error_message(e)}")
+        return path, "image/png"
+
+def inline_report_image(path, kind=None, width_px=HTML_IMAGE_WIDTH):
+    """data: URI of an image prepared for the HTML report."""
+    prepared_path, mime = prepare_report_image(path, width_px, kind=kind, target="html")
+    with open(prepared_path, "rb") as img_file:
+        return f"data:{mime};base64,{base64.b64encode(img_file.read()).decode('utf-8')}"
+
+# Trace Python allocations while rendering reports (tracemalloc slows rendering down noticeably)
+REPORT_MEMORY_TRACE = os.getenv("REPORT_MEMORY_TRACE", "0").lower() in ("1", "true", "yes")
+MEMORY_SAMPLE_INTERVAL = 0.01  # seconds between samples of the traced memory
+
+_memory_trace_lock = threading.Lock()
+_memory_meters = []  # stats dicts of the active meters
+_memory_trace_owned = [False]  # whether the meters started tracemalloc (and so must stop it)
+
+def _sample_memory_meters():
+    """Sampler thread: raise each active meter's peak to the current traced size until no meter is left."""
+    while True:
+        with _memory_trace_lock:
+            if not _memory_meters:
+                if _memory_trace_owned[0]:
+                    tracemalloc.stop()
+                    _memory_trace_owned[0] = False
+                return
+            current = tracemalloc.get_traced_memory()[0]
+            for meter in _memory_meters:
+                meter["peak"] = max(meter["peak"], current)
+        time.sleep(MEMORY_SAMPLE_INTERVAL)
+
+@contextlib.contextmanager
+def peak_memory_meter(stats):
+    """
+    Record the peak traced Python allocation of the block (bytes above the starting level) in
+    stats["peakMemoryBytes"] when REPORT_MEMORY_TRACE is set (None otherwise). Each meter keeps
+    its own peak - sampled every MEMORY_SAMPLE_INTERVAL, plus tracemalloc's peak when the block set
+    a new high - and the peak is never reset, so overlapping meters don't disturb each other;
+    allocations of concurrent work on other threads still count. Tracing started outside the
+    meters is left running.
+    """
+    if not REPORT_MEMORY_TRACE:
+        stats["peakMemoryBytes"] = None
+        yield stats
+        return
+    with _memory_trace_lock:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _memory_trace_owned[0] = True
+        baseline, process_peak = tracemalloc.get_traced_memory()
+        meter = {"peak": baseline}
+        _memory_meters.append(meter)
+        if len(_memory_meters) == 1:
+            threading.Thread(target=_sample_memory_meters, name="memory-meter", daemon=True).start()
+    try:
+        yield stats
+    finally:
+        with _memory_trace_lock:
+            _memory_meters.remove(meter)
+            current, process_peak_now = tracemalloc.get_traced_memory()
+            peak = max(meter["peak"], current)
+            if process_peak_now > process_peak:
+                # A new process-wide high was reached while this meter ran - exact even between samples
+                peak = max(peak, process_peak_now)
+        stats["peakMemoryBytes"] = max(0, peak - baseline)
+
+def write_pdf_report(json_data, path, screenshot_path=None, site_url=None, radar_chart_path=None, stitched_heatmap_path=None):
+    """
+    Render the PDF report straight to a file instead of returning it as bytes, so nothing but the
+    path needs to stay in session state. The file is written next to path and renamed into place.
+    Returns stats: path, bytes, pages, embedded images, seconds and peakMemoryBytes (see peak_memory_meter).
+    """
+    stats = {"path": path, "pages": 0, "images": 0}
+    started = time.perf_counter()
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with peak_memory_meter(stats):
+        try:
+            pdf = build_pdf_report(json_data, screenshot_path=screenshot_path, site_url=site_url,
+                                   radar_chart_path=radar_chart_path, stitched_heatmap_path=stitched_heatmap_path)
+            stats["pages"] = pdf.page_no()
+            stats["images"] = len(pdf.embedded_images)
+            pdf.output(partial_path)
+            del pdf
+        except Exception as e:
+            # generate_pdf_report carries the error/minimal-PDF fallbacks
+            safe_print(f"[ERROR] Streaming PDF output failed, using in-memory fallback: {safe_error_message(e)}")
+            with open(partial_path, "wb") as partial:
+                partial.write(generate_pdf_report(json_data, screenshot_path=screenshot_path, site_url=site_url,
+                                                  radar_chart_path=radar_chart_path, stitched_heatmap_path=stitched_heatmap_path))
+        os.replace(partial_path, path)
+    stats["bytes"] = os.path.getsize(path)
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    peak_memory = f", peak memory {format_bytes(stats['peakMemoryBytes'])}" if stats["peakMemoryBytes"] is not None else ""
+    safe_print(f"[PDF] Wrote {stats['pages']} pages ({format_bytes(stats['bytes'])}, {stats['images']} image(s)) in "
+               f"{stats['seconds']}s{peak_memory}")
+    return stats
+
+# Rendered reports, prepared report images and staged audits are pruned by age, then oldest first
+# down to a size cap (files newer than REPORT_TEMP_MIN_AGE are never removed, they may be in use)
+REPORT_TEMP_MAX_AGE = float(os.getenv("REPORT_TEMP_MAX_AGE_HOURS", "24")) * 3600
+REPORT_TEMP_MAX_BYTES = int(os.getenv("REPORT_TEMP_MAX_MB", "512")) * 1024 * 1024
+REPORT_TEMP_MIN_AGE = 600
+REPORT_TEMP_PRUNE_INTERVAL = 600
+REPORT_TEMP_DIRS = ("reports", "report_images", "render")
+
+_report_temp_pruned_at = [0.0]
+
+def report_render_dir(name):
+    """siteroast_temp/<name> (created on first use); old files in the report temp dirs are pruned now and then."""
+    path = os.path.join(tempfile.gettempdir(), "siteroast_temp", name)
+    os.makedirs(path, exist_ok=True)
+    if time.time() - _report_temp_pruned_at[0] > REPORT_TEMP_PRUNE_INTERVAL:
+        _report_temp_pruned_at[0] = time.time()
+        prune_report_temp()
+    return path
+
+def prune_report_temp(max_age=REPORT_TEMP_MAX_AGE, max_bytes=REPORT_TEMP_MAX_BYTES, now=None):
+    """
+    Delete files in the report temp dirs older than max_age seconds, then the least recently
+    modified ones until the dirs total at most max_bytes. Returns (files removed, bytes freed).
+    """
+    now = time.time() if now is None else now
+    entries = []
+    for name in REPORT_TEMP_DIRS:
+        directory = os.path.join(tempfile.gettempdir(), "siteroast_temp", name)
+        try:
+            with os.scandir(directory) as scan:
+                for entry in scan:
+                    if entry.is_file(follow_symlinks=False):
+                        stat = entry.stat(follow_symlinks=False)
+                        entries.append((stat.st_mtime, stat.st_size, entry.path))
+        except OSError:
+            continue
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    removed = freed = 0
+    for mtime, size, path in entries:
+        age = now - mtime
+        if age < REPORT_TEMP_MIN_AGE or (age <= max_age and total <= max_bytes):
+            continue
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+        freed += size
+    if removed:
+        safe_print(f"[DEBUG] Pruned {removed} report temp file(s), {format_bytes(freed)} freed")
+    return removed, freed
+
+def stage_report_audit(json_data):
+    """Write an audit where render workers can load it; returns its audit ID (content hash)."""
+    audit_id = content_hash(json_data)
+    path = os.path.join(report_render_dir("render"), f"audit_{audit_id}.bin")
+    if not os.path.exists(path):
+        partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+        with open(partial_path, "wb") as staged:
+            staged.write(pack_audit(json_data))
+        os.replace(partial_path, path)
+    return audit_id
+
+def load_report_audit(audit_id):
+    with open(os.path.join(report_render_dir("render"), f"audit_{audit_id}.bin"), "rb") as staged:
+        return unpack_audit(staged.read())
+
+def stage_report_data(data):
+    """Stage JSON-serializable render input that isn't an audit (a portfolio model, a batch of cards); returns its ID."""
+    data_id = content_hash(data)
+    path = os.path.join(report_render_dir("render"), f"data_{data_id}.json")
+    if not os.path.exists(path):
+        partial_path = f"{path}.{os.getpid()}.{threading.get_ident()}.partial"
+        with open(partial_path, "w", encoding="utf-8") as staged:
+            json.dump(data, staged)
+        os.replace(partial_path, path)
+    return data_id
+
+def load_report_data(data_id):
+    with open(os.path.join(report_render_dir("render"), f"data_{data_id}.json"), encoding="utf-8") as staged:
+        return json.load(staged)
+
+def generate_pdf_report(json_data, screenshot_path=None, site_url=None, radar_chart_path=None, stitched_heatmap_path=None):
+    """
+    Generate a PDF report from the audit JSON data.
+    
+    Args:
+        json_data: Dictionary containing the audit results
+        screenshot_path: Optional path to screenshot image file
+        site_url: Optional URL of the audited site (will extract base URL if full URL provided)
+        radar_chart_path: Optional path to radar chart image file
+    
+    Returns:
+        PDF bytes
+    """
+    # Validate input data - return error PDF if empty
+    if not json_data or not isinstance(json_data, dict):
+        safe_print("[ERROR] PDF generation: json_data is None or empty")
+        try:
+            error_pdf = PDFReport()
+            error_pdf.add_page()
+            error_pdf.set_font("Helvetica", "B", 16)
+            error_pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
+            error_pdf.set_font("Helvetica", "", 11)
+            error_pdf.cell(0, 10, clean_text("Error: No audit data available to generate report."), ln=True, align="C")
+            return error_pdf.output(dest='S')
+        except:
+            return b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
+    
+    try:
+        pdf = build_pdf_report(json_data, screenshot_path=screenshot_path, site_url=site_url,
+                               radar_chart_path=radar_chart_path, stitched_heatmap_path=stitched_heatmap_path)
+        
+        # pdf.output(dest='S') returns bytes/bytearray directly
+        # Handle encoding errors gracefully (Windows charmap issue)
+        try:
+            pdf_bytes = pdf.output(dest='S')
+            safe_print(f"[PDF] Output size: {len(pdf_bytes) if pdf_bytes else 0} bytes")
+            # Verify PDF is not empty
+            if not pdf_bytes or len(pdf_bytes) < 100:
+                raise ValueError(f"PDF output is too small ({len(pdf_bytes) if pdf_bytes else 0} bytes), likely empty")
+        except (UnicodeEncodeError, UnicodeDecodeError, ValueError) as e:
+            # If encoding fails, use BytesIO buffer which handles encoding better
+            try:
+                buffer = io.BytesIO()
+                pdf.output(buffer)
+                pdf_bytes = buffer.getvalue()
+                # Verify again
+                if not pdf_bytes or len(pdf_bytes) < 100:
+                    raise ValueError("PDF buffer is too small")
+            except Exception as e2:
+                # Last resort: create a minimal valid PDF
+                safe_print(f"[ERROR] PDF generation failed: {safe_error_message(str(e2))}")
+                try:
+                    # Create a minimal PDF with error message
+                    fallback_pdf = PDFReport()
+                    fallback_pdf.add_page()
+                    fallback_pdf.set_font("Helvetica", "B", 16)
+                    fallback_pdf.cell(0, 10, clean_text("SiteRoast Conversion Audit Report"), ln=True, align="C")
+                    fallback_pdf.set_font("Helvetica", "", 11)
+                    error_msg = clean_text("PDF generation encountered an error. Please try again.")
+                    fallback_pdf.multi_cell(0, 6, error_msg)
+                    pdf_bytes = fallback_pdf.output(dest='S')
+                except:
+                    # Absolute last resort - return minimal valid PDF
+                    pdf_bytes = b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
+        
+        # Convert bytearray to bytes if needed (Streamlit download_button expects bytes)
+        if isinstance(pdf_bytes, bytearray):
+            pdf_bytes = bytes(pdf_bytes)
+        
+        # Final verification
+        if not pdf_bytes or len(pdf_bytes) < 100:
+            safe_print("[ERROR] PDF bytes are empty or too small")
+            # Return minimal valid PDF
+            pdf_bytes = b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
+        
+        return pdf_bytes
+    except Exception as e:
+        safe_print(f"[CRITICAL ERROR] PDF generation completely failed: {safe_error_message(str(e))}")
+        # Return minimal valid PDF structure
+        return b'%PDF-1.4\n1 0 obj\n<<\n/Type /Catalog\n>>\nendobj\nxref\n0 0\ntrailer\n<<\n/Size 0\n>>\nstartxref\n0\n%%EOF'
+
+RADAR_AXIS_LABELS = {"ux": "UX", "conversion": "Conversion", "copy": "Copy", "visuals": "Visuals", "trust": "Trust", "speed": "Speed"}
+
+def radar_polygon_points(radar_metrics, cx, cy, radius):
+    """Vertices of a radar polygon (scores 0-100) over RADAR_CATEGORIES, first axis straight up, clockwise."""
+    points = []
+    for axis, category in enumerate(RADAR_CATEGORIES):
+        angle = math.radians(-90 + axis * 360 / len(RADAR_CATEGORIES))
+        r = radius * max(0, min(100, radar_metrics.get(category, 50))) / 100
+        points.append((cx + r * math.cos(angle), cy + r * math.sin(angle)))
+    return points
+
+# Radar chart image for the PDF/HTML reports: 400x400 at 2x, as the plotly export was
+RADAR_IMAGE_SIZE = 800
+RADAR_SUPERSAMPLE = 2
+
+def render_radar_png(radar_metrics, path, size=RADAR_IMAGE_SIZE):
+    """
+    Draw the six-axis radar chart (scores 0-100 per RADAR_CATEGORIES) to a transparent PNG with
+    PIL, replacing the plotly/kaleido export. Drawn at RADAR_SUPERSAMPLE x and downsampled for
+    antialiasing; the output depends only on the scores and size, so it is pixel-stable.
+    Returns path.
+    """
+    canvas = size * RADAR_SUPERSAMPLE
+    center, radius = canvas / 2, canvas * 0.34
+    grid_color, line_color = (150, 150, 150, 128), (102, 126, 234, 255)
+    img = Image.new("RGBA", (canvas, canvas), (0, 0, 0, 0))
+    draw = ImageDraw.Draw(img)
+    for level in (20, 40, 60, 80, 100):
+        ring = radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, level), center, center, radius)
+        draw.line(ring + ring[:1], fill=grid_color, width=RADAR_SUPERSAMPLE)
+    for x, y in radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, 100), center, center, radius):
+        draw.line([(center, center), (x, y)], fill=grid_color, width=RADAR_SUPERSAMPLE)
+    
+    # Score polygon: translucent fill composited over the grid, then the outline
+    shape = radar_polygon_points(radar_metrics, center, center, radius)
+    fill = Image.new("RGBA", img.size, (0, 0, 0, 0))
+    ImageDraw.Draw(fill).polygon(shape, fill=(102, 126, 234, 77))
+    img = Image.alpha_composite(img, fill)
+    draw = ImageDraw.Draw(img)
+    draw.line(shape + shape[:1], fill=line_color, width=3 * RADAR_SUPERSAMPLE, joint="curve")
+    
+    try:
+        font = ImageFont.load_default(size=canvas // 30)
+    except TypeError:
+        # Pillow < 10.1: fixed-size bitmap font only
+        font = ImageFont.load_default()
+    label_points = radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, 100), center, center, radius + canvas * 0.08)
+    for category, (x, y) in zip(RADAR_CATEGORIES, label_points):
+        draw.text((x, y), f"{RADAR_AXIS_LABELS[category]} {radar_metrics.get(category, 50)}", fill=(68, 68, 68, 255), font=font, anchor="mm")
+    
+    img.reduce(RADAR_SUPERSAMPLE).save(path, "PNG")
+    return path
+
+# Portfolio reports (many stored audits in one document); the model comes from build_portfolio in main.py
+PORTFOLIO_REPORT_CSS = """
+    <style>
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; background: #f5f5f5; padding: 20px; margin: 0; }
+        .container { max-width: 1200px; margin: 0 auto; background: white; padding: 40px; border-radius: 12px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); }
+        h1 { color: #ff4b4b; border-bottom: 3px solid #ff4b4b; padding-bottom: 10px; }
+        h2 { color: #333; margin-top: 40px; border-bottom: 2px solid #eee; padding-bottom: 8px; }
+        table { width: 100%; border-collapse: collapse; margin: 20px 0; font-size: 0.95em; }
+        th, td { padding: 10px; border: 1px solid #ddd; text-align: center; }
+        th { background: #f8f9fa; }
+        td.page { text-align: left; word-break: break-all; }
+        .score-high { color: #1b7f3b; font-weight: bold; }
+        .score-mid { color: #b26a00; font-weight: bold; }
+        .score-low { color: #c62828; font-weight: bold; }
+        .radar-grid { display: grid; grid-template-columns: repeat(auto-fill, minmax(320px, 1fr)); gap: 20px; }
+        .page-card { border: 1px solid #eee; border-radius: 8px; padding: 16px; }
+        .page-card h3 { margin: 0 0 4px; font-size: 1em; word-break: break-all; }
+        .page-card svg { display: block; margin: 10px auto; }
+        .page-card ul { padding-left: 18px; margin: 8px 0 0; font-size: 0.9em; }
+        .meta { color: #777; font-size: 0.85em; }
+    </style>
+"""
+
+def portfolio_score_class(score):
+    return "score-high" if score >= 80 else "score-mid" if score >= 50 else "score-low"
+
+def render_portfolio_page_html(page):
+    """HTML card for one portfolio page: inline SVG radar, score, headline and top findings."""
+    size, radius = 240, 80
+    center = size / 2
+    rings = "".join(
+        '<polygon points="{}" fill="none" stroke="#ddd" stroke-width="1"/>'.format(
+            " ".join(f"{x:.1f},{y:.1f}" for x, y in radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, level), center, center, radius))
+        )
+        for level in (20, 40, 60, 80, 100)
+    )
+    outer = radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, 100), center, center, radius)
+    labelled = radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, 100), center, center, radius + 18)
+    axes = "".join(f'<line x1="{center}" y1="{center}" x2="{x:.1f}" y2="{y:.1f}" stroke="#ddd" stroke-width="1"/>' for x, y in outer)
+    labels = "".join(
+        f'<text x="{x:.1f}" y="{y + 4:.1f}" font-size="11" text-anchor="middle" fill="#555">{RADAR_AXIS_LABELS[category]} {page["radarMetrics"].get(category, 50)}</text>'
+        for category, (x, y) in zip(RADAR_CATEGORIES, labelled)
+    )
+    shape = " ".join(f"{x:.1f},{y:.1f}" for x, y in radar_polygon_points(page["radarMetrics"], center, center, radius))
+    findings = "".join(
+        f"<li><strong>{html.escape(finding['elementName'] or 'Element')}</strong> - {html.escape(finding['status'])} ({finding['impact']} impact)"
+        + (f": {html.escape(finding['quickFix'])}" if finding["quickFix"] else "") + "</li>"
+        for finding in page["topFindings"]
+    )
+    return f"""
+            <div class="page-card" id="page-{page['index']}">
+                <h3>{page['index']}. {html.escape(page['url'])}</h3>
+                <div class="meta">Audited {page['auditedAt']} · Score <span class="{portfolio_score_class(page['overallScore'])}">{page['overallScore']}/100</span></div>
+                <svg width="{size}" height="{size}" viewBox="0 0 {size} {size}" role="img" aria-label="Radar chart">
+                    {rings}{axes}
+                    <polygon points="{shape}" fill="rgba(102, 126, 234, 0.3)" stroke="#667eea" stroke-width="2"/>
+                    {labels}
+                </svg>
+                <p>{html.escape(page['headline'])}</p>
+                {f'<ul>{findings}</ul>' if findings else '<p class="meta">No failing findings.</p>'}
+            </div>
+    """
+
+def render_portfolio_cards_html(pages):
+    """Radar-grid cards of several portfolio pages, in order (one portfolio-cards render task)."""
+    return "".join(render_portfolio_page_html(page) for page in pages)
+
+def generate_portfolio_html_report(portfolio, cards_html=None):
+    """
+    HTML portfolio report: comparison table, radar grid (one SVG card per page) and shared
+    top-issue ranking. cards_html is the grid already rendered by portfolio-cards tasks (merged
+    in page order); without it the cards are rendered here.
+    """
+    started = time.perf_counter()
+    pages = portfolio["pages"]
+    if cards_html is None:
+        cards_html = render_portfolio_cards_html(pages)
+    
+    header_cells = "".join(f"<th>{RADAR_AXIS_LABELS[category]}</th>" for category in RADAR_CATEGORIES)
+    rows = "".join(
+        f"""<tr><td class="page"><a href="#page-{page['index']}">{page['index']}. {html.escape(page['url'])}</a></td>"""
+        + "".join(f"<td>{page['radarMetrics'].get(category, 50)}</td>" for category in RADAR_CATEGORIES)
+        + f"""<td class="{portfolio_score_class(page['overallScore'])}">{page['overallScore']}</td></tr>"""
+        for page in pages
+    )
+    issues = "".join(
+        f"""<tr><td>{rank}</td><td class="page"><strong>{html.escape(issue['elementName'])}</strong>"""
+        + (f"""<br><span class="meta">{html.escape(issue['quickFix'])}</span>""" if issue["quickFix"] else "")
+        + f"""</td><td>{RADAR_AXIS_LABELS.get(issue['category'], issue['category'] or '-')}</td><td>{issue['worstStatus']}</td>"""
+        + f"""<td>{len(issue['pages'])} of {len(pages)} ({', '.join(f'#{index}' for index in issue['pages'])})</td></tr>"""
+        for rank, issue in enumerate(portfolio["topIssues"], 1)
+    )
+    
+    report = f"""<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>SiteRoast Portfolio Report</title>
+    {PORTFOLIO_REPORT_CSS}
+</head>
+<body>
+    <div class="container">
+        <h1>🔥 SiteRoast Portfolio Report</h1>
+        <p class="meta">{len(pages)} page(s) · Average score {portfolio['averageScore']}/100 · Scoring profile: {html.escape(portfolio['profileLabel'])} · Generated {portfolio['generatedAt']}</p>
+        
+        <h2>📊 Page Comparison</h2>
+        <table>
+            <tr><th>Page</th>{header_cells}<th>Overall</th></tr>
+            {rows}
+        </table>
+        
+        <h2>🎯 Top Issues Across Pages</h2>
+        {f'<table><tr><th>#</th><th>Element</th><th>Category</th><th>Worst status</th><th>Pages affected</th></tr>{issues}</table>' if issues else '<p>No failing findings across these pages.</p>'}
+        
+        <h2>🕸️ Page Radars</h2>
+        <div class="radar-grid">
+            {cards_html}
+        </div>
+    </div>
+</body>
+</html>
+"""
+    safe_print(f"[Portfolio Report] HTML for {len(pages)} page(s): {format_bytes(len(report.encode('utf-8')))} in {time.perf_counter() - started:.2f}s")
+    return report
+
+def build_portfolio_pdf_report(portfolio):
+    """
+    PDF portfolio report: cover, comparison table, radar grid (vector radars, six per page) and
+    the shared top-issue ranking. Returns the laid-out PDFReport (see write_portfolio_pdf_report).
+    """
+    pages = portfolio["pages"]
+    pdf = PDFReport()
+    pdf.add_cover_page(
+        {"scannedUrl": f"{len(pages)} pages (portfolio)", "scannedAt": portfolio["generatedAt"]},
+        portfolio["averageScore"]
+    )
+    
+    # Comparison table: page, one column per radar category, overall
+    pdf.add_page()
+    pdf.chapter_title("Page Comparison")
+    pdf.set_font("Helvetica", "", 9)
+    pdf.cell(0, 6, clean_text(f"Average score {portfolio['averageScore']}/100 - scoring profile: {portfolio['profileLabel']}"), ln=True)
+    pdf.ln(3)
+    page_width, score_width = 72, 13
+    pdf.set_font("Helvetica", "B", 9)
+    pdf.set_fill_color(240, 240, 240)
+    pdf.cell(page_width, 8, "Page", border=1, fill=True)
+    for category in RADAR_CATEGORIES:
+        pdf.cell(score_width, 8, RADAR_AXIS_LABELS[category][:5], border=1, align="C", fill=True)
+    pdf.cell(pdf.usable_width - page_width - score_width * len(RADAR_CATEGORIES), 8, "Overall", border=1, ln=True, align="C", fill=True)
+    for page in pages:
+        label = clean_text(f"{page['index']}. {page['url']}")
+        while len(label) > 12 and pdf.get_string_width(label) > page_width - 2:
+            label = label[:-4] + "..."
+        pdf.set_font("Helvetica", "", 9)
+        pdf.cell(page_width, 7, label, border=1)
+        for category in RADAR_CATEGORIES:
+            pdf.cell(score_width, 7, str(page["radarMetrics"].get(category, 50)), border=1, align="C")
+        pdf.set_font("Helvetica", "B", 9)
+        pdf.cell(pdf.usable_width - page_width - score_width * len(RADAR_CATEGORIES), 7, f"{page['overallScore']}/100", border=1, ln=True, align="C")
+    
+    # Shared top-issue ranking
+    pdf.ln(8)
+    pdf.chapter_title("Top Issues Across Pages")
+    if not portfolio["topIssues"]:
+        pdf.set_font("Helvetica", "", 11)
+        pdf.cell(0, 8, "No failing findings across these pages.", ln=True)
+    for rank, issue in enumerate(portfolio["topIssues"], 1):
+        pdf.set_font("Helvetica", "B", 11)
+        pdf.set_text_color(0, 0, 0)
+        pdf.multi_cell(0, 6, clean_text(
+            f"{rank}. {issue['elementName']} - {issue['worstStatus']} on {len(issue['pages'])} of {len(pages)} page(s) "
+            f"({', '.join(f'#{index}' for index in issue['pages'])})"
+        ))
+        if issue["quickFix"]:
+            pdf.set_font("Helvetica", "", 10)
+            pdf.set_text_color(80, 80, 80)
+            pdf.multi_cell(0, 5, clean_text(f"Fix: {issue['quickFix']}"))
+        pdf.ln(2)
+    pdf.set_text_color(0, 0, 0)
+    
+    # Radar grid: two columns, three rows per page
+    cell_width, cell_height, radius = pdf.usable_width / 2, 76, 24
+    for position, page in enumerate(pages):
+        if position % 6 == 0:
+            pdf.add_page()
+            pdf.chapter_title("Page Radars")
+            grid_top = pdf.get_y()
+        x = pdf.l_margin + (position % 2) * cell_width
+        y = grid_top + (position % 6 // 2) * cell_height
+        label = clean_text(f"{page['index']}. {page['url']}")
+        while len(label) > 12 and pdf.get_string_width(label) > cell_width - 6:
+            label = label[:-4] + "..."
+        pdf.set_xy(x, y)
+        pdf.set_font("Helvetica", "B", 9)
+        pdf.cell(cell_width, 5, label, align="C")
+        pdf.set_xy(x, y + 5)
+        pdf.set_font("Helvetica", "", 9)
+        pdf.cell(cell_width, 5, clean_text(f"Score {page['overallScore']}/100 - audited {page['auditedAt']}"), align="C")
+        pdf.draw_radar(page["radarMetrics"], x + cell_width / 2, y + 14 + radius + 6, radius)
+    return pdf
+
+def write_portfolio_pdf_report(portfolio, path):
+    """
+    Render the portfolio PDF straight to path (written next to it and renamed into place).
+    Returns stats: path, bytes, pages, seconds and peakMemoryBytes, as write_pdf_report.
+    """
+    stats = {"path": path, "pages": 0}
+    started = time.perf_counter()
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with peak_memory_meter(stats):
+        pdf = build_portfolio_pdf_report(portfolio)
+        stats["pages"] = pdf.page_no()
+        pdf.output(partial_path)
+        del pdf
+        os.replace(partial_path, path)
+    stats["bytes"] = os.path.getsize(path)
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    safe_print(f"[Portfolio Report] PDF for {len(portfolio['pages'])} page(s): {stats['pages']} pages, "
+               f"{format_bytes(stats['bytes'])} in {stats['seconds']}s")
+    return stats
+
+def write_text_report(path, text):
+    """Write a rendered HTML report or fragment to path (via a partial file); returns the render stats shape."""
+    partial_path = f"{path}.{os.getpid()}.partial"
+    with open(partial_path, "w", encoding="utf-8") as partial:
+        partial.write(text)
+    os.replace(partial_path, path)
+    return {"path": path, "bytes": os.path.getsize(path)}
+
+def render_report_task(task):
+    """
+    Worker entry point: render one report task straight to task["path"] and return the render
+    stats (write_pdf_report's for a PDF). Audit reports ("pdf", "html") carry
+    {"auditId", "siteUrl", "artifacts"}; portfolio tasks carry a staged "dataId" (stage_report_data):
+    "portfolio-cards" renders a list of pages' radar cards, "portfolio-html" merges the card files
+    in artifacts["cards"] into the report, "portfolio-pdf" renders the whole PDF.
+    """
+    kind, path = task["kind"], task["path"]
+    if kind == "portfolio-pdf":
+        return write_portfolio_pdf_report(load_report_data(task["dataId"]), path)
+    started = time.perf_counter()
+    if kind == "portfolio-cards":
+        stats = write_text_report(path, render_portfolio_cards_html(load_report_data(task["dataId"])))
+    elif kind == "portfolio-html":
+        cards_html = []
+        for card_path in task["artifacts"]["cards"]:
+            with open(card_path, encoding="utf-8") as cards:
+                cards_html.append(cards.read())
+        stats = write_text_report(path, generate_portfolio_html_report(load_report_data(task["dataId"]), "".join(cards_html)))
+    elif kind in ("pdf", "html"):
+        data = load_report_audit(task["auditId"])
+        artifacts = task["artifacts"]
+        options = {"screenshot_path": artifacts.get("screenshot"), "site_url": task.get("siteUrl"),
+                   "radar_chart_path": artifacts.get("radarChart"), "stitched_heatmap_path": artifacts.get("heatmap")}
+        if kind == "pdf":
+            return write_pdf_report(data, path, **options)
+        stats = write_text_report(path, generate_html_report(data, data.get("overall_score", 50), **options))
+    else:
+        raise ValueError(f"Unknown report kind: {kind}")
+    stats["seconds"] = round(time.perf_counter() - started, 2)
+    return stats
+
+if __name__ == "__main__":
+    # Render worker for ReportRenderPool: the task as JSON on stdin, its stats as the last line of stdout
+    print(json.dumps(render_report_task(json.load(sys.stdin))))
@@ -0,0 +1,113 @@
+"""
+Benchmark of LLM JSON parsing: parse_worker_items (C json decoder, falling back to TolerantJSONParser)
+against the clean_json_text + repair_json path it replaced, on the same documents, valid and with
+typical defects. The old path is vendored below as the baseline, since it is no longer in main.py.
+Run: python tests/benchmark_json_parser.py
+"""
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import TolerantJSONParser, parse_worker_items
+
+# --- Baseline: clean_json_text + repair_json as they were before the tolerant parser ---
+
+def repair_json(text):
+    """Twelve full-text regex repairs for missing and trailing commas (error-context logging dropped)."""
+    fixed = text
+    fixed = re.sub(r',(\s*[}\]])', r'\1', fixed)
+    fixed = re.sub(r'\]\s+"(\w+)":', r'], "\1":', fixed)
+    fixed = re.sub(r'\]\s*\n\s*"(\w+)":', r'],\n    "\1":', fixed)
+    fixed = re.sub(r'"\s+"(\w+)":', r'", "\1":', fixed)
+    fixed = re.sub(r'([}\]])"(\w+)":', r'\1, "\2":', fixed)
+    fixed = re.sub(r'"\s*\n\s*"(\w+)":', r'",\n    "\1":', fixed)
+    fixed = re.sub(r'\]\s*{', r'], {', fixed)
+    fixed = re.sub(r'\]"(\w+)":', r'], "\1":', fixed)
+    fixed = re.sub(r'(\d+|true|false|null)\s+"(\w+)":', r'\1, "\2":', fixed)
+    fixed = re.sub(r'"\s*{', r'", {', fixed)
+    fixed = re.sub(r'"\s*\[', r'", [', fixed)
+    fixed = re.sub(r'"\s*\n\s+"(\w+)":', r'",\n    "\1":', fixed)
+    fixed = re.sub(r'(")\s+(")(\w+)":', r'\1, \2\3":', fixed)
+    return fixed
+
+def clean_json_text(text):
+    """Strip Markdown fences and cut the first brace-balanced object (not string-aware)."""
+    text = text.replace("```json", "").replace("```", "")
+    text = text.strip()
+    start = text.find("{")
+    if start == -1:
+        return text
+    brace_count = 0
+    last_balanced_brace = -1
+    for i in range(start, len(text)):
+        if text[i] == '{':
+            brace_count += 1
+        elif text[i] == '}':
+            brace_count -= 1
+            if brace_count == 0:
+                last_balanced_brace = i
+                break
+    if last_balanced_brace != -1:
+        return text[start:last_balanced_brace + 1]
+    end = text.rfind("}")
+    if end != -1 and end > start:
+        return text[start:end + 1]
+    return text[start:]
+
+def baseline_parse(text):
+    """The worker parsing sequence before the tolerant parser; None where it raised (workers returned no items)."""
+    text = clean_json_text(text.strip())
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        try:
+            return json.loads(repair_json(text))
+        except json.JSONDecodeError:
+            return None
+
+# --- Benchmark ---
+
+def worker_response(items=12):
+    return json.dumps({"items": [
+        {"elementName": f"Element {i}", "status": "Needs Improvement", "impact": "HI", "radarCategory": "ux",
+         "rationale": "The hero section buries the call to action below three paragraphs of copy. " * 3,
+         "workingWell": ["Clear logo", "Consistent colours"], "notWorking": ["CTA below the fold"],
+         "fix": {"quickFix": "Move the CTA above the fold", "example": '<a class="cta">Start</a>', "expectedImpact": "+10%"}}
+        for i in range(items)
+    ]}, indent=2)
+
+def recovered_items(result):
+    return len(result.get("items", [])) if isinstance(result, dict) else 0
+
+def main(number=200):
+    valid = worker_response()
+    cases = {
+        "valid": valid,
+        "trailing commas": valid.replace('"+10%"', '"+10%",'),
+        "missing commas": valid.replace('},\n    {', '}\n    {'),
+        "truncated at 60%": valid[:len(valid) * 6 // 10],
+        "fenced with prose": f"Here you go:\n```json\n{valid}\n```\nHope it helps",
+    }
+    parsers = {"baseline": baseline_parse, "parse_worker_items": lambda text: parse_worker_items(text)[0]}
+    print(f"document: {len(valid)} chars, {number} runs each; items recovered in brackets")
+    print(f"{'case':<20}" + "".join(f"{name:>24}" for name in parsers) + f"{'speedup':>10}")
+    for case, text in cases.items():
+        timings = {}
+        row = f"{case:<20}"
+        for name, parse in parsers.items():
+            with contextlib.redirect_stdout(io.StringIO()):  # parse_worker_items warns on every recovery
+                timings[name] = timeit.timeit(lambda: parse(text), number=number) / number
+                items = recovered_items(parse(text))
+            row += f"{timings[name] * 1000:14.3f} ms [{items:>3}]  "
+        print(row + f"{timings['baseline'] / timings['parse_worker_items']:9.1f}x")
+    seconds = timeit.timeit(lambda: TolerantJSONParser(valid).parse(), number=number) / number
+    print(f"tolerant parser alone on the valid document: {seconds * 1000:.3f} ms, {len(valid) / seconds / 1e6:.1f} M chars/s")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Benchmark of the report radar PNG: render_radar_png (PIL) against the plotly + kaleido export it
+replaced (fig.write_image, 400x400 at scale 2), on the same six scores. The kaleido side is
+skipped when kaleido isn't installed (it is no longer a requirement).
+Run: python tests/benchmark_radar_chart.py
+"""
+import importlib.util
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reports import RADAR_AXIS_LABELS, RADAR_CATEGORIES, render_radar_png
+
+SCORES = {"ux": 72, "conversion": 45, "copy": 88, "visuals": 60, "trust": 30, "speed": 95}
+
+def kaleido_radar_figure(scores):
+    """The dashboard's plotly radar, styled as it was for the kaleido export."""
+    import pandas as pd
+    import plotly.express as px
+    df = pd.DataFrame(dict(r=[scores[c] for c in RADAR_CATEGORIES], theta=[RADAR_AXIS_LABELS[c] for c in RADAR_CATEGORIES]))
+    fig = px.line_polar(df, r='r', theta='theta', line_close=True)
+    fig.update_traces(fill='toself', line_color='#667eea', fillcolor='rgba(102, 126, 234, 0.3)')
+    fig.update_layout(
+        polar=dict(
+            radialaxis=dict(visible=True, range=[0, 100], tickmode='linear', tick0=0, dtick=20, tickfont=dict(size=10),
+                            gridcolor='rgba(150, 150, 150, 0.5)', showline=True, linecolor='rgba(150, 150, 150, 0.5)'),
+            angularaxis=dict(showline=True, linecolor='rgba(150, 150, 150, 0.3)', gridcolor='rgba(150, 150, 150, 0.3)'),
+            bgcolor='rgba(0,0,0,0)'
+        ),
+        showlegend=False, paper_bgcolor='rgba(0,0,0,0)', plot_bgcolor='rgba(0,0,0,0)', font=dict(family="Helvetica", size=12)
+    )
+    return fig
+
+def main(number=20):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "radar.png")
+        seconds = timeit.timeit(lambda: render_radar_png(SCORES, path), number=number) / number
+        print(f"render_radar_png (PIL)    {seconds * 1000:8.1f} ms per 800x800 PNG ({os.path.getsize(path) // 1024} KB)")
+
+        if importlib.util.find_spec("kaleido") is None:
+            print("kaleido                   skipped (not installed: pip install kaleido plotly pandas)")
+            return
+        fig = kaleido_radar_figure(SCORES)
+        path = os.path.join(directory, "radar_kaleido.png")
+        started = time.perf_counter()
+        try:
+            fig.write_image(path, width=400, height=400, scale=2, format='png')
+        except Exception as e:
+            # kaleido >= 1 drives a separately installed Chrome
+            print(f"kaleido                   skipped (export failed: {str(e).strip().splitlines()[0]})")
+            return
+        first = time.perf_counter() - started
+        seconds = timeit.timeit(lambda: fig.write_image(path, width=400, height=400, scale=2, format='png'), number=number) / number
+        print(f"kaleido (fig.write_image) {seconds * 1000:8.1f} ms per 800x800 PNG warm, "
+              f"{first * 1000:.0f} ms first export (starts the renderer)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+AssetCache writes from concurrent capture contexts: storing the same asset from several threads
+at once must neither raise nor leave temp files behind.
+"""
+import threading
+
+from main import AssetCache
+
+
+def test_concurrent_stores_of_one_url(tmp_path):
+    cache = AssetCache(tmp_path / "assets")
+    url = "https://example.com/static/site.css"
+    start = threading.Barrier(8)
+    errors = []
+
+    def store(n):
+        start.wait()
+        try:
+            for _ in range(20):
+                cache.store(url, 200, {"content-type": "text/css", "etag": '"v1"'}, b"body %d" % n, 2e9)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=store, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert cache.lookup(url)["body"].startswith(b"body ")
+    assert not list((tmp_path / "assets").rglob("*.tmp"))
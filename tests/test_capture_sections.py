@@ -0,0 +1,25 @@
+"""
+uncovered_tiles: on tall pages every area outside the selected sections is tiled, top first.
+"""
+from main import uncovered_tiles
+
+
+def spans(tiles):
+    return [(tile["top"], tile["top"] + tile["height"]) for tile in tiles]
+
+
+def test_gaps_between_and_below_sections_are_tiled():
+    sections = [{"label": "hero", "top": 0, "height": 800}, {"label": "pricing", "top": 3000, "height": 1000}]
+    tiles = uncovered_tiles(sections, page_height=9000, tile_height=1800)
+    assert spans(tiles) == [(800, 2600), (2600, 3000), (4000, 5800), (5800, 7600), (7600, 9000)]
+    assert {tile["label"] for tile in tiles} == {"content"}
+
+
+def test_fully_covered_page_needs_no_tiles():
+    sections = [{"label": "hero", "top": 0, "height": 1500}, {"label": "footer", "top": 1200, "height": 800}]
+    assert uncovered_tiles(sections, page_height=2000, tile_height=1800) == []
+
+
+def test_tiles_are_capped_from_the_top():
+    tiles = uncovered_tiles([], page_height=100000, tile_height=1000, max_tiles=3)
+    assert spans(tiles) == [(0, 1000), (1000, 2000), (2000, 3000)]
@@ -0,0 +1,61 @@
+"""
+Golden-output test for the HTML report: a fixed audit rendered through generate_html_report must
+match tests/golden/audit_report.html byte for byte. After an intentional template change, rewrite
+the golden file with UPDATE_GOLDEN=1 python -m pytest tests/test_html_report.py and review the diff.
+"""
+import os
+import time
+
+from reports import generate_html_report
+
+GOLDEN_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden", "audit_report.html")
+
+AUDIT = {
+    "overall_score": 58,
+    "roast_summary": "A clean layout let down by a vague headline & a buried call to action.",
+    "overview": {
+        "executiveSummary": "Solid foundations. The hero needs work.",
+        "roastAnalysis": "The hero says nothing about the product. Visitors have to scroll to find out what it does.\n\n"
+                         "Trust signals are strong: testimonials and logos sit right under the fold.",
+    },
+    "quick_wins": [
+        {"elementName": "Hero headline", "fix": {"quickFix": "Lead with the outcome: \"Ship invoices in 30 seconds\"."}},
+        {"title": "Primary CTA", "fix": "Move the signup button above the fold."},
+    ],
+    "auditDiff": {"fixed": [{"elementName": "Footer links", "category": "navigation"}]},
+    "detailedAudit": {
+        "copy": [
+            {"elementName": "Hero headline", "status": "Poor", "impact": "HI", "radarCategory": "Clarity",
+             "rationale": "Generic <h1> copy with no value proposition.", "workingWell": "Short and readable.",
+             "notWorking": "Doesn't say what the product does.", "conversionImpact": "High bounce from paid traffic.",
+             "fix": {"quickFix": "Rewrite around the main outcome.", "example": "Ship invoices in 30 seconds",
+                     "expectedImpact": "+10-15% signups"}},
+            {"elementName": "Testimonials", "status": "Excellent", "impact": "MI", "radarCategory": "Trust",
+             "rationale": "Named customers with photos.", "fix": None},
+        ],
+        "design": [
+            {"elementName": "Primary CTA", "status": "Needs Improvement", "impact": "HI", "radarCategory": "Action",
+             "rationale": "Low contrast, below the fold on mobile.", "fix": "Use the brand red and move it up."},
+        ],
+        "seo": [],
+    },
+}
+
+
+def render_fixed_audit(monkeypatch):
+    # The report header carries the render date
+    monkeypatch.setattr(time, "strftime", lambda fmt, *args: "January 01, 2026")
+    return generate_html_report(AUDIT, AUDIT["overall_score"], site_url="https://example.com/pricing")
+
+
+def test_html_report_matches_golden_file(monkeypatch):
+    html = render_fixed_audit(monkeypatch)
+    if os.getenv("UPDATE_GOLDEN"):
+        with open(GOLDEN_PATH, "w", encoding="utf-8") as golden:
+            golden.write(html)
+    with open(GOLDEN_PATH, encoding="utf-8") as golden:
+        assert html == golden.read()
+
+
+def test_html_report_is_deterministic(monkeypatch):
+    assert render_fixed_audit(monkeypatch) == render_fixed_audit(monkeypatch)
@@ -0,0 +1,78 @@
+"""
+Corpus and fuzz tests for the tolerant LLM JSON parser (TolerantJSONParser / parse_llm_json).
+Each corpus entry is a malformed worker response seen in practice (or a close variant) with
+the value and completeness the parser must recover.
+"""
+import json
+import random
+
+import pytest
+
+from main import TolerantJSONParser, parse_llm_json, parse_worker_items
+
+CORPUS = [
+    ("fenced", '```json\n{"items":[{"a":1},{"b":2}]}\n```', {"items": [{"a": 1}, {"b": 2}]}, True),
+    ("trailing commas", '{"items":[{"a":1,},{"b":2},]}', {"items": [{"a": 1}, {"b": 2}]}, True),
+    ("missing comma between objects", '{"items":[{"a":"x"}\n{"b":"y"}]}', {"items": [{"a": "x"}, {"b": "y"}]}, True),
+    ("missing comma between keys", '{"a":"x" "b":"y"}', {"a": "x", "b": "y"}, True),
+    ("missing comma at line break", '{"a":"x"\n "b":"y"}', {"a": "x", "b": "y"}, True),
+    ("prose around json", 'Sure! here: {"status": Good, "n": 12} thanks', {"status": "Good", "n": 12}, True),
+    ("braces inside strings", '{"a":"brace { inside } ok"}', {"a": "brace { inside } ok"}, True),
+    ("raw newline inside string", '{"x":"line\nbreak"}', {"x": "line\nbreak"}, True),
+    ("python literals", '{"a": True, "b": None, "c": false}', {"a": True, "b": None, "c": False}, True),
+    ("unescaped inner quotes", '{"a":"he said "hi" ok","c":1}', {"a": 'he said "hi" ok', "c": 1}, True),
+    ("unescaped inner quote before a comma", '{"a": "she said "x", then left", "b": 1}',
+     {"a": 'she said "x", then left', "b": 1}, True),
+    ("inner quote before a comma, then a key", '{"a": "quoted "x", "b": 1}', {"a": 'quoted "x', "b": 1}, True),
+    ("inner quote before a comma and a bare key", '{"a": "x", b: 2}', {"a": "x", "b": 2}, True),
+    ("inner quote before a comma in an array", '["say "hi", please", "next"]', ['say "hi", please', "next"], True),
+    ("mismatched closer", '{"items":[{"a":1}, {"b":[1,2,3}]}', {"items": [{"a": 1}, {"b": [1, 2, 3]}]}, True),
+    ("truncated array element", '{"items":[{"a":1},{"b":"trunc', {"items": [{"a": 1}]}, False),
+    ("truncated nested object", '{"items":[{"a":1}],"fix":{"quickFix":"do', {"items": [{"a": 1}], "fix": {}}, False),
+    ("truncated number", '{"a":1,"b":12', {"a": 1}, False),
+    ("missing closers", '{"items":[{"a":1}', {"items": [{"a": 1}]}, False),
+    ("escapes", '{"hook":"L1\\nL2 \\u00e9 \\"q\\""}', {"hook": 'L1\nL2 é "q"'}, True),
+    ("no json", "no json here", None, False),
+    ("empty", "", None, False),
+]
+
+@pytest.mark.parametrize("name, text, expected, complete", CORPUS, ids=[case[0] for case in CORPUS])
+def test_corpus(name, text, expected, complete):
+    assert parse_llm_json(text) == (expected, complete)
+
+def test_valid_json_matches_json_module():
+    document = {"items": [{"elementName": "CTA", "status": "Good", "rationale": 'has "quotes", {braces} and \\ slashes'}]}
+    text = json.dumps(document, indent=2)
+    assert parse_llm_json(text) == (document, True)
+    assert TolerantJSONParser(text).parse() == (document, True)
+
+ITEMS = [
+    {"elementName": f"E{i}", "status": "Good", "rationale": 'has "quotes" and {braces} and \\ slashes',
+     "workingWell": ["a", "b"], "fix": {"quickFix": "x", "example": '<div class="a">'}}
+    for i in range(8)
+]
+
+def test_every_truncation_keeps_a_prefix_of_complete_items():
+    document = json.dumps({"items": ITEMS}, indent=2)
+    for cut in range(len(document) + 1):
+        items, complete = parse_worker_items(document[:cut])
+        recovered = items["items"]
+        assert recovered == ITEMS[:len(recovered)], cut
+        assert complete == (cut == len(document)) or recovered == ITEMS
+
+def test_fuzzed_responses_never_raise():
+    document = json.dumps({"items": ITEMS}, indent=2)
+    rng = random.Random(1)
+    for _ in range(2000):
+        chars = list(document)
+        for _ in range(5):
+            index = rng.randrange(len(chars))
+            op = rng.random()
+            if op < 0.4:
+                del chars[index]
+            elif op < 0.7:
+                chars.insert(index, rng.choice(',{}[]":\n '))
+            else:
+                chars[index] = rng.choice(',{}[]":\n a')
+        items, _ = parse_worker_items("".join(chars))
+        assert all(isinstance(item, dict) for item in items["items"])
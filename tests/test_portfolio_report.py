@@ -0,0 +1,38 @@
+"""
+Portfolio reports rendered by report workers: the HTML cards are rendered in separate
+portfolio-cards tasks and merged, and must come out exactly as a single inline render.
+"""
+import tempfile
+
+import main
+from reports import generate_portfolio_html_report
+
+PAGES = [
+    {"index": i, "url": f"https://example.com/page-{i}", "auditedAt": "2026-01-01", "overallScore": 40 + 7 * i,
+     "radarMetrics": {"ux": 50 + i, "conversion": 60 - i, "copy": 70, "visuals": 40 + 2 * i, "trust": 55, "speed": 80 - 3 * i},
+     "headline": f"Page {i} buries its <CTA>.",
+     "topFindings": [{"elementName": "Primary CTA", "status": "Poor", "impact": "High", "quickFix": "Move it up & make it red."}]}
+    for i in range(1, 6)
+]
+PORTFOLIO = {
+    "profile": "default", "profileLabel": "Default", "generatedAt": "2026-01-01 09:00", "pages": PAGES,
+    "averageScore": 61,
+    "topIssues": [{"elementName": "Primary CTA", "category": "conversion", "pages": [1, 2, 3, 4, 5], "badness": 20,
+                   "worstStatus": "Poor", "quickFix": "Move it up."}],
+}
+
+
+def test_worker_rendered_portfolio_matches_inline_render(monkeypatch, tmp_path):
+    # Fresh report temp dirs, here and in the worker processes
+    monkeypatch.setenv("TMPDIR", str(tmp_path))
+    monkeypatch.setattr(tempfile, "tempdir", str(tmp_path))
+    monkeypatch.setattr(main, "REPORT_RENDER_WORKERS", 2)
+    monkeypatch.setattr(main, "_report_render_pool", main.ReportRenderPool(max_workers=2))
+    html_path = main.get_portfolio_report_file("html", PORTFOLIO)
+    with open(html_path, encoding="utf-8") as rendered:
+        assert rendered.read() == generate_portfolio_html_report(PORTFOLIO)
+    assert main.get_report_render_pool().metrics()["submitted"] == 3  # two card chunks, then the merge
+
+    pdf_path = main.get_portfolio_report_file("pdf", PORTFOLIO)
+    with open(pdf_path, "rb") as rendered:
+        assert rendered.read(5) == b"%PDF-"
@@ -0,0 +1,79 @@
+"""
+Regression tests for render_radar_png. The chart geometry (grid, axes, score polygon) is checked
+by sampling pixels, which doesn't depend on how the axis labels are rasterized. The exact file
+and pixel hashes include the label text drawn with Pillow's bundled font, which varies with the
+Pillow/FreeType build, so they are only checked on the Pillow version they were pinned with.
+After an intentional change to the chart, re-pin both hashes from a reviewed render.
+"""
+import hashlib
+
+import PIL
+import pytest
+from PIL import Image
+
+from reports import RADAR_CATEGORIES, RADAR_IMAGE_SIZE, radar_polygon_points, render_radar_png
+
+SCORES = {"ux": 72, "conversion": 45, "copy": 88, "visuals": 60, "trust": 30, "speed": 95}
+PINNED_PILLOW_VERSION = "12.3.0"
+PNG_SHA256 = "b53dbff465e741248fd1fd136ff61cd9065de083939d4dd3dae3ddcd36591951"
+PIXELS_SHA256 = "8f872cf2eb7e123f6fb2496e4d8b02a75252db682514a8dfb8b0980fe8941351"
+
+pinned_pillow = pytest.mark.skipif(
+    PIL.__version__ != PINNED_PILLOW_VERSION,
+    reason=f"hashes pinned with Pillow {PINNED_PILLOW_VERSION} (label text rendering differs across builds)"
+)
+
+CENTER, RADIUS = RADAR_IMAGE_SIZE / 2, RADAR_IMAGE_SIZE * 0.34
+
+
+def render(tmp_path, scores=SCORES, name="radar.png"):
+    path = render_radar_png(scores, str(tmp_path / name))
+    with Image.open(path) as img:
+        return img.convert("RGBA")
+
+
+def nearby(img, x, y, reach=2):
+    return [img.getpixel((round(x) + dx, round(y) + dy)) for dx in range(-reach, reach + 1) for dy in range(-reach, reach + 1)]
+
+
+def is_score_blue(pixel):
+    red, green, blue, alpha = pixel
+    return alpha > 50 and blue > red + 40
+
+
+def test_radar_png_geometry(tmp_path):
+    img = render(tmp_path)
+    assert img.size == (RADAR_IMAGE_SIZE, RADAR_IMAGE_SIZE)
+    assert img.getpixel((0, 0))[3] == 0  # transparent background
+
+    # Every score vertex carries the polygon outline
+    for x, y in radar_polygon_points(SCORES, CENTER, CENTER, RADIUS):
+        assert any(pixel[3] > 200 and is_score_blue(pixel) for pixel in nearby(img, x, y))
+
+    # Inside the polygon (halfway to each edge midpoint) is filled
+    vertices = radar_polygon_points(SCORES, CENTER, CENTER, RADIUS)
+    for (x1, y1), (x2, y2) in zip(vertices, vertices[1:] + vertices[:1]):
+        assert is_score_blue(img.getpixel((round((CENTER + (x1 + x2) / 2) / 2), round((CENTER + (y1 + y2) / 2) / 2))))
+
+    # Outside the polygon, on an axis, is grey grid only
+    x, y = radar_polygon_points(dict.fromkeys(RADAR_CATEGORIES, 65), CENTER, CENTER, RADIUS)[RADAR_CATEGORIES.index("trust")]
+    axis_pixels = [pixel for pixel in nearby(img, x, y, reach=1) if pixel[3] > 0]
+    assert axis_pixels and all(abs(pixel[0] - pixel[2]) < 20 for pixel in axis_pixels)
+
+
+def test_radar_png_depends_on_scores(tmp_path):
+    first = render(tmp_path, name="first.png")
+    second = render(tmp_path, {**SCORES, "trust": 31}, name="second.png")
+    assert first.tobytes() != second.tobytes()
+
+
+@pinned_pillow
+def test_radar_png_pixels_are_pinned(tmp_path):
+    assert hashlib.sha256(render(tmp_path).tobytes()).hexdigest() == PIXELS_SHA256
+
+
+@pinned_pillow
+def test_radar_png_file_is_pinned(tmp_path):
+    path = render_radar_png(SCORES, str(tmp_path / "radar.png"))
+    with open(path, "rb") as png:
+        assert hashlib.sha256(png.read()).hexdigest() == PNG_SHA256
@@ -0,0 +1,106 @@
+"""
+WriteBehindWriter against a fake sink: batching, retry with backoff after partial writes,
+spilling on overflow and failed batches, and replaying the spill file once the sink recovers.
+"""
+import json
+import threading
+
+from main import WriteBehindWriter
+
+
+class FakeSink:
+    """write_batch stand-in: records every call, fails (raises) or writes only a prefix on demand."""
+    def __init__(self, failures=(), partial=None):
+        self.calls = []
+        self.written = []
+        self.failures = list(failures)  # True = raise on that call
+        self.partial = partial  # {call_index: records written}
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def __call__(self, records):
+        self.gate.wait()
+        index = len(self.calls)
+        self.calls.append(list(records))
+        if self.failures and self.failures.pop(0):
+            raise ConnectionError("sink unavailable")
+        count = (self.partial or {}).get(index, len(records))
+        self.written.extend(records[:count])
+        return count
+
+
+def make_writer(sink, tmp_path, sleeps=None, **kwargs):
+    options = {"batch_size": 5, "flush_interval": 0.2, "max_retries": 3, "base_backoff": 1.0}
+    options.update(kwargs)
+    sleep = sleeps.append if sleeps is not None else (lambda seconds: None)
+    return WriteBehindWriter(sink, tmp_path / "spill.jsonl", sleep=sleep, name="test", **options)
+
+
+def test_records_are_written_in_batches(tmp_path):
+    sink = FakeSink()
+    sink.gate.clear()
+    writer = make_writer(sink, tmp_path)
+    for i in range(12):
+        assert writer.submit(f"url{i}", {"n": i}, i)
+    sink.gate.set()
+    writer.flush()
+
+    assert [record[0] for record in sink.written] == [f"url{i}" for i in range(12)]
+    assert all(len(call) <= 5 for call in sink.calls)
+    assert len(sink.calls) < 12
+    metrics = writer.metrics()
+    assert metrics["submitted"] == 12
+    assert metrics["written"] == 12
+    assert metrics["queueDepth"] == 0
+    assert metrics["spilled"] == 0
+
+
+def test_retry_resumes_after_partial_write_with_backoff(tmp_path):
+    sink = FakeSink(failures=[False, True], partial={0: 2})
+    sleeps = []
+    writer = make_writer(sink, tmp_path, sleeps=sleeps, flush_interval=0.5)
+    for i in range(4):
+        writer.submit(f"url{i}", {}, i)
+    writer.flush()
+
+    # Call 0 writes two records, call 1 raises, call 2 writes the remaining two - nothing written twice
+    assert [record[0] for record in sink.written] == ["url0", "url1", "url2", "url3"]
+    assert sink.calls[1] == sink.calls[2] == [("url2", {}, 2), ("url3", {}, 3)]
+    assert len(sleeps) == 2
+    assert 0.8 <= sleeps[0] <= 1.2 and 1.6 <= sleeps[1] <= 2.4  # exponential, with jitter
+    assert writer.metrics()["retries"] == 2
+
+
+def test_failed_batch_spills_and_replays_after_recovery(tmp_path):
+    sink = FakeSink(failures=[True] * 4)
+    writer = make_writer(sink, tmp_path, max_retries=3)
+    writer.submit("lost", {"a": 1}, 10)
+    writer.flush()
+
+    spill = tmp_path / "spill.jsonl"
+    assert [json.loads(line) for line in spill.read_text().splitlines()] == [["lost", {"a": 1}, 10]]
+    assert writer.metrics()["spilled"] == 1
+
+    writer.submit("next", {}, 20)
+    writer.flush()
+    assert [record[0] for record in sink.written] == ["next", "lost"]
+    assert not spill.exists()
+    assert writer.metrics()["replayed"] == 1
+
+
+def test_overflow_spills_instead_of_blocking(tmp_path):
+    sink = FakeSink()
+    sink.gate.clear()
+    writer = make_writer(sink, tmp_path, max_queue=2, batch_size=1, flush_interval=0)
+    results = [writer.submit(f"url{i}", {}, i) for i in range(6)]
+
+    assert results.count(False) >= 3
+    spilled = [json.loads(line)[0] for line in (tmp_path / "spill.jsonl").read_text().splitlines()]
+    assert len(spilled) == results.count(False)
+    assert writer.metrics()["maxQueueDepth"] <= 2
+
+    sink.gate.set()
+    writer.flush()
+    # The spill file is replayed after the next successful write, so every record arrives once
+    assert sorted(record[0] for record in sink.written) == [f"url{i}" for i in range(6)]
+    assert writer.metrics()["spilled"] == results.count(False)